@@ -33,6 +33,21 @@ class GlobalConfig(BaseConfig):
     LOGOUT_REDIRECT_URI: Optional[str]=None
     OKTA_ISSUER: Optional[str] = None
     DEFAULT_ROLE_ID: int = 1
+    JOB_QUEUE_PERSIST: bool = False
+    # >1 reserves CR codes in blocks per process: fewer round trips, but gaps on restart
+    CR_CODE_BLOCK_SIZE: int = 1
+    RATE_LIMIT_REDIS_URL: Optional[str] = None
+    # Reverse proxies (comma-separated IPs or CIDRs) whose X-Forwarded-For names the client
+    TRUSTED_PROXIES: str = ""
+    # Development/staging: per-request query log, N+1 and slow-query report
+    QUERY_PROFILER_ENABLED: bool = False
+    QUERY_PROFILER_SLOW_MS: float = 250
+    QUERY_PROFILER_REPEAT_THRESHOLD: int = 5
+    # Server-side task document PDFs (WeasyPrint in worker processes)
+    PDF_RENDER_WORKERS: int = 2
+    PDF_CACHE_FOLDER: str = "pdf_cache"
+    # Store resubmitted incident forms as JSON patches (database_scripts/Rakesh/json_template_patches.sql)
+    JSON_TEMPLATE_PATCH_STORAGE: bool = False
     BASE_DIR: ClassVar[str] = os.path.dirname(os.path.abspath(__file__))
 
 
@@ -33,6 +33,8 @@ from app.db.transaction.incident_reports import incident_report_table
 from app.db.transaction.task_work_log import task_work_log_table
 from app.db.transaction.change_request_user_mapping import change_request_user_mapping_table
 from app.db.transaction.json_template_transactions import json_template_transactions
+from app.db.transaction.background_jobs import background_jobs
+from app.db.transaction.change_request_code_counters import change_request_code_counters
 
 # docs tables
 from app.db.docs.task_docs import task_docs_table
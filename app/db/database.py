@@ -2,6 +2,7 @@ import databases
 import sqlalchemy
 from app.db.metadata import metadata
 from app.config import config
+from app.utils.metrics import QueryTimer
 
 # Detect if using SQLite (no schema support)
 IS_SQLITE = "sqlite" in config.DATABASE_URL
@@ -38,8 +39,45 @@ engine = sqlalchemy.create_engine(config.DATABASE_URL, connect_args=connect_args
 # Create all tables
 metadata.create_all(engine)
 
+class InstrumentedDatabase(databases.Database):
+    """
+    databases.Database that records every call in the Prometheus metrics:
+    time per calling service function, rows returned, and round trips and
+    DB time per request (see app.utils.metrics).
+    """
+
+    async def execute(self, query, values=None):
+        with QueryTimer("execute", query):
+            return await super().execute(query, values)
+
+    async def execute_many(self, query, values):
+        with QueryTimer("execute_many", query):
+            return await super().execute_many(query, values)
+
+    async def fetch_one(self, query, values=None):
+        with QueryTimer("fetch_one", query):
+            return await super().fetch_one(query, values)
+
+    async def fetch_val(self, query, values=None, column=0):
+        with QueryTimer("fetch_val", query):
+            return await super().fetch_val(query, values, column=column)
+
+    async def fetch_all(self, query, values=None):
+        with QueryTimer("fetch_all", query) as timer:
+            rows = await super().fetch_all(query, values)
+            timer.rows = len(rows)
+            return rows
+
+    async def iterate(self, query, values=None):
+        with QueryTimer("iterate", query) as timer:
+            timer.rows = 0
+            async for row in super().iterate(query, values):
+                timer.rows += 1
+                yield row
+
+
 # Set up the database object
-database = databases.Database(
+database = InstrumentedDatabase(
     config.DATABASE_URL, force_rollback=config.DB_FORCE_ROLL_BACK
 )
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, Text, Boolean, ForeignKey, DateTime,Numeric
+from sqlalchemy import Table, Column, Integer, Text, Boolean, ForeignKey, DateTime,Numeric, Index
 from app.db.metadata import metadata
 from app.db.database import docs_schema, transaction_schema_fk
 
@@ -19,3 +19,6 @@ task_docs_table = Table(
     Column("updated_date", DateTime(timezone=True)),
     schema=docs_schema,
 )
+
+# Per-task version lists and the latest-version window of the phase document index
+Index("ix_task_docs_task_version", task_docs_table.c.project_task_id, task_docs_table.c.doc_version.desc())
@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, String, JSON, Float, TIMESTAMP, ForeignKey, text
+from sqlalchemy import Table, Column, Integer, String, JSON, Float, TIMESTAMP, ForeignKey, Index, text
 from app.db.metadata import metadata
 from app.db.database import master_schema, master_schema_fk
 
@@ -15,6 +15,13 @@ json_templates_table = Table(
     schema=master_schema
 )
 
+# latest version of a template type without a MAX() join
+Index(
+    "ix_json_templates_type_version",
+    json_templates_table.c.template_type_id,
+    json_templates_table.c.template_version.desc(),
+)
+
 
 
 
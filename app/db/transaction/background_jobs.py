@@ -0,0 +1,22 @@
+from sqlalchemy import Table, Column, Integer, String, Text, JSON, DateTime
+from app.db.metadata import metadata
+from app.db.database import transaction_schema
+
+background_jobs = Table(
+    "background_jobs",
+    metadata,
+    Column("job_id", String(32), primary_key=True),
+    Column("job_type", String(64), nullable=False),
+    Column("status", String(16), nullable=False),
+    Column("progress", Integer, nullable=False, default=0),
+    Column("message", String),
+    Column("attempts", Integer, nullable=False, default=0),
+    Column("payload", JSON),
+    Column("result", JSON),
+    Column("error", Text),
+    Column("created_by", Integer),
+    Column("created_date", DateTime(timezone=True)),
+    Column("started_date", DateTime(timezone=True)),
+    Column("finished_date", DateTime(timezone=True)),
+    schema=transaction_schema,
+)
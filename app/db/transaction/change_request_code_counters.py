@@ -0,0 +1,12 @@
+from sqlalchemy import Table, Column, Integer
+from app.db.metadata import metadata
+from app.db.database import transaction_schema
+
+# last CR-{year}-{n} number handed out per year (see app.utils.change_request_codes)
+change_request_code_counters = Table(
+    "change_request_code_counters",
+    metadata,
+    Column("year", Integer, primary_key=True, autoincrement=False),
+    Column("last_value", Integer, nullable=False),
+    schema=transaction_schema,
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, String, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Table, Column, Integer, String, DateTime, ForeignKey, Boolean, Text, Index
 from app.db.metadata import metadata
 from app.db.database import transaction_schema, transaction_schema_fk
 
@@ -14,3 +14,11 @@ change_request_user_mapping_table = Table(
     Column("user_is_active", Boolean, default=True, nullable=False),
     schema=transaction_schema,
 )
+
+# CR inbox: the requests an approver still has to verify
+Index(
+    "ix_change_request_user_mapping_verifier",
+    change_request_user_mapping_table.c.verified_by,
+    change_request_user_mapping_table.c.user_is_active,
+    change_request_user_mapping_table.c.change_request_id,
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Table, Column, Integer, String, DateTime, ForeignKey, Index
 from app.db.metadata import metadata
 from app.db.database import transaction_schema, transaction_schema_fk
 
@@ -14,3 +14,6 @@ comment_replies_table = Table(
     Column("update_date", DateTime(timezone=True)),
     schema=transaction_schema,
 )
+
+# Replies of a comment in date order; also probed per comment by "since" queries
+Index("ix_comment_replies_comment_date", comment_replies_table.c.comment_id, comment_replies_table.c.replied_date)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Table, Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Boolean, Table, Column, Integer, String, DateTime, ForeignKey, Text, Index
 from app.db.metadata import metadata
 from app.db.database import transaction_schema, transaction_schema_fk
 
@@ -21,9 +21,22 @@ incident_report_table = Table(
     Column("resolved_date", DateTime, nullable=True),
     Column("resolve_comment", String, nullable=True),
     Column("is_resolved", Boolean, default=False, nullable=False),
+    # lookup names copied in at create time so the incident inbox needs no joins
+    Column("project_name", String, nullable=True),
+    Column("phase_name", String, nullable=True),
+    Column("task_name", String, nullable=True),
     schema=transaction_schema,
 )
 
+# inbox: filter by assignee + failure type, newest first (keyset on incident_report_id)
+Index(
+    "ix_incident_reports_assigned_failure_id",
+    incident_report_table.c.assigned_to,
+    incident_report_table.c.failure_type,
+    incident_report_table.c.incident_report_id.desc(),
+)
+Index("ix_incident_reports_task_id", incident_report_table.c.task_id)
+
 incident_reports_table = Table(
     "incident_report",
     metadata,
@@ -47,4 +60,12 @@ incident_report_transactions = Table(
     Column("status", Integer),
     Column("created_date", DateTime, nullable=True),
     schema=transaction_schema,
-)
\ No newline at end of file
+)
+
+# incident version history: the submissions of one incident in order
+Index(
+    "ix_incident_report_transactions_incident_status",
+    incident_report_transactions.c.incident_report_id,
+    incident_report_transactions.c.status,
+    incident_report_transactions.c.created_date.desc(),
+)
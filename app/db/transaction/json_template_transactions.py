@@ -6,8 +6,13 @@ json_template_transactions = Table(
     "json_template_transactions",
     metadata,
     Column("transaction_template_id", Integer, primary_key=True, autoincrement=True),
-    Column("template_json", JSON, nullable=False),
+    # NULL on patch rows; see json_template_versions_service.load_template_json
+    Column("template_json", JSON, nullable=True),
     Column("created_by", Integer),
     Column("created_date", DateTime, server_default=func.now()),
+    # successive versions stored as a JSON Patch against base_transaction_id
+    Column("base_transaction_id", Integer, ForeignKey(transaction_schema_fk("json_template_transactions.transaction_template_id")), nullable=True),
+    Column("patch_json", JSON, nullable=True),
+    Column("chain_depth", Integer, nullable=True),
     schema=transaction_schema,
 )
@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Table, Column, Integer, String, Boolean, DateTime, ForeignKey, Index
 from app.db.metadata import metadata
 from app.db.database import transaction_schema, transaction_schema_fk
 
@@ -20,3 +20,6 @@ project_comments_table = Table(
     Column("is_direct_comment", Boolean, default=True),
     schema=transaction_schema,
 )
+
+# Phase comment threads in date order, and their "since" delta scans
+Index("ix_project_comments_phase_date", project_comments_table.c.project_phase_id, project_comments_table.c.comment_date)
@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, ForeignKey, Boolean
+from sqlalchemy import Table, Column, Integer, ForeignKey, Boolean, Index
 from app.db.metadata import metadata
 from app.db.database import transaction_schema, transaction_schema_fk
 
@@ -11,3 +11,11 @@ projects_user_mapping_table = Table(
     Column("is_active", Boolean, default=True),
     schema=transaction_schema,
 )
+
+# membership probes by user (CR inbox EXISTS, "my projects"); project_id makes them index-only
+Index(
+    "ix_projects_user_mapping_user_active",
+    projects_user_mapping_table.c.user_id,
+    projects_user_mapping_table.c.is_active,
+    projects_user_mapping_table.c.project_id,
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, String, ForeignKey, DateTime, func
+from sqlalchemy import Table, Column, Integer, String, ForeignKey, DateTime, func, Index
 from app.db.metadata import metadata
 from app.db.database import transaction_schema, transaction_schema_fk
 
@@ -12,3 +12,5 @@ task_work_log_table = Table(
     Column("created_date",DateTime(timezone=True),server_default=func.now(),nullable=False,),
     schema=transaction_schema,
 )
+
+Index("ix_task_work_log_project_task_id", task_work_log_table.c.project_task_id, task_work_log_table.c.task_work_log_id)
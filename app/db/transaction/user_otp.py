@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy import Table, Column, Integer, String, DateTime, ForeignKey, func, Index
 from app.db.metadata import metadata
 from app.db.database import transaction_schema
 
@@ -19,3 +19,5 @@ user_otp = Table(
     schema=transaction_schema,  # optional, can be None
 )
 
+# one OTP row per user; forgot-password upserts on it
+Index("ux_user_otp_user_id", user_otp.c.user_id, unique=True)
@@ -18,7 +18,7 @@
 #     schema=transaction_schema,
 # )
 
-from sqlalchemy import Table, Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Table, Column, Integer, String, Boolean, DateTime, Index
 from app.db.metadata import metadata
 from app.db.database import transaction_schema
 
@@ -49,3 +49,23 @@ users = Table(
     Column("image_url", String),
     schema=transaction_schema,
 )
+
+# Login lookups by email over active users, answered from the index alone
+# (partial + INCLUDE; SQLite just gets a plain email index)
+Index(
+    "ix_users_active_email",
+    users.c.email,
+    postgresql_where=users.c.is_active == True,
+    postgresql_include=[
+        "user_id",
+        "user_name",
+        "user_first_name",
+        "password",
+        "is_active",
+        "is_temporary_password",
+        "password_validity_date",
+        "login_failed_count",
+        "is_user_locked",
+        "user_locked_time",
+    ],
+)
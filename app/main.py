@@ -10,9 +10,14 @@ from starlette.staticfiles import StaticFiles
 from app.logging_conf import configure_logging
 from asgi_correlation_id import CorrelationIdMiddleware
 from app.db.database import database
+from app.utils.http_clients import http_clients
+from app.utils.metrics import InstrumentedJSONResponse
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from app.middleware.auth_middleware import auth_middleware
+from app.middleware.request_user_cache import RequestUserCacheMiddleware
+from app.middleware.metrics_middleware import RequestMetricsMiddleware
+from app.middleware.query_profiler_middleware import QueryProfilerMiddleware
 from app.routers.risk_assessment_template_router import router as  risk_assessment_template_router
 from app.routers.transaction.projects_router import router as projects_router
 # from app.routers.auth import auth_router
@@ -52,16 +57,30 @@ from app.routers.transaction.change_request_router import router as change_reque
 from app.routers.transaction.project_details_router import router as project_details_router
 # from app.routers.transaction.user_registeration_router import router as user_registration
 from app.routers.template_type_router import router as template_type_router
+from app.routers.jobs_router import router as jobs_router
+from app.routers.search_router import router as search_router
+from app.routers.transaction.project_export_router import router as project_export_router
+from app.utils.job_runner import job_runner
+from app.utils.pdf_renderer import pdf_renderer
 logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     configure_logging()
     await database.connect()
+    await job_runner.resume_pending()
     yield
+    await job_runner.shutdown()
+    pdf_renderer.shutdown()
     await database.disconnect()
+    await http_clients.aclose()
 
-app = FastAPI(lifespan=lifespan, root_path="/api", title="AI Verify Dev")
+app = FastAPI(
+    lifespan=lifespan,
+    root_path="/api",
+    title="AI Verify Dev",
+    default_response_class=InstrumentedJSONResponse,
+)
 
 # CORS middleware
 app.add_middleware(
@@ -83,6 +102,14 @@ app.add_middleware(CorrelationIdMiddleware)
 
 app.middleware("http")(auth_middleware)
 
+# Dev/staging query log and N+1 report; a pass-through unless QUERY_PROFILER_ENABLED
+app.add_middleware(QueryProfilerMiddleware)
+
+# Outside the auth middleware, so it and the dependencies share the request's user cache
+app.add_middleware(RequestUserCacheMiddleware)
+# DB round trips / upload bytes per route; the Instrumentator covers HTTP timings
+app.add_middleware(RequestMetricsMiddleware)
+
 app.include_router(user_roles_router)
 app.include_router(status_router)
 app.include_router(task_router)
@@ -119,7 +146,10 @@ app.include_router(change_request_router)
 app.include_router(work_flow_stages_router)
 app.include_router(risk_assessment_template_router)
 app.include_router(projects_router)
-# Instrumentation
+app.include_router(jobs_router)
+app.include_router(search_router)
+app.include_router(project_export_router)
+# Instrumentation: HTTP metrics here, DB/cache/WebSocket metrics in app.utils.metrics
 Instrumentator().instrument(app).expose(app)
 app.include_router(template_type_router)
 
@@ -0,0 +1,64 @@
+import time
+
+from app.utils.metrics import UPLOAD_BYTES, UPLOAD_SECONDS, begin_request_stats, end_request_stats, route_label
+
+
+class RequestMetricsMiddleware:
+    """
+    Per-request metrics the Instrumentator cannot see: database round trips
+    and DB time per route, and multipart upload volume and duration.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if _is_multipart(scope):
+            receive = _UploadMeter(scope, receive)
+
+        token = begin_request_stats(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            end_request_stats(token)
+            if isinstance(receive, _UploadMeter):
+                receive.record()
+
+
+def _is_multipart(scope) -> bool:
+    for name, value in scope.get("headers", ()):
+        if name == b"content-type":
+            return value.startswith(b"multipart/")
+    return False
+
+
+class _UploadMeter:
+    __slots__ = ("scope", "receive", "size", "first_chunk", "last_chunk")
+
+    def __init__(self, scope, receive):
+        self.scope = scope
+        self.receive = receive
+        self.size = 0
+        self.first_chunk = None
+        self.last_chunk = None
+
+    async def __call__(self):
+        message = await self.receive()
+        if message["type"] == "http.request":
+            now = time.perf_counter()
+            if self.first_chunk is None:
+                self.first_chunk = now
+            self.last_chunk = now
+            self.size += len(message.get("body", b""))
+        return message
+
+    def record(self) -> None:
+        if self.first_chunk is None:
+            return
+        route = route_label(self.scope)
+        UPLOAD_BYTES.labels(route).inc(self.size)
+        UPLOAD_SECONDS.labels(route).observe(self.last_chunk - self.first_chunk)
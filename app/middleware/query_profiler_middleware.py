@@ -0,0 +1,39 @@
+from starlette.datastructures import MutableHeaders
+
+from app.utils.metrics import route_label
+from app.utils.query_profiler import SUMMARY_HEADER, current_query_profile, query_profiler
+
+
+class QueryProfilerMiddleware:
+    """
+    When query profiling is on, records every query of a request, adds an
+    X-DB-Queries summary header to the response and logs the JSON report
+    (N+1 fingerprints, slow queries with EXPLAIN). A pass-through otherwise.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not query_profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        token = query_profiler.begin(scope["method"], scope["path"])
+        profile = current_query_profile()
+
+        async def send_with_summary(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                # streamed bodies keep querying after this point; the
+                # logged report has the final numbers
+                message["headers"] = list(message.get("headers", []))
+                MutableHeaders(scope=message).append(SUMMARY_HEADER, query_profiler.summary(profile))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_summary)
+        finally:
+            query_profiler.end(token)
+            profile.route = route_label(scope)
+            await query_profiler.finish(profile)
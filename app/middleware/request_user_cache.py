@@ -0,0 +1,22 @@
+from app.utils.user_queries import begin_request_user_cache, end_request_user_cache
+
+
+class RequestUserCacheMiddleware:
+    """
+    Gives every HTTP request its own user cache, so the auth dependency and
+    the services behind it load a given user at most once per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = begin_request_user_cache()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            end_request_user_cache(token)
@@ -1,6 +1,11 @@
 from fastapi import APIRouter
-from app.services.docs.task_doc_pdf_service import get_task_doc_by_id, compare_documents
-from fastapi.responses import HTMLResponse,JSONResponse
+from app.services.docs.task_doc_pdf_service import get_task_doc_by_id, compare_documents, render_task_doc_pdf
+from fastapi.responses import FileResponse, HTMLResponse,JSONResponse
+from app.services.background_jobs_service import enqueue_job_service
+from app.services.transaction.json_template_versions_service import (
+    compare_incident_submissions_service,
+    compare_template_transactions_service,
+)
 
 router = APIRouter(prefix="/docs", tags=["Docs APIs"])
 
@@ -12,7 +17,9 @@ async def fetch_task_doc(task_doc_id: int):
 
 
 @router.get("/compare_docs/{task_doc_id}", response_class=HTMLResponse)
-async def compare_docs_html(task_doc_id: int):
+async def compare_docs_html(task_doc_id: int, background: bool = False):
+    if background:
+        return await enqueue_job_service("compare_documents", task_doc_id=task_doc_id)
     result = await compare_documents(task_doc_id)
     # Since response_class is HTMLResponse, return the diff_html directly if that's the intent
     # If you want JSON, change response_class to JSONResponse
@@ -20,4 +27,32 @@ async def compare_docs_html(task_doc_id: int):
         status_code=result["status_code"],
         content={"message": result["message"], "data": result["data"]}
  
-   )
\ No newline at end of file
+   )
+
+
+# declared before the two-id route, which would otherwise match "incident"
+@router.get("/compare_json/incident/{incident_report_id}")
+async def compare_incident_submissions(incident_report_id: int):
+    return await compare_incident_submissions_service(incident_report_id)
+
+
+@router.get("/compare_json/{old_transaction_id}/{new_transaction_id}")
+async def compare_json_templates(old_transaction_id: int, new_transaction_id: int):
+    return await compare_template_transactions_service(old_transaction_id, new_transaction_id)
+
+
+@router.get("/render_pdf/{task_doc_id}")
+async def render_pdf(task_doc_id: int):
+    result = await render_task_doc_pdf(task_doc_id)
+    if result["status_code"] != 200:
+        return JSONResponse(
+            status_code=result["status_code"],
+            content={"message": result["message"], "data": result["data"]}
+        )
+    # streamed from the render cache; Range requests work for large documents
+    return FileResponse(
+        result["data"],
+        media_type="application/pdf",
+        filename=f"task_doc_{task_doc_id}.pdf",
+        content_disposition_type="inline",
+    )
@@ -1,9 +1,12 @@
 import logging
+from typing import Optional
 from app.db.database import database
 from app.schemas.docs.task_docs_schema import SaveProjectTaskDocumentRequest, SubmitProjectTaskDocumentRequest
 from app.services.docs.task_docs_service import get_document_by_project_task_id_service, get_phase_documents_by_project_task_id, \
-    save_project_task_document_service, submit_project_task_document_service
-from fastapi import APIRouter
+    save_project_task_document_service, submit_project_task_document_service, get_phase_document_index, \
+    get_task_document_versions
+from fastapi import APIRouter, Header, Request
+from app.services.background_jobs_service import enqueue_job_service
 
 router = APIRouter(prefix="/docs", tags=["Docs APIs"])
 logger = logging.getLogger(__name__)
@@ -18,9 +21,19 @@ async def save_project_task_document(payload: SaveProjectTaskDocumentRequest):
     return await save_project_task_document_service(database, payload)
 
 @router.post("/submitProjectTaskDocument")
-async def submit_project_task_document(payload: SubmitProjectTaskDocumentRequest):
+async def submit_project_task_document(payload: SubmitProjectTaskDocumentRequest, request: Request, background: bool = False):
+    if background:
+        return await enqueue_job_service("submit_task_document", request=request, payload=payload.model_dump())
     return await submit_project_task_document_service(database, payload)
 
 @router.get("/GetPhaseDocumentsByProjectTaskId/{project_task_id}")
 async def get_document_by_project_task_id(project_task_id: int):
-    return await get_phase_documents_by_project_task_id(database, project_task_id)
\ No newline at end of file
+    return await get_phase_documents_by_project_task_id(database, project_task_id)
+
+@router.get("/GetPhaseDocumentIndex/{project_task_id}")
+async def get_phase_document_index_api(project_task_id: int, if_none_match: Optional[str] = Header(None)):
+    return await get_phase_document_index(database, project_task_id, if_none_match)
+
+@router.get("/GetTaskDocumentVersions/{project_task_id}")
+async def get_task_document_versions_api(project_task_id: int):
+    return await get_task_document_versions(database, project_task_id)
@@ -1,6 +1,6 @@
 
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from app.schemas.forgot_password_schema import (
     ForgotPasswordRequest,
     VerifyOtpRequest,
@@ -12,12 +12,13 @@ from app.services.forgot_password_service import (
     process_verify_otp,
     process_reset_password
 )
+from app.utils.rate_limit import client_ip
 
 router = APIRouter()
 
 @router.post("/forgot-password", response_model=SendResetResponse)
-async def forgot_password(payload: ForgotPasswordRequest):
-    return await process_forgot_password(payload)
+async def forgot_password(payload: ForgotPasswordRequest, request: Request):
+    return await process_forgot_password(payload, client_ip(request))
 
 
 @router.post("/verify-otp", response_model=SendResetResponse)
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+
+from app.services.background_jobs_service import get_job_status_service
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get("/{job_id}")
+async def get_job_status(job_id: str):
+    return await get_job_status_service(job_id)
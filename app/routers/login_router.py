@@ -51,8 +51,6 @@ async def okta_logout(request: Request):
     """
     id_token = request.query_params.get("id_token")
 
-    print("ID_TOKEN received:", id_token)
-
     # Frontend URL to redirect after logout
     post_logout_redirect_uri = config.LOGOUT_REDIRECT_URI
 
@@ -64,7 +62,6 @@ async def okta_logout(request: Request):
         f"id_token_hint={id_token or ''}&"
         f"post_logout_redirect_uri={post_logout_redirect_uri}"
     )
-    print("logout url is : ",logout_url)
     # Clear server-side session if any (optional)
     # request.session.clear()  # if using sessions
 
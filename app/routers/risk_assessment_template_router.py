@@ -1,5 +1,7 @@
 import logging
-from fastapi import APIRouter,Body,Request,status
+from typing import Optional
+
+from fastapi import APIRouter,Body,Header,Request,status
 from fastapi.responses import JSONResponse
 from app.services.risk_assessment_template_service import (
     # get_all_risk_assessment_templates_service, get_risk_assessment_templates_by_asset_type_service,
@@ -15,11 +17,11 @@ logger = logging.getLogger(__name__)
 
 
 @router.get("/by-template-type", summary="Get latest JSON templates by template_type_id")
-async def get_templates_by_template_type(template_type_id: int):
+async def get_templates_by_template_type(template_type_id: int, if_none_match: Optional[str] = Header(None)):
     """
     Fetch the latest version of all JSON templates for a given template_type_id.
     """
-    return await get_latest_templates_by_type_service(template_type_id)
+    return await get_latest_templates_by_type_service(template_type_id, if_none_match)
 
 
 
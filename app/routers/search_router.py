@@ -0,0 +1,21 @@
+from typing import Optional
+
+from fastapi import APIRouter, Query, Request
+
+from app.services.search_service import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, search_service
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("")
+async def search(
+    request: Request,
+    q: str = Query(..., min_length=1, description="Words or quoted phrases; -word excludes on Postgres"),
+    types: Optional[list[str]] = Query(None, description="document, comment, reply and/or incident"),
+    project_id: Optional[int] = Query(None),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    return await search_service(
+        q=q, user_id=request.state.user["user_id"], types=types, project_id=project_id, page=page, page_size=page_size
+    )
@@ -1,5 +1,7 @@
 # app/routers/template_type_router.py
-from fastapi import APIRouter, Path, Query,Request
+from typing import Optional
+
+from fastapi import APIRouter, Header, Path, Query,Request
 
 from app.schemas.template_type_schema import (
     CreateJsonTemplate,
@@ -25,12 +27,14 @@ async def create_json_template(request: Request, input: CreateJsonTemplate):
 
 @router.get("/getJsonTemplate/{template_id}")
 async def get_json_template(
-    template_id: int = Path(..., ge=1, description="The ID of the JSON template to retrieve")
+    template_id: int = Path(..., ge=1, description="The ID of the JSON template to retrieve"),
+    if_none_match: Optional[str] = Header(None),
 ):
-    return await get_json_template_by_id(template_id)
+    return await get_json_template_by_id(template_id, if_none_match)
 
 @router.get("/getAllVersions")
 async def get_all_versions(
-    template_type_id: int = Query(..., ge=1, description="The template_type_id to filter versions")
+    template_type_id: int = Query(..., ge=1, description="The template_type_id to filter versions"),
+    if_none_match: Optional[str] = Header(None),
 ):
-    return await get_all_versions_by_type_id(template_type_id)
\ No newline at end of file
+    return await get_all_versions_by_type_id(template_type_id, if_none_match)
\ No newline at end of file
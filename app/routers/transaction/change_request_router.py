@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Query, Request
 from app.schemas.transaction.change_request_schema import ChangeRequestVerifyUpdateRequest
 from app.services.transaction.change_request_service import get_unverified_change_requests, get_cr_file_service, \
-    update_change_request_verification_status
+    update_change_request_verification_status, get_change_request_detail_service
 
 
 router = APIRouter(prefix="/transaction", tags=["Transaction APIs"])
@@ -12,6 +12,11 @@ async def get_change_requests(request: Request):
     return await get_unverified_change_requests(request)
 
 
+@router.get("/getChangeRequestDetail")
+async def get_change_request_detail(request: Request, change_request_id: int = Query(..., description="Change request to load")):
+    return await get_change_request_detail_service(change_request_id, request)
+
+
 @router.get("/getChangeRequestFile")
 async def get_project_file_api(file_name: str = Query(..., description="Name of the file to retrieve")):
     return await get_cr_file_service(file_name)
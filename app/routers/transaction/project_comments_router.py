@@ -1,3 +1,6 @@
+from datetime import datetime
+from typing import Optional
+
 from fastapi import APIRouter
 from app.db.database import database
 from app.schemas.transaction.project_comments_schema import ProjectCommentCreateRequest, ProjectCommentResponse, \
@@ -14,15 +17,14 @@ async def create_project_comment_api(data: ProjectCommentCreateRequest):
     return await create_project_comment(data)
 
 @router.get("/GetCommentsByTask/{task_id}")
-async def get_comments_by_task_api(task_id: int):
-    return await get_comments_by_task(task_id)
+async def get_comments_by_task_api(task_id: int, since: Optional[datetime] = None):
+    return await get_comments_by_task(task_id, since=since)
 
 
 @router.post("/AddCommentReply", response_model=CommentReplyResponse)
 async def add_comment_reply_api(reply: CommentReplyCreateRequest):
     # here we pass `database` instead of `db` from Depends
-    async with database.transaction():
-        return await create_comment_reply(database, reply)
+    return await create_comment_reply(database, reply)
 
 
 @router.put("/ResolveComment/{comment_id}/{user_id}", response_model=CommentResolveResponse)
@@ -31,8 +33,8 @@ async def resolve_comment(comment_id: int, user_id: int):
 
 
 @router.get("/comments/{user_id}")
-async def fetch_user_comments(user_id: int, project_id: int):
-    return await get_user_comments_service(user_id=user_id, project_id=project_id)
+async def fetch_user_comments(user_id: int, project_id: int, since: Optional[datetime] = None):
+    return await get_user_comments_service(user_id=user_id, project_id=project_id, since=since)
 
 
 @router.put("/comment/edit")
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Request
+
+from app.services.background_jobs_service import enqueue_job_service
+from app.services.transaction.project_export_service import (
+    get_project_export_file_service,
+    stream_project_export_service,
+)
+
+router = APIRouter(prefix="/exports", tags=["Project Exports"])
+
+
+@router.get("/projects/{project_id}")
+async def stream_project_export(project_id: int):
+    return await stream_project_export_service(project_id)
+
+
+@router.post("/projects/{project_id}")
+async def start_project_export(project_id: int, request: Request):
+    # progress via GET /jobs/{job_id}; the result holds the download_url
+    return await enqueue_job_service("export_project", request=request, project_id=project_id)
+
+
+@router.get("/files/{file_name}")
+async def download_project_export(file_name: str):
+    return await get_project_export_file_service(file_name)
@@ -1,5 +1,5 @@
 import logging
-from fastapi import APIRouter, HTTPException, Query, Form
+from fastapi import APIRouter, HTTPException, Query, Form, Header
 from fastapi.responses import JSONResponse
 from app.db.database import database
 # from app.security import get_current_user
@@ -9,6 +9,7 @@ from typing import Union
 from app.schemas.transaction.project_schema import DashboardResponse, ProjectDetailResponse, ProjectCreateRequest, ProjectOut, \
     ProjectSummaryListResponse, UpdateProjectDetailsRequest, dashboard_Get_Request
 # from app.security import get_current_user
+from app.services.background_jobs_service import buffer_upload, enqueue_job_service
 from app.services.transaction.project_service import get_dashboard_data, get_project_detail, create_project_service, \
     get_all_projects_by_user_id, get_all_projects, \
     new_get_all_projects, get_project_details_service, update_project_details_service, delete_project_service
@@ -128,9 +129,19 @@ async def create_project_api(
     payload: ProjectCreateRequest = Depends(ProjectCreateRequest.as_form),
     files: Optional[List[UploadFile]] = None,
     change_request_file: Union[UploadFile, str, None] = Form(None),
+    background: bool = Query(False, description="Run as a background job and return 202 with a job handle"),
 ):
     if isinstance(change_request_file, str) and change_request_file.strip() == "":
         change_request_file = None
+    if background:
+        return await enqueue_job_service(
+            "create_project",
+            request=request,
+            payload=payload,
+            files=[await buffer_upload(f) for f in files or []],
+            change_request_file=await buffer_upload(change_request_file),
+            user=request.state.user,
+        )
     return await create_project_service(
         payload=payload,
         files=files,
@@ -229,6 +240,7 @@ async def update_project_details(
     change_request_file: Union[UploadFile, str, None] = Form(None),
     change_request_json: Optional[str] = Form(None),
     change_request_id: Optional[int] = Form(None),
+    background: bool = Query(False, description="Run as a background job and return 202 with a job handle"),
 ):
     if isinstance(change_request_file, str) and change_request_file.strip() == "":
         change_request_file = None
@@ -262,9 +274,7 @@ async def update_project_details(
             },
         )
 
-    # Call the service
-    return await update_project_details_service(
-        request=request,
+    update_fields = dict(
         project_id=project_id,
         title=title,
         description=description,
@@ -273,15 +283,30 @@ async def update_project_details(
         renewal_year=renewal_year,
         make=make,
         model=model,
-        files=files,
         remove_file_ids=parsed_remove_file_ids,
         add_user_ids=parsed_add_user_ids,
         remove_user_ids=parsed_remove_user_ids,
         change_request_code=change_request_code,
-        change_request_file=change_request_file,
         change_request_json=change_request_json,
         change_request_id=change_request_id,
     )
+    if background:
+        return await enqueue_job_service(
+            "update_project_details",
+            request=request,
+            files=[await buffer_upload(f) for f in files or []] or None,
+            change_request_file=await buffer_upload(change_request_file),
+            user=request.state.user,
+            **update_fields,
+        )
+
+    # Call the service
+    return await update_project_details_service(
+        request=request,
+        files=files,
+        change_request_file=change_request_file,
+        **update_fields,
+    )
 
 
 @router.delete("/delete_project/{project_id}")
@@ -295,7 +320,8 @@ async def delete_project(project_id: int):
 #     return await get_dashboard_data(payload)
 async def fetch_dashboard_data(
     user_id: int = Query(..., description="User ID"),
-    project_id: Optional[int] = Query(None, description="Project ID")
+    project_id: Optional[int] = Query(None, description="Project ID"),
+    if_none_match: Optional[str] = Header(None),
 ):
     payload = dashboard_Get_Request(user_id=user_id, project_id=project_id)
-    return await get_dashboard_data(payload)
\ No newline at end of file
+    return await get_dashboard_data(payload, if_none_match)
\ No newline at end of file
@@ -1,10 +1,10 @@
 import logging
 from app.db.database import database
-from app.schemas.transaction.project_task_schema import MapUsersToTaskRequest
+from app.schemas.transaction.project_task_schema import MapUsersToTaskRequest, MapUsersToTasksRequest
 from fastapi import APIRouter
 from app.schemas.transaction.task_schema import ProjectTaskTransferRequest
 from app.services.transaction.project_task_service import map_users_to_project_task_service, \
-    get_users_by_project_task_id, transfer_project_task_ownership_service
+    get_users_by_project_task_id, transfer_project_task_ownership_service, map_users_to_project_tasks_service
 
 router = APIRouter(prefix="/transaction", tags=["Transaction APIs"])
 logger = logging.getLogger(__name__)
@@ -14,6 +14,10 @@ logger = logging.getLogger(__name__)
 async def map_users_to_task(payload: MapUsersToTaskRequest):
     return await map_users_to_project_task_service(database, payload)
 
+@router.post("/mapUsersToTasks")
+async def map_users_to_tasks(payload: MapUsersToTasksRequest):
+    return await map_users_to_project_tasks_service(database, payload)
+
 @router.get("/GetUsersByProjectTaskId/{project_task_id}")
 async def get_users_by_project_task(project_task_id: int):
     return await get_users_by_project_task_id(database, project_task_id)
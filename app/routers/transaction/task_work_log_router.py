@@ -1,7 +1,10 @@
+from typing import Optional
 from fastapi import APIRouter, Query
-from app.schemas.transaction.task_work_log_schema import TaskWorkLogCreateRequest, UpdateProjectTaskStatusRequest
+from app.schemas.transaction.task_work_log_schema import TaskWorkLogCreateRequest, UpdateProjectTaskStatusRequest, \
+    TaskWorkLogBatchCreateRequest
 from app.services.transaction.task_work_log_service import get_task_work_log_details_by_project_task_id, \
-    create_task_work_log, update_project_task_status
+    create_task_work_log, update_project_task_status, create_task_work_logs_batch, get_task_work_logs, \
+    stream_task_work_logs
 
 router = APIRouter(prefix="/transaction", tags=["Transaction APIs"])
 
@@ -10,10 +13,32 @@ async def get_task_work_log_details(project_task_id: int = Query(..., descriptio
     return await get_task_work_log_details_by_project_task_id(project_task_id)
 
 
+@router.get("/getTaskWorkLogs")
+async def get_task_work_logs_api(
+    project_task_id: int = Query(..., description="Project Task ID"),
+    after_id: Optional[int] = Query(None, description="Return logs after this task_work_log_id"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size"),
+):
+    return await get_task_work_logs(project_task_id, after_id, limit)
+
+
+@router.get("/streamTaskWorkLogs")
+async def stream_task_work_logs_api(
+    project_task_id: int = Query(..., description="Project Task ID"),
+    after_id: Optional[int] = Query(None, description="Return logs after this task_work_log_id"),
+):
+    return await stream_task_work_logs(project_task_id, after_id)
+
+
 @router.post("/createTaskWorkLog")
 async def create_task_work_log_api(payload: TaskWorkLogCreateRequest):
     return await create_task_work_log(payload)
 
+
+@router.post("/createTaskWorkLogs")
+async def create_task_work_logs_api(payload: TaskWorkLogBatchCreateRequest):
+    return await create_task_work_logs_batch(payload)
+
 @router.post("/updateProjectTaskStatusForTaskWorkLog")
 async def update_project_task_status_api(request: UpdateProjectTaskStatusRequest):
     return await update_project_task_status(
@@ -4,6 +4,7 @@ from fastapi import APIRouter, BackgroundTasks, Request, status,UploadFile,File
 from fastapi.responses import JSONResponse
 from app.schemas.transaction.users_schema import UserCreateRequest, UserUpdateRequest, UserImageResponse, \
     UserDetailResponse
+from app.services.background_jobs_service import enqueue_job_service
 from app.services.transaction.users_service import (
     create_user_service,
     update_user_service,
@@ -15,7 +16,9 @@ router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.post("/NewCreateUser", status_code=status.HTTP_201_CREATED)
-async def register_user(req: UserCreateRequest, background_tasks: BackgroundTasks, request: Request):
+async def register_user(req: UserCreateRequest, background_tasks: BackgroundTasks, request: Request, background: bool = False):
+    if background:
+        return await enqueue_job_service("create_users", request=request, req=req.model_dump(mode="json"))
     return await create_user_service(req, background_tasks)
 
 
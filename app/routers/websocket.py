@@ -78,10 +78,16 @@
 #                 log_level="info")
 
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+import asyncio
 import json
 import logging
-from typing import Set, Dict
+from typing import Set, Dict, Optional
+
+from app.security import decode_access_token
+from app.services.transaction.project_comments_service import get_user_comment_phase_ids
+from app.utils.comment_stream import comment_stream
+from app.utils.metrics import WS_BROADCAST_FANOUT, record_ws_message, record_ws_rooms
 
 router = APIRouter()
 
@@ -98,6 +104,7 @@ async def websocket_endpoint(websocket: WebSocket, task_id: str):
     if task_id not in rooms:
         rooms[task_id] = set()
     rooms[task_id].add(websocket)
+    record_ws_rooms(rooms)
     logger.info(f"Client connected to task room: {task_id}, total clients: {len(rooms[task_id])}")
 
     try:
@@ -106,6 +113,8 @@ async def websocket_endpoint(websocket: WebSocket, task_id: str):
             logger.info(f"Received message for task {task_id}: {raw_data}")
             try:
                 data = json.loads(raw_data)
+                # only known types become label values
+                record_ws_message("in", "content_update" if data.get("type") == "content_update" else "other")
                 if data.get("type") == "content_update":
                     # Broadcast to all clients in the same task_id room, excluding sender
                     broadcast_data = {
@@ -116,11 +125,14 @@ async def websocket_endpoint(websocket: WebSocket, task_id: str):
                         "cursor": data.get("cursor"),
                         "formState": data.get("formState")
                     }
-                    for client in rooms.get(task_id, []):
-                        if client != websocket:
-                            await client.send_json(broadcast_data)
-                            logger.info(f"Broadcasted to client in task room {task_id}")
+                    recipients = [client for client in rooms.get(task_id, []) if client != websocket]
+                    WS_BROADCAST_FANOUT.observe(len(recipients))
+                    for client in recipients:
+                        await client.send_json(broadcast_data)
+                        record_ws_message("out", "content_update")
+                        logger.info(f"Broadcasted to client in task room {task_id}")
             except json.JSONDecodeError:
+                record_ws_message("in", "invalid")
                 logger.error(f"Invalid JSON received for task {task_id}: {raw_data}")
                 await websocket.send_json({"type": "error", "message": "Invalid JSON"})
     except WebSocketDisconnect:
@@ -128,8 +140,93 @@ async def websocket_endpoint(websocket: WebSocket, task_id: str):
         logger.info(f"Client disconnected from task room {task_id}, remaining: {len(rooms[task_id])}")
         if not rooms[task_id]:
             del rooms[task_id]
+        record_ws_rooms(rooms)
     except Exception as e:
         logger.error(f"WebSocket error for task {task_id}: {e}")
         rooms[task_id].remove(websocket)
         if not rooms[task_id]:
-            del rooms[task_id]
\ No newline at end of file
+            del rooms[task_id]
+        record_ws_rooms(rooms)
+
+
+# =====================================================
+# Comment event stream
+# =====================================================
+@router.websocket("/ws/comments/events")
+async def comment_events_endpoint(
+    websocket: WebSocket,
+    token: str,
+    phases: Optional[str] = None,
+    after_seq: Optional[int] = None,
+    stream_id: Optional[str] = None,
+):
+    """
+    Pushes comment/reply changes for the token user's project phases, or
+    for the subset of them named in `phases`; phases the user cannot see
+    are dropped. Reconnect with the last seen `seq` and the `stream_id`
+    from the hello message to get missed events replayed; a "resync"
+    message means they are gone and the thread must be reloaded.
+    """
+    try:
+        claims = decode_access_token(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    requested = [p.strip() for p in phases.split(",") if p.strip()] if phases else []
+    if not all(p.isdigit() for p in requested):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    phase_ids = set(await get_user_comment_phase_ids(claims.get("userId")))
+    if requested:
+        phase_ids &= {int(p) for p in requested}
+        if not phase_ids:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+
+    await websocket.accept()
+    subscription, missed, resync = comment_stream.subscribe(phase_ids, after_seq, stream_id)
+    logger.info(f"Comment stream client connected for phases {sorted(phase_ids)}")
+
+    async def push_events():
+        await websocket.send_json({
+            "type": "hello",
+            "stream_id": comment_stream.stream_id,
+            "seq": comment_stream.seq,
+            "project_phase_ids": sorted(phase_ids),
+        })
+        if resync:
+            await websocket.send_json({"type": "resync"})
+        for message in missed:
+            await websocket.send_text(message)
+        while True:
+            message = await subscription.next()
+            if message is None:
+                await websocket.send_json({"type": "resync"})
+                await websocket.close()
+                return
+            await websocket.send_text(message)
+            record_ws_message("out", "comment_event")
+
+    async def read_client():
+        while True:
+            # the stream is push-only; clients may ping to check liveness
+            try:
+                data = json.loads(await websocket.receive_text())
+            except json.JSONDecodeError:
+                continue
+            if isinstance(data, dict) and data.get("type") == "ping":
+                await websocket.send_json({"type": "pong", "seq": comment_stream.seq})
+
+    tasks = [asyncio.create_task(push_events()), asyncio.create_task(read_client())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not task.cancelled() and task.exception() and not isinstance(task.exception(), WebSocketDisconnect):
+                logger.error(f"Comment stream error: {task.exception()}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        comment_stream.unsubscribe(subscription)
+        logger.info("Comment stream client disconnected")
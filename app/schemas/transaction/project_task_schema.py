@@ -7,6 +7,13 @@ class MapUsersToTaskRequest(BaseModel):
     user_ids: List[int]
 
 
+class MapUsersToTasksRequest(BaseModel):
+    user_ids: List[int]
+    project_task_ids: Optional[List[int]] = None
+    project_phase_id: Optional[int] = None
+    replace: bool = True  # False only adds the users, keeping current assignments
+
+
 class UserResponseByTask(BaseModel):
     user_id: int
     user_name: str
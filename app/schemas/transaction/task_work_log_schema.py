@@ -29,6 +29,10 @@ class TaskWorkLogCreateRequest(BaseModel):
     project_task_id: int
     user_id: int
     remarks: Optional[str] = None
+
+
+class TaskWorkLogBatchCreateRequest(BaseModel):
+    entries: List[TaskWorkLogCreateRequest] = Field(..., min_length=1, max_length=500)
 #
 # class TaskWorkLogCreateResponse(BaseModel):
 #     task_work_log_id: int
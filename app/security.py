@@ -5,7 +5,8 @@ from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from passlib.context import CryptContext
 from app.config import config
-from app.utils.user_utils import fetch_user_by_email, get_user_role
+from app.utils.user_queries import PROFILE_USER_COLUMNS
+from app.utils.user_utils import fetch_user_by_email, get_user_role, role_from_user
 
 logger = logging.getLogger(__name__)
 bearer_scheme = HTTPBearer()
@@ -17,16 +18,18 @@ credentials_exception = HTTPException(
     headers={"WWW-Authenticate": "Bearer"},
 )
 
-async def create_access_token(user: dict) -> str:
+async def create_access_token(user: dict, role: dict | None = None) -> str:
     # expire = datetime.now(timezone.utc) + timedelta(seconds=1800)  # for testing
     expire = datetime.now(timezone.utc) + timedelta(days=7)
 
-    role = await get_user_role(user["user_id"])
+    # Callers holding a fetch_user_by_email row already have the role
+    if role is None:
+        role = role_from_user(user) or await get_user_role(user["user_id"])
 
     jwt_data = {
         "sub": user["email"],
         "userId": user["user_id"],
-        "role_id": role["id"],
+        "role_id": role["id"] if role else None,
         "name": user.get("user_name"),
         "user_role": role["name"] if role else None,
         "exp": int(expire.timestamp()),
@@ -35,13 +38,13 @@ async def create_access_token(user: dict) -> str:
 
     return jwt.encode(jwt_data, key=config.SECRET_KEY, algorithm=config.ALGORITHM)
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)):
-    token = credentials.credentials
+def decode_access_token(token: str) -> dict:
+    """
+    Claims of a valid access token; raises 401 when it is expired, invalid
+    or has no subject.
+    """
     try:
         payload = jwt.decode(token, key=config.SECRET_KEY, algorithms=[config.ALGORITHM])
-        email = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -50,13 +53,22 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(b
         )
     except JWTError:
         raise credentials_exception
+    if payload.get("sub") is None:
+        raise credentials_exception
+    return payload
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)):
+    payload = decode_access_token(credentials.credentials)
+    email = payload.get("sub")
 
-    user = await fetch_user_by_email(email=email)
+    # Profile projection: the request never needs the password hash
+    user = await fetch_user_by_email(email=email, columns=PROFILE_USER_COLUMNS)
     if user is None:
         raise credentials_exception
 
     # Convert Record to dict
-    user = dict(user)
+    user = dict(user._mapping)
 
     # Attach values from token payload
     user["role_id"] = payload.get("role_id")
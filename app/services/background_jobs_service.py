@@ -0,0 +1,200 @@
+import asyncio
+import json
+import logging
+from types import SimpleNamespace
+from typing import Optional
+
+from fastapi import BackgroundTasks, Request, status
+from fastapi.responses import JSONResponse, Response
+
+from app.db.database import database
+from app.schemas.docs.task_docs_schema import SubmitProjectTaskDocumentRequest
+from app.schemas.transaction.users_schema import UserCreateRequest
+from app.services.docs.task_doc_pdf_service import compare_documents, render_latest_task_doc_pdf
+from app.services.docs.task_docs_service import submit_project_task_document_service
+from app.services.transaction.project_export_service import write_project_export
+from app.services.transaction.project_service import create_project_service, get_project_details_service, \
+    update_project_details_service
+from app.services.transaction.users_service import create_user_service
+from app.utils import events
+from app.utils.job_runner import JobError, job_runner
+from app.utils.pdf_renderer import pdf_renderer
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedUpload:
+    """
+    In-memory copy of an UploadFile. FastAPI closes request uploads once the
+    response is sent, so background jobs keep their own bytes.
+    """
+
+    def __init__(self, filename: str, content: bytes, content_type: Optional[str] = None):
+        self.filename = filename
+        self.content_type = content_type
+        self._content = content
+
+    async def read(self) -> bytes:
+        return self._content
+
+
+async def buffer_upload(upload):
+    if upload is None:
+        return None
+    return BufferedUpload(upload.filename, await upload.read(), getattr(upload, "content_type", None))
+
+
+def _job_request(user: Optional[dict]):
+    # services only read request.state.user
+    return SimpleNamespace(state=SimpleNamespace(user=user))
+
+
+def _service_result(response):
+    """
+    Unwrap a service JSONResponse into the job result. 4xx responses fail the
+    job as-is; 5xx responses are retried.
+    """
+    if isinstance(response, Response):
+        body = json.loads(response.body)
+        # some services report errors only in the envelope
+        code = body.get("status_code") or response.status_code
+    else:
+        body = response
+        code = body.get("status_code", status.HTTP_200_OK)
+    body.setdefault("status_code", code)
+
+    if code >= 500:
+        raise JobError(body.get("message") or "Internal server error", result=body, retryable=True)
+    if code >= 400:
+        raise JobError(body.get("message") or "Request failed", result=body)
+    return body
+
+
+# -------------------- Job handlers -------------------- #
+
+async def create_project_job(ctx, payload, files=None, change_request_file=None, user=None):
+    await ctx.report(10, "Creating project")
+    response = await create_project_service(
+        payload=payload, files=files, change_request_file=change_request_file, request=_job_request(user)
+    )
+    return _service_result(response)
+
+
+async def update_project_details_job(ctx, user=None, **kwargs):
+    await ctx.report(10, "Updating project")
+    response = await update_project_details_service(request=_job_request(user), **kwargs)
+    return _service_result(response)
+
+
+async def compare_documents_job(ctx, task_doc_id: int):
+    await ctx.report(10, "Comparing documents")
+    return _service_result(await compare_documents(task_doc_id))
+
+
+async def create_users_job(ctx, req: dict):
+    await ctx.report(10, "Creating users")
+    background_tasks = BackgroundTasks()
+    response = await create_user_service(UserCreateRequest(**req), background_tasks)
+    await ctx.report(90, "Sending welcome emails")
+    # welcome emails queued by the service run here instead of after a response
+    await background_tasks()
+    return _service_result(response)
+
+
+async def submit_task_document_job(ctx, payload: dict):
+    await ctx.report(10, "Submitting document")
+    response = await submit_project_task_document_service(database, SubmitProjectTaskDocumentRequest(**payload))
+    return _service_result(response)
+
+
+async def export_project_job(ctx, project_id: int):
+    await ctx.report(0, "Collecting project details")
+    details = await get_project_details_service(project_id)
+    _service_result(details)
+    # the job id names the file, so a re-run after a restart overwrites its own partial export
+    file_name = f"project_{project_id}_{ctx.job.job_id}.zip"
+    return await write_project_export(project_id, details.body, file_name, progress=ctx.report)
+
+
+async def render_task_doc_pdf_job(ctx, project_task_id: int):
+    await ctx.report(10, "Rendering PDF")
+    return _service_result(await render_latest_task_doc_pdf(project_task_id))
+
+
+job_runner.register("create_project", create_project_job, concurrency=2)
+job_runner.register("update_project_details", update_project_details_job, concurrency=2)
+job_runner.register("compare_documents", compare_documents_job, concurrency=2, max_retries=2, resumable=True)
+job_runner.register("create_users", create_users_job, concurrency=1)
+# creates a new document version and runs the workflow: never re-run after a partial failure
+job_runner.register("submit_task_document", submit_task_document_job, concurrency=4)
+job_runner.register("export_project", export_project_job, concurrency=1, max_retries=1, resumable=True)
+job_runner.register("render_task_doc_pdf", render_task_doc_pdf_job, concurrency=2, max_retries=1)
+
+
+_warmups: set[asyncio.Task] = set()
+
+
+def _prerender_submitted_document(project_task_id: Optional[int] = None, **_):
+    # pre-render so the first download of a submitted version is a cache hit
+    if project_task_id is None or not pdf_renderer.available:
+        return
+    task = asyncio.get_running_loop().create_task(
+        job_runner.submit("render_task_doc_pdf", {"project_task_id": project_task_id})
+    )
+    _warmups.add(task)
+    task.add_done_callback(_warmups.discard)
+
+
+events.subscribe(events.TASK_DOCUMENT_SUBMITTED, _prerender_submitted_document)
+
+
+# -------------------- API helpers -------------------- #
+
+def _current_user(request: Optional[Request]):
+    state = getattr(request, "state", None)
+    return getattr(state, "user", None)
+
+
+async def enqueue_job_service(job_type: str, request: Optional[Request] = None, **payload):
+    """
+    Accept the work and answer 202 with a handle for GET /jobs/{job_id}.
+    """
+    try:
+        user = _current_user(request)
+        created_by = user.get("user_id") if isinstance(user, dict) else None
+        job = await job_runner.submit(job_type, payload, created_by=created_by)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "status_code": status.HTTP_202_ACCEPTED,
+                "message": "Job accepted",
+                "data": {"job_id": job.job_id, "job_type": job.job_type, "status": job.status},
+            },
+            headers={"Location": f"/jobs/{job.job_id}"},
+        )
+    except Exception as e:
+        logger.error(f"Error queuing {job_type} job: {e}", exc_info=True)
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"status_code": 500, "message": "Internal server error", "data": None},
+        )
+
+
+async def get_job_status_service(job_id: str):
+    try:
+        job = await job_runner.get(job_id)
+        if not job:
+            return JSONResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                content={"status_code": 404, "message": "Job not found", "data": None},
+            )
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={"status_code": 200, "message": "Job fetched successfully", "data": job.to_dict()},
+        )
+    except Exception as e:
+        logger.error(f"Error fetching job {job_id}: {e}", exc_info=True)
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"status_code": 500, "message": "Internal server error", "data": None},
+        )
@@ -1,6 +1,7 @@
 
 import logging
 from fastapi import HTTPException
+from sqlalchemy import select
 from app.schemas.change_password_schema import ChangePasswordRequest
 from app.db.database import database
 from app.db.transaction.users import users as users_table
@@ -27,7 +28,7 @@ async def change_user_password(payload: ChangePasswordRequest, current_user: dic
 
     try:
         # 1. Fetch current user record
-        query = users_table.select().where(users_table.c.user_id == user_id)
+        query = select(users_table.c.password).where(users_table.c.user_id == user_id)
         user = await database.fetch_one(query)
         if not user:
             # logger.warning(f"User not found for user_id={user_id}",extra={"email": current_user["email"]})
@@ -3,6 +3,7 @@ from sqlalchemy import select
 
 from app.db import task_docs_table
 from app.db.database import database
+from app.utils.pdf_renderer import pdf_renderer
 
 
 async def get_task_doc_by_id(task_doc_id: int):
@@ -112,4 +113,72 @@ async def compare_documents(task_doc_id: int):
             "status_code": 500,
             "message": f"An error occurred: {str(e)}",
             "data": None
-        }
\ No newline at end of file
+        }
+
+
+async def render_task_doc_pdf(task_doc_id: int):
+    """
+    Render a task document version to PDF on the server. `data` is the path
+    of the cached file for the caller to stream.
+    """
+    try:
+        query = select(
+            task_docs_table.c.task_doc_id,
+            task_docs_table.c.document_json
+        ).where(task_docs_table.c.task_doc_id == task_doc_id)
+        record = await database.fetch_one(query)
+
+        if not record:
+            return {
+                "status_code": 404,
+                "message": "Task document not found",
+                "data": None
+            }
+
+        html = record["document_json"] or ""
+        if not html.strip():
+            return {
+                "status_code": 400,
+                "message": "Task document is empty",
+                "data": None
+            }
+
+        path = pdf_renderer.cached(task_doc_id, html)
+        if path is None and not pdf_renderer.available:
+            return {
+                "status_code": 503,
+                "message": "PDF rendering is not available on this server",
+                "data": None
+            }
+
+        return {
+            "status_code": 200,
+            "message": "Task document rendered successfully",
+            "data": path or await pdf_renderer.render(task_doc_id, html)
+        }
+
+    except Exception as e:
+        return {
+            "status_code": 500,
+            "message": f"An error occurred: {str(e)}",
+            "data": None
+        }
+
+
+async def render_latest_task_doc_pdf(project_task_id: int):
+    """
+    Pre-render the latest version of a task's document (warm-up after submit).
+    """
+    query = select(task_docs_table.c.task_doc_id).where(
+        task_docs_table.c.project_task_id == project_task_id,
+        task_docs_table.c.is_latest == True
+    ).order_by(task_docs_table.c.doc_version.desc()).limit(1)
+    task_doc_id = await database.fetch_val(query)
+
+    if task_doc_id is None:
+        return {
+            "status_code": 404,
+            "message": "Task document not found",
+            "data": None
+        }
+    return await render_task_doc_pdf(task_doc_id)
@@ -2,6 +2,7 @@ import os
 import aiofiles
 import logging
 from fastapi.encoders import jsonable_encoder
+from typing import Optional
 from sqlalchemy import select,and_, update, insert, func, or_
 from fastapi.responses import JSONResponse
 from app.db.transaction.project_comments import project_comments_table
@@ -21,6 +22,10 @@ from dotenv import load_dotenv
 from app.db.transaction.project_files import project_files_table
 from app.schemas.docs.task_docs_schema import ProjectFileItem, taskDocumentsResponse
 from app.db.master.sdlc_tasks import sdlc_tasks_table
+from app.utils import events
+from app.utils.etag import cached_json_response, not_modified
+from app.utils.phase_document_cache import phase_document_cache
+from app.utils.raw_json import RawJSONResponse
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -406,6 +411,9 @@ async def save_project_task_document_service(db, payload):
             )
             new_id = await db.execute(ins_query)
             logger.info(f"New document created with task_doc_id={new_id}")
+            events.publish(
+                events.TASK_DOCUMENT_SAVED, project_task_id=payload.project_task_id, project_phase_id=project_phase_id
+            )
             return JSONResponse(
                 status_code=status.HTTP_201_CREATED,
                 content={
@@ -428,6 +436,9 @@ async def save_project_task_document_service(db, payload):
             )
             await db.execute(upd_query)
             logger.info(f"Document updated successfully for task_doc_id={existing_doc.task_doc_id}")
+            events.publish(
+                events.TASK_DOCUMENT_SAVED, project_task_id=payload.project_task_id, project_phase_id=project_phase_id
+            )
             return JSONResponse(
                 status_code=status.HTTP_200_OK,
                 content={
@@ -462,6 +473,9 @@ async def save_project_task_document_service(db, payload):
             )
             new_id = await db.execute(ins_query)
             logger.info(f"New document version created with task_doc_id={new_id}")
+            events.publish(
+                events.TASK_DOCUMENT_SAVED, project_task_id=payload.project_task_id, project_phase_id=project_phase_id
+            )
             return JSONResponse(
                 status_code=status.HTTP_201_CREATED,
                 content={
@@ -966,6 +980,18 @@ from sqlalchemy import select, and_
 
 logger = logging.getLogger(__name__)
 
+
+def _envelope_succeeded(envelope) -> bool:
+    if isinstance(envelope, (str, bytes)):
+        try:
+            envelope = json.loads(envelope)
+        except ValueError:
+            return False
+    if not isinstance(envelope, dict):
+        return False
+    return 200 <= int(envelope.get("status_code") or 0) < 300
+
+
 async def submit_project_task_document_service(db, payload):
     try:
         logger.info(f"Starting submit_project_task_document_service for Task ID: {payload.project_task_id}, User ID: {payload.updated_by}")
@@ -1010,11 +1036,13 @@ async def submit_project_task_document_service(db, payload):
                 }
             )
 
-        # Parse JSON string and return as JSONResponse
-        parsed_result = json.loads(result["result"])
-        return JSONResponse(
-            content=parsed_result
-        )
+        # The function call is its own committed statement; announce the new
+        # version only once it is committed and the function reported success
+        if _envelope_succeeded(result["result"]):
+            events.publish(events.TASK_DOCUMENT_SUBMITTED, project_task_id=payload.project_task_id)
+
+        # The function returns the full response envelope; send it unparsed
+        return RawJSONResponse(content=result["result"])
 
     except Exception as e:
         logger.error(f"Error in submit_project_task_document_service: {str(e)}")
@@ -1167,6 +1195,8 @@ async def get_phase_documents_by_project_task_id(db, project_task_id: int):
                 task_docs_table.c.doc_version.isnot(None),
             )
         )
+        .order_by(project_tasks_list_table.c.task_order_id, task_docs_table.c.project_task_id,
+                  task_docs_table.c.doc_version.desc())
     )
 
     docs_list = [dict(row) for row in task_doc_rows]
@@ -1179,3 +1209,161 @@ async def get_phase_documents_by_project_task_id(db, project_task_id: int):
             "data": safe_data
         }
     )
+
+
+async def get_phase_document_index(db, project_task_id: int, if_none_match: Optional[str] = None):
+    """
+    Version picker index for the phase of a task: the latest versioned
+    document of every task in the phase with its version count, in task
+    order. Cached per phase until a document of the phase is saved or
+    submitted; history comes from get_task_document_versions.
+    """
+    try:
+        cached = phase_document_cache.get(project_task_id)
+        if cached:
+            body, etag = cached
+            return cached_json_response(body, etag, if_none_match)
+
+        # 1. Every task of the phase, with the names shown in the picker
+        task_phase_id = (
+            select(project_tasks_list_table.c.project_phase_id)
+            .where(project_tasks_list_table.c.project_task_id == project_task_id)
+            .scalar_subquery()
+        )
+        task_rows = await db.fetch_all(
+            select(
+                project_tasks_list_table.c.project_task_id,
+                project_tasks_list_table.c.project_phase_id,
+                sdlc_tasks_table.c.task_name,
+                sdlc_phases_table.c.phase_code,
+            )
+            .join(sdlc_tasks_table, project_tasks_list_table.c.task_id == sdlc_tasks_table.c.task_id)
+            .join(
+                project_phases_list_table,
+                project_tasks_list_table.c.project_phase_id == project_phases_list_table.c.project_phase_id,
+            )
+            .join(sdlc_phases_table, project_phases_list_table.c.phase_id == sdlc_phases_table.c.phase_id)
+            .where(project_tasks_list_table.c.project_phase_id == task_phase_id)
+            .order_by(project_tasks_list_table.c.task_order_id, project_tasks_list_table.c.project_task_id)
+        )
+        if not task_rows:
+            return JSONResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                content={
+                    "status_code": status.HTTP_404_NOT_FOUND,
+                    "message": "Task not found",
+                    "data": None,
+                },
+            )
+        tasks = {row["project_task_id"]: row for row in task_rows}
+
+        # 2. Latest version per task and the number of versions, in one pass
+        versions = (
+            select(
+                task_docs_table.c.task_doc_id,
+                task_docs_table.c.project_task_id,
+                task_docs_table.c.doc_version,
+                task_docs_table.c.created_by,
+                task_docs_table.c.created_date,
+                func.row_number().over(
+                    partition_by=task_docs_table.c.project_task_id,
+                    order_by=(task_docs_table.c.doc_version.desc(), task_docs_table.c.task_doc_id.desc()),
+                ).label("version_rank"),
+                func.count().over(partition_by=task_docs_table.c.project_task_id).label("version_count"),
+            )
+            .where(
+                task_docs_table.c.project_task_id.in_(list(tasks)),
+                task_docs_table.c.doc_version.isnot(None),
+            )
+            .subquery("versions")
+        )
+        latest_rows = await db.fetch_all(
+            select(
+                versions.c.task_doc_id,
+                versions.c.project_task_id,
+                versions.c.doc_version,
+                versions.c.created_by,
+                versions.c.created_date,
+                versions.c.version_count,
+            ).where(versions.c.version_rank == 1)
+        )
+        latest = {row["project_task_id"]: row for row in latest_rows}
+
+        docs_list = []
+        for task_id, task in tasks.items():
+            doc = latest.get(task_id)
+            if doc is None:
+                continue
+            docs_list.append({
+                **dict(doc),
+                "task_name": task["task_name"],
+                "phase_code": task["phase_code"],
+            })
+
+        response = JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=jsonable_encoder({
+                "status_code": status.HTTP_200_OK,
+                "message": "Phase document index fetched successfully",
+                "data": docs_list,
+            }),
+        )
+        etag = phase_document_cache.set(task_rows[0]["project_phase_id"], tasks, response.body)
+        response.headers["ETag"] = etag
+        return not_modified(etag, if_none_match) or response
+
+    except Exception as e:
+        logger.exception(f"Error fetching phase document index for task {project_task_id}: {str(e)}")
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "Internal server error",
+                "data": None,
+            },
+        )
+
+
+async def get_task_document_versions(db, project_task_id: int):
+    """
+    Version history of one task's document, newest first, for the picker
+    to load when a task is expanded. Metadata only; the document itself is
+    fetched by the viewer.
+    """
+    try:
+        rows = await db.fetch_all(
+            select(
+                task_docs_table.c.task_doc_id,
+                task_docs_table.c.doc_version,
+                task_docs_table.c.is_latest,
+                task_docs_table.c.created_by,
+                task_docs_table.c.created_date,
+                task_docs_table.c.submitted_by,
+                task_docs_table.c.updated_by,
+                task_docs_table.c.updated_date,
+            )
+            .where(
+                task_docs_table.c.project_task_id == project_task_id,
+                task_docs_table.c.doc_version.isnot(None),
+            )
+            .order_by(task_docs_table.c.doc_version.desc(), task_docs_table.c.task_doc_id.desc())
+        )
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=jsonable_encoder({
+                "status_code": status.HTTP_200_OK,
+                "message": "Task document versions fetched successfully",
+                "data": [dict(row) for row in rows],
+            }),
+        )
+
+    except Exception as e:
+        logger.exception(f"Error fetching document versions for task {project_task_id}: {str(e)}")
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "Internal server error",
+                "data": None,
+            },
+        )
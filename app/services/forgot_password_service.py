@@ -1,15 +1,24 @@
 import logging
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 from fastapi import HTTPException, status
+from sqlalchemy import select
 
 from app.db.database import database
 from app.db.transaction.user_password_history import user_password_history
-from app.db.transaction.user_otp import user_otp
 from app.db.transaction.users import users as users_table
 from app.security import get_password_hash
+from app.services.otp_service import (
+    enforce_rate_limit,
+    fetch_otp,
+    forgot_password_email_limiter,
+    forgot_password_ip_limiter,
+    upsert_otp,
+    verify_otp_limiter
+)
 from app.utils.db_transaction import with_transaction
-from app.utils.email_utils import send_simple_email
+from app.utils.email_utils import queue_email
 from app.utils.validations import (
     generate_otp,
     validate_password,
@@ -51,19 +60,29 @@ def build_forgot_password_email(username: str, otp: str, expiry: int) -> str:
     </body>
     </html>
     """
-async def process_forgot_password(request: ForgotPasswordRequest) -> SendResetResponse:
+async def process_forgot_password(request: ForgotPasswordRequest, client_ip: Optional[str] = None) -> SendResetResponse:
     """
     Handles forgot password logic:
+    - Rate limit by client IP and email before touching the DB
     - Validate user
-    - Generate OTP
-    - Update or insert OTP into DB
-    - Send OTP via email
+    - Generate OTP and upsert it in one statement
+    - Queue the OTP email off the request path
     """
     try:
         email = request.email
 
-        # Step 1: Fetch user by email
-        query = users_table.select().where(users_table.c.email == email)
+        # Step 1: Token buckets absorb enumeration bursts in memory
+        await enforce_rate_limit(forgot_password_ip_limiter, client_ip)
+        await enforce_rate_limit(forgot_password_email_limiter, email.lower())
+
+        # Step 2: Fetch only the columns the account checks and email need
+        query = select(
+            users_table.c.user_id,
+            users_table.c.email,
+            users_table.c.user_first_name,
+            users_table.c.is_active,
+            users_table.c.is_temporary_password,
+        ).where(users_table.c.email == email)
         user = await database.fetch_one(query)
 
         validate_user_account(user)
@@ -72,54 +91,18 @@ async def process_forgot_password(request: ForgotPasswordRequest) -> SendResetRe
         now = datetime.now(timezone.utc)
         expiry = now + timedelta(minutes=OTP_VALIDITY_MINUTES)
 
-        # expiry = (now + timedelta(minutes=OTP_VALIDITY_MINUTES)).replace(tzinfo=None)
-
-        # Step 2: Generate new OTP
+        # Step 3: Generate and store the OTP
         otp = generate_otp()
-
-        # Step 3: Check for existing OTP record
-        existing_otp_query = user_otp.select().where(user_otp.c.user_id == user_id)
-        existing_otp = await database.fetch_one(existing_otp_query)
-
-        if existing_otp:
-            # Update existing OTP record
-            update_query = user_otp.update().where(
-                user_otp.c.user_id == user_id
-            ).values(
-                otp=otp,
-                otp_expiry_date=expiry,
-                updated_at=now
-            )
-            await database.execute(update_query)
-            logger.info(f"Updated OTP for user_id={user_id}")
-        else:
-            # Insert new OTP record
-            insert_query = user_otp.insert().values(
-                user_id=user_id,
-                otp=otp,
-                otp_expiry_date=expiry,
-                created_date=now
-            )
-            await database.execute(insert_query)
-            logger.info(f"Inserted new OTP for user_id={user_id}")
+        await upsert_otp(user_id, otp, expiry, now)
+        logger.info(f"Stored OTP for user_id={user_id}")
 
         # Step 4: Send OTP email
-        # await send_template_email(
-        #     to_email=email,
-        #     template_id=TEMPLATE_OTP,
-        #     dynamic_data={
-        #         "otp": otp,
-        #         "expiry": f"{OTP_VALIDITY_MINUTES} minutes",
-        #         "username": user["user_first_name"] or user["email"]
-        #     }
-        # )
-
         html_body = build_forgot_password_email(
             username=user["user_first_name"] or user["email"],
             otp=otp,
             expiry=OTP_VALIDITY_MINUTES
         )
-        await send_simple_email(
+        await queue_email(
             to=email,
             subject="Your Password Reset OTP",
             body=html_body
@@ -152,8 +135,10 @@ async def process_verify_otp(request: VerifyOtpRequest) -> SendResetResponse:
                 detail=messages["otp_required"]
             )
 
-        query = user_otp.select().where((user_otp.c.user_id == request.user_id))
-        otp_record = await database.fetch_one(query)
+        # bounded guesses per user; a 4-digit OTP is otherwise easy to brute force
+        await enforce_rate_limit(verify_otp_limiter, request.user_id)
+
+        otp_record = await fetch_otp(request.user_id)
 
         if not otp_record:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=messages["otp_missing"])
@@ -203,8 +188,9 @@ async def process_reset_password(request: ResetPasswordRequest) -> SendResetResp
             )
 
         # Fetch user
-        query = users_table.select().where(users_table.c.user_id == request.user_id)
-        user = await database.fetch_one(query)
+        user = await database.fetch_val(
+            select(users_table.c.user_id).where(users_table.c.user_id == request.user_id)
+        )
 
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages["user_not_found"])
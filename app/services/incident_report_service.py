@@ -7,6 +7,7 @@ from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from sqlalchemy import and_, case, desc, func, insert, update, select
 
+from app.config import config
 from app.db.database import database
 # from app.db import incident_report, project_tasks, project_phases, projects  # adjust imports
 from app.db.master.sdlc_phases import sdlc_phases_table
@@ -20,6 +21,8 @@ from app.db.docs.task_docs import task_docs_table
 from app.db.transaction.users import users
 from app.schemas.transaction.incident_reports_schema import IncidentCreateRequest, RaiseIncidentOut  # pydantic model
 from app.db import user_role_mapping_table, user_roles_table
+from app.services.transaction.json_template_versions_service import latest_incident_submission, store_template_json
+from app.utils import events
 
 import logging
 
@@ -31,9 +34,23 @@ async def create_incident_report(db, incident: IncidentCreateRequest):
         raised_date = datetime.utcnow()
         logger.info(f"Creating incident for task_id={incident.project_task_id} by user={incident.raised_by}")
 
-        # 1. Get phase_id from project_tasks_list_table
+        # 1. Resolve phase/project ids and the lookup names in one round trip
         task_query = (
-            select(project_tasks_list_table.c.project_phase_id)
+            select(
+                project_tasks_list_table.c.project_phase_id,
+                project_phases_list_table.c.project_phase_id.label("listed_phase_id"),
+                project_phases_list_table.c.project_id,
+                projects.c.project_name,
+                sdlc_phases_table.c.phase_name,
+                sdlc_tasks_table.c.task_name,
+            )
+            .select_from(
+                project_tasks_list_table
+                .outerjoin(project_phases_list_table, project_tasks_list_table.c.project_phase_id == project_phases_list_table.c.project_phase_id)
+                .outerjoin(projects, project_phases_list_table.c.project_id == projects.c.project_id)
+                .outerjoin(sdlc_phases_table, project_phases_list_table.c.phase_id == sdlc_phases_table.c.phase_id)
+                .outerjoin(sdlc_tasks_table, project_tasks_list_table.c.task_id == sdlc_tasks_table.c.task_id)
+            )
             .where(project_tasks_list_table.c.project_task_id == incident.project_task_id)
         )
         task_row = await db.fetch_one(task_query)
@@ -45,19 +62,14 @@ async def create_incident_report(db, incident: IncidentCreateRequest):
 
         v_phase_id = task_row["project_phase_id"]
 
-        # 2. Get project_id from project_phases_list_table
-        phase_query = (
-            select(project_phases_list_table.c.project_id)
-            .where(project_phases_list_table.c.project_phase_id == v_phase_id)
-        )
-        phase_row = await db.fetch_one(phase_query)
-        if not phase_row:
+        # 2. Phase row must exist for the task
+        if task_row["listed_phase_id"] is None:
             return JSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
                 content={"status_code": 404, "message": "Project phase not found", "data": None}
             )
 
-        v_project_id = phase_row["project_id"]
+        v_project_id = task_row["project_id"]
 
         # 3. Determine resolved flag
         is_resolved = True if incident.incident_type_id == 1 else False
@@ -78,6 +90,9 @@ async def create_incident_report(db, incident: IncidentCreateRequest):
                 is_resolved=is_resolved,
                 raised_by=incident.raised_by,
                 raised_date=raised_date,
+                project_name=task_row["project_name"],
+                phase_name=task_row["phase_name"],
+                task_name=task_row["task_name"],
             )
             .returning(
                 incident_report_table.c.incident_report_id,
@@ -164,11 +179,14 @@ async def create_incident_report(db, incident: IncidentCreateRequest):
                     )
                 )
                 await db.execute(insert_new_doc)
+                events.publish(events.TASK_DOCUMENT_SAVED, project_task_id=incident.project_task_id, project_phase_id=v_phase_id)
 
             logger.info(f"New document created for task_id={incident.project_task_id} with version=1.0") 
 
             # logger.info("Updated project, phase, and task statuses to Pending (id=4)")
 
+        events.publish(events.INCIDENT_CHANGED, project_id=v_project_id, incident_report_id=new_incident["incident_report_id"])
+
         # 6. Return success response
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -187,6 +205,38 @@ async def create_incident_report(db, incident: IncidentCreateRequest):
         )      
         
 
+async def rename_incident_project(db, project_id: int, project_name: str):
+    # incidents keep a copy of the names for the list view; run with the rename
+    await db.execute(
+        update(incident_report_table)
+        .where(incident_report_table.c.project_id == project_id)
+        .values(project_name=project_name)
+    )
+
+
+async def rename_incident_phase(db, phase_id: int, phase_name: str):
+    # incident phase_id is the project_phase_id, so match every project's copy of the phase
+    await db.execute(
+        update(incident_report_table)
+        .where(incident_report_table.c.phase_id.in_(
+            select(project_phases_list_table.c.project_phase_id)
+            .where(project_phases_list_table.c.phase_id == phase_id)
+        ))
+        .values(phase_name=phase_name)
+    )
+
+
+async def rename_incident_task(db, task_id: int, task_name: str):
+    await db.execute(
+        update(incident_report_table)
+        .where(incident_report_table.c.task_id.in_(
+            select(project_tasks_list_table.c.project_task_id)
+            .where(project_tasks_list_table.c.task_id == task_id)
+        ))
+        .values(task_name=task_name)
+    )
+
+
 async def resolve_incident_report(db, incident_report_id: int, resolved_by: int, resolve_comment: str):
     try:
         resolved_date = datetime.utcnow()
@@ -261,6 +311,7 @@ async def resolve_incident_report(db, incident_report_id: int, resolved_by: int,
         # await db.execute(update_project)
 
         logger.info(f"Incident {incident_report_id} resolved and statuses restored to 9")
+        events.publish(events.INCIDENT_CHANGED, project_id=v_project_id, incident_report_id=incident_report_id)
 
         # 4. Return success response
         return JSONResponse(
@@ -280,22 +331,41 @@ async def resolve_incident_report(db, incident_report_id: int, resolved_by: int,
         )
 
 
+def _format_incident_date(value: Optional[datetime]) -> Optional[str]:
+    return value.strftime("%Y-%m-%dT%H:%M:%S") if value else None
+
+
 async def fetch_incident_reports(
     db,
     user_id: Optional[int] = None,
     task_id: Optional[int] = None,
     raised_by: Optional[int] = None,
+    before_id: Optional[int] = None,
+    limit: Optional[int] = None,
 ) -> list[RaiseIncidentOut]:
     try:
+        # Lookup names are stored on the incident row, so no joins are needed here.
+        # Only filters that were actually supplied are added, keeping the
+        # (assigned_to, failure_type, incident_report_id DESC) index usable.
+        conditions = [incident_report_table.c.failure_type == 2]  # System issues only
+        if user_id is not None:
+            conditions.append(incident_report_table.c.assigned_to == user_id)
+        if task_id is not None:
+            conditions.append(incident_report_table.c.task_id == task_id)
+        if raised_by is not None:
+            conditions.append(incident_report_table.c.raised_by == raised_by)
+        if before_id is not None:
+            conditions.append(incident_report_table.c.incident_report_id < before_id)
+
         query = (
             select(
                 incident_report_table.c.incident_report_id,
                 incident_report_table.c.project_id,
-                projects.c.project_name,
+                incident_report_table.c.project_name,
                 incident_report_table.c.phase_id,
-                sdlc_phases_table.c.phase_name,
+                incident_report_table.c.phase_name,
                 incident_report_table.c.task_id,
-                sdlc_tasks_table.c.task_name.label("task_name"),
+                incident_report_table.c.task_name,
                 incident_report_table.c.test_script_name,
                 incident_report_table.c.testcase_number,
                 incident_report_table.c.document,
@@ -303,47 +373,30 @@ async def fetch_incident_reports(
                 incident_report_table.c.resolve_comment,
                 incident_report_table.c.is_resolved,
                 incident_report_table.c.raised_by,
-                func.to_char(
-                    incident_report_table.c.raised_date, 'YYYY-MM-DD"T"HH24:MI:SS'
-                ).label("raised_date"),
+                incident_report_table.c.raised_date,
                 incident_report_table.c.resolved_by,
-                func.to_char(
-                    incident_report_table.c.resolved_date, 'YYYY-MM-DD"T"HH24:MI:SS'
-                ).label("resolved_date"),
-                case(
-                    (incident_report_table.c.failure_type == 1, "Test Case Failure"),
-                    else_="System Failure",
-                ).label("failure_type"),
+                incident_report_table.c.resolved_date,
+                incident_report_table.c.failure_type,
                 incident_report_table.c.assigned_to,
             )
-            .select_from(
-                incident_report_table
-                .outerjoin(project_phases_list_table, incident_report_table.c.phase_id == project_phases_list_table.c.project_phase_id)
-                .outerjoin(projects, incident_report_table.c.project_id == projects.c.project_id)
-                .outerjoin(sdlc_phases_table, project_phases_list_table.c.project_phase_id == sdlc_phases_table.c.phase_id)
-                .outerjoin(project_tasks_list_table, incident_report_table.c.task_id == project_tasks_list_table.c.project_task_id)
-                .outerjoin(sdlc_tasks_table, project_tasks_list_table.c.task_id == sdlc_tasks_table.c.task_id)
-            )
-            .where(
-                and_(
-                    incident_report_table.c.assigned_to == user_id if user_id is not None else True,
-                    incident_report_table.c.task_id == task_id if task_id is not None else True,
-                    incident_report_table.c.raised_by == raised_by if raised_by is not None else True,
-                    incident_report_table.c.failure_type == 2,  # System issues only
-                )
-            )
-            .order_by(
-                incident_report_table.c.incident_report_id.desc(),
-                incident_report_table.c.raised_date.desc(),
-            )
+            .where(and_(*conditions))
+            .order_by(incident_report_table.c.incident_report_id.desc())
         )
+        if limit is not None:
+            # fetch one extra row to know whether another page exists
+            query = query.limit(limit + 1)
 
         rows = await db.fetch_all(query)
+        has_more = limit is not None and len(rows) > limit
+        if has_more:
+            rows = rows[:limit]
+
         result = []
         for row in rows:
             row_dict = dict(row)
-            row_dict["raised_date"] = row_dict["raised_date"] or None
-            row_dict["resolved_date"] = row_dict["resolved_date"] or None
+            row_dict["raised_date"] = _format_incident_date(row_dict["raised_date"])
+            row_dict["resolved_date"] = _format_incident_date(row_dict["resolved_date"])
+            row_dict["failure_type"] = "Test Case Failure" if row_dict["failure_type"] == 1 else "System Failure"
             result.append(RaiseIncidentOut(**row_dict))
 
         return JSONResponse(
@@ -352,6 +405,7 @@ async def fetch_incident_reports(
                 "status_code": status.HTTP_200_OK,
                 "message": "Incident reports fetched successfully",
                 "data": result,
+                "next_before_id": result[-1].incident_report_id if has_more else None,
             }),
         )
 
@@ -754,17 +808,13 @@ async def raise_incident_report(db, incident):
         if not current_role_id:
             return JSONResponse(status_code=400, content={"message": "User role not found"})
 
-        # 4) insert JSON snapshot (always insert new snapshot per submission)
-        json_row = await db.fetch_one(
-            insert(json_template_transactions)
-            .values(
-                created_by=incident.raised_by,
-                template_json=incident.document,
-                created_date=datetime.utcnow(),
-            )
-            .returning(json_template_transactions.c.transaction_template_id)
+        # 4) insert JSON version (a patch against the previous submission when patch storage is on)
+        base_transaction_id = None
+        if not is_new_incident and config.JSON_TEMPLATE_PATCH_STORAGE:
+            base_transaction_id = await latest_incident_submission(db, incident_report_id)
+        json_transaction_id = await store_template_json(
+            db, incident.document, incident.raised_by, base_transaction_id
         )
-        json_transaction_id = json_row["transaction_template_id"]
         logger.info(f"Inserted JSON transaction_id={json_transaction_id}")
 
         # 5) workflow handling
@@ -866,6 +916,7 @@ async def raise_incident_report(db, incident):
 
                 logger.info("Incident fully completed and task set to Active")
                 # await db.commit()
+                events.publish(events.INCIDENT_CHANGED, project_id=v_project_id, incident_report_id=incident_report_id)
 
                 return JSONResponse(
                     status_code=200,
@@ -875,6 +926,7 @@ async def raise_incident_report(db, incident):
                     }
                 )
 
+        events.publish(events.INCIDENT_CHANGED, project_id=v_project_id, incident_report_id=incident_report_id)
         return JSONResponse(
             status_code=200,
             content={
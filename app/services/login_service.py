@@ -11,7 +11,7 @@ from app.utils.user_utils import (
     fetch_user_by_email,
     reset_user_login_state,
     log_user_audit,
-    get_user_role,
+    role_from_user,
 )
 from app.security import create_access_token, verify_password
 from app.db.transaction.users import users as users_table
@@ -189,15 +189,14 @@ async def simple_login(login: LoginRequest):
         # --- Case 3: Valid password ---
         logger.info("Password verified", extra={"user_id": user_id})
 
-        # Run slow I/O in parallel
+        # Role came with the user row; only reset the lock state if there is one
+        role = role_from_user(user)
         expiry_task = asyncio.create_task(check_password_expiry_flag(user.get("password_validity_date")))
-        reset_task = asyncio.create_task(reset_user_login_state(user_id))
-        role_task = asyncio.create_task(get_user_role(user_id))
-        token_task = asyncio.create_task(create_access_token(user))
+        token_task = asyncio.create_task(create_access_token(user, role))
+        if failed_attempts or is_locked or locked_time:
+            await reset_user_login_state(user_id)
 
-        password_expired, _, role, token = await asyncio.gather(
-            expiry_task, reset_task, role_task, token_task
-        )
+        password_expired, token = await asyncio.gather(expiry_task, token_task)
 
         asyncio.create_task(log_user_audit(user_id, AuditAction.login, AuditStatus.success))
         user_role_name = role["name"] if role else None
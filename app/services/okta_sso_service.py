@@ -1,19 +1,28 @@
+import asyncio
+import hashlib
 import logging
-import httpx
 from fastapi import Request, status
 from starlette.responses import JSONResponse, RedirectResponse
 from app.db.transaction.users import users as users_table
 from sqlalchemy import  insert
 from app.db import user_role_mapping_table
 from app.schemas.login_schema import LoginResponse, AuditAction, AuditStatus
-from app.utils.user_utils import fetch_user_by_email, reset_user_login_state, log_user_audit, get_user_role
+from app.utils.user_utils import fetch_user_by_email, reset_user_login_state, log_user_audit, role_from_user
 from app.security import create_access_token
 from app.config import config
 from app.db.database import database
+from app.utils.http_clients import http_clients
+from app.utils.ttl_cache import TTLCache
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Validated Okta sessions and their userinfo, keyed by a hash of the session
+# token. Kept short so a revoked Okta session stops working quickly.
+OKTA_SESSION_CACHE_TTL_SECONDS = 60
+okta_session_cache = TTLCache(ttl=OKTA_SESSION_CACHE_TTL_SECONDS, max_entries=10000, name="okta_session")
+okta_userinfo_cache = TTLCache(ttl=OKTA_SESSION_CACHE_TTL_SECONDS, max_entries=10000, name="okta_userinfo")
+
 # OKTA_BASE_URL = "https://yourcompany.okta.com"
 # OKTA_CLIENT_ID = "your-okta-client-id"
 # OKTA_REDIRECT_URI = "https://yourapp.com/api/auth/okta/callback"
@@ -39,10 +48,12 @@ async def okta_sso_login(request: Request):
 
                 user = dict(user_record._mapping)
                 user_id = user["user_id"]
-                await reset_user_login_state(user_id)
-                await log_user_audit(user_id, AuditAction.login, AuditStatus.success)
-                token = await create_access_token(user)
-                role = await get_user_role(user_id)
+                role = role_from_user(user)
+                _, _, token = await asyncio.gather(
+                    reset_user_login_state(user_id),
+                    log_user_audit(user_id, AuditAction.login, AuditStatus.success),
+                    create_access_token(user, role),
+                )
 
                 return JSONResponse(
                     status_code=status.HTTP_200_OK,
@@ -78,24 +89,39 @@ async def okta_sso_login(request: Request):
 
 
 # --- Helper Functions ---
+def _token_key(session_token: str) -> str:
+    return hashlib.sha256(session_token.encode()).hexdigest()
+
+
 async def validate_okta_session(session_token: str) -> bool:
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{config.OKTA_DOMAIN}/api/v1/sessions/me",
-            headers={"Authorization": f"SSWS {session_token}"}
-        )
-        return resp.status_code == 200
+    key = _token_key(session_token)
+    if okta_session_cache.get(key):
+        return True
+    resp = await http_clients.get("okta").get(
+        f"{config.OKTA_DOMAIN}/api/v1/sessions/me",
+        headers={"Authorization": f"SSWS {session_token}"}
+    )
+    # Only successful validations are cached so a new session is never rejected from cache
+    if resp.status_code == 200:
+        okta_session_cache.set(key, True)
+        return True
+    return False
 
 
 async def get_okta_user_info(session_token: str) -> dict:
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{config.OKTA_DOMAIN}/oauth2/v1/userinfo",
-            headers={"Authorization": f"Bearer {session_token}"}
-        )
-        if resp.status_code == 200:
-            return resp.json()
-        raise Exception("Failed to fetch user info from Okta")
+    key = _token_key(session_token)
+    cached = okta_userinfo_cache.get(key)
+    if cached is not None:
+        return cached
+    resp = await http_clients.get("okta").get(
+        f"{config.OKTA_DOMAIN}/oauth2/v1/userinfo",
+        headers={"Authorization": f"Bearer {session_token}"}
+    )
+    if resp.status_code == 200:
+        user_info = resp.json()
+        okta_userinfo_cache.set(key, user_info)
+        return user_info
+    raise Exception("Failed to fetch user info from Okta")
 
 
 
@@ -110,52 +136,48 @@ async def handle_okta_callback(request: Request):
             content={"message": "Missing authorization code"}
         )
 
-    # --- Step 1: Exchange code for access token ---
-    async with httpx.AsyncClient() as client:
-        token_url = f"{config.OKTA_DOMAIN}/oauth2/v1/token"
-        print("token_ur is",token_url);
-        data = {
-            "grant_type": "authorization_code",
-            "code": code,
-            "redirect_uri": config.OKTA_REDIRECT_URI,
-            "client_id": config.OKTA_CLIENT_ID,
-            "client_secret": config.OKTA_CLIENT_SECRET,
-        }
-        headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        resp = await client.post(token_url, data=data, headers=headers)
-        if resp.status_code != 200:
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={"message": "Failed to get token from Okta"}
-            )
-        tokens = resp.json()
-        access_token = tokens.get("access_token")
-        print("accesstoken  is",access_token);
-
-        id_token = tokens.get("id_token")  # <--- store this
-        print("idtoken  is",id_token);
+    client = http_clients.get("okta")
 
-    # --- Step 2: Fetch user info from Okta ---
-    async with httpx.AsyncClient() as client:
-        userinfo_resp = await client.get(
-            f"{config.OKTA_DOMAIN}/oauth2/v1/userinfo",
-            headers={"Authorization": f"Bearer {access_token}"}
+    # --- Step 1: Exchange code for access token ---
+    token_url = f"{config.OKTA_DOMAIN}/oauth2/v1/token"
+    data = {
+        "grant_type": "authorization_code",
+        "code": code,
+        "redirect_uri": config.OKTA_REDIRECT_URI,
+        "client_id": config.OKTA_CLIENT_ID,
+        "client_secret": config.OKTA_CLIENT_SECRET,
+    }
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    resp = await client.post(token_url, data=data, headers=headers)
+    if resp.status_code != 200:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"message": "Failed to get token from Okta"}
         )
-        print("userinfo resp  is",userinfo_resp);
-        print("userinfo url   is",f"{config.OKTA_DOMAIN}/oauth2/v1/userinfo");
+    tokens = resp.json()
+    access_token = tokens.get("access_token")
+    id_token = tokens.get("id_token")  # <--- store this
+    # token values are credentials: log only whether they came back
+    logger.debug(f"Okta token exchange returned access_token={access_token is not None}, id_token={id_token is not None}")
 
+    # --- Step 2: Fetch user info from Okta ---
+    userinfo_resp = await client.get(
+        f"{config.OKTA_DOMAIN}/oauth2/v1/userinfo",
+        headers={"Authorization": f"Bearer {access_token}"}
+    )
+    logger.debug(f"Okta userinfo responded with status {userinfo_resp.status_code}")
 
-        if userinfo_resp.status_code != 200:
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={"message": "Failed to get user info"}
-            )
+    if userinfo_resp.status_code != 200:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"message": "Failed to get user info"}
+        )
 
-        userinfo = userinfo_resp.json()
-        email = userinfo.get("email")
-        first_name = userinfo.get("given_name") or ""
-        last_name = userinfo.get("family_name") or ""
-        full_name = userinfo.get("name") or f"{first_name} {last_name}"
+    userinfo = userinfo_resp.json()
+    email = userinfo.get("email")
+    first_name = userinfo.get("given_name") or ""
+    last_name = userinfo.get("family_name") or ""
+    full_name = userinfo.get("name") or f"{first_name} {last_name}"
 
     # --- Step 3: Lookup or create user ---
     user_record = await fetch_user_by_email(email)
@@ -205,10 +227,12 @@ async def handle_okta_callback(request: Request):
     user["first_name"] = first_name
     user["last_name"] = last_name
 
-    await reset_user_login_state(user_id)
-    await log_user_audit(user_id, AuditAction.login, AuditStatus.success)
-    token = await create_access_token(user)
-    role = await get_user_role(user_id)
+    # Existing users carry their role from fetch_user_by_email; new users are looked up
+    _, _, token = await asyncio.gather(
+        reset_user_login_state(user_id),
+        log_user_audit(user_id, AuditAction.login, AuditStatus.success),
+        create_access_token(user),
+    )
 
     # --- Step 5: Redirect to frontend ---
     # frontend_url = f"http://localhost:5173/login-success?token={token}"
@@ -216,7 +240,7 @@ async def handle_okta_callback(request: Request):
     # return RedirectResponse(url=frontend_url)
 
     frontend_url = f"{config.FRONTEND_LOGOUT_REDIRECT_URI}?token={token}&id_token={id_token}"
-    logger.info(f"Redirecting Okta user {email} to frontend: {frontend_url}")
+    logger.info(f"Redirecting Okta user {email} to frontend: {config.FRONTEND_LOGOUT_REDIRECT_URI}")
     return RedirectResponse(url=frontend_url)
 
 
@@ -0,0 +1,62 @@
+import logging
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.db.database import IS_SQLITE, database
+from app.db.transaction.user_otp import user_otp
+from app.utils.messages import messages
+from app.utils.rate_limit import TokenBucketLimiter
+
+logger = logging.getLogger(__name__)
+
+# forgot-password: 3 OTP mails per address and 20 requests per client IP per window
+forgot_password_email_limiter = TokenBucketLimiter("forgot-password:email", capacity=3, per_seconds=15 * 60)
+forgot_password_ip_limiter = TokenBucketLimiter("forgot-password:ip", capacity=20, per_seconds=5 * 60)
+# verify-otp: 5 guesses per user per window
+verify_otp_limiter = TokenBucketLimiter("verify-otp:user", capacity=5, per_seconds=10 * 60)
+
+OTP_LIMITERS = (forgot_password_email_limiter, forgot_password_ip_limiter, verify_otp_limiter)
+
+
+async def enforce_rate_limit(limiter: TokenBucketLimiter, key) -> None:
+    """
+    Raise 429 with Retry-After once `key` has used up its bucket.
+    """
+    if key is None:
+        return
+    retry_after = await limiter.hit(key)
+    if retry_after > 0:
+        logger.warning(f"Rate limit '{limiter.name}' exceeded for {key}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=messages["too_many_requests"],
+            headers={"Retry-After": str(int(retry_after) + 1)},
+        )
+
+
+async def upsert_otp(user_id: int, otp: str, expiry: datetime, now: datetime) -> None:
+    """
+    Store the user's current OTP in one INSERT ... ON CONFLICT (user_id)
+    DO UPDATE, backed by ux_user_otp_user_id.
+    """
+    dialect_insert = sqlite_insert if IS_SQLITE else pg_insert
+    stmt = dialect_insert(user_otp).values(
+        user_id=user_id, otp=otp, otp_expiry_date=expiry, created_date=now
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[user_otp.c.user_id],
+        set_={"otp": otp, "otp_expiry_date": expiry, "updated_at": now},
+    )
+    await database.execute(stmt)
+
+
+async def fetch_otp(user_id: int) -> Optional[dict]:
+    row = await database.fetch_one(
+        select(user_otp.c.otp, user_otp.c.otp_expiry_date).where(user_otp.c.user_id == user_id)
+    )
+    return dict(row._mapping) if row else None
@@ -8,6 +8,8 @@ from app.db.master.sdlc_phases import sdlc_phases_table
 from app.db.master.sdlc_phase_tasks_mapping import sdlc_phase_tasks_mapping_table
 from app.db.master.risk_sdlcphase_mapping import risk_sdlcphase_mapping_table
 from app.db.master.equipment_ai_docs import equipment_ai_docs_table
+from app.services.incident_report_service import rename_incident_phase
+from app.utils.sdlc_template_graph import sdlc_template_graph
 from app.schemas.phase_schema import PhaseResponse, PhaseCreateRequest, PhaseUpdateRequest, PhaseDeleteRequest
 
 logger = logging.getLogger(__name__)
@@ -68,6 +70,7 @@ async def create_phase(payload: PhaseCreateRequest):
                 # Activate inactive phase
                 update_query = sdlc_phases_table.update().where(sdlc_phases_table.c.phase_id == existing_phase.phase_id).values(is_active=True)
                 await database.execute(update_query)
+                sdlc_template_graph.clear()
                 return JSONResponse(
                     status_code=status.HTTP_200_OK,
                     content={"status_code": 200, "message": f"Phase '{payload.phase_name}' activated successfully",
@@ -89,6 +92,7 @@ async def create_phase(payload: PhaseCreateRequest):
             phase_name=payload.phase_name, order_id=payload.order_id, is_active=payload.is_active
         )
         new_phase_id = await database.execute(insert_query)
+        sdlc_template_graph.clear()
         logger.info(f"Phase '{payload.phase_name}' created with ID {new_phase_id}.")
 
         return JSONResponse(
@@ -141,11 +145,14 @@ async def update_phase(payload: PhaseUpdateRequest):
             return JSONResponse(status_code=409, content={"status_code": 409, "message": f"order_id '{payload.order_id}' already exists for another phase", "data": []})
 
         # Update phase
-        await database.execute(
-            sdlc_phases_table.update()
-            .where(sdlc_phases_table.c.phase_id == payload.phase_id)
-            .values(phase_name=payload.phase_name, order_id=payload.order_id)
-        )
+        async with database.transaction():
+            await database.execute(
+                sdlc_phases_table.update()
+                .where(sdlc_phases_table.c.phase_id == payload.phase_id)
+                .values(phase_name=payload.phase_name, order_id=payload.order_id)
+            )
+            await rename_incident_phase(database, payload.phase_id, payload.phase_name)
+        sdlc_template_graph.clear()
 
         logger.info(f"Phase ID {payload.phase_id} updated successfully.")
         return JSONResponse(status_code=200, content={
@@ -190,6 +197,7 @@ async def delete_phase(payload: PhaseDeleteRequest):
         await database.execute(
             sdlc_phases_table.update().where(sdlc_phases_table.c.phase_id == payload.phase_id).values(is_active=False)
         )
+        sdlc_template_graph.clear()
 
         logger.info(f"Phase ID {payload.phase_id} inactivated successfully.")
         return JSONResponse(status_code=200, content={"status_code": 200, "message": "phase inactivated successfully", "data": {"phase_id": payload.phase_id, "is_active": False}})
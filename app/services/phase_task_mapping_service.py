@@ -2,13 +2,13 @@ from fastapi import APIRouter, status
 from starlette.responses import JSONResponse
 from sqlalchemy import select,and_
 
-from app.db import sdlc_phases_table, sdlc_tasks_table
 from app.db.database import database  # Your database connection instance
 
 import logging
 
 from app.db.master.sdlc_phase_tasks_mapping import sdlc_phase_tasks_mapping_table
 from app.schemas.phase_task_mapping_schema import PhaseTaskMappingRequest
+from app.utils.sdlc_template_graph import sdlc_template_graph
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -18,26 +18,11 @@ async def get_sdlc_phases_with_tasks():
     try:
         logger.info("Fetching SDLC phases with their mapped tasks")
 
-        # Join and filter only by mapping table's is_active
-        query = (
-            select(
-                sdlc_phases_table.c.phase_id,
-                sdlc_phases_table.c.phase_name,
-                sdlc_tasks_table.c.task_id,
-                sdlc_tasks_table.c.task_name
-            )
-            .select_from(
-                sdlc_phase_tasks_mapping_table
-                .join(sdlc_phases_table, sdlc_phase_tasks_mapping_table.c.phase_id == sdlc_phases_table.c.phase_id)
-                .join(sdlc_tasks_table, sdlc_phase_tasks_mapping_table.c.task_id == sdlc_tasks_table.c.task_id)
-            )
-            .where(sdlc_phase_tasks_mapping_table.c.is_active == True)  # Only mapping table filter
-            .order_by(sdlc_tasks_table.c.order_id)
-        )
+        # Served from the in-memory template graph, rebuilt on mapping writes
+        graph = await sdlc_template_graph.get()
+        data = list(graph.phases_with_tasks)
 
-        rows = await database.fetch_all(query)
-
-        if not rows:
+        if not data:
             return JSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
                 content={
@@ -47,30 +32,6 @@ async def get_sdlc_phases_with_tasks():
                 }
             )
 
-        # Group tasks by phase_id
-        phase_task_map = {}
-        phase_name_map = {}
-
-        for row in rows:
-            pid = row["phase_id"]
-            if pid not in phase_task_map:
-                phase_task_map[pid] = []
-                phase_name_map[pid] = row["phase_name"]
-
-            phase_task_map[pid].append({
-                "task_id": row["task_id"],
-                "task_name": row["task_name"]
-            })
-
-        # Prepare final response list
-        data = []
-        for pid, tasks in phase_task_map.items():
-            data.append({
-                "phase_id": pid,
-                "phase_name": phase_name_map[pid],
-                "tasks": tasks
-            })
-
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={
@@ -157,6 +118,8 @@ async def map_phase_to_tasks(payload: PhaseTaskMappingRequest):
             )
             await database.execute(deactivate_query)
 
+        await sdlc_template_graph.rebuild()
+
         logger.info("✅ Phase to task mapping successfully updated.")
         return JSONResponse(
             status_code=status.HTTP_200_OK,
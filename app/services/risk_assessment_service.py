@@ -4,6 +4,7 @@ from fastapi.responses import JSONResponse
 from sqlalchemy import select, func, and_
 from app.db.database import database
 from app.db.master.risk_assessment import risk_assessment_table
+from app.utils.sdlc_template_graph import sdlc_template_graph
 from app.schemas.risk_assessment_schema import RiskAssessmentResponse, RiskAssessmentCreateRequest, \
     RiskAssessmentUpdateRequest, RiskAssessmentDeleteRequest
 
@@ -184,6 +185,7 @@ async def update_risk_assessment(payload: RiskAssessmentUpdateRequest):
             .values(risk_assessment_name=payload.risk_assessment_name)
         )
         await database.execute(update_query)
+        sdlc_template_graph.clear()
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -1,4 +1,6 @@
 import logging
+from typing import Optional
+
 from fastapi import status
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
@@ -7,6 +9,9 @@ from app.db.database import database
 from app.db.master.json_templates import json_templates_table
 from app.db.master.template_types import template_types_table
 from app.db.transaction.json_template_transactions import json_template_transactions
+from app.services.transaction.json_template_versions_service import load_template_json
+from app.utils.etag import not_modified
+from app.utils.template_registry import template_etag, template_registry
 from datetime import datetime
 # from app.db.master.risk_assessment_template import risk_assessment_template_table
 
@@ -16,7 +21,7 @@ logger.setLevel(logging.INFO)
 
 
 
-async def get_latest_templates_by_type_service(template_type_id: int):
+async def get_latest_templates_by_type_service(template_type_id: int, if_none_match: Optional[str] = None):
     """
     Service to fetch the latest JSON template for a given template_type_id.
     """
@@ -27,71 +32,61 @@ async def get_latest_templates_by_type_service(template_type_id: int):
                 content={"message": "Missing template_type_id"}
             )
 
-        # Subquery: get latest version for this template_type_id
-        subq = (
-            select(
-                json_templates_table.c.template_type_id,
-                func.max(json_templates_table.c.template_version)
-                .label("latest_version")
-            )
-            .where(
-                json_templates_table.c.template_type_id == template_type_id
-            )
-            .group_by(json_templates_table.c.template_type_id)
-        ).subquery()
-
-        # Main query
-        query = (
-            select(
-                json_templates_table.c.template_id,
-                json_templates_table.c.template_name,
-                json_templates_table.c.template_type_id,
-                json_templates_table.c.json_template,
-                json_templates_table.c.created_by,
-                json_templates_table.c.created_date,
-                json_templates_table.c.template_version,
-                template_types_table.c.template_format_type_id
-            )
-            .select_from(
-                json_templates_table
-                .join(
-                    template_types_table,
-                    json_templates_table.c.template_type_id ==
-                    template_types_table.c.template_type_id
+        safe_data = template_registry.get_latest(template_type_id)
+        if safe_data is None:
+            # Newest version first on (template_type_id, template_version DESC)
+            query = (
+                select(
+                    json_templates_table.c.template_id,
+                    json_templates_table.c.template_name,
+                    json_templates_table.c.template_type_id,
+                    json_templates_table.c.json_template,
+                    json_templates_table.c.created_by,
+                    json_templates_table.c.created_date,
+                    json_templates_table.c.template_version,
+                    template_types_table.c.template_format_type_id
                 )
-                .join(
-                    subq,
-                    and_(
+                .select_from(
+                    json_templates_table
+                    .join(
+                        template_types_table,
                         json_templates_table.c.template_type_id ==
-                        subq.c.template_type_id,
-                        json_templates_table.c.template_version ==
-                        subq.c.latest_version
+                        template_types_table.c.template_type_id
                     )
                 )
+                .where(json_templates_table.c.template_type_id == template_type_id)
+                .order_by(
+                    json_templates_table.c.template_version.desc(),
+                    json_templates_table.c.template_id.desc()
+                )
+                .limit(1)
             )
-            .limit(1)
-        )
 
-        row = await database.fetch_one(query)
+            row = await database.fetch_one(query)
 
-        if not row:
-            return JSONResponse(
-                status_code=404,
-                content={
-                    "message": "No templates found for this template_type_id"
-                }
-            )
+            if not row:
+                return JSONResponse(
+                    status_code=404,
+                    content={
+                        "message": "No templates found for this template_type_id"
+                    }
+                )
 
-        data = dict(row)
-        
-        safe_data = jsonable_encoder(data)
+            safe_data = jsonable_encoder(dict(row))
+            template_registry.set_latest(template_type_id, safe_data)
+
+        etag = template_etag(safe_data["template_id"])
+        unchanged = not_modified(etag, if_none_match)
+        if unchanged:
+            return unchanged
 
         return JSONResponse(
             status_code=200,
             content={
                 "message": f"Fetched latest template for template_type_id {template_type_id}",
                 "data": safe_data
-            }
+            },
+            headers={"ETag": etag},
         )
 
     except Exception as e:
@@ -158,7 +153,10 @@ async def get_json_template_by_id_service(transaction_template_id: int):
                 content={"message": f"No template found for id {transaction_template_id}"},
             )
 
-        safe_data = jsonable_encoder(dict(row))
+        data = dict(row)
+        if data.get("template_json") is None and data.get("patch_json") is not None:
+            data["template_json"] = await load_template_json(database, transaction_template_id)
+        safe_data = jsonable_encoder(data)
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={
@@ -2,10 +2,10 @@ import logging
 from fastapi import status
 from fastapi.responses import JSONResponse
 
-from app.db import risk_assessment_table, sdlc_phases_table
 from app.db.database import database
 from app.db.master.risk_sdlcphase_mapping import risk_sdlcphase_mapping_table
 from app.schemas.risk_phase_map_schema import RiskPhaseMappingRequest
+from app.utils.sdlc_template_graph import sdlc_template_graph
 from sqlalchemy import select
 
 logger = logging.getLogger(__name__)
@@ -92,6 +92,9 @@ async def map_risk_to_phases(payload: RiskPhaseMappingRequest):
             )
             await database.execute(update_query)
 
+        if to_insert or to_activate or to_deactivate:
+            await sdlc_template_graph.rebuild()
+
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={
@@ -117,25 +120,11 @@ async def get_all_risks_with_phases_only_from_mapping():
     try:
         logger.info("Start to fetching risks with mappings phases.")
 
-        # 1. Get all risk-phase mappings with is_active=True (only check in mapping table)
-        mappings_query = (
-            select(
-                risk_sdlcphase_mapping_table.c.risk_assessment_id,
-                risk_assessment_table.c.risk_assessment_name,
-                sdlc_phases_table.c.phase_id,
-                sdlc_phases_table.c.phase_name
-            )
-            .select_from(
-                risk_sdlcphase_mapping_table
-                .join(risk_assessment_table, risk_sdlcphase_mapping_table.c.risk_assessment_id == risk_assessment_table.c.risk_assessment_id)
-                .join(sdlc_phases_table, risk_sdlcphase_mapping_table.c.phase_id == sdlc_phases_table.c.phase_id)
-            )
-            .where(risk_sdlcphase_mapping_table.c.is_active == True)
-        )
-
-        mappings = await database.fetch_all(mappings_query)
+        # Served from the in-memory template graph, rebuilt on mapping writes
+        graph = await sdlc_template_graph.get()
+        data = list(graph.risks_with_phases)
 
-        if not mappings:
+        if not data:
             logger.warning("No active mappings found in mapping table.")
             return JSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -146,29 +135,6 @@ async def get_all_risks_with_phases_only_from_mapping():
                 }
             )
 
-        # 2. Group phases by risk_id
-        risk_phase_map = {}
-        risk_name_map = {}
-        for m in mappings:
-            rid = m["risk_assessment_id"]
-            if rid not in risk_phase_map:
-                risk_phase_map[rid] = []
-                risk_name_map[rid] = m["risk_assessment_name"]
-
-            risk_phase_map[rid].append({
-                "phase_id": m["phase_id"],
-                "phase_name": m["phase_name"]
-            })
-
-        # 3. Build final response
-        data = []
-        for rid, phases in risk_phase_map.items():
-            data.append({
-                "risk_assessment_id": rid,
-                "risk_assessment_name": risk_name_map[rid],
-                "phases": phases
-            })
-
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={
@@ -0,0 +1,204 @@
+import logging
+from typing import Optional
+
+from fastapi import status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, literal_column, select, union_all
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+from app.db.database import IS_SQLITE, database
+from app.db.docs.task_docs import task_docs_table
+from app.db.transaction.comment_replies import comment_replies_table
+from app.db.transaction.incident_reports import incident_report_table
+from app.db.transaction.project_comments import project_comments_table
+from app.db.transaction.projects_user_mapping import projects_user_mapping_table
+from app.utils.search_index import COMMENT, DOCUMENT, INCIDENT, REPLY, SEARCH_TEXT_MAX_CHARS, SEARCH_TYPES, \
+    search_index, snippet, tokenize
+
+logger = logging.getLogger(__name__)
+
+TS_CONFIG = "english"
+HEADLINE_OPTIONS = "MaxWords=30, MinWords=10, MaxFragments=1"
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def _tsv(table):
+    # generated column from database_scripts/Rakesh/full_text_search.sql; kept
+    # out of the Table definitions so SQLite can still create the schema
+    return literal_column(f"{table.fullname}.search_tsv", TSVECTOR)
+
+
+def _type_label(type_: str):
+    # a constant rather than a bind parameter, whose type Postgres cannot infer inside a UNION
+    return literal_column(f"'{type_}'").label("type")
+
+
+def _member_project_ids(user_id: int):
+    pum = projects_user_mapping_table.c
+    return select(pum.project_id).where(pum.user_id == user_id, pum.is_active == True)
+
+
+def _capped(column):
+    # the same text the tsvector was built from (see full_text_search.sql)
+    return func.left(func.coalesce(column, ""), SEARCH_TEXT_MAX_CHARS)
+
+
+def _postgres_sources(tsquery):
+    """
+    One select per searchable type: (type, id, project ids, body, rank),
+    matching through the GIN-indexed tsvector columns.
+    """
+    docs = task_docs_table.c
+    comments = project_comments_table.c
+    replies = comment_replies_table.c
+    incidents = incident_report_table.c
+
+    def hits(table, *columns):
+        tsv = _tsv(table)
+        return select(*columns, func.ts_rank(tsv, tsquery).label("rank")).where(tsv.op("@@")(tsquery))
+
+    return {
+        DOCUMENT: (
+            hits(
+                task_docs_table, _type_label(DOCUMENT), docs.task_doc_id.label("id"), docs.project_id,
+                docs.project_phase_id, docs.project_task_id,
+                func.ai_verify_docs.document_search_text(docs.document_json).label("body"),
+            ).where(docs.is_latest == True),
+            docs.project_id,
+        ),
+        COMMENT: (
+            hits(
+                project_comments_table, _type_label(COMMENT), comments.comment_id.label("id"),
+                comments.project_id, comments.project_phase_id, comments.project_task_id,
+                _capped(comments.description).label("body"),
+            ),
+            comments.project_id,
+        ),
+        REPLY: (
+            hits(
+                comment_replies_table, _type_label(REPLY), replies.reply_id.label("id"),
+                comments.project_id, comments.project_phase_id, comments.project_task_id,
+                _capped(replies.reply_description).label("body"),
+            ).join(project_comments_table, comments.comment_id == replies.comment_id),
+            comments.project_id,
+        ),
+        INCIDENT: (
+            hits(
+                incident_report_table, _type_label(INCIDENT), incidents.incident_report_id.label("id"),
+                incidents.project_id, incidents.phase_id.label("project_phase_id"),
+                incidents.task_id.label("project_task_id"),
+                _capped(func.concat_ws(" ", incidents.raise_comment, incidents.resolve_comment)).label("body"),
+            ),
+            incidents.project_id,
+        ),
+    }
+
+
+async def _postgres_search(q: str, types: list[str], user_id: int, project_id: Optional[int],
+                           page: int, page_size: int):
+    tsquery = func.websearch_to_tsquery(TS_CONFIG, q)
+    selects = []
+    for type_, (query, project_column) in _postgres_sources(tsquery).items():
+        if type_ not in types:
+            continue
+        query = query.where(project_column.in_(_member_project_ids(user_id)))
+        if project_id is not None:
+            query = query.where(project_column == project_id)
+        selects.append(query)
+
+    matches = union_all(*selects).subquery("matches")
+    # rank and page first; the headline is only built for the rows returned
+    page_rows = (
+        select(matches, func.count().over().label("total"))
+        .order_by(matches.c.rank.desc(), matches.c.type, matches.c.id.desc())
+        .limit(page_size)
+        .offset((page - 1) * page_size)
+        .subquery("page_rows")
+    )
+    query = select(
+        page_rows.c.type, page_rows.c.id, page_rows.c.project_id, page_rows.c.project_phase_id,
+        page_rows.c.project_task_id, page_rows.c.rank, page_rows.c.total,
+        func.ts_headline(TS_CONFIG, page_rows.c.body, tsquery, HEADLINE_OPTIONS).label("snippet"),
+    ).order_by(page_rows.c.rank.desc(), page_rows.c.type, page_rows.c.id.desc())
+    rows = await database.fetch_all(query)
+
+    items = [{k: v for k, v in dict(row._mapping).items() if k != "total"} for row in rows]
+    return items, rows[0]["total"] if rows else 0
+
+
+async def _index_search(q: str, types: list[str], user_id: int, project_id: Optional[int],
+                        page: int, page_size: int):
+    rows = await database.fetch_all(_member_project_ids(user_id))
+    member_of = {row["project_id"] for row in rows}
+    results = await search_index.search(q, types=types, project_id=project_id, project_ids=member_of)
+    terms = tokenize(q)
+    offset = (page - 1) * page_size
+    items = [
+        {
+            "type": doc.type,
+            "id": doc.id,
+            "project_id": doc.project_id,
+            "project_phase_id": doc.project_phase_id,
+            "project_task_id": doc.project_task_id,
+            "rank": round(score, 6),
+            "snippet": snippet(doc.text, terms),
+        }
+        for score, doc in results[offset:offset + page_size]
+    ]
+    return items, len(results)
+
+
+async def search_service(
+    q: str,
+    user_id: int,
+    types: Optional[list[str]] = None,
+    project_id: Optional[int] = None,
+    page: int = 1,
+    page_size: int = DEFAULT_PAGE_SIZE,
+):
+    """
+    Ranked, paginated full-text search over latest task documents, comments,
+    replies and incident comments of the projects `user_id` is a member of.
+    Postgres matches through the tsvector columns; SQLite (tests, local
+    runs) uses the in-process index.
+    """
+    try:
+        logger.info(f"Searching q={q!r} for user_id={user_id}, types={types}, project_id={project_id}, page={page}")
+        unknown = sorted(set(types or ()) - set(SEARCH_TYPES))
+        if not q or not q.strip() or unknown:
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={
+                    "status_code": status.HTTP_400_BAD_REQUEST,
+                    "message": f"Unknown search types: {', '.join(unknown)}" if unknown else "Search text is required",
+                    "data": None,
+                },
+            )
+        types = list(types or SEARCH_TYPES)
+
+        if IS_SQLITE:
+            items, total = await _index_search(q, types, user_id, project_id, page, page_size)
+        else:
+            items, total = await _postgres_search(q, types, user_id, project_id, page, page_size)
+
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=jsonable_encoder({
+                "status_code": status.HTTP_200_OK,
+                "message": "Search results fetched successfully",
+                "data": {"items": items, "total": total, "page": page, "page_size": page_size},
+            }),
+        )
+
+    except Exception as e:
+        logger.exception(f"Error searching for {q!r}: {str(e)}")
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "Internal server error",
+                "data": None,
+            },
+        )
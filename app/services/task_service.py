@@ -4,6 +4,8 @@ from fastapi.responses import JSONResponse
 from app.db.database import database
 from app.db.master.sdlc_phase_tasks_mapping import sdlc_phase_tasks_mapping_table
 from app.db.master.sdlc_tasks import sdlc_tasks_table
+from app.services.incident_report_service import rename_incident_task
+from app.utils.sdlc_template_graph import sdlc_template_graph
 from app.schemas.task_schema import TaskResponse, TaskCreateRequest, TaskUpdateRequest, TaskDeleteRequest
 from sqlalchemy import select, and_, func
 
@@ -242,7 +244,10 @@ async def update_task(payload: TaskUpdateRequest):
             .where(sdlc_tasks_table.c.task_id == payload.task_id)
             .values(task_name=payload.task_name, order_id=payload.order_id)
         )
-        await database.execute(update_query)
+        async with database.transaction():
+            await database.execute(update_query)
+            await rename_incident_task(database, payload.task_id, payload.task_name)
+        sdlc_template_graph.clear()
 
         logger.info(f"task ID {payload.task_id} updated successfully to '{payload.task_name}' with order_id {payload.order_id}.")
         return JSONResponse(
@@ -1,4 +1,6 @@
 # app/services/template_type_service.py
+from typing import Optional
+
 from fastapi import status, HTTPException,Request
 from fastapi.responses import JSONResponse
 from sqlalchemy import select, join, func, insert
@@ -7,6 +9,9 @@ from app.db.master.json_templates import json_templates_table
 from app.db.master.template_format_types import template_format_types_table
 from app.db.master.template_types import template_types_table
 from app.schemas.template_type_schema import TemplateTypeFullResponse, CreateJsonTemplate, JsonTemplateResponse
+from app.utils import events
+from app.utils.etag import body_etag, not_modified
+from app.utils.template_registry import template_etag, template_registry
 import logging
 
 logger = logging.getLogger(__name__)
@@ -121,6 +126,7 @@ async def create_json_template(input: CreateJsonTemplate, request: Request):
         response_data = JsonTemplateResponse(**dict(result))
 
         logger.info(f"New JSON template created with ID: {new_template_id}, version: {new_version}")
+        events.publish(events.JSON_TEMPLATE_CREATED, template_type_id=input.template_type_id)
 
         serialized_data = response_data.model_dump(mode='json')  # ✅ Key fix: mode='json' serializes datetime to ISO str
 
@@ -145,22 +151,30 @@ async def create_json_template(input: CreateJsonTemplate, request: Request):
         )
 
 # New service: Get JSON template by ID
-async def get_json_template_by_id(template_id: int):
+async def get_json_template_by_id(template_id: int, if_none_match: Optional[str] = None):
     try:
         logger.info(f"Fetching JSON template with ID: {template_id}")
 
-        query = select(json_templates_table).where(
-            json_templates_table.c.template_id == template_id
-        )
-        row = await database.fetch_one(query)
-        if not row:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="JSON template not found"
+        etag = template_etag(template_id)
+        unchanged = not_modified(etag, if_none_match)
+        if unchanged:
+            return unchanged
+
+        serialized_data = template_registry.get(template_id)
+        if serialized_data is None:
+            query = select(json_templates_table).where(
+                json_templates_table.c.template_id == template_id
             )
+            row = await database.fetch_one(query)
+            if not row:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="JSON template not found"
+                )
 
-        response_data = JsonTemplateResponse(**dict(row))
-        serialized_data = response_data.model_dump(mode='json')
+            response_data = JsonTemplateResponse(**dict(row))
+            serialized_data = response_data.model_dump(mode='json')
+            template_registry.put(template_id, serialized_data)
 
         logger.info(f"JSON template {template_id} fetched successfully.")
         return JSONResponse(
@@ -169,7 +183,8 @@ async def get_json_template_by_id(template_id: int):
                 "status_code": status.HTTP_200_OK,
                 "message": "JSON template fetched successfully",
                 "data": serialized_data
-            }
+            },
+            headers={"ETag": etag},
         )
 
     except HTTPException:
@@ -182,7 +197,7 @@ async def get_json_template_by_id(template_id: int):
         )
 
 # New service: Get all versions for a template_type_id
-async def get_all_versions_by_type_id(template_type_id: int):
+async def get_all_versions_by_type_id(template_type_id: int, if_none_match: Optional[str] = None):
     try:
         logger.info(f"Fetching all versions for template_type_id: {template_type_id}")
 
@@ -198,9 +213,9 @@ async def get_all_versions_by_type_id(template_type_id: int):
                 detail="Invalid or inactive template type"
             )
 
-        # Fetch all versions ordered by version DESC (newest first)
+        # Version ids newest first; the immutable contents come from the registry
         query = (
-            select(json_templates_table)
+            select(json_templates_table.c.template_id)
             .where(json_templates_table.c.template_type_id == template_type_id)
             .order_by(json_templates_table.c.template_version.desc())
         )
@@ -217,8 +232,23 @@ async def get_all_versions_by_type_id(template_type_id: int):
                 }
             )
 
-        result = [JsonTemplateResponse(**dict(row)) for row in rows]
-        serialized_data = [r.model_dump(mode='json') for r in result]
+        template_ids = [row["template_id"] for row in rows]
+        etag = body_etag(",".join(map(str, template_ids)).encode(), prefix="json-templates-")
+        unchanged = not_modified(etag, if_none_match)
+        if unchanged:
+            return unchanged
+
+        templates = template_registry.get_many(template_ids)
+        missing = [template_id for template_id in template_ids if template_id not in templates]
+        if missing:
+            missing_rows = await database.fetch_all(
+                select(json_templates_table).where(json_templates_table.c.template_id.in_(missing))
+            )
+            for row in missing_rows:
+                serialized = JsonTemplateResponse(**dict(row)).model_dump(mode='json')
+                template_registry.put(row["template_id"], serialized)
+                templates[row["template_id"]] = serialized
+        serialized_data = [templates[template_id] for template_id in template_ids if template_id in templates]
 
         logger.info(f"All versions for template_type_id {template_type_id} fetched successfully. Found {len(rows)} versions.")
         return JSONResponse(
@@ -227,7 +257,8 @@ async def get_all_versions_by_type_id(template_type_id: int):
                 "status_code": status.HTTP_200_OK,
                 "message": "All versions fetched successfully",
                 "data": serialized_data  # Consistent with other endpoints: "data" is the list of versions
-            }
+            },
+            headers={"ETag": etag},
         )
 
     except HTTPException:
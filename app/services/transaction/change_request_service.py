@@ -2,7 +2,8 @@ import os
 import logging
 from fastapi import status, Request
 from fastapi.responses import JSONResponse, FileResponse
-from sqlalchemy import select, join, or_
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, join, or_, and_, exists
 
 from app.db.transaction.user_role_mapping import user_role_mapping_table
 from app.db.database import database
@@ -21,48 +22,61 @@ load_dotenv()
 CR_APPROVER_ROLES = os.getenv("CR_APPROVER_ROLES")
 CR_APPROVER_ROLES = [int(r.strip()) for r in CR_APPROVER_ROLES.split(",")]
 
+def _approver_inbox_filter(login_user_id: int):
+    """
+    Change requests awaiting this user's verification: an active approver
+    mapping for them on an active project they belong to, while they hold
+    an active approver role. Project membership and role are EXISTS
+    semi-joins, so neither multiplies the rows.
+    """
+    crum = change_request_user_mapping_table.c
+    return and_(
+        projects.c.is_active == True,
+        crum.user_is_active == True,
+        crum.verified_by == login_user_id,
+        exists().where(
+            projects_user_mapping_table.c.project_id == projects.c.project_id,
+            projects_user_mapping_table.c.user_id == login_user_id,
+            projects_user_mapping_table.c.is_active == True,
+        ),
+        exists().where(
+            user_role_mapping_table.c.user_id == login_user_id,
+            user_role_mapping_table.c.role_id.in_(CR_APPROVER_ROLES),
+            user_role_mapping_table.c.is_active == True,
+        ),
+    )
+
+
+def _approver_inbox_join():
+    return (
+        join(change_request_table, projects, change_request_table.c.project_id == projects.c.project_id)
+        .join(change_request_user_mapping_table,
+              change_request_table.c.change_request_id == change_request_user_mapping_table.c.change_request_id)
+    )
+
+
+INBOX_COLUMNS = (
+    change_request_table.c.change_request_id,
+    change_request_table.c.change_request_code,
+    change_request_table.c.change_request_file,
+    change_request_user_mapping_table.c.reject_reason,
+    projects.c.project_id,
+    projects.c.project_name,
+    change_request_user_mapping_table.c.is_verified,
+    change_request_user_mapping_table.c.change_request_user_mapping_id,
+    change_request_table.c.transaction_template_id,
+)
+
+
 async def get_unverified_change_requests(request: Request):
     try:
         login_user_id = request.state.user["user_id"]
         logger.info("Fetching unverified change requests for active projects.")
-        # Join change_request and projects table
-        j = (
-            join(change_request_table, projects, change_request_table.c.project_id == projects.c.project_id)
-            .join(projects_user_mapping_table, projects.c.project_id == projects_user_mapping_table.c.project_id)
-            .join(
-                json_template_transactions,
-                change_request_table.c.transaction_template_id == json_template_transactions.c.transaction_template_id,
-                isouter=True)
-            .join(user_role_mapping_table,user_role_mapping_table.c.user_id == login_user_id,isouter=False)
-            .join(change_request_user_mapping_table,
-                  change_request_table.c.change_request_id == change_request_user_mapping_table.c.change_request_id,
-                  isouter=True)
-        )
+        # The CR form JSON is left out; getChangeRequestDetail loads it for one request
         query = (
-            select(
-                change_request_table.c.change_request_id,
-                change_request_table.c.change_request_code,
-                change_request_table.c.change_request_file,
-                change_request_user_mapping_table.c.reject_reason,
-                projects.c.project_id,
-                projects.c.project_name,
-                change_request_user_mapping_table.c.is_verified,
-                change_request_user_mapping_table.c.change_request_user_mapping_id,
-                change_request_table.c.transaction_template_id,
-                json_template_transactions.c.template_json.label("change_request_json"),
-            )
-            .select_from(j)
-            .where(
-                # change_request_table.c.is_verified == False,
-                projects.c.is_active == True,
-                projects_user_mapping_table.c.is_active == True,
-                projects_user_mapping_table.c.user_id == login_user_id,
-                user_role_mapping_table.c.role_id.in_(CR_APPROVER_ROLES),
-
-                user_role_mapping_table.c.is_active == True,
-                change_request_user_mapping_table.c.user_is_active == True,
-                change_request_user_mapping_table.c.verified_by == login_user_id
-            )
+            select(*INBOX_COLUMNS)
+            .select_from(_approver_inbox_join())
+            .where(_approver_inbox_filter(login_user_id))
             .order_by(change_request_table.c.change_request_id.desc())
         )
 
@@ -78,21 +92,7 @@ async def get_unverified_change_requests(request: Request):
                     "data": []
                 }
             )
-        result = [
-            {
-                "change_request_id": row["change_request_id"],
-                "change_request_code": row["change_request_code"],
-                "change_request_file": row["change_request_file"],
-                "reject_reason": row["reject_reason"],
-                "transaction_template_id": row["transaction_template_id"],
-                "change_request_json": row["change_request_json"],
-                "project_id": row["project_id"],
-                "project_name": row["project_name"],
-                "is_verified": row["is_verified"],
-                "change_request_user_mapping_id": row["change_request_user_mapping_id"],
-            }
-            for row in rows
-        ]
+        result = [dict(row._mapping) for row in rows]
 
         logger.info(f"Fetched {len(result)} unverified change requests successfully.")
         return JSONResponse(
@@ -115,6 +115,56 @@ async def get_unverified_change_requests(request: Request):
             }
         )
 
+
+async def get_change_request_detail_service(change_request_id: int, request: Request):
+    try:
+        login_user_id = request.state.user["user_id"]
+        logger.info(f"Fetching change request {change_request_id} for user {login_user_id}.")
+        query = (
+            select(*INBOX_COLUMNS, json_template_transactions.c.template_json.label("change_request_json"))
+            .select_from(
+                _approver_inbox_join().join(
+                    json_template_transactions,
+                    change_request_table.c.transaction_template_id == json_template_transactions.c.transaction_template_id,
+                    isouter=True)
+            )
+            .where(change_request_table.c.change_request_id == change_request_id)
+            .where(_approver_inbox_filter(login_user_id))
+            .limit(1)
+        )
+        row = await database.fetch_one(query)
+
+        if not row:
+            logger.info(f"Change request {change_request_id} not found in the user's inbox.")
+            return JSONResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                content={
+                    "status_code": status.HTTP_404_NOT_FOUND,
+                    "message": "Change Request not found",
+                    "data": None
+                }
+            )
+
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={
+                "status_code": status.HTTP_200_OK,
+                "message": "Change request fetched successfully",
+                "data": jsonable_encoder(dict(row._mapping))
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"Internal server error while fetching change request {change_request_id}: {str(e)}")
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "Internal server error",
+                "data": None
+            }
+        )
+
 async def get_cr_file_service(file_name: str):
     try:
         logger.info(f"Fetching file: {file_name}")
@@ -0,0 +1,208 @@
+import json
+import logging
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import insert, literal_column, select
+
+from app.config import config
+from app.db.database import database
+from app.db.transaction.incident_reports import incident_report_transactions
+from app.db.transaction.json_template_transactions import json_template_transactions
+from app.utils.json_diff import apply_patch, diff, strip_review_values, summarize
+
+logger = logging.getLogger(__name__)
+
+# A full snapshot every this many versions bounds reconstruction to as many patches
+JSON_SNAPSHOT_INTERVAL = 10
+INCIDENT_SUBMITTED = 3
+
+
+class TemplateNotFound(LookupError):
+    pass
+
+
+def _as_json(value: Any) -> Any:
+    # some forms arrive as JSON text; compare them structurally
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+async def store_template_json(db, template_json: Any, created_by: Optional[int],
+                              base_transaction_id: Optional[int] = None) -> int:
+    """
+    Insert a JSON template version. With patch storage on and a base given,
+    the version is stored as a patch against it unless a snapshot is due or
+    the patch would not be smaller.
+    """
+    t = json_template_transactions.c
+    values = {"created_by": created_by, "created_date": datetime.utcnow()}
+
+    if config.JSON_TEMPLATE_PATCH_STORAGE and base_transaction_id is not None:
+        base_row = await db.fetch_one(select(t.chain_depth).where(t.transaction_template_id == base_transaction_id))
+        depth = ((base_row["chain_depth"] or 0) + 1) if base_row else JSON_SNAPSHOT_INTERVAL
+        if depth < JSON_SNAPSHOT_INTERVAL:
+            patch = strip_review_values(diff(await load_template_json(db, base_transaction_id), template_json))
+            if len(json.dumps(patch)) < len(json.dumps(template_json)):
+                values.update(base_transaction_id=base_transaction_id, patch_json=patch, chain_depth=depth)
+
+    if "patch_json" not in values:
+        values.update(template_json=template_json, chain_depth=0)
+
+    row = await db.fetch_one(
+        insert(json_template_transactions).values(**values).returning(t.transaction_template_id)
+    )
+    return row["transaction_template_id"]
+
+
+async def load_template_json(db, transaction_template_id: int) -> Any:
+    """
+    The full JSON of a version: its snapshot, or the nearest snapshot before
+    it with the patches since applied in order (one recursive query).
+    """
+    t = json_template_transactions.c
+    chain = (
+        select(t.transaction_template_id, t.base_transaction_id, t.template_json, t.patch_json,
+               literal_column("0").label("hop"))
+        .where(t.transaction_template_id == transaction_template_id)
+        .cte("chain", recursive=True)
+    )
+    chain = chain.union_all(
+        select(t.transaction_template_id, t.base_transaction_id, t.template_json, t.patch_json,
+               (chain.c.hop + 1).label("hop"))
+        .join(chain, t.transaction_template_id == chain.c.base_transaction_id)
+        .where(chain.c.patch_json.isnot(None))
+    )
+    rows = await db.fetch_all(select(chain.c.template_json, chain.c.patch_json).order_by(chain.c.hop.desc()))
+    if not rows:
+        raise TemplateNotFound(transaction_template_id)
+
+    document = rows[0]["template_json"]
+    for row in rows[1:]:
+        document = apply_patch(document, row["patch_json"])
+    return document
+
+
+async def latest_incident_submission(db, incident_report_id: int) -> Optional[int]:
+    return await db.fetch_val(
+        select(incident_report_transactions.c.transaction_template_id)
+        .where(incident_report_transactions.c.incident_report_id == incident_report_id)
+        .where(incident_report_transactions.c.status == INCIDENT_SUBMITTED)
+        .order_by(incident_report_transactions.c.created_date.desc(),
+                  incident_report_transactions.c.incident_report_transaction_id.desc())
+        .limit(1)
+    )
+
+
+def _changes(old: Any, new: Any) -> dict:
+    changes = diff(_as_json(old), _as_json(new))
+    return {"summary": summarize(changes), "changes": changes}
+
+
+async def compare_template_transactions_service(old_transaction_id: int, new_transaction_id: int):
+    """
+    Path-level differences between two JSON template versions (CR forms,
+    incident submissions, risk templates).
+    """
+    try:
+        logger.info(f"Comparing JSON templates {old_transaction_id} -> {new_transaction_id}")
+        try:
+            old = await load_template_json(database, old_transaction_id)
+            new = await load_template_json(database, new_transaction_id)
+        except TemplateNotFound as e:
+            return JSONResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                content={
+                    "status_code": status.HTTP_404_NOT_FOUND,
+                    "message": f"No template found for id {e.args[0]}",
+                    "data": None,
+                },
+            )
+
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=jsonable_encoder({
+                "status_code": status.HTTP_200_OK,
+                "message": "Templates compared successfully",
+                "data": {
+                    "old_transaction_id": old_transaction_id,
+                    "new_transaction_id": new_transaction_id,
+                    **_changes(old, new),
+                },
+            }),
+        )
+
+    except Exception as e:
+        logger.exception(f"Error comparing JSON templates {old_transaction_id} and {new_transaction_id}: {str(e)}")
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "Internal server error",
+                "data": None,
+            },
+        )
+
+
+async def compare_incident_submissions_service(incident_report_id: int):
+    """
+    Every submission of an incident form, each with its changes against the
+    one before.
+    """
+    try:
+        logger.info(f"Comparing submissions of incident {incident_report_id}")
+        irt = incident_report_transactions.c
+        rows = await database.fetch_all(
+            select(irt.transaction_template_id, irt.role_id, irt.created_date,
+                   json_template_transactions.c.created_by)
+            .join(json_template_transactions,
+                  json_template_transactions.c.transaction_template_id == irt.transaction_template_id)
+            .where(irt.incident_report_id == incident_report_id, irt.status == INCIDENT_SUBMITTED)
+            .order_by(irt.created_date, irt.incident_report_transaction_id)
+        )
+        if not rows:
+            return JSONResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                content={
+                    "status_code": status.HTTP_404_NOT_FOUND,
+                    "message": "No submissions found for this incident",
+                    "data": None,
+                },
+            )
+
+        versions, previous = [], None
+        for number, row in enumerate(rows, start=1):
+            document = await load_template_json(database, row["transaction_template_id"])
+            versions.append({
+                "version": number,
+                **dict(row._mapping),
+                **(_changes(previous, document) if number > 1 else {"summary": None, "changes": []}),
+            })
+            previous = document
+
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=jsonable_encoder({
+                "status_code": status.HTTP_200_OK,
+                "message": "Incident submissions compared successfully",
+                "data": {"incident_report_id": incident_report_id, "versions": versions},
+            }),
+        )
+
+    except Exception as e:
+        logger.exception(f"Error comparing submissions of incident {incident_report_id}: {str(e)}")
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "Internal server error",
+                "data": None,
+            },
+        )
@@ -1,9 +1,10 @@
 from collections import defaultdict
-from sqlalchemy import select,insert,update,func
+from sqlalchemy import select,insert,update,func,or_
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 from fastapi import status
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 from app.db import project_phases_list_table, sdlc_phases_table, sdlc_tasks_table
 from app.db.database import database
@@ -18,10 +19,78 @@ from app.schemas.transaction.project_comments_schema import ProjectCommentCreate
 import logging
 
 from app.db.transaction.users import users  # Import the Table, not the module
+from app.utils import events
+from app.utils.comment_stream import (
+    COMMENT_CREATED,
+    COMMENT_RESOLVED,
+    COMMENT_UPDATED,
+    REPLY_CREATED,
+    REPLY_UPDATED,
+)
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# timestamps are taken before commit, so a row can land stamped behind a mark
+# already handed out; `since` filters reach back this far to pick it up
+COMMENT_SINCE_OVERLAP_SECONDS = 60
+
+
+def _as_utc_naive(value: datetime) -> datetime:
+    # comment timestamps are written as naive UTC (datetime.utcnow())
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _reply_changed_since(since: datetime):
+    return or_(
+        comment_replies_table.c.replied_date > since,
+        comment_replies_table.c.update_date > since,
+    )
+
+
+def _comment_changed_since(since: datetime):
+    """
+    Comments created, edited or resolved after `since`, or with a reply added
+    or edited after it. The reply side is a correlated EXISTS so it probes
+    comment_replies(comment_id, replied_date) per candidate comment.
+    """
+    reply_changed = (
+        select(comment_replies_table.c.reply_id)
+        .where(comment_replies_table.c.comment_id == project_comments_table.c.comment_id)
+        .where(_reply_changed_since(since))
+        .exists()
+    )
+    return or_(
+        project_comments_table.c.comment_date > since,
+        project_comments_table.c.update_date > since,
+        project_comments_table.c.resolved_date > since,
+        reply_changed,
+    )
+
+
+def _high_water_mark(since: Optional[datetime], comments: list, replies: list) -> Optional[datetime]:
+    """
+    Latest change timestamp among the returned rows, for the client to send
+    back as `since` on its next refresh. Unchanged when nothing was returned.
+    Changes are then fetched from COMMENT_SINCE_OVERLAP_SECONDS before the
+    mark, so rows stamped earlier but committed after it still arrive; rows
+    inside the overlap come back again and clients replace them by
+    comment_id / reply_id.
+    """
+    marks = [since] if since is not None else []
+    for row in comments:
+        marks.extend(row.get(col) for col in ("comment_date", "update_date", "resolved_date"))
+    for row in replies:
+        marks.extend(row.get(col) for col in ("replied_date", "update_date"))
+    marks = [_as_utc_naive(m) for m in marks if isinstance(m, datetime)]
+    return max(marks, default=None)
+
+
+def _changed_after(since: datetime) -> datetime:
+    return since - timedelta(seconds=COMMENT_SINCE_OVERLAP_SECONDS)
+
 async def create_project_comment(data: ProjectCommentCreateRequest):
     try:
         logger.info(f"Creating comment for project_task_id={data.project_task_id}")
@@ -90,6 +159,14 @@ async def create_project_comment(data: ProjectCommentCreateRequest):
             )
 
         logger.info(f"Comment created successfully with comment_id={new_comment['comment_id']}")
+        events.publish(
+            events.COMMENT_CHANGED,
+            project_id=project_id,
+            project_phase_id=project_phase_id,
+            comment_id=new_comment["comment_id"],
+            action=COMMENT_CREATED,
+            data=dict(new_comment),
+        )
 
         # # Update current task
         # update_current_task = (
@@ -260,9 +337,18 @@ async def create_project_comment(data: ProjectCommentCreateRequest):
 #         )
 
 
-async def get_comments_by_task(task_id: int):
+async def get_comments_by_task(task_id: int, since: Optional[datetime] = None):
+    """
+    Comments and replies of the task's phase. With `since` (the
+    high_water_mark of the previous response) only comments created, edited
+    or resolved after it, or with new or edited replies, are returned, each
+    with just its new or edited replies. See _high_water_mark for the
+    overlap clients must de-duplicate.
+    """
     try:
         logger.info(f"Fetching phase_id for task_id={task_id}")
+        if since is not None:
+            since = _as_utc_naive(since)
 
         # 1. Get phase_id for given task
         phase_query = (
@@ -296,6 +382,7 @@ async def get_comments_by_task(task_id: int):
                 project_comments_table.c.resolved_date,
                 project_comments_table.c.project_task_id,
                 project_comments_table.c.is_direct_comment,
+                project_comments_table.c.update_date,
                 users.c.user_name.label("commented_by_name"),
                 project_tasks_list_table.c.task_status_id
             )
@@ -304,8 +391,21 @@ async def get_comments_by_task(task_id: int):
             .where(project_comments_table.c.project_phase_id == phase_id)
             .order_by(project_comments_table.c.comment_date.asc())
         )
+        if since is not None:
+            comment_query = comment_query.where(_comment_changed_since(_changed_after(since)))
         comments = await database.fetch_all(comment_query)
 
+        if not comments and since is not None:
+            return JSONResponse(
+                status_code=status.HTTP_200_OK,
+                content=jsonable_encoder({
+                    "status_code": status.HTTP_200_OK,
+                    "message": f"No new or changed comments for phase {phase_id}",
+                    "data": [],
+                    "high_water_mark": since,
+                }),
+            )
+
         if not comments:
             return JSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -325,6 +425,7 @@ async def get_comments_by_task(task_id: int):
                 comment_replies_table.c.reply_description,
                 comment_replies_table.c.replied_by,
                 comment_replies_table.c.replied_date,
+                comment_replies_table.c.update_date,
                 comment_replies_table.c.comment_id,
                 users.c.user_name.label("replied_by_name"),
             )
@@ -332,6 +433,8 @@ async def get_comments_by_task(task_id: int):
             .where(comment_replies_table.c.comment_id.in_(comment_ids))
             .order_by(comment_replies_table.c.replied_date.asc())
         )
+        if since is not None:
+            reply_query = reply_query.where(_reply_changed_since(_changed_after(since)))
         replies = await database.fetch_all(reply_query)
 
         # 4. Group replies by comment_id
@@ -346,6 +449,9 @@ async def get_comments_by_task(task_id: int):
             c_dict = dict(comment)
             c_dict["replies"] = replies_by_comment.get(comment["comment_id"], [])
             results.append(c_dict)
+        high_water_mark = _high_water_mark(
+            since, results, [r for c in results for r in c["replies"]]
+        )
 
         logger.info(f"Fetched {len(results)} comments and {len(replies)} replies for phase_id={phase_id}")
 
@@ -356,6 +462,7 @@ async def get_comments_by_task(task_id: int):
                 "status_code": status.HTTP_200_OK,
                 "message": f"Comments and replies fetched successfully for phase {phase_id} (from task {task_id})",
                 "data": results,
+                "high_water_mark": high_water_mark,
             }),
         )
 
@@ -376,46 +483,59 @@ async def create_comment_reply(db, reply: CommentReplyCreateRequest):
         replied_date = datetime.utcnow()
         logger.info(f"Creating reply for comment_id={reply.comment_id} by user={reply.replied_by}")
 
-        # 1. Insert into comment_replies
-        insert_stmt = (
-            insert(comment_replies_table)
-            .values(
-                comment_id=reply.comment_id,
-                reply_description=reply.reply_description,
-                replied_by=reply.replied_by,
-                replied_date=replied_date,
-            )
-            .returning(
-                comment_replies_table.c.reply_id,
-                comment_replies_table.c.comment_id,
-                comment_replies_table.c.reply_description,
-                comment_replies_table.c.replied_by,
-                comment_replies_table.c.replied_date,
+        # The reply and the resolved flag commit together; stream clients hear
+        # about the reply only once both are committed
+        async with db.transaction():
+            # 1. Insert into comment_replies
+            insert_stmt = (
+                insert(comment_replies_table)
+                .values(
+                    comment_id=reply.comment_id,
+                    reply_description=reply.reply_description,
+                    replied_by=reply.replied_by,
+                    replied_date=replied_date,
+                )
+                .returning(
+                    comment_replies_table.c.reply_id,
+                    comment_replies_table.c.comment_id,
+                    comment_replies_table.c.reply_description,
+                    comment_replies_table.c.replied_by,
+                    comment_replies_table.c.replied_date,
+                )
             )
-        )
 
-        new_reply = await db.fetch_one(insert_stmt)
-        if not new_reply:
-            logger.error("Failed to insert comment reply")
-            return JSONResponse(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                content={
-                    "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    "message": "Failed to insert comment reply",
-                    "data": None
-                }
-            )
+            new_reply = await db.fetch_one(insert_stmt)
+            if not new_reply:
+                logger.error("Failed to insert comment reply")
+                return JSONResponse(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    content={
+                        "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        "message": "Failed to insert comment reply",
+                        "data": None
+                    }
+                )
 
-        logger.info(f"Reply inserted successfully with reply_id={new_reply['reply_id']}")
+            logger.info(f"Reply inserted successfully with reply_id={new_reply['reply_id']}")
 
-        # 2. Update project_comments → mark as resolved
-        update_stmt = (
-            update(project_comments_table)
-            .where(project_comments_table.c.comment_id == reply.comment_id)
-            .values(is_resolved=True)
+            # 2. Update project_comments → mark as resolved
+            update_stmt = (
+                update(project_comments_table)
+                .where(project_comments_table.c.comment_id == reply.comment_id)
+                .values(is_resolved=True)
+                .returning(project_comments_table.c.project_id, project_comments_table.c.project_phase_id)
+            )
+            comment = await db.fetch_one(update_stmt)
+            logger.info(f"Updated project_comments -> is_resolved=True for comment_id={reply.comment_id}")
+
+        events.publish(
+            events.COMMENT_CHANGED,
+            project_id=comment["project_id"] if comment else None,
+            project_phase_id=comment["project_phase_id"] if comment else None,
+            comment_id=reply.comment_id,
+            action=REPLY_CREATED,
+            data=dict(new_reply),
         )
-        await db.execute(update_stmt)
-        logger.info(f"Updated project_comments -> is_resolved=True for comment_id={reply.comment_id}")
 
         # 3. Return success response
         return JSONResponse(
@@ -488,18 +608,27 @@ async def resolve_comment_service(comment_id: int, user_id: int):
         )
         await database.execute(update_stmt)
         logger.info(f"Comment resolved successfully: comment_id={comment_id}, resolved_by={user_id}")
+        resolved = {
+            "comment_id": comment_id,
+            "is_resolved": True,
+            "resolved_by": user_id,
+            "resolved_date": resolved_date.isoformat()
+        }
+        events.publish(
+            events.COMMENT_CHANGED,
+            project_id=comment.project_id,
+            project_phase_id=comment.project_phase_id,
+            comment_id=comment_id,
+            action=COMMENT_RESOLVED,
+            data=resolved,
+        )
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={
                 "status_code": 200,
                 "message": "Comment resolved successfully",
-                "data": {
-                    "comment_id": comment_id,
-                    "is_resolved": True,
-                    "resolved_by": user_id,
-                    "resolved_date": resolved_date.isoformat()
-                }
+                "data": resolved
             }
         )
 
@@ -515,22 +644,46 @@ async def resolve_comment_service(comment_id: int, user_id: int):
         )
 
 
-async def get_user_comments_service(user_id: int, project_id: int = None):
+def _user_phase_ids_query(user_id: int):
+    """
+    Distinct project phases holding a task assigned to the user.
+    """
+    user_task_ids_subq = (
+        select(project_task_users_table.c.project_task_id)
+        .distinct()
+        .where(project_task_users_table.c.user_id == user_id)
+    )
+    return (
+        select(project_tasks_list_table.c.project_phase_id)
+        .distinct()
+        .where(project_tasks_list_table.c.project_task_id.in_(user_task_ids_subq))
+    )
+
+
+async def get_user_comment_phase_ids(user_id: int) -> list[int]:
+    """
+    Phases whose comments get_user_comments_service shows the user; the
+    comment stream subscribes a user's socket to these.
+    """
+    rows = await database.fetch_all(_user_phase_ids_query(user_id))
+    return [row["project_phase_id"] for row in rows]
+
+
+async def get_user_comments_service(user_id: int, project_id: int = None, since: Optional[datetime] = None):
+    """
+    Comment inbox of a user: every comment on the phases they are mapped to,
+    nested project -> phases -> comments -> replies. With `since` (the
+    high_water_mark of the previous response) only new, edited or resolved
+    comments and comments with new or edited replies come back, each with
+    just those replies; replies_count stays the comment's total. See
+    _high_water_mark for the overlap clients must de-duplicate.
+    """
     try:
         logger.info(f"Fetching comments for user_id={user_id}, project_id={project_id}")
+        if since is not None:
+            since = _as_utc_naive(since)
 
-        # Subquery 1: fetch all project_task_ids for this user
-        user_task_ids_subq = (
-            select(project_task_users_table.c.project_task_id)
-            .distinct()
-            .where(project_task_users_table.c.user_id == user_id)
-        )
-        # Subquery 2: fetch distinct phases from those tasks
-        user_phase_ids_subq = (
-            select(project_tasks_list_table.c.project_phase_id)
-            .distinct()
-            .where(project_tasks_list_table.c.project_task_id.in_(user_task_ids_subq))
-        )
+        user_phase_ids_subq = _user_phase_ids_query(user_id)
         # Step 1: Fetch all comments for this user (and project if given)
         query = (
             select(
@@ -543,6 +696,7 @@ async def get_user_comments_service(user_id: int, project_id: int = None):
                 project_comments_table.c.resolved_date,
                 project_comments_table.c.project_id,
                 project_comments_table.c.is_direct_comment,
+                project_comments_table.c.update_date,
                 projects.c.project_name.label("project_name"),
                 sdlc_phases_table.c.phase_id.label("sdlc_phase_id"),
                 project_phases_list_table.c.project_phase_id.label("project_phase_id"),
@@ -571,7 +725,25 @@ async def get_user_comments_service(user_id: int, project_id: int = None):
         if project_id is not None and project_id != 0:
             query = query.where(project_comments_table.c.project_id == project_id)
 
+        if since is not None:
+            replies_count = (
+                select(func.count(comment_replies_table.c.reply_id))
+                .where(comment_replies_table.c.comment_id == project_comments_table.c.comment_id)
+                .scalar_subquery()
+            )
+            query = query.add_columns(replies_count.label("replies_count")).where(_comment_changed_since(_changed_after(since)))
+
         comments = await database.fetch_all(query)
+        if not comments and since is not None:
+            return JSONResponse(
+                status_code=status.HTTP_200_OK,
+                content=jsonable_encoder({
+                    "status_code": status.HTTP_200_OK,
+                    "message": "No new or changed comments",
+                    "data": [],
+                    "high_water_mark": since,
+                }),
+            )
         if not comments:
             return JSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -592,12 +764,15 @@ async def get_user_comments_service(user_id: int, project_id: int = None):
                     comment_replies_table.c.reply_description,
                     comment_replies_table.c.replied_by,
                     comment_replies_table.c.replied_date,
+                    comment_replies_table.c.update_date,
                     users.c.user_name.label("replied_by_name"),
                 )
                 .join(users, users.c.user_id == comment_replies_table.c.replied_by, isouter=True)
                 .join(project_comments_table, project_comments_table.c.comment_id == comment_replies_table.c.comment_id)
                 .where(comment_replies_table.c.comment_id.in_(comment_ids))
             )
+            if since is not None:
+                reply_query = reply_query.where(_reply_changed_since(_changed_after(since)))
 
             if project_id is not None and project_id != 0:
                 reply_query = reply_query.where(project_comments_table.c.project_id == project_id)
@@ -616,7 +791,8 @@ async def get_user_comments_service(user_id: int, project_id: int = None):
         projects_data = {}
         for comment in comments:
             c = dict(comment)
-            c["replies_count"] = len(replies_map.get(c["comment_id"], []))  # Add replies_count to each comment
+            # delta rows carry the total from the query; their reply lists are partial
+            c.setdefault("replies_count", len(replies_map.get(c["comment_id"], [])))  # Add replies_count to each comment
             c["replies"] = replies_map.get(c["comment_id"], [])
 
             project_key = c["project_id"]
@@ -641,6 +817,10 @@ async def get_user_comments_service(user_id: int, project_id: int = None):
             projects_data[project_key]["phases"][phase_key]["comments"].append(c)
             projects_data[project_key]["phases"][phase_key]["comment_count"] += 1  # Increment comment_count
 
+        high_water_mark = _high_water_mark(
+            since, [dict(c) for c in comments], [r for rs in replies_map.values() for r in rs]
+        )
+
         # Convert phases dict to list
         final_result = []
         for project in projects_data.values():
@@ -653,6 +833,7 @@ async def get_user_comments_service(user_id: int, project_id: int = None):
                 "status_code": status.HTTP_200_OK,
                 "message": "Comments and replies fetched successfully",
                 "data": final_result,
+                "high_water_mark": high_water_mark,
             }),
         )
 
@@ -700,17 +881,27 @@ async def update_project_comment(data: CommentUpdateRequest):
         )
         await database.execute(update_query)
 
+        updated = {
+            "comment_id": data.comment_id,
+            "description": data.description,
+            "updated_by": data.updated_by,
+            "update_date": now
+        }
+        events.publish(
+            events.COMMENT_CHANGED,
+            project_id=existing_comment["project_id"],
+            project_phase_id=existing_comment["project_phase_id"],
+            comment_id=data.comment_id,
+            action=COMMENT_UPDATED,
+            data=updated,
+        )
+
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content=jsonable_encoder({
                 "status_code": status.HTTP_200_OK,
                 "message": "Comment updated successfully",
-                "data": {
-                    "comment_id": data.comment_id,
-                    "description": data.description,
-                    "updated_by": data.updated_by,
-                    "update_date": now
-                }
+                "data": updated
             }),
         )
 
@@ -730,8 +921,21 @@ async def update_comment_reply(data: ReplyUpdateRequest):
     try:
         logger.info(f"Updating reply_id={data.reply_id} with data={data.dict()}")
 
-        # Step 1: Check if reply exists
-        check_query = select(comment_replies_table).where(comment_replies_table.c.reply_id == data.reply_id)
+        # Step 1: Check if reply exists (with its comment's project and phase for the event)
+        check_query = (
+            select(
+                comment_replies_table.c.comment_id,
+                project_comments_table.c.project_id,
+                project_comments_table.c.project_phase_id,
+            )
+            .select_from(
+                comment_replies_table.outerjoin(
+                    project_comments_table,
+                    project_comments_table.c.comment_id == comment_replies_table.c.comment_id,
+                )
+            )
+            .where(comment_replies_table.c.reply_id == data.reply_id)
+        )
         existing_reply = await database.fetch_one(check_query)
 
         if not existing_reply:
@@ -757,17 +961,27 @@ async def update_comment_reply(data: ReplyUpdateRequest):
         )
         await database.execute(update_query)
 
+        updated = {
+            "reply_id": data.reply_id,
+            "reply_description": data.reply_description,
+            "updated_by": data.updated_by,
+            "update_date": now
+        }
+        events.publish(
+            events.COMMENT_CHANGED,
+            project_id=existing_reply["project_id"],
+            project_phase_id=existing_reply["project_phase_id"],
+            comment_id=existing_reply["comment_id"],
+            action=REPLY_UPDATED,
+            data=updated,
+        )
+
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content=jsonable_encoder({
                 "status_code": status.HTTP_200_OK,
                 "message": "Reply updated successfully",
-                "data": {
-                    "reply_id": data.reply_id,
-                    "reply_description": data.reply_description,
-                    "updated_by": data.updated_by,
-                    "update_date": now
-                }
+                "data": updated
             }),
         )
 
@@ -1135,6 +1349,7 @@ async def revert_back_to_previous_task(db, data: RevertBackRequest):
         logger.info(
             f"[REVERT] Created new doc version {new_version} for task {data.task_id} (phase {project_phase_id})"
         )
+        events.publish(events.TASK_DOCUMENT_SAVED, project_task_id=data.task_id, project_phase_id=project_phase_id)
         
         # ------------------------------------------------------------
         # Activate Previous Task (task_id - 1) when current task reverts
@@ -1170,6 +1385,8 @@ async def revert_back_to_previous_task(db, data: RevertBackRequest):
         else:
             logger.info(f"No previous task found for revert of {data.task_id}")
 
+        events.publish(events.TASK_STATUS_CHANGED, project_id=project_id, project_task_id=data.task_id)
+
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={
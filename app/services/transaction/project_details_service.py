@@ -6,6 +6,7 @@ from fastapi import status
 import json
 from typing import List, Dict, Any
 from fastapi.responses import JSONResponse, FileResponse
+from app.utils.raw_json import RawJSONResponse, json_envelope
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -53,28 +54,9 @@ async def get_projects_by_user_service(db, user_id: int):
                 }
             )
 
-        # Parse the JSON string from the function result
-        try:
-            projects_json_str = result["projects_json"].replace('""', '"')  # Fix escaped quotes
-            projects_data = json.loads(projects_json_str)
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing JSON for user_id={user_id}: {str(e)}")
-            return JSONResponse(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                content={
-                    "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    "message": f"Error parsing JSON: {str(e)}",
-                    "data": None
-                }
-            )
-
-        # Return the parsed data in the proper format
-        return JSONResponse(
-            content={
-                "status_code": status.HTTP_200_OK,
-                "message": "Projects fetched successfully",
-                "data": projects_data  # Return the parsed projects data
-            }
+        # pass the function's JSON through without parsing it
+        return RawJSONResponse(
+            content=json_envelope(result["projects_json"], "Projects fetched successfully")
         )
 
     except Exception as e:
@@ -109,11 +91,9 @@ async def get_project_details_by_id(project_id: int):
         row = await database.fetch_one(query, {"project_id": project_id})
 
         if row and row.response_json:
-            response_data = json.loads(row.response_json)
-            logger.info(
-                f"Project details fetched successfully for project_id: {project_id} (Completed: {response_data['data']['completed_percentage']}%)"
-            )
-            return JSONResponse(content=response_data)
+            logger.info(f"Project details fetched successfully for project_id: {project_id}")
+            # the function returns the full response envelope; send it unparsed
+            return RawJSONResponse(content=row.response_json)
         else:
             # Fallback (should not occur if DB handles 404)
             return JSONResponse(
@@ -0,0 +1,289 @@
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime, timezone
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+import aiofiles
+from fastapi import status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from sqlalchemy import select
+
+from app.db import project_phases_list_table, sdlc_phases_table, sdlc_tasks_table
+from app.db.database import database
+from app.db.docs.task_docs import task_docs_table
+from app.db.transaction.change_request import change_request_table
+from app.db.transaction.comment_replies import comment_replies_table
+from app.db.transaction.incident_reports import incident_report_table
+from app.db.transaction.project_comments import project_comments_table
+from app.db.transaction.project_files import project_files_table
+from app.db.transaction.project_tasks_list import project_tasks_list_table
+from app.db.transaction.task_work_log import task_work_log_table
+from app.services.transaction.project_service import CR_UPLOAD_FOLDER, UPLOAD_FOLDER, get_project_details_service
+from app.utils.zip_stream import ZipStream
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+EXPORT_FOLDER = "project_exports"
+# Finished exports older than this are removed when a new one is written
+EXPORT_RETENTION_SECONDS = 24 * 3600
+FILE_CHUNK_SIZE = 64 * 1024
+
+Progress = Callable[[int, Optional[str]], Awaitable[None]]
+
+
+def _safe_name(value, fallback: str = "untitled") -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", str(value or "")).strip("._") or fallback
+
+
+async def _ndjson(query) -> AsyncIterator[bytes]:
+    # one row in memory at a time, straight from the cursor
+    async for row in database.iterate(query):
+        yield (json.dumps(jsonable_encoder(dict(row._mapping)), separators=(",", ":")) + "\n").encode("utf-8")
+
+
+async def _file_chunks(path: str) -> AsyncIterator[bytes]:
+    async with aiofiles.open(path, "rb") as f:
+        while chunk := await f.read(FILE_CHUNK_SIZE):
+            yield chunk
+
+
+def _documents_query(project_id: int):
+    return (
+        select(
+            task_docs_table.c.task_doc_id,
+            task_docs_table.c.project_task_id,
+            task_docs_table.c.document_json,
+            sdlc_tasks_table.c.task_name,
+            sdlc_phases_table.c.phase_code,
+            project_phases_list_table.c.phase_order_id,
+        )
+        .join(project_tasks_list_table, task_docs_table.c.project_task_id == project_tasks_list_table.c.project_task_id)
+        .join(sdlc_tasks_table, project_tasks_list_table.c.task_id == sdlc_tasks_table.c.task_id)
+        .join(
+            project_phases_list_table,
+            project_tasks_list_table.c.project_phase_id == project_phases_list_table.c.project_phase_id,
+        )
+        .join(sdlc_phases_table, project_phases_list_table.c.phase_id == sdlc_phases_table.c.phase_id)
+        .where(task_docs_table.c.project_id == project_id, task_docs_table.c.is_latest == True)
+        .order_by(project_phases_list_table.c.phase_order_id, project_tasks_list_table.c.task_order_id,
+                  task_docs_table.c.project_task_id)
+    )
+
+
+def _table_exports(project_id: int) -> list[tuple[str, object]]:
+    project_task_ids = (
+        select(project_tasks_list_table.c.project_task_id)
+        .join(
+            project_phases_list_table,
+            project_tasks_list_table.c.project_phase_id == project_phases_list_table.c.project_phase_id,
+        )
+        .where(project_phases_list_table.c.project_id == project_id)
+    )
+    return [
+        ("comments.ndjson", select(project_comments_table)
+            .where(project_comments_table.c.project_id == project_id)
+            .order_by(project_comments_table.c.comment_id)),
+        ("comment_replies.ndjson", select(comment_replies_table)
+            .join(project_comments_table, project_comments_table.c.comment_id == comment_replies_table.c.comment_id)
+            .where(project_comments_table.c.project_id == project_id)
+            .order_by(comment_replies_table.c.reply_id)),
+        ("incidents.ndjson", select(incident_report_table)
+            .where(incident_report_table.c.project_id == project_id)
+            .order_by(incident_report_table.c.incident_report_id)),
+        ("work_logs.ndjson", select(task_work_log_table)
+            .where(task_work_log_table.c.project_task_id.in_(project_task_ids))
+            .order_by(task_work_log_table.c.project_task_id, task_work_log_table.c.task_work_log_id)),
+        ("change_requests.ndjson", select(change_request_table)
+            .where(change_request_table.c.project_id == project_id)
+            .order_by(change_request_table.c.change_request_id)),
+    ]
+
+
+def _project_files_query(project_id: int):
+    return (
+        select(project_files_table.c.file_name)
+        .where(project_files_table.c.project_id == project_id, project_files_table.c.is_active == True)
+        .order_by(project_files_table.c.project_file_id)
+    )
+
+
+def _change_request_files_query(project_id: int):
+    return (
+        select(change_request_table.c.change_request_file.label("file_name"))
+        .where(change_request_table.c.project_id == project_id, change_request_table.c.change_request_file.isnot(None))
+        .order_by(change_request_table.c.change_request_id)
+    )
+
+
+async def iter_project_package(project_id: int, project_json: bytes,
+                               progress: Optional[Progress] = None) -> AsyncIterator[bytes]:
+    """
+    The validation package of a project as ZIP bytes, produced while the
+    rows and files are read: project.json (get_project_details_service),
+    the latest task documents, comments, replies, incidents, work logs and
+    change requests as NDJSON, the project and change request files, and a
+    manifest.json with the size and sha256 of every entry.
+    """
+    zs = ZipStream()
+    missing_files = []
+    steps = 4 + len(_table_exports(project_id))
+    step = 0
+
+    async def report(message: str):
+        nonlocal step
+        if progress is not None:
+            await progress(min(99, step * 100 // steps), message)
+        step += 1
+
+    await report("Writing project details")
+    async for data in zs.add("project.json", [project_json]):
+        yield data
+
+    await report("Writing task documents")
+    async for doc in database.iterate(_documents_query(project_id)):
+        name = (
+            f"documents/{doc['phase_order_id'] or 0:02d}_{_safe_name(doc['phase_code'], 'phase')}/"
+            f"{doc['project_task_id']}_{_safe_name(doc['task_name'], 'task')}.json"
+        )
+        async for data in zs.add(name, [(doc["document_json"] or "").encode("utf-8")]):
+            yield data
+
+    for name, query in _table_exports(project_id):
+        await report(f"Writing {name}")
+        async for data in zs.add(name, _ndjson(query)):
+            yield data
+
+    await report("Writing attached files")
+    for folder, query in ((UPLOAD_FOLDER, _project_files_query(project_id)),
+                          (CR_UPLOAD_FOLDER, _change_request_files_query(project_id))):
+        async for row in database.iterate(query):
+            file_name = os.path.basename(row["file_name"] or "")
+            path = os.path.join(folder, file_name)
+            if not file_name or not os.path.isfile(path):
+                missing_files.append(f"{folder}/{row['file_name']}")
+                continue
+            async for data in zs.add(f"files/{folder}/{file_name}", _file_chunks(path)):
+                yield data
+
+    await report("Writing manifest")
+    manifest = {
+        "project_id": project_id,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "entries": zs.entries,
+        "missing_files": missing_files,
+    }
+    async for data in zs.add("manifest.json", [json.dumps(manifest, indent=2).encode("utf-8")]):
+        yield data
+    for data in zs.finish():
+        yield data
+    logger.info(f"Exported project {project_id}: {len(zs.entries)} entries, {zs.size} bytes")
+
+
+async def _project_json(project_id: int):
+    response = await get_project_details_service(project_id)
+    return response, response.body if response.status_code == status.HTTP_200_OK else None
+
+
+async def stream_project_export_service(project_id: int):
+    """
+    Download the package directly as it is built (no progress or resume;
+    use the export job for those).
+    """
+    try:
+        logger.info(f"Streaming export of project {project_id}")
+        response, project_json = await _project_json(project_id)
+        if project_json is None:
+            return response
+        return StreamingResponse(
+            iter_project_package(project_id, project_json),
+            media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="project_{project_id}_package.zip"'},
+        )
+    except Exception as e:
+        logger.exception(f"Error exporting project {project_id}: {str(e)}")
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "Internal server error",
+                "data": None,
+            },
+        )
+
+
+def _remove_stale_exports() -> None:
+    cutoff = time.time() - EXPORT_RETENTION_SECONDS
+    for entry in os.scandir(EXPORT_FOLDER):
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
+
+
+async def write_project_export(project_id: int, project_json: bytes, file_name: str,
+                               progress: Optional[Progress] = None) -> dict:
+    """
+    Write the package to EXPORT_FOLDER chunk by chunk for the export job.
+    The file only appears under its name once complete.
+    """
+    os.makedirs(EXPORT_FOLDER, exist_ok=True)
+    _remove_stale_exports()
+    path = os.path.join(EXPORT_FOLDER, file_name)
+    partial = path + ".part"
+    size = 0
+    try:
+        async with aiofiles.open(partial, "wb") as f:
+            async for data in iter_project_package(project_id, project_json, progress):
+                await f.write(data)
+                size += len(data)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return {
+        "project_id": project_id,
+        "file_name": file_name,
+        "size": size,
+        "download_url": f"/exports/files/{file_name}",
+    }
+
+
+async def get_project_export_file_service(file_name: str):
+    """
+    A finished export. Served as a FileResponse, so Range requests resume
+    interrupted downloads.
+    """
+    try:
+        if not file_name or os.path.basename(file_name) != file_name or not file_name.endswith(".zip"):
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={
+                    "status_code": status.HTTP_400_BAD_REQUEST,
+                    "message": "Invalid export file name",
+                    "data": None,
+                },
+            )
+        path = os.path.join(EXPORT_FOLDER, file_name)
+        if not os.path.isfile(path):
+            return JSONResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                content={
+                    "status_code": status.HTTP_404_NOT_FOUND,
+                    "message": "Export not found",
+                    "data": None,
+                },
+            )
+        return FileResponse(path=path, filename=file_name, media_type="application/zip")
+    except Exception as e:
+        logger.exception(f"Error returning export {file_name}: {str(e)}")
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "Internal server error",
+                "data": None,
+            },
+        )
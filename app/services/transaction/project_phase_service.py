@@ -7,6 +7,7 @@ from app.db.transaction.project_phase_users import project_phase_users_table
 from app.db.transaction.users import users as t_users
 from fastapi import status
 from app.schemas.transaction.project_phase_schema import UserResponseByProject, ProjectPhaseTransferRequest
+from app.utils.membership import sync_memberships
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -30,56 +31,17 @@ async def map_users_to_project_phase_service(db, payload):
         project_phase_id = payload.project_phase_id
         selected_user_ids = set(payload.user_ids)
 
-        # 2. Fetch current assignments
-        query = (
-            select(
-                project_phase_users_table.c.project_phase_user_map_id,
-                project_phase_users_table.c.user_id,
-                project_phase_users_table.c.user_is_active,
-            )
-            .where(project_phase_users_table.c.project_phase_id == project_phase_id)
+        # 2. Apply the selection as a set: insert missing, reactivate, deactivate the rest
+        await sync_memberships(
+            db,
+            project_phase_users_table,
+            {"project_phase_id": project_phase_id},
+            project_phase_users_table.c.user_id,
+            project_phase_users_table.c.user_is_active,
+            key_source=t_users.c.user_id,
+            desired=selected_user_ids,
+            insert_values={"to_user_id": None, "user_transfer_reason": None},
         )
-        existing_rows = await db.fetch_all(query)
-        existing_user_map = {row["user_id"]: row for row in existing_rows}
-
-        # 3. Reactivate or Insert
-        for user_id in selected_user_ids:
-            if user_id in existing_user_map:
-                if not existing_user_map[user_id]["user_is_active"]:
-                    await db.execute(
-                        update(project_phase_users_table)
-                        .where(
-                            project_phase_users_table.c.project_phase_user_map_id
-                            == existing_user_map[user_id]["project_phase_user_map_id"]
-                        )
-                        .values(user_is_active=True)
-                    )
-            else:
-                await db.execute(
-                    insert(project_phase_users_table).values(
-                        project_phase_id=project_phase_id,
-                        user_id=user_id,
-                        user_is_active=True,
-                        to_user_id=None,          # handled internally
-                        user_transfer_reason=None       # handled internally
-                    )
-                )
-
-        # 4. Deactivate unselected users
-        existing_user_ids = set(existing_user_map.keys())
-        users_to_deactivate = existing_user_ids - selected_user_ids
-
-        for user_id in users_to_deactivate:
-            await db.execute(
-                update(project_phase_users_table)
-                .where(
-                    and_(
-                        project_phase_users_table.c.project_phase_id == project_phase_id,
-                        project_phase_users_table.c.user_id == user_id,
-                    )
-                )
-                .values(user_is_active=False)
-            )
 
         logger.info(f"Users mapped to project phase {project_phase_id} successfully.")
         return JSONResponse(
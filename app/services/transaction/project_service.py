@@ -1,7 +1,7 @@
 import os
 import logging
 from http.client import HTTPException
-from sqlalchemy import select, insert, func, and_, desc, case, Integer, update
+from sqlalchemy import select, insert, func, and_, desc, case, Integer, update, literal
 from typing import List, Optional
 from fastapi.responses import JSONResponse, FileResponse
 from sqlalchemy.exc import SQLAlchemyError
@@ -9,7 +9,6 @@ from app.db import risk_sdlcphase_mapping_table, task_docs_table, project_commen
     testing_asset_types_table, change_request_user_mapping_table
 from app.db import equipment_list_table, status_table
 from app.db.database import database
-from app.db.master.sdlc_phase_tasks_mapping import sdlc_phase_tasks_mapping_table
 from app.db.transaction.project_files import project_files_table
 from app.db.master import status
 from app.db.transaction.change_request import change_request_table
@@ -41,6 +40,13 @@ from datetime import datetime
 from fastapi import Request
 from app.db.transaction.json_template_transactions import json_template_transactions
 from dotenv import load_dotenv
+from app.utils.dashboard_cache import dashboard_cache
+from app.utils.etag import cached_json_response, not_modified
+from app.utils.raw_json import RawJSONResponse, json_envelope, fetch_json_value
+from app.utils.membership import sync_memberships
+from app.utils.sdlc_template_graph import sdlc_template_graph
+from app.utils.change_request_codes import change_request_codes
+from app.services.incident_report_service import rename_incident_project
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -51,7 +57,9 @@ CR_APPROVER_ROLES = [int(r.strip()) for r in CR_APPROVER_ROLES.split(",")]
 
 async def get_project_detail(project_id: int) -> Optional[ProjectDetailResponse]:
     try:
-        # 1️⃣ Fetch project + core info
+        # All queries below only depend on project_id, so they are issued
+        # together; each gathered task gets its own pool connection.
+        # 1️⃣ Project + core info
         project_query = (
             select(
                 projects.c.project_id,
@@ -74,11 +82,8 @@ async def get_project_detail(project_id: int) -> Optional[ProjectDetailResponse]
                 )
             )
         )
-        proj = await database.fetch_one(project_query)
-        if not proj:
-            raise HTTPException(status_code=404, detail="Project not found")
 
-        # 2️⃣ Fetch project users (active only)
+        # 2️⃣ Project users (active only)
         user_query = (
             select(
                 users.c.user_id,
@@ -100,11 +105,9 @@ async def get_project_detail(project_id: int) -> Optional[ProjectDetailResponse]
                 )
             )
         )
-        user_rows = await database.fetch_all(user_query)
-        usersdata = [UserInfo(**row._mapping) for row in user_rows]
 
-        # 3️⃣ Fetch all phases
-        phase_rows = await database.fetch_all(
+        # 3️⃣ All phases
+        phase_query = (
             select(
                 project_phases_list_table.c.project_phase_id,
                 project_phases_list_table.c.phase_id,
@@ -120,10 +123,9 @@ async def get_project_detail(project_id: int) -> Optional[ProjectDetailResponse]
             )
             .order_by(sdlc_phases_table.c.order_id)
         )
-        phase_ids = [p.project_phase_id for p in phase_rows]
 
-        # 4️⃣ Fetch tasks for all phases
-        task_rows = await database.fetch_all(
+        # 4️⃣ Tasks for all phases of the project
+        task_query = (
             select(
                 project_tasks_list_table.c.project_task_id,
                 project_tasks_list_table.c.project_phase_id,
@@ -131,95 +133,63 @@ async def get_project_detail(project_id: int) -> Optional[ProjectDetailResponse]
                 sdlc_tasks_table.c.task_name,
                 sdlc_tasks_table.c.order_id
             )
-            .join(sdlc_tasks_table, project_tasks_list_table.c.task_id == sdlc_tasks_table.c.task_id)
-            .where(project_tasks_list_table.c.project_phase_id.in_(phase_ids))
+            .select_from(
+                project_tasks_list_table
+                .join(project_phases_list_table, project_tasks_list_table.c.project_phase_id == project_phases_list_table.c.project_phase_id)
+                .join(sdlc_tasks_table, project_tasks_list_table.c.task_id == sdlc_tasks_table.c.task_id)
+            )
+            .where(project_phases_list_table.c.project_id == project_id)
             .order_by(sdlc_tasks_table.c.order_id)
         )
-        task_ids = [t.project_task_id for t in task_rows]
 
-        # 5️⃣ Fetch phase users
-        phase_user_rows = await database.fetch_all(
+        # 5️⃣ Phase users
+        phase_user_query = (
             select(
                 project_phase_users_table.c.project_phase_id,
                 users.c.user_id,
                 users.c.user_name
             )
-            .join(users, project_phase_users_table.c.user_id == users.c.user_id)
+            .select_from(
+                project_phase_users_table
+                .join(project_phases_list_table, project_phase_users_table.c.project_phase_id == project_phases_list_table.c.project_phase_id)
+                .join(users, project_phase_users_table.c.user_id == users.c.user_id)
+            )
             .where(
                 and_(
-                    project_phase_users_table.c.project_phase_id.in_(phase_ids),
+                    project_phases_list_table.c.project_id == project_id,
                     project_phase_users_table.c.user_is_active == True,
                     users.c.is_active == True
                 )
             )
         )
 
-        # 6️⃣ Fetch task users
-        if task_ids:
-            task_user_rows = await database.fetch_all(
-                select(
-                    project_task_users_table.c.project_task_id,
-                    users.c.user_id,
-                    users.c.user_name
-                )
-                .join(users, project_task_users_table.c.user_id == users.c.user_id)
-                .where(
-                    and_(
-                        project_task_users_table.c.project_task_id.in_(task_ids),
-                        project_task_users_table.c.user_is_active == True,
-                        users.c.is_active == True
-                    )
-                )
-            )
-        else:
-            task_user_rows = []
-
-        # 7️⃣ Build lookup dictionaries
-        phase_users_dict = {}
-        for row in phase_user_rows:
-            phase_users_dict.setdefault(row.project_phase_id, []).append(
-                UserData(user_id=row.user_id, user_name=row.user_name)
-            )
-
-        task_users_dict = {}
-        for row in task_user_rows:
-            task_users_dict.setdefault(row.project_task_id, []).append(
-                UserData(user_id=row.user_id, user_name=row.user_name)
+        # 6️⃣ Task users
+        task_user_query = (
+            select(
+                project_task_users_table.c.project_task_id,
+                users.c.user_id,
+                users.c.user_name
             )
-
-        tasks_by_phase = {}
-        for t in task_rows:
-            tasks_by_phase.setdefault(t.project_phase_id, []).append(
-                TaskInfo(
-                    task_id=t.project_task_id,
-                    task_name=t.task_name,
-                    status_id=t.status_id,
-                    task_users=task_users_dict.get(t.project_task_id, [])
-                )
+            .select_from(
+                project_task_users_table
+                .join(project_tasks_list_table, project_task_users_table.c.project_task_id == project_tasks_list_table.c.project_task_id)
+                .join(project_phases_list_table, project_tasks_list_table.c.project_phase_id == project_phases_list_table.c.project_phase_id)
+                .join(users, project_task_users_table.c.user_id == users.c.user_id)
             )
-
-        # 8️⃣ Build phases
-        phases: List[PhaseInfo] = []
-        for p in phase_rows:
-            phase_tasks = tasks_by_phase.get(p.project_phase_id, [])
-            phase_status = max([t.status_id for t in phase_tasks], default=1)
-            phases.append(
-                PhaseInfo(
-                    phase_id=p.project_phase_id,
-                    phase_name=p.phase_name,
-                    status_id=phase_status,
-                    phase_users=phase_users_dict.get(p.project_phase_id, []),
-                    tasks=phase_tasks
+            .where(
+                and_(
+                    project_phases_list_table.c.project_id == project_id,
+                    project_task_users_table.c.user_is_active == True,
+                    users.c.is_active == True
                 )
             )
+        )
 
-        # 9️⃣ Fetch project files
+        # 7️⃣ Project files
         file_query = select(project_files_table.c.file_name).where(project_files_table.c.project_id == project_id)
-        file_rows = await database.fetch_all(file_query)
-        file_names = [row.file_name for row in file_rows]
 
-        # 🔟 Fetch task docs where doc_version is not null, include phase + task names
-        task_doc_rows = await database.fetch_all(
+        # 8️⃣ Task docs where doc_version is not null, include phase + task names
+        task_doc_query = (
             select(
                 task_docs_table.c.task_doc_id,
                 task_docs_table.c.project_task_id,
@@ -240,36 +210,98 @@ async def get_project_detail(project_id: int) -> Optional[ProjectDetailResponse]
             )
         )
 
-        # 1️⃣1️⃣ Build phase-doc lookup with format: phase_task_version
-        phase_docs_dict = {}
-        for row in task_doc_rows:
-            phase_docs_dict.setdefault(row.project_phase_id, []).append({
-                "task_doc_id": row.task_doc_id,
-                "phase_name_doc_version": f"{row.phase_name}_{row.task_name}_{row.doc_version}"
-            })
-
-        # Attach docs to phases
-        for phase in phases:
-            phase.task_docs = phase_docs_dict.get(phase.phase_id, [])
-
-        # 🔁 Return final response
-        return ProjectDetailResponse(
-            project_id=proj.project_id,
-            project_name=proj.project_name,
-            description=proj.project_description,
-            risk_assessment_id=proj.risk_assessment_id,
-            risk_assessment_name=proj.risk_assessment_name,
-            created_date=proj.created_date,
-            status_id=proj.status_id,
-            users=usersdata,
-            phases=phases,
-            project_files=file_names
+        (
+            proj, user_rows, phase_rows, task_rows,
+            phase_user_rows, task_user_rows, file_rows, task_doc_rows,
+        ) = await asyncio.gather(
+            database.fetch_one(project_query),
+            database.fetch_all(user_query),
+            database.fetch_all(phase_query),
+            database.fetch_all(task_query),
+            database.fetch_all(phase_user_query),
+            database.fetch_all(task_user_query),
+            database.fetch_all(file_query),
+            database.fetch_all(task_doc_query),
+        )
+        if not proj:
+            raise HTTPException(status_code=404, detail="Project not found")
+
+        return build_project_detail_response(
+            proj, user_rows, phase_rows, task_rows, phase_user_rows, task_user_rows, file_rows, task_doc_rows
         )
 
     except Exception as e:
         logger.exception(f"Error fetching project details: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+
+def build_project_detail_response(
+    proj, user_rows, phase_rows, task_rows, phase_user_rows, task_user_rows, file_rows, task_doc_rows
+) -> ProjectDetailResponse:
+    """
+    Assemble the project tree from flat rows. Every row set is walked once
+    and grouped through dicts keyed by phase/task id.
+    """
+    usersdata = [UserInfo(**row._mapping) for row in user_rows]
+
+    phase_users_dict = defaultdict(list)
+    for row in phase_user_rows:
+        phase_users_dict[row.project_phase_id].append(UserData(user_id=row.user_id, user_name=row.user_name))
+
+    task_users_dict = defaultdict(list)
+    for row in task_user_rows:
+        task_users_dict[row.project_task_id].append(UserData(user_id=row.user_id, user_name=row.user_name))
+
+    # tasks grouped by phase, phase status (max task status) tracked in the same pass
+    tasks_by_phase = defaultdict(list)
+    phase_status = {}
+    for t in task_rows:
+        tasks_by_phase[t.project_phase_id].append(
+            TaskInfo(
+                task_id=t.project_task_id,
+                task_name=t.task_name,
+                status_id=t.status_id,
+                task_users=task_users_dict.get(t.project_task_id, [])
+            )
+        )
+        current = phase_status.get(t.project_phase_id)
+        if t.status_id is not None and (current is None or t.status_id > current):
+            phase_status[t.project_phase_id] = t.status_id
+
+    # phase-doc lookup with format: phase_task_version
+    phase_docs_dict = defaultdict(list)
+    for row in task_doc_rows:
+        phase_docs_dict[row.project_phase_id].append({
+            "task_doc_id": row.task_doc_id,
+            "phase_name_doc_version": f"{row.phase_name}_{row.task_name}_{row.doc_version}"
+        })
+
+    phases: List[PhaseInfo] = []
+    for p in phase_rows:
+        phases.append(
+            PhaseInfo(
+                phase_id=p.project_phase_id,
+                phase_name=p.phase_name,
+                status_id=phase_status.get(p.project_phase_id, 1),
+                phase_users=phase_users_dict.get(p.project_phase_id, []),
+                tasks=tasks_by_phase.get(p.project_phase_id, []),
+                task_docs=phase_docs_dict.get(p.project_phase_id, [])
+            )
+        )
+
+    return ProjectDetailResponse(
+        project_id=proj.project_id,
+        project_name=proj.project_name,
+        description=proj.project_description,
+        risk_assessment_id=proj.risk_assessment_id,
+        risk_assessment_name=proj.risk_assessment_name,
+        created_date=proj.created_date,
+        status_id=proj.status_id,
+        users=usersdata,
+        phases=phases,
+        project_files=[row.file_name for row in file_rows]
+    )
+
 UPLOAD_FOLDER = "project_files"
 CR_UPLOAD_FOLDER = "change_request_files"
 now = datetime.now()
@@ -354,33 +386,6 @@ async def create_project_service(payload, files=None, change_request_file=None,
                 }
             )
 
-        # Handle change_request_code generation for change_request_json
-        if payload.change_request_json:
-            # Generate change_request_code if not provided
-            current_year = now.year
-            change_request_code = payload.change_request_code
-
-            # Find the latest change_request_code for the current year
-            query = select(change_request_table.c.change_request_code) \
-                .where(change_request_table.c.change_request_code.like(f"CR-{current_year}-%")) \
-                .order_by(change_request_table.c.change_request_id.desc()) \
-                .limit(1)
-            latest_code_row = await database.fetch_one(query)
-
-            if latest_code_row:
-                # Extract the numeric part from the latest change_request_code (e.g., '45' from 'CR-2025-45')
-                latest_code = latest_code_row["change_request_code"]
-                parts = latest_code.split('-')
-                latest_number = int(parts[-1]) if parts[-1].isdigit() else 0
-                new_number = latest_number + 1
-                change_request_code = f"CR-{current_year}-{new_number}"
-            else:
-                # If no records, generate the first change_request_code for the current year
-                change_request_code = f"CR-{current_year}-1"
-
-            # Set the generated change_request_code to the payload
-            payload.change_request_code = change_request_code
-
         if payload.start_date and payload.end_date:
             if payload.end_date < payload.start_date:
                 return JSONResponse(
@@ -388,6 +393,10 @@ async def create_project_service(payload, files=None, change_request_file=None,
                     content={"status_code": 400, "message": "End date cannot be earlier than start date", "data": None}
                 )
 
+        # Phase/task template comes from the SDLC template graph, no queries
+        template = await sdlc_template_graph.get()
+        ordered_phases = template.ordered_active_phases(payload.phase_ids)
+
         async with database.transaction():
             # 4. Insert project
             insert_project = insert(projects).values(
@@ -420,18 +429,9 @@ async def create_project_service(payload, files=None, change_request_file=None,
                     )
                 )
 
-            # 6. Get phases for risk_assessment
-            phase_query = (
-                select(sdlc_phases_table.c.phase_id)
-                .where(sdlc_phases_table.c.phase_id.in_(payload.phase_ids))
-                .where(sdlc_phases_table.c.is_active == True)
-                .order_by(sdlc_phases_table.c.order_id)
-            )
-            ordered_phase_rows = await database.fetch_all(phase_query)
-
-            # 9. Insert phases and tasks
-            for p_index, phase_row in enumerate(ordered_phase_rows):
-                phase_id = phase_row.phase_id
+            # 6. Insert phases and tasks from the in-memory template graph
+            for p_index, phase in enumerate(ordered_phases):
+                phase_id = phase["phase_id"]
                 phase_order = p_index + 1
                 # status_id = 1 if phase_order == 1 else 8
                 insert_phase = insert(project_phases_list_table).values(
@@ -442,19 +442,12 @@ async def create_project_service(payload, files=None, change_request_file=None,
                 )
                 project_phase_id = await database.execute(insert_phase)
 
-                task_query = (
-                    select(sdlc_phase_tasks_mapping_table.c.task_id)
-                    .where(sdlc_phase_tasks_mapping_table.c.phase_id == phase_id)
-                    .where(sdlc_phase_tasks_mapping_table.c.is_active == True)
-                )
-                task_rows = await database.fetch_all(task_query)
-
-                for t_index, task_row in enumerate(task_rows):
+                for t_index, task in enumerate(template.tasks_for_phase(phase_id)):
                     # status_id = 1 if (p_index == 0 and t_index == 0) else 8
                     await database.execute(
                         insert(project_tasks_list_table).values(
                             project_phase_id=project_phase_id,
-                            task_id=task_row.task_id,
+                            task_id=task["task_id"],
                             task_order_id=t_index + 1,
                             task_status_id=8
                         )
@@ -507,6 +500,11 @@ async def create_project_service(payload, files=None, change_request_file=None,
                     .returning(json_template_transactions.c.transaction_template_id)
                 )
                 transaction_template_id = await database.execute(insert_json)
+
+            # A JSON change request is numbered here, with or without an uploaded file,
+            # inside this transaction so a failed create hands the code back
+            if payload.change_request_json:
+                payload.change_request_code = await change_request_codes.allocate()
             # Insert into change_request table
             change_request_id = await database.execute(
                 insert(change_request_table).values(
@@ -674,19 +672,12 @@ async def get_all_projects():
 async def new_get_all_projects(user_id: int):
     try:
         query = "SELECT ai_verify_transaction.get_all_projects(:user_id) AS data"
-        row = await database.fetch_one(query, values={"user_id": user_id})
-
-        data = row["data"]  # this may be a string
-        if isinstance(data, str):
-            data = json.loads(data)  # parse string into Python list
+        data = await fetch_json_value(database, query, {"user_id": user_id}, "data")
 
-        return JSONResponse(
+        # pass the function's JSON through without parsing it
+        return RawJSONResponse(
             status_code=200,
-            content={
-                "status_code": 200,
-                "message": "Projects fetched successfully",
-                "data": data  # now it's a proper list
-            }
+            content=json_envelope(data, "Projects fetched successfully"),
         )
 
     except Exception as e:
@@ -744,27 +735,8 @@ async def get_project_details_service(project_id: int):
             .join(users, users.c.user_id == projects.c.created_by)
             .where(and_(projects.c.project_id == project_id, projects.c.is_active.is_(True)))
         )
-        project_row = await database.fetch_one(project_query)
-        if not project_row:
-            logger.warning("Project with ID %s not found.", project_id)
-            return JSONResponse(
-                status_code=status.HTTP_404_NOT_FOUND,
-                content={
-                    "status_code": status.HTTP_404_NOT_FOUND,
-                    "message": "Project not found",
-                    "data": None,
-                },
-            )
 
-        project_data = dict(project_row)
-
-        # Convert datetimes
-        for field in ("created_date", "start_date", "end_date"):
-            value = project_data.get(field)
-            if value:
-                project_data[field] = value.isoformat()
-
-        # 2. Fetch associated users
+        # 2. Associated users
         users_query = (
             select(
                 projects_user_mapping_table.c.user_id,
@@ -778,10 +750,8 @@ async def get_project_details_service(project_id: int):
                 )
             )
         )
-        user_rows = await database.fetch_all(users_query)
-        users_list = [dict(row) for row in user_rows]
 
-        # 3. Fetch project files
+        # 3. Project files
         files_query = (
             select(
                 project_files_table.c.project_file_id.label("file_id"),
@@ -795,10 +765,7 @@ async def get_project_details_service(project_id: int):
             )
         )
 
-        file_rows = await database.fetch_all(files_query)
-        files_list = [dict(row) for row in file_rows]
-
-        # 4. ✅ Fetch project phases (ordered)
+        # 4. ✅ Project phases (ordered)
         phases_query = (
             select(
                 sdlc_phases_table.c.phase_id,
@@ -813,10 +780,8 @@ async def get_project_details_service(project_id: int):
             .where(project_phases_list_table.c.project_id == project_id)
             .order_by(project_phases_list_table.c.phase_order_id.asc())
         )
-        phase_rows = await database.fetch_all(phases_query)
-        phases_list = [dict(row) for row in phase_rows]
 
-        # 5.Fetch change request details
+        # 5. Latest change request
         change_request_query = (
             select(
                 change_request_table.c.change_request_id,
@@ -836,7 +801,36 @@ async def get_project_details_service(project_id: int):
             .limit(1)
         )
 
-        change_request_row = await database.fetch_one(change_request_query)
+        # independent reads, issued concurrently on separate pool connections
+        project_row, user_rows, file_rows, phase_rows, change_request_row = await asyncio.gather(
+            database.fetch_one(project_query),
+            database.fetch_all(users_query),
+            database.fetch_all(files_query),
+            database.fetch_all(phases_query),
+            database.fetch_one(change_request_query),
+        )
+        if not project_row:
+            logger.warning("Project with ID %s not found.", project_id)
+            return JSONResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                content={
+                    "status_code": status.HTTP_404_NOT_FOUND,
+                    "message": "Project not found",
+                    "data": None,
+                },
+            )
+
+        project_data = dict(project_row)
+
+        # Convert datetimes
+        for field in ("created_date", "start_date", "end_date"):
+            value = project_data.get(field)
+            if value:
+                project_data[field] = value.isoformat()
+
+        users_list = [dict(row) for row in user_rows]
+        files_list = [dict(row) for row in file_rows]
+        phases_list = [dict(row) for row in phase_rows]
 
         if change_request_row:
 
@@ -1057,21 +1051,35 @@ async def update_project_details_service(
                         content={"status_code": status.HTTP_400_BAD_REQUEST, "message": "Invalid end_date format.", "data": None},
                     )
 
+        # Removing users is only allowed once the project has started; reject
+        # before any write so the request is all-or-nothing
+        if remove_user_ids and project_status != 8:
+            return JSONResponse(
+                status_code=status.HTTP_403_FORBIDDEN,
+                content={
+                    "status_code": status.HTTP_403_FORBIDDEN,
+                    "message": "Cannot remove users unless project status is 8.",
+                    "data": None,
+                },
+            )
+
         # Update project info
         if update_dict:
-            await database.execute(
-                projects.update().where(projects.c.project_id == project_id).values(**update_dict)
-            )
+            async with database.transaction():
+                await database.execute(
+                    projects.update().where(projects.c.project_id == project_id).values(**update_dict)
+                )
+                if "project_name" in update_dict:
+                    await rename_incident_project(database, project_id, update_dict["project_name"])
 
         # Step 3: Handle file operations
         if remove_file_ids:
-            for fid in remove_file_ids:
-                await database.execute(
-                    project_files_table.update()
-                    .where(project_files_table.c.project_file_id == fid)
-                    .where(project_files_table.c.project_id == project_id)
-                    .values(is_active=False)
-                )
+            await database.execute(
+                project_files_table.update()
+                .where(project_files_table.c.project_file_id.in_(remove_file_ids))
+                .where(project_files_table.c.project_id == project_id)
+                .values(is_active=False)
+            )
 
         if files:
             os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -1091,59 +1099,17 @@ async def update_project_details_service(
                         )
                     )
 
-        # Step 4: Handle user operations based on status
+        # Step 4: Handle user operations (removal was validated above)
         if add_user_ids or remove_user_ids:
-            # Add users
-            if add_user_ids:
-                for user_id in add_user_ids:
-                    existing = await database.fetch_one(
-                        select(projects_user_mapping_table)
-                        .where(projects_user_mapping_table.c.project_id == project_id)
-                        .where(projects_user_mapping_table.c.user_id == user_id)
-                    )
-                    if not existing:
-                        # Insert new if no row exists
-                        await database.execute(
-                            insert(projects_user_mapping_table).values(
-                                project_id=project_id,
-                                user_id=user_id,
-                                is_active=True,
-                            )
-                        )
-                    elif not existing.is_active:
-                        # Update to active if row exists but is inactive
-                        await database.execute(
-                            update(projects_user_mapping_table)
-                            .where(projects_user_mapping_table.c.project_id == project_id)
-                            .where(projects_user_mapping_table.c.user_id == user_id)
-                            .values(is_active=True)
-                        )
-
-            # Remove users only when status = 8
-            if remove_user_ids:
-                if project_status != 8:
-                    return JSONResponse(
-                        status_code=status.HTTP_403_FORBIDDEN,
-                        content={
-                            "status_code": status.HTTP_403_FORBIDDEN,
-                            "message": "Cannot remove users unless project status is 8.",
-                            "data": None,
-                        },
-                    )
-                for user_id in remove_user_ids:
-                    existing = await database.fetch_one(
-                        select(projects_user_mapping_table)
-                        .where(projects_user_mapping_table.c.project_id == project_id)
-                        .where(projects_user_mapping_table.c.user_id == user_id)
-                    )
-                    if existing:
-                        await database.execute(
-                            update(projects_user_mapping_table)
-                            .where(projects_user_mapping_table.c.project_id == project_id)
-                            .where(projects_user_mapping_table.c.user_id == user_id)
-                            .values(is_active=False)
-                        )
-                    # If no existing row, do nothing (idempotent)
+            await sync_memberships(
+                database,
+                projects_user_mapping_table,
+                {"project_id": project_id},
+                projects_user_mapping_table.c.user_id,
+                projects_user_mapping_table.c.is_active,
+                add=add_user_ids,
+                remove=remove_user_ids,
+            )
 
         # Step 5: Fetch updated project info
         updated_project_query = (
@@ -1198,7 +1164,8 @@ async def update_project_details_service(
         new_cr_id = None
         target_cr_id = change_request_id  # default: old CR
 
-        if change_request_code and project_status == 8:
+        has_change_request_json = bool(change_request_json and str(change_request_json).strip())
+        if project_status == 8 and (change_request_code or has_change_request_json):
             old_cr_id = change_request_id
 
             # CASE A: New file uploaded
@@ -1222,7 +1189,8 @@ async def update_project_details_service(
                 )
 
             # CASE B: New JSON submitted
-            elif change_request_json and str(change_request_json).strip():
+            elif has_change_request_json:
+                change_request_code = change_request_code or await change_request_codes.allocate()
                 try:
                     parsed_json = json.loads(change_request_json)
                 except Exception:
@@ -1252,23 +1220,23 @@ async def update_project_details_service(
                 target_cr_id = new_cr_id
 
                 if old_cr_id:
-                    old_active_users = await database.fetch_all(
-                        select(change_request_user_mapping_table.c.verified_by)
-                        .where(
-                            change_request_user_mapping_table.c.change_request_id == old_cr_id,
-                            change_request_user_mapping_table.c.user_is_active == True
-                        )
-                    )
-                    for row in old_active_users:
-                        await database.execute(
-                            insert(change_request_user_mapping_table).values(
-                                change_request_id=target_cr_id,
-                                verified_by=row.verified_by,
-                                user_is_active=True,
-                                is_verified=None,
-                                reject_reason=None
+                    await database.execute(
+                        insert(change_request_user_mapping_table).from_select(
+                            [
+                                change_request_user_mapping_table.c.change_request_id,
+                                change_request_user_mapping_table.c.verified_by,
+                                change_request_user_mapping_table.c.user_is_active,
+                            ],
+                            select(
+                                literal(target_cr_id),
+                                change_request_user_mapping_table.c.verified_by,
+                                true(),
+                            ).where(
+                                change_request_user_mapping_table.c.change_request_id == old_cr_id,
+                                change_request_user_mapping_table.c.user_is_active == True
                             )
                         )
+                    )
 
             # === SAFE & INCREMENTAL APPROVER UPDATES (Your Exact Requirement) ===
             if target_cr_id:
@@ -1277,69 +1245,33 @@ async def update_project_details_service(
 
                 # Only modify approvers if at least one change is requested
                 if add_user_ids or remove_user_ids:
-
-                    # 1. Remove specified users
-                    if remove_user_ids:
-                        await database.execute(
-                            update(change_request_user_mapping_table)
+                    # Only users holding an approver role can be added
+                    valid_adds = []
+                    if add_user_ids:
+                        role_rows = await database.fetch_all(
+                            select(user_role_mapping_table.c.user_id)
                             .where(
-                                change_request_user_mapping_table.c.change_request_id == target_cr_id,
-                                change_request_user_mapping_table.c.verified_by.in_(remove_user_ids)
-                            )
-                            .values(
-                                user_is_active=False,
-                                is_verified=None,
-                                reject_reason=None
+                                user_role_mapping_table.c.user_id.in_(add_user_ids),
+                                user_role_mapping_table.c.is_active == True,
+                                user_role_mapping_table.c.role_id.in_(CR_APPROVER_ROLES)
                             )
+                            .distinct()
                         )
-
-                    # 2. Add valid new approvers (only role 1 or 8)
-                    if add_user_ids:
-                        valid_adds = []
-                        for uid in add_user_ids:
-                            role_row = await database.fetch_one(
-                                select(user_role_mapping_table.c.role_id)
-                                .where(
-                                    user_role_mapping_table.c.user_id == uid,
-                                    user_role_mapping_table.c.is_active == True
-                                )
-                            )
-                            if role_row and role_row.role_id in CR_APPROVER_ROLES:
-                                valid_adds.append(uid)
-
-                        for uid in valid_adds:
-                            # Check if mapping already exists
-                            existing = await database.fetch_one(
-                                select(change_request_user_mapping_table.c.change_request_user_mapping_id)
-                                .where(
-                                    change_request_user_mapping_table.c.change_request_id == target_cr_id,
-                                    change_request_user_mapping_table.c.verified_by == uid
-                                )
-                            )
-
-                            if existing:
-                                # Reactivate if exists but was inactive
-                                await database.execute(
-                                    update(change_request_user_mapping_table)
-                                    .where(
-                                        change_request_user_mapping_table.c.change_request_user_mapping_id == existing.change_request_user_mapping_id)
-                                    .values(
-                                        user_is_active=True,
-                                        is_verified=None,
-                                        reject_reason=None
-                                    )
-                                )
-                            else:
-                                # Insert new mapping
-                                await database.execute(
-                                    insert(change_request_user_mapping_table).values(
-                                        change_request_id=target_cr_id,
-                                        verified_by=uid,
-                                        user_is_active=True,
-                                        is_verified=None,
-                                        reject_reason=None
-                                    )
-                                )
+                        valid_adds = [row.user_id for row in role_rows]
+
+                    # Re-added approvers start a fresh verification
+                    await sync_memberships(
+                        database,
+                        change_request_user_mapping_table,
+                        {"change_request_id": target_cr_id},
+                        change_request_user_mapping_table.c.verified_by,
+                        change_request_user_mapping_table.c.user_is_active,
+                        add=valid_adds,
+                        remove=remove_user_ids,
+                        reactivate_values={"is_verified": None, "reject_reason": None},
+                        deactivate_values={"is_verified": None, "reject_reason": None},
+                        reset_active=True,
+                    )
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -1439,8 +1371,13 @@ async def delete_project_service(project_id: int):
 
 
 # api to show dashboard data
-async def get_dashboard_data(payload):
+async def get_dashboard_data(payload, if_none_match: Optional[str] = None):
     try:
+        cached = dashboard_cache.get(payload.user_id, payload.project_id)
+        if cached:
+            body, etag = cached
+            return cached_json_response(body, etag, if_none_match)
+
         query = """
             SELECT ai_verify_transaction.get_dashboard_data_v1(
                 CAST(:p_user_id AS INTEGER),
@@ -1466,17 +1403,13 @@ async def get_dashboard_data(payload):
                 },
             )
 
-        raw_result = rows[0]["result"]
-        response_data = json.loads(raw_result) if isinstance(raw_result, str) else raw_result
-
-        return JSONResponse(
+        response = RawJSONResponse(
             status_code=status.HTTP_200_OK,
-            content={
-                "status_code": 200,
-                "message": "Dashboard data fetched successfully.",
-                "data": response_data,
-            },
+            content=json_envelope(rows[0]["result"], "Dashboard data fetched successfully."),
         )
+        etag = dashboard_cache.set(payload.user_id, payload.project_id, response.body)
+        response.headers["ETag"] = etag
+        return not_modified(etag, if_none_match) or response
 
     except Exception as e:
         return JSONResponse(
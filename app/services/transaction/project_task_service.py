@@ -1,20 +1,57 @@
 import os
 import logging
-from sqlalchemy import select, insert, func,and_, update,join
+from sqlalchemy import select, insert, func,and_, or_, update,join
 from fastapi.responses import JSONResponse
 from app.db.master import status
 from app.db.transaction.project_task_users import project_task_users_table
 from app.db.transaction.users import users as t_users_table
 from app.db.transaction.project_tasks_list import project_tasks_list_table
 from fastapi import status
-from app.schemas.transaction.project_task_schema import UserResponseByTask
+from app.schemas.transaction.project_task_schema import UserResponseByTask, MapUsersToTasksRequest
 from app.schemas.transaction.task_schema import ProjectTaskTransferRequest
+from app.utils.membership import sync_memberships
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
 
+async def assign_users_to_tasks(db, task_ids, user_ids, replace: bool = True) -> dict:
+    """
+    Make `user_ids` the active users of every task in `task_ids` (ids or a
+    SELECT of ids) and store the resulting task_users_count. Runs a constant
+    number of statements whatever the number of tasks; returns
+    {project_task_id: active user count}.
+    """
+    changes = {"desired": user_ids} if replace else {"add": user_ids}
+    await sync_memberships(
+        db,
+        project_task_users_table,
+        {"project_task_id": task_ids},
+        project_task_users_table.c.user_id,
+        project_task_users_table.c.user_is_active,
+        key_source=t_users_table.c.user_id,
+        **changes,
+    )
+
+    active_users = (
+        select(func.count())
+        .select_from(project_task_users_table)
+        .where(
+            project_task_users_table.c.project_task_id == project_tasks_list_table.c.project_task_id,
+            project_task_users_table.c.user_is_active == True,
+        )
+        .scalar_subquery()
+    )
+    rows = await db.fetch_all(
+        update(project_tasks_list_table)
+        .where(project_tasks_list_table.c.project_task_id.in_(task_ids))
+        .values(task_users_count=active_users)
+        .returning(project_tasks_list_table.c.project_task_id, project_tasks_list_table.c.task_users_count)
+    )
+    return {row["project_task_id"]: row["task_users_count"] for row in rows}
+
+
 async def map_users_to_project_task_service(db, payload):
     try:
         logger.info("Start mapping users to project task.")
@@ -32,75 +69,9 @@ async def map_users_to_project_task_service(db, payload):
         project_task_id = payload.project_task_id
         selected_user_ids = set(payload.user_ids)
 
-        # 2. Fetch current assignments
-        query = select(
-            project_task_users_table.c.project_task_user_map_id,
-            project_task_users_table.c.user_id,
-            project_task_users_table.c.user_is_active
-        ).where(project_task_users_table.c.project_task_id == project_task_id)
-
-        existing_rows = await db.fetch_all(query)
-        existing_user_map = {row["user_id"]: row for row in existing_rows}
-
-        # 3. Reactivate or insert selected users
-        for user_id in selected_user_ids:
-            if user_id in existing_user_map:
-                if not existing_user_map[user_id]["user_is_active"]:
-                    await db.execute(
-                        update(project_task_users_table)
-                        .where(
-                            project_task_users_table.c.project_task_user_map_id
-                            == existing_user_map[user_id]["project_task_user_map_id"]
-                        )
-                        .values(user_is_active=True)
-                    )
-            else:
-                await db.execute(
-                    insert(project_task_users_table).values(
-                        project_task_id=project_task_id,
-                        user_id=user_id,
-                        user_is_active=True
-                    )
-                )
-
-        # 4. Deactivate unselected users
-        existing_user_ids = set(existing_user_map.keys())
-        users_to_deactivate = existing_user_ids - selected_user_ids
-
-        for user_id in users_to_deactivate:
-            user_row = existing_user_map[user_id]
-            # Deactivate user if they are currently active
-            if user_row["user_is_active"]:
-                await db.execute(
-                    update(project_task_users_table)
-                    .where(
-                        and_(
-                            project_task_users_table.c.project_task_id == project_task_id,
-                            project_task_users_table.c.user_id == user_id,
-                        )
-                    )
-                    .values(user_is_active=False)
-                )
-            else:
-                logger.info(
-                    f"User {user_id} is already inactive and not deactivated."
-                )
-
-        # 5. Update task_users_count based on active users
-        query_active = select(project_task_users_table.c.user_id).where(
-            and_(
-                project_task_users_table.c.project_task_id == project_task_id,
-                project_task_users_table.c.user_is_active == True
-            )
-        )
-        active_rows = await db.fetch_all(query_active)
-        active_count = len(active_rows)
-
-        await db.execute(
-            update(project_tasks_list_table)
-            .where(project_tasks_list_table.c.project_task_id == project_task_id)
-            .values(task_users_count=active_count)
-        )
+        # 2. Apply the selection and refresh task_users_count
+        counts = await assign_users_to_tasks(db, [project_task_id], selected_user_ids)
+        active_count = counts.get(project_task_id, 0)
 
         logger.info(f"Users mapped to project task {project_task_id} successfully.")
         return JSONResponse(
@@ -126,6 +97,58 @@ async def map_users_to_project_task_service(db, payload):
         )
 
 
+async def map_users_to_project_tasks_service(db, payload: MapUsersToTasksRequest):
+    """
+    Assign the same users to many tasks in one request: the listed
+    project_task_ids and/or every task of project_phase_id.
+    """
+    try:
+        if not payload.user_ids or not (payload.project_task_ids or payload.project_phase_id):
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={
+                    "status_code": status.HTTP_400_BAD_REQUEST,
+                    "message": "user_ids and project_task_ids or project_phase_id are required",
+                    "data": [],
+                },
+            )
+
+        task_ids = select(project_tasks_list_table.c.project_task_id).where(
+            or_(
+                project_tasks_list_table.c.project_task_id.in_(payload.project_task_ids or []),
+                project_tasks_list_table.c.project_phase_id == payload.project_phase_id,
+            )
+        )
+        counts = await assign_users_to_tasks(db, task_ids, payload.user_ids, replace=payload.replace)
+
+        logger.info(f"Users {payload.user_ids} mapped to {len(counts)} project tasks.")
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={
+                "status_code": status.HTTP_200_OK,
+                "message": "Users mapped to project tasks successfully",
+                "data": {
+                    "user_ids": sorted(set(payload.user_ids)),
+                    "tasks": [
+                        {"project_task_id": task_id, "active_users_count": count}
+                        for task_id, count in sorted(counts.items())
+                    ],
+                },
+            },
+        )
+
+    except Exception as e:
+        logger.error(f"Error mapping users to project tasks: {str(e)}")
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "Internal server error",
+                "data": [],
+            },
+        )
+
+
 async def get_users_by_project_task_id(db, project_task_id: int):
     try:
         logger.info(f"Fetching users for project_task_id: {project_task_id}")
@@ -9,6 +9,7 @@ from app.db import user_roles_table
 from app.db.database import database
 from app.db.transaction.user_role_mapping import user_role_mapping_table
 from app.db.transaction.users import users
+from app.utils.user_queries import forget_request_users
 from app.schemas.transaction.t_users_schema import UserResponse, CreateUserRequest, UserUpdateRequest, UserDeleteRequest
 from fastapi.encoders import jsonable_encoder
 
@@ -221,7 +222,7 @@ async def update_user_service(user_data: UserUpdateRequest):
         logger.info(f"Start updating user with id: {user_data.user_id}")
 
         # Check if user exists
-        query = select(users).where(users.c.user_id == user_data.user_id)
+        query = select(users.c.user_id, users.c.email).where(users.c.user_id == user_data.user_id)
         existing_user = await database.fetch_one(query)
         if not existing_user:
             return JSONResponse(
@@ -261,6 +262,7 @@ async def update_user_service(user_data: UserUpdateRequest):
             )
         )
         await database.execute(update_query)
+        forget_request_users()
 
         logger.info(f"User with id {user_data.user_id} updated successfully.")
 
@@ -1,7 +1,7 @@
 import logging
 from fastapi import status
-from fastapi.responses import JSONResponse
-from sqlalchemy import select
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import select, insert
 from app.db.database import database
 from app.db.transaction.project_tasks_list import project_tasks_list_table
 from app.db.transaction.project_task_users import project_task_users_table
@@ -13,9 +13,13 @@ from app.db.master.sdlc_tasks import sdlc_tasks_table
 from app.db.master.status import status_table
 from app.db.master.sdlc_phases import sdlc_phases_table
 from datetime import datetime, timezone
-from app.schemas.transaction.task_work_log_schema import TaskWorkLogCreateRequest
+from typing import Optional
+from app.schemas.transaction.task_work_log_schema import TaskWorkLogCreateRequest, TaskWorkLogBatchCreateRequest
 from sqlalchemy import text
 import json
+from app.utils import events
+from app.utils.db_errors import is_foreign_key_violation, violated_column
+from app.utils.raw_json import RawJSONResponse, fetch_json_value
 
 logger = logging.getLogger(__name__)
 
@@ -159,13 +163,11 @@ async def get_task_work_log_details_by_project_task_id(project_task_id: int):
             "SELECT ai_verify_transaction.get_task_work_log_details_by_project_task_id(:project_task_id)"
         ).bindparams(project_task_id=project_task_id)
 
-        result = await database.fetch_one(query)
+        result = await fetch_json_value(database, query)
 
-        if result and result[0] is not None:
-            return JSONResponse(
-                status_code=status.HTTP_200_OK,
-                content=json.loads(result[0])
-            )
+        if result is not None:
+            # the DB function already returns the full response envelope
+            return RawJSONResponse(status_code=status.HTTP_200_OK, content=result)
         else:
             return JSONResponse(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -188,51 +190,73 @@ async def get_task_work_log_details_by_project_task_id(project_task_id: int):
         )
 
 
-async def create_task_work_log(payload: TaskWorkLogCreateRequest):
-    try:
-        logger.info("Start to create task work log entry.")
+# Page size bounds for the keyset work-log reader
+DEFAULT_WORK_LOG_PAGE = 100
+MAX_WORK_LOG_PAGE = 500
 
-        # 1️⃣ Validate project_task_id
-        project_task_query = select(project_tasks_list_table.c.project_task_id).where(
-            project_tasks_list_table.c.project_task_id == payload.project_task_id
-        )
-        project_task = await database.fetch_one(project_task_query)
+_WORK_LOG_REFERENCES = {
+    "project_task_id": (project_tasks_list_table.c.project_task_id,
+                        "Invalid project_task_id — not found in project_tasks_list_table"),
+    "user_id": (users.c.user_id, "Invalid user_id — not found in users table"),
+}
 
-        if not project_task:
-            logger.warning(f"Project Task ID {payload.project_task_id} not found.")
-            return JSONResponse(
-                status_code=status.HTTP_404_NOT_FOUND,
-                content={
-                    "status_code": status.HTTP_404_NOT_FOUND,
-                    "message": "Invalid project_task_id — not found in project_tasks_list_table",
-                    "data": []
-                }
-            )
 
-        # 2️⃣ Validate user_id
-        user_query = select(users.c.user_id).where(users.c.user_id == payload.user_id)
-        user = await database.fetch_one(user_query)
+async def _missing_work_log_reference(entries, column: Optional[str] = None):
+    """
+    Error path only: find which referenced ids do not exist. Postgres names
+    the column in the violation; otherwise both references are checked.
+    """
+    columns = [column] if column in _WORK_LOG_REFERENCES else list(_WORK_LOG_REFERENCES)
+    for name in columns:
+        ref_column, message = _WORK_LOG_REFERENCES[name]
+        wanted = {getattr(e, name) for e in entries}
+        rows = await database.fetch_all(select(ref_column).where(ref_column.in_(wanted)))
+        missing = sorted(wanted - {r[0] for r in rows})
+        if missing:
+            return message, missing
+    return None, []
 
-        if not user:
-            logger.warning(f"User ID {payload.user_id} not found.")
-            return JSONResponse(
-                status_code=status.HTTP_404_NOT_FOUND,
-                content={
-                    "status_code": status.HTTP_404_NOT_FOUND,
-                    "message": "Invalid user_id — not found in users table",
-                    "data": []
-                }
-            )
 
-        # 3️⃣ Insert record
-        # current_time = datetime.now(timezone.utc)
-        insert_query = task_work_log_table.insert().values(
-            project_task_id=payload.project_task_id,
-            user_id=payload.user_id,
-            remarks=payload.remarks,
-            # created_date=current_time
+async def insert_task_work_logs(entries):
+    """
+    Insert work-log entries with one multi-row INSERT. The table's foreign
+    keys validate project_task_id and user_id; a violation becomes a 404.
+    """
+    try:
+        async with database.transaction():
+            rows = await database.fetch_all(
+                insert(task_work_log_table)
+                .values([
+                    {"project_task_id": e.project_task_id, "user_id": e.user_id, "remarks": e.remarks}
+                    for e in entries
+                ])
+                .returning(task_work_log_table.c.task_work_log_id)
+            )
+    except Exception as e:
+        if not is_foreign_key_violation(e):
+            raise
+        message, missing = await _missing_work_log_reference(entries, violated_column(e))
+        logger.warning(f"Work log rejected by foreign key: {message} {missing}")
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "status_code": status.HTTP_404_NOT_FOUND,
+                "message": message or "Referenced project task or user not found",
+                "data": missing
+            }
         )
-        new_log_id = await database.execute(insert_query)
+
+    return [r["task_work_log_id"] for r in rows]
+
+
+async def create_task_work_log(payload: TaskWorkLogCreateRequest):
+    try:
+        logger.info("Start to create task work log entry.")
+
+        result = await insert_task_work_logs([payload])
+        if isinstance(result, JSONResponse):
+            return result
+        new_log_id = result[0]
 
         logger.info(f"Task work log created successfully with ID {new_log_id}.")
         return JSONResponse(
@@ -257,6 +281,120 @@ async def create_task_work_log(payload: TaskWorkLogCreateRequest):
             }
         )
 
+
+async def create_task_work_logs_batch(payload: TaskWorkLogBatchCreateRequest):
+    try:
+        logger.info(f"Start to create {len(payload.entries)} task work log entries.")
+
+        result = await insert_task_work_logs(payload.entries)
+        if isinstance(result, JSONResponse):
+            return result
+
+        logger.info(f"{len(result)} task work logs created successfully.")
+        return JSONResponse(
+            status_code=status.HTTP_201_CREATED,
+            content={
+                "status_code": status.HTTP_201_CREATED,
+                "message": "Task work logs created successfully",
+                "data": {
+                    "task_work_log_ids": result
+                }
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"Error while creating task work logs: {str(e)}")
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "Internal server error",
+                "data": []
+            }
+        )
+
+
+def _work_log_query(project_task_id: int, after_id: Optional[int] = None):
+    query = (
+        select(
+            task_work_log_table.c.task_work_log_id,
+            task_work_log_table.c.user_id,
+            users.c.user_name,
+            users.c.image_url,
+            task_work_log_table.c.remarks,
+            task_work_log_table.c.created_date,
+        )
+        .join(users, users.c.user_id == task_work_log_table.c.user_id)
+        .where(task_work_log_table.c.project_task_id == project_task_id)
+        .order_by(task_work_log_table.c.task_work_log_id.asc())
+    )
+    if after_id is not None:
+        query = query.where(task_work_log_table.c.task_work_log_id > after_id)
+    return query
+
+
+def _work_log_item(row) -> dict:
+    created = row["created_date"]
+    return {
+        "task_work_log_id": row["task_work_log_id"],
+        "user_id": row["user_id"],
+        "user_name": row["user_name"],
+        "image_url": row["image_url"],
+        "remarks": row["remarks"],
+        # same format as get_task_work_log_details_by_project_task_id
+        "created_date": created.strftime("%Y-%m-%dT%H:%M:%S") if created else None,
+    }
+
+
+async def get_task_work_logs(project_task_id: int, after_id: Optional[int] = None, limit: Optional[int] = None):
+    """
+    One page of a task's work logs, oldest first, keyed on task_work_log_id.
+    """
+    try:
+        limit = min(limit or DEFAULT_WORK_LOG_PAGE, MAX_WORK_LOG_PAGE)
+        rows = await database.fetch_all(_work_log_query(project_task_id, after_id).limit(limit + 1))
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={
+                "status_code": status.HTTP_200_OK,
+                "message": "Task work logs fetched successfully",
+                "data": [_work_log_item(r) for r in rows],
+                "next_after_id": rows[-1]["task_work_log_id"] if has_more else None,
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"Error while fetching task work logs: {str(e)}")
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "Internal server error",
+                "data": []
+            }
+        )
+
+
+async def stream_task_work_logs(project_task_id: int, after_id: Optional[int] = None):
+    """
+    A task's full work-log history as NDJSON, one entry per line, read
+    from a server-side cursor instead of being built up in memory.
+    """
+    async def lines():
+        try:
+            async for row in database.iterate(_work_log_query(project_task_id, after_id)):
+                yield json.dumps(_work_log_item(row)) + "\n"
+        except Exception as e:
+            # headers are already sent; end the stream with an error line
+            logger.error(f"Error while streaming task work logs: {str(e)}")
+            yield json.dumps({"error": "Internal server error"}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 async def update_project_task_status(project_task_id: int, task_status_id: int):
     try:
         logger.info(f"Updating task_status_id for project_task_id: {project_task_id}")
@@ -297,6 +435,7 @@ async def update_project_task_status(project_task_id: int, task_status_id: int):
         await database.execute(update_query)
 
         logger.info(f"Task status updated successfully for project_task_id: {project_task_id}")
+        events.publish(events.TASK_STATUS_CHANGED, project_task_id=project_task_id)
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={
@@ -8,6 +8,7 @@ from app.db.database import database
 from app.db.transaction.user_role_mapping import user_role_mapping_table
 from app.db.master.user_roles import user_roles_table
 from app.schemas.transaction.user_role_mapping_schema import UserRoleMappingCreateRequest
+from app.utils.user_utils import invalidate_user_role
 
 
 logger = logging.getLogger(__name__)
@@ -76,6 +77,9 @@ async def create_user_role_mappings(data: UserRoleMappingCreateRequest):
                 results.append(dict(new_record))
                 message_list.append(f"Role {role_id} assigned to user {data.user_id}")
 
+        if results:
+            invalidate_user_role(data.user_id)
+
         combined_message = "\n".join(message_list) if message_list else "User role mappings processed successfully"
         logger.info(f"Role mapping processing completed for user_id={data.user_id}")
 
@@ -198,6 +202,7 @@ async def delete_user_role_mapping(user_id: int, role_id: int):
             )
         )
         updated_record = await database.fetch_one(update_query)
+        invalidate_user_role(user_id)
 
         logger.info(f"Mapping deactivated successfully: user_role_map_id={updated_record['user_role_map_id']}")
         return JSONResponse(
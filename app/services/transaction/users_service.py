@@ -17,6 +17,8 @@ from app.db.transaction.users import users as users_table
 from app.db.transaction.user_role_mapping import user_role_mapping_table
 from app.db.master.user_roles import user_roles_table
 from app.utils.email_utils import send_simple_email
+from app.utils.user_queries import forget_request_users
+from app.utils.user_utils import invalidate_user_role
 from app.config import config
 
 logger = logging.getLogger(__name__)
@@ -82,6 +84,7 @@ async def update_user_role_mapping(user_id: int, new_role_id: int, updated_by: O
         update_stmt = update_stmt.values(updated_by=updated_by)
 
     await database.execute(update_stmt)
+    invalidate_user_role(user_id)
 
 async def log_image_history(user_id: int, image_url: str, reason: str):
     """
@@ -239,7 +242,7 @@ async def update_user_service(user_id: int, user_data):
     Service to update selected fields of a user.
     """
     # Step 1: Check if user exists
-    stmt = select(users_table).where(users_table.c.user_id == user_id)
+    stmt = select(users_table.c.user_id).where(users_table.c.user_id == user_id)
     existing_user = await database.fetch_one(stmt)
 
     if not existing_user:
@@ -280,6 +283,7 @@ async def update_user_service(user_id: int, user_data):
             .values(**update_data)
         )
         await database.execute(update_stmt)
+        forget_request_users()
         logger.info(f"User {user_id} updated with: {update_data}")
     else:
         return JSONResponse(
@@ -353,7 +357,7 @@ async def get_user_by_id_service(user_id: int):
 
 
 async def update_user_service(user_id: int, user_data):
-    stmt = select(users_table).where(users_table.c.user_id == user_id)
+    stmt = select(users_table.c.user_id).where(users_table.c.user_id == user_id)
     existing_user = await database.fetch_one(stmt)
 
     if not existing_user:
@@ -378,6 +382,7 @@ async def update_user_service(user_id: int, user_data):
     await database.execute(
         update(users_table).where(users_table.c.user_id == user_id).values(**update_data)
     )
+    forget_request_users()
 
     # Update role mapping if needed
     if user_data.role_id is not None:
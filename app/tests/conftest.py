@@ -15,6 +15,16 @@ from httpx import AsyncClient
 import random
 import string
 from app.db.transaction.users import users as users_table
+from app.utils.sdlc_template_graph import sdlc_template_graph
+from app.utils.job_runner import job_runner
+from app.utils.template_registry import template_registry
+from app.services.otp_service import OTP_LIMITERS
+
+
+def pytest_configure(config):
+    # pytest_plugins is only honoured in a rootdir conftest
+    if not config.pluginmanager.has_plugin("app.tests.query_budget"):
+        config.pluginmanager.import_plugin("app.tests.query_budget")
 
 
 # Ensure tables are created before running tests
@@ -47,6 +57,22 @@ async def db() -> AsyncGenerator:
 #     async with AsyncClient(transport=transport, base_url=client.base_url) as ac:
 #         yield ac
 
+@pytest.fixture(autouse=True)
+def reset_sdlc_template_graph():
+    # Tests seed master data directly, so every test loads its own template
+    sdlc_template_graph.clear()
+    yield
+    sdlc_template_graph.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_template_registry():
+    # template tests mock the rows a cached template id would otherwise return
+    template_registry.clear()
+    yield
+    template_registry.clear()
+
+
 @pytest.fixture(autouse=True)
 def mock_httpx_client(mocker):
     mocked_client = mocker.patch("app.utils.email_utils.httpx.AsyncClient")
@@ -58,6 +84,20 @@ def mock_httpx_client(mocker):
 
     return mocked_async_client
 
+@pytest.fixture(autouse=True)
+async def drain_background_jobs(mock_httpx_client):
+    # queued jobs (emails) finish while the httpx mock is still installed
+    yield
+    await job_runner.drain()
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    for limiter in OTP_LIMITERS:
+        limiter.clear()
+    yield
+
+
 #------existing test cases-----------------------------------***
 # Fixture: Register user manually into DB
 @pytest.fixture()
@@ -0,0 +1,59 @@
+"""
+Query-budget pytest plugin (registered from conftest.py).
+
+Turns the query profiler on for every test and fails the test when a
+request it makes runs more queries than its endpoint's budget. Budgets are
+per route template; a test can override with @pytest.mark.query_budget(n).
+"""
+import pytest
+
+from app.utils.query_profiler import query_profiler
+
+# Requests to routes without an entry get the default; a loop issuing one
+# query per row trips it long before it reaches production data sizes.
+DEFAULT_QUERY_BUDGET = 25
+
+QUERY_BUDGETS = {
+    ("POST", "/transaction/createProject"): 12,
+    ("PUT", "/transaction/update_project_details/{project_id}"): 20,
+    ("POST", "/transaction/mapUsersToTask"): 6,
+    ("POST", "/transaction/mapUsersToTasks"): 6,
+    ("POST", "/transaction/task/revert"): 8,
+}
+
+
+def budget_for(report: dict, override=None) -> int:
+    if override is not None:
+        return override
+    return QUERY_BUDGETS.get((report["method"], report["route"]), DEFAULT_QUERY_BUDGET)
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "query_budget(n): fail if any request in the test runs more than n queries"
+    )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("query_budget")
+    override = marker.args[0] if marker else None
+    reports = []
+    enabled = query_profiler.enabled
+    query_profiler.enabled = True
+    query_profiler.add_listener(reports.append)
+    try:
+        result = yield
+    finally:
+        query_profiler.remove_listener(reports.append)
+        query_profiler.enabled = enabled
+
+    over = [r for r in reports if r["queries"] > budget_for(r, override)]
+    if over:
+        lines = [
+            f"{r['method']} {r['route']}: {r['queries']} queries (budget {budget_for(r, override)}), "
+            f"repeated: {[(g['count'], g['callers']) for g in r['repeated']]}"
+            for r in over
+        ]
+        pytest.fail("Query budget exceeded:\n" + "\n".join(lines), pytrace=False)
+    return result
@@ -8,6 +8,9 @@ from app.db.transaction.change_request import change_request_table
 from app.db.transaction.projects import projects
 from app.db.transaction.projects_user_mapping import projects_user_mapping_table
 from app.db.transaction.json_template_transactions import json_template_transactions
+from app.db.transaction.change_request_user_mapping import change_request_user_mapping_table
+from app.db.transaction.user_role_mapping import user_role_mapping_table
+from app.services.transaction.change_request_service import CR_APPROVER_ROLES
 
 UPLOAD_FOLDER = "change_request_files"
 
@@ -39,7 +42,6 @@ async def insert_change_request(
     change_request_code: str = "CR_CODE",
     change_request_file: str = None,
     is_verified: bool = False,
-    reject_reason: str = None
 ):
     query = change_request_table.insert().values(
         project_id=project_id,
@@ -47,11 +49,22 @@ async def insert_change_request(
         change_request_file=change_request_file,
         is_verified=is_verified,
         transaction_template_id=transaction_template_id,
-        reject_reason=reject_reason
     )
     return await database.execute(query)
 
 
+async def insert_change_request_approver(change_request_id: int, user_id: int = 1):
+    query = change_request_user_mapping_table.insert().values(
+        change_request_id=change_request_id, verified_by=user_id, user_is_active=True
+    )
+    return await database.execute(query)
+
+
+async def insert_user_role(user_id: int = 1, role_id: int = CR_APPROVER_ROLES[0]):
+    query = user_role_mapping_table.insert().values(user_id=user_id, role_id=role_id, is_active=True)
+    return await database.execute(query)
+
+
 # --- API helper requests ---
 async def get_unverified_change_requests_request(async_client: AsyncClient):
     return await async_client.get("/transaction/getUnverifiedChangeRequests")
@@ -78,8 +91,9 @@ async def test_get_unverified_change_requests_success(async_client: AsyncClient)
         change_request_code="CR1",
         change_request_file=None,
         is_verified=False,
-        reject_reason=None
     )
+    await insert_change_request_approver(cr_id)
+    await insert_user_role()
 
     response = await get_unverified_change_requests_request(async_client)
     assert response.status_code == 200
@@ -96,12 +110,58 @@ async def test_get_unverified_change_requests_success(async_client: AsyncClient)
         "change_request_file",
         "reject_reason",
         "transaction_template_id",
-        "change_request_json",
         "project_id",
         "project_name",
         "is_verified",
     }
     assert expected_keys.issubset(set(sample.keys()))
+    # the form JSON is loaded per request through getChangeRequestDetail
+    assert "change_request_json" not in sample
+
+
+@pytest.mark.anyio
+async def test_get_unverified_change_requests_one_row_per_request(async_client: AsyncClient):
+    project_id = await insert_project(project_name="P_many_roles", is_active=True)
+    await insert_projects_user_mapping(project_id=project_id, user_id=1, is_active=True)
+    # a second membership row and several role rows used to multiply the inbox
+    await insert_projects_user_mapping(project_id=project_id, user_id=1, is_active=True)
+    for role_id in CR_APPROVER_ROLES + [1, 2]:
+        await insert_user_role(role_id=role_id)
+    cr_ids = []
+    for n in range(3):
+        cr_id = await insert_change_request(project_id=project_id, change_request_code=f"CR_MANY_{n}")
+        await insert_change_request_approver(cr_id)
+        cr_ids.append(cr_id)
+    other_cr = await insert_change_request(project_id=project_id, change_request_code="CR_OTHER")
+    await insert_change_request_approver(other_cr, user_id=2)
+
+    response = await get_unverified_change_requests_request(async_client)
+
+    assert response.status_code == 200
+    assert [item["change_request_id"] for item in response.json()["data"]] == cr_ids[::-1]
+
+
+@pytest.mark.anyio
+async def test_get_change_request_detail_returns_form_json(async_client: AsyncClient):
+    project_id = await insert_project(project_name="P_detail", is_active=True)
+    await insert_projects_user_mapping(project_id=project_id, user_id=1, is_active=True)
+    await insert_user_role()
+    template_id = await insert_json_template({"reason": "Audit"})
+    cr_id = await insert_change_request(project_id=project_id, transaction_template_id=template_id,
+                                        change_request_code="CR_DETAIL")
+    await insert_change_request_approver(cr_id)
+    other_cr = await insert_change_request(project_id=project_id, change_request_code="CR_NOT_MINE")
+    await insert_change_request_approver(other_cr, user_id=2)
+
+    response = await async_client.get(f"/transaction/getChangeRequestDetail?change_request_id={cr_id}")
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["change_request_code"] == "CR_DETAIL"
+    assert json.loads(data["change_request_json"]) == {"reason": "Audit"}
+
+    response = await async_client.get(f"/transaction/getChangeRequestDetail?change_request_id={other_cr}")
+    assert response.status_code == 404
 
 
 @pytest.mark.anyio
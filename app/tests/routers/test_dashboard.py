@@ -0,0 +1,146 @@
+import pytest
+from fastapi.responses import JSONResponse
+from httpx import AsyncClient
+
+from app.utils import events
+from app.utils.dashboard_cache import dashboard_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_dashboard_cache():
+    dashboard_cache.clear()
+    yield
+    dashboard_cache.clear()
+
+
+def _dashboard_rows():
+    return [{"result": '{"projects": [{"project_id": 1, "open_tasks": 3}]}'}]
+
+
+# --- Dashboard served from cache on repeat loads ---
+@pytest.mark.anyio
+async def test_dashboard_cached_after_first_load(mocker, async_client: AsyncClient):
+    fetch_all = mocker.patch(
+        "app.services.transaction.project_service.database.fetch_all", return_value=_dashboard_rows()
+    )
+
+    first = await async_client.get("/transaction/get_dashboard_data", params={"user_id": 1, "project_id": 1})
+    second = await async_client.get("/transaction/get_dashboard_data", params={"user_id": 1, "project_id": 1})
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert first.json()["data"]["projects"][0]["open_tasks"] == 3
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+    assert fetch_all.call_count == 1
+
+
+# --- ETag round trip returns 304 ---
+@pytest.mark.anyio
+async def test_dashboard_not_modified(mocker, async_client: AsyncClient):
+    mocker.patch("app.services.transaction.project_service.database.fetch_all", return_value=_dashboard_rows())
+
+    first = await async_client.get("/transaction/get_dashboard_data", params={"user_id": 2})
+    resp = await async_client.get(
+        "/transaction/get_dashboard_data",
+        params={"user_id": 2},
+        headers={"If-None-Match": first.headers["etag"]},
+    )
+
+    assert resp.status_code == 304
+    assert resp.content == b""
+
+
+# --- A validator still matches after the entry was dropped ---
+@pytest.mark.anyio
+async def test_dashboard_not_modified_on_cache_miss(mocker, async_client: AsyncClient):
+    fetch_all = mocker.patch(
+        "app.services.transaction.project_service.database.fetch_all", return_value=_dashboard_rows()
+    )
+
+    first = await async_client.get("/transaction/get_dashboard_data", params={"user_id": 2})
+    dashboard_cache.clear()
+    resp = await async_client.get(
+        "/transaction/get_dashboard_data",
+        params={"user_id": 2},
+        headers={"If-None-Match": first.headers["etag"]},
+    )
+
+    assert fetch_all.call_count == 2
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == first.headers["etag"]
+
+
+# --- Service events drop the affected entries ---
+@pytest.mark.anyio
+async def test_dashboard_invalidated_by_events(mocker, async_client: AsyncClient):
+    fetch_all = mocker.patch(
+        "app.services.transaction.project_service.database.fetch_all", return_value=_dashboard_rows()
+    )
+
+    await async_client.get("/transaction/get_dashboard_data", params={"user_id": 1, "project_id": 1})
+    await async_client.get("/transaction/get_dashboard_data", params={"user_id": 1, "project_id": 2})
+    events.publish(events.COMMENT_CHANGED, project_id=1, comment_id=10)
+
+    assert dashboard_cache.get(1, 1) is None
+    assert dashboard_cache.get(1, 2) is not None
+
+    await async_client.get("/transaction/get_dashboard_data", params={"user_id": 1, "project_id": 1})
+    assert fetch_all.call_count == 3
+
+    events.publish(events.TASK_STATUS_CHANGED, project_task_id=5)
+    assert dashboard_cache.get(1, 2) is None
+
+
+# --- Events raised inside a transaction wait for its commit ---
+@pytest.mark.anyio
+async def test_deferred_events_wait_for_commit(mocker, async_client: AsyncClient):
+    mocker.patch("app.services.transaction.project_service.database.fetch_all", return_value=_dashboard_rows())
+    await async_client.get("/transaction/get_dashboard_data", params={"user_id": 1, "project_id": 1})
+
+    with pytest.raises(RuntimeError):
+        with events.deferred():
+            events.publish(events.INCIDENT_CHANGED, project_id=1, incident_report_id=10)
+            raise RuntimeError("rolled back")
+    assert dashboard_cache.get(1, 1) is not None
+
+    with events.deferred():
+        events.publish(events.INCIDENT_CHANGED, project_id=1, incident_report_id=10)
+        assert dashboard_cache.get(1, 1) is not None
+    assert dashboard_cache.get(1, 1) is None
+
+
+@pytest.mark.anyio
+async def test_incident_route_publishes_after_commit(mocker, async_client: AsyncClient):
+    seen = []
+
+    async def create_incident_report(db, incident):
+        events.publish(events.INCIDENT_CHANGED, project_id=1, incident_report_id=11)
+        # still inside the route's transaction
+        seen.append(list(handler.call_args_list))
+        return JSONResponse({"status_code": 200, "message": "Incident reported successfully", "data": None})
+
+    handler = mocker.Mock()
+    events.subscribe(events.INCIDENT_CHANGED, handler)
+    mocker.patch("app.routers.incident_report_router.create_incident_report", side_effect=create_incident_report)
+    try:
+        await async_client.post("/transaction/AddIncidentReport", json={
+            "project_task_id": 1, "incident_type_id": 1, "raised_by": 1,
+            "test_script_name": None, "testcase_number": None, "incident_comment": None, "document": None,
+        })
+    finally:
+        events.unsubscribe(events.INCIDENT_CHANGED, handler)
+
+    assert seen == [[]]
+    handler.assert_called_once_with(project_id=1, incident_report_id=11)
+
+
+# --- Not-found results are never cached ---
+@pytest.mark.anyio
+async def test_dashboard_no_data_not_cached(mocker, async_client: AsyncClient):
+    mocker.patch("app.services.transaction.project_service.database.fetch_all", return_value=[])
+
+    resp = await async_client.get("/transaction/get_dashboard_data", params={"user_id": 3})
+
+    assert resp.status_code == 404
+    assert dashboard_cache.get(3, None) is None
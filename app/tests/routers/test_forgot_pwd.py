@@ -10,6 +10,8 @@ from app.db.transaction.user_password_history import user_password_history
 from app.db.transaction.user_otp import user_otp
 from app.security import get_password_hash
 from app.utils.validations import generate_otp
+from app.services.otp_service import forgot_password_email_limiter, verify_otp_limiter
+from app.utils.job_runner import job_runner
 
 
 # ─────────────────────────────
@@ -107,6 +109,64 @@ async def test_forgot_password_missing_email(async_client: AsyncClient):
     assert response.status_code == 422
 
 
+@pytest.mark.anyio
+async def test_forgot_password_upserts_single_otp_and_queues_email(
+    async_client: AsyncClient, registered_user: dict, mock_httpx_client
+):
+    """
+    Test: Repeated requests keep one OTP row per user; the email is sent by a background job.
+    """
+    first = await forgot_password(async_client, registered_user["email"])
+    second = await forgot_password(async_client, registered_user["email"])
+    assert first.status_code == second.status_code == 200
+
+    rows = await database.fetch_all(select(user_otp).where(user_otp.c.user_id == registered_user["user_id"]))
+    assert len(rows) == 1
+
+    await job_runner.drain()
+    assert mock_httpx_client.post.await_count == 2
+
+
+@pytest.mark.anyio
+async def test_forgot_password_rate_limited_per_email(async_client: AsyncClient, registered_user: dict):
+    """
+    Test: The per-email bucket answers 429 with Retry-After once it is spent.
+    """
+    for _ in range(forgot_password_email_limiter.capacity):
+        response = await forgot_password(async_client, registered_user["email"])
+        assert response.status_code == 200
+
+    response = await forgot_password(async_client, registered_user["email"].upper())
+
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) > 0
+    assert "too many requests" in response.json()["detail"].lower()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("trusted, forwarded_for, expected", [
+    ("", "203.0.113.9", "127.0.0.1"),                          # no proxy configured: the header is ignored
+    ("127.0.0.1", "203.0.113.9", "203.0.113.9"),
+    ("127.0.0.1,10.0.0.0/8", "6.6.6.6, 203.0.113.9, 10.1.2.3", "203.0.113.9"),  # spoofed left entry skipped
+])
+async def test_forgot_password_limits_the_forwarded_client_ip(
+    async_client: AsyncClient, mocker, monkeypatch, trusted, forwarded_for, expected
+):
+    from app.config import config
+
+    monkeypatch.setattr(config, "TRUSTED_PROXIES", trusted)
+    process = mocker.patch(
+        "app.routers.forgot_password.process_forgot_password",
+        return_value={"status_code": 200, "message": "ok", "data": None},
+    )
+
+    await async_client.post(
+        "/forgot-password", json={"email": "a@example.com"}, headers={"X-Forwarded-For": forwarded_for}
+    )
+
+    assert process.call_args.args[1] == expected
+
+
 # ─────────────────────────────
 # OTP Verification Tests
 # ─────────────────────────────
@@ -195,6 +255,26 @@ async def test_verify_incorrect_otp(async_client: AsyncClient, registered_user):
     assert "incorrect" in response.json()["detail"].lower()
 
 
+@pytest.mark.anyio
+async def test_verify_otp_rate_limited_per_user(async_client: AsyncClient, registered_user):
+    """
+    Test: OTP guesses are capped per user.
+    """
+    await database.execute(user_otp.insert().values(
+        user_id=registered_user["user_id"],
+        otp="1234",
+        otp_expiry_date=datetime.now(UTC) + timedelta(minutes=10),
+        created_date=datetime.now(UTC)
+    ))
+
+    for _ in range(verify_otp_limiter.capacity):
+        response = await verify_otp(async_client, registered_user["user_id"], "0000")
+        assert response.status_code == 400
+
+    response = await verify_otp(async_client, registered_user["user_id"], "1234")
+    assert response.status_code == 429
+
+
 # ─────────────────────────────
 # Password Reset Tests
 # ─────────────────────────────
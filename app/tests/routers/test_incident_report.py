@@ -4,7 +4,20 @@ from fastapi.encoders import jsonable_encoder
 from unittest.mock import AsyncMock, patch
 from datetime import datetime, timezone
 import json
-from app.services.incident_report_service import get_incident_reports
+from types import SimpleNamespace
+from app.db.database import database
+from app.db.master.sdlc_phases import sdlc_phases_table
+from app.db.master.sdlc_tasks import sdlc_tasks_table
+from app.db.transaction.incident_reports import incident_report_table
+from app.db.transaction.project_phases_list import project_phases_list_table
+from app.db.transaction.project_tasks_list import project_tasks_list_table
+from app.db.transaction.projects import projects
+from app.schemas.phase_schema import PhaseUpdateRequest
+from app.schemas.task_schema import TaskUpdateRequest
+from app.services.incident_report_service import get_incident_reports, fetch_incident_reports
+from app.services.phase_service import update_phase
+from app.services.task_service import update_task
+from app.services.transaction.project_service import update_project_details_service
 
 
 # ------------------------------
@@ -187,4 +200,119 @@ async def test_get_incident_reports_multiple_results():
 #     assert any(
 #         "value is not a valid integer" in str(detail) or "type_error.integer" in str(detail)
 #         for detail in data["detail"]
-#     ), "Expected integer validation error"
\ No newline at end of file
+#     ), "Expected integer validation error"
+
+
+# ------------------------------
+# GetIncidentReports (read model + keyset pagination)
+# ------------------------------
+
+def _incident_row(incident_report_id, **overrides):
+    row = {
+        "incident_report_id": incident_report_id,
+        "project_id": 1,
+        "project_name": "Test Project",
+        "phase_id": 1,
+        "phase_name": "Development",
+        "task_id": 1,
+        "task_name": "Design Spec",
+        "test_script_name": None,
+        "testcase_number": None,
+        "document": None,
+        "raise_comment": "Test comment",
+        "resolve_comment": None,
+        "is_resolved": False,
+        "raised_by": 1,
+        "raised_date": datetime(2025, 9, 30, 10, 15, 0),
+        "resolved_by": None,
+        "resolved_date": None,
+        "failure_type": 2,
+        "assigned_to": 1,
+    }
+    row.update(overrides)
+    return row
+
+
+@pytest.mark.anyio
+async def test_fetch_incident_reports_formats_rows():
+    mock_db = AsyncMock()
+    mock_db.fetch_all = AsyncMock(return_value=[_incident_row(3)])
+
+    response = await fetch_incident_reports(mock_db, user_id=1)
+
+    assert response.status_code == status.HTTP_200_OK
+    data = json.loads(response.body.decode())
+    assert data["next_before_id"] is None
+    assert data["data"][0]["raised_date"] == "2025-09-30T10:15:00"
+    assert data["data"][0]["failure_type"] == "System Failure"
+    assert data["data"][0]["task_name"] == "Design Spec"
+
+    sql = str(mock_db.fetch_all.call_args.args[0])
+    assert "JOIN" not in sql.upper()
+    assert "task_id =" not in sql
+
+
+@pytest.mark.anyio
+async def test_fetch_incident_reports_keyset_page():
+    mock_db = AsyncMock()
+    mock_db.fetch_all = AsyncMock(return_value=[_incident_row(9), _incident_row(8), _incident_row(7)])
+
+    response = await fetch_incident_reports(mock_db, user_id=1, before_id=10, limit=2)
+
+    data = json.loads(response.body.decode())
+    assert [r["incident_report_id"] for r in data["data"]] == [9, 8]
+    assert data["next_before_id"] == 8
+
+    query = mock_db.fetch_all.call_args.args[0]
+    assert "incident_report_id <" in str(query)
+    assert query._limit == 3
+
+
+@pytest.mark.anyio
+async def test_fetch_incident_reports_database_error():
+    mock_db = AsyncMock()
+    mock_db.fetch_all = AsyncMock(side_effect=Exception("Database error"))
+
+    response = await fetch_incident_reports(mock_db, task_id=1)
+
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert json.loads(response.body.decode())["details"] == "Database error"
+
+
+@pytest.mark.anyio
+async def test_renames_reach_the_stored_incident_names():
+    phase_id = await database.execute(
+        sdlc_phases_table.insert().values(phase_name="Old phase", order_id=9101, is_active=True)
+    )
+    task_id = await database.execute(
+        sdlc_tasks_table.insert().values(task_name="Old task", order_id=9101, is_active=True)
+    )
+    project_id = await database.execute(projects.insert().values(project_name="Old project", is_active=True))
+    project_phase_id = await database.execute(
+        project_phases_list_table.insert().values(project_id=project_id, phase_id=phase_id)
+    )
+    project_task_id = await database.execute(
+        project_tasks_list_table.insert().values(project_phase_id=project_phase_id, task_id=task_id)
+    )
+    await database.execute(
+        incident_report_table.insert().values(
+            project_id=project_id, phase_id=project_phase_id, task_id=project_task_id,
+            failure_type=2, assigned_to=1, raised_by=1, is_resolved=False,
+            project_name="Old project", phase_name="Old phase", task_name="Old task",
+        )
+    )
+
+    request = SimpleNamespace(state=SimpleNamespace(user={"user_id": 1}))
+    response = await update_project_details_service(request, project_id, title="New project")
+    assert response.status_code == status.HTTP_200_OK
+    response = await update_phase(PhaseUpdateRequest(phase_id=phase_id, phase_name="New phase", order_id=9101))
+    assert response.status_code == status.HTTP_200_OK
+    response = await update_task(TaskUpdateRequest(task_id=task_id, task_name="New task", order_id=9101))
+    assert response.status_code == status.HTTP_200_OK
+
+    response = await fetch_incident_reports(database, task_id=project_task_id)
+
+    [incident] = json.loads(response.body.decode())["data"]
+    assert (incident["project_name"], incident["phase_name"], incident["task_name"]) == (
+        "New project", "New phase", "New task",
+    )
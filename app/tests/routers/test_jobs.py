@@ -0,0 +1,54 @@
+import pytest
+from httpx import AsyncClient
+
+from app.utils.job_runner import job_runner
+
+MOCK_DOC_1 = {"task_doc_id": 1, "project_task_id": 10, "doc_version": 1, "document_json": "<p>Hello World</p>"}
+MOCK_DOC_2 = {"task_doc_id": 2, "project_task_id": 10, "doc_version": 2, "document_json": "<p>Hello Universe</p>"}
+
+
+@pytest.mark.anyio
+async def test_compare_docs_in_background_returns_job_handle(mocker, async_client: AsyncClient):
+    mocker.patch(
+        "app.services.docs.task_doc_pdf_service.database.fetch_one",
+        side_effect=[MOCK_DOC_2, MOCK_DOC_1],
+    )
+
+    response = await async_client.get("/docs/compare_docs/2", params={"background": True})
+
+    assert response.status_code == 202
+    job_id = response.json()["data"]["job_id"]
+    assert response.headers["location"] == f"/jobs/{job_id}"
+
+    await job_runner.drain()
+
+    response = await async_client.get(f"/jobs/{job_id}")
+    assert response.status_code == 200
+    job = response.json()["data"]
+    assert job["status"] == "succeeded"
+    assert job["job_type"] == "compare_documents"
+    assert job["progress"] == 100
+    assert "<del" in job["result"]["data"] or "<ins" in job["result"]["data"]
+
+
+@pytest.mark.anyio
+async def test_background_job_failure_is_reported(mocker, async_client: AsyncClient):
+    mocker.patch("app.services.docs.task_doc_pdf_service.database.fetch_one", return_value=None)
+
+    response = await async_client.get("/docs/compare_docs/999", params={"background": True})
+    job_id = response.json()["data"]["job_id"]
+    await job_runner.drain()
+
+    job = (await async_client.get(f"/jobs/{job_id}")).json()["data"]
+    assert job["status"] == "failed"
+    assert job["attempts"] == 1  # client errors are not retried
+    assert job["error"] == "Task document not found"
+    assert job["result"]["status_code"] == 404
+
+
+@pytest.mark.anyio
+async def test_get_job_not_found(async_client: AsyncClient):
+    response = await async_client.get("/jobs/does-not-exist")
+
+    assert response.status_code == 404
+    assert response.json()["message"] == "Job not found"
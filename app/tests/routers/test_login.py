@@ -28,6 +28,8 @@ async def test_login_success(mocker, async_client: AsyncClient):
         "user_locked_time": None,
         "is_temporary_password": False,
         "password_validity_date": None,
+        "role_id": 1,
+        "role_name": "Admin",
     }
 
     # Mock all dependencies
@@ -38,7 +40,6 @@ async def test_login_success(mocker, async_client: AsyncClient):
     mocker.patch("app.services.login_service.fetch_user_by_email", AsyncMock(return_value=MockRow(user)))
     mocker.patch("app.services.login_service.verify_password", return_value=True)
     mocker.patch("app.services.login_service.create_access_token", AsyncMock(return_value="fake-jwt-token"))
-    mocker.patch("app.services.login_service.get_user_role", AsyncMock(return_value={"id": 1, "name": "Admin"}))
     mocker.patch("app.services.login_service.reset_user_login_state", AsyncMock())
     mocker.patch("app.services.login_service.log_user_audit", AsyncMock())
     mocker.patch("app.db.database.database.execute", AsyncMock())
@@ -157,7 +158,6 @@ async def test_login_password_expired(mocker, async_client: AsyncClient):
     mocker.patch("app.services.login_service.fetch_user_by_email", AsyncMock(return_value=MockRow(user)))
     mocker.patch("app.services.login_service.verify_password", return_value=True)
     mocker.patch("app.services.login_service.create_access_token", AsyncMock(return_value="expired-jwt-token"))
-    mocker.patch("app.services.login_service.get_user_role", AsyncMock(return_value={"id": 2, "name": "User"}))
     mocker.patch("app.services.login_service.reset_user_login_state", AsyncMock())
     mocker.patch("app.services.login_service.log_user_audit", AsyncMock())
     mocker.patch("app.db.database.database.execute", AsyncMock())
@@ -192,7 +192,6 @@ async def test_login_temp_password(mocker, async_client: AsyncClient):
     mocker.patch("app.services.login_service.fetch_user_by_email", AsyncMock(return_value=MockRow(user)))
     mocker.patch("app.services.login_service.verify_password", return_value=True)
     mocker.patch("app.services.login_service.create_access_token", AsyncMock(return_value="temp-jwt-token"))
-    mocker.patch("app.services.login_service.get_user_role", AsyncMock(return_value={"id": 3, "name": "TempRole"}))
     mocker.patch("app.services.login_service.reset_user_login_state", AsyncMock())
     mocker.patch("app.services.login_service.log_user_audit", AsyncMock())
     mocker.patch("app.db.database.database.execute", AsyncMock())
@@ -14,6 +14,7 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from app.services.transaction import project_service
 from app.services.transaction.project_service import get_project_details_service, update_project_details_service
+from app.utils.sdlc_template_graph import build_sdlc_template_snapshot, sdlc_template_graph
 
 # -------------------------------------------------------------------
 # Helpers
@@ -221,6 +222,18 @@ async def test_create_project_no_phases(monkeypatch, tmp_path):
 
 
 
+def _template_snapshot(task_ids):
+    phases = [
+        {"phase_id": 20, "phase_name": "P20", "order_id": 2, "is_active": True},
+        {"phase_id": 10, "phase_name": "P10", "order_id": 1, "is_active": True},
+    ]
+    tasks = [
+        {"phase_id": pid, "task_id": tid, "task_name": f"T{tid}"}
+        for pid in (10, 20) for tid in task_ids
+    ]
+    return build_sdlc_template_snapshot(phases, tasks, [])
+
+
 @pytest.mark.anyio
 async def test_create_project_success_with_phases_tasks_files(monkeypatch, tmp_path):
     payload = SimpleNamespace(
@@ -248,12 +261,11 @@ async def test_create_project_success_with_phases_tasks_files(monkeypatch, tmp_p
 
     async def fake_fetch_one(query): return None
 
+    sdlc_template_graph.install(_template_snapshot(task_ids=(100, 200)))
+
     async def fake_fetch_all(query):
         q = str(query).lower()
-        if "sdlc_phases" in q:  # Updated condition to match actual phase_query str(query)
-            return [SimpleNamespace(phase_id=10), SimpleNamespace(phase_id=20)]
-        if "sdlc_phase_tasks_mapping" in q:  # Updated condition to match actual task_query str(query)
-            return [SimpleNamespace(task_id=100), SimpleNamespace(task_id=200)]
+        assert "sdlc_phase" not in q  # template is served from the graph
         return []
 
     async def fake_execute(query):
@@ -353,12 +365,11 @@ async def test_create_project_full_branch_coverage(monkeypatch, tmp_path):
 
     async def fake_fetch_one(query): return None
 
+    sdlc_template_graph.install(_template_snapshot(task_ids=(101, 102)))
+
     async def fake_fetch_all(query):
         q = str(query).lower()
-        if "sdlc_phases" in q:  # Updated condition to match actual phase_query str(query)
-            return [SimpleNamespace(phase_id=10), SimpleNamespace(phase_id=20)]
-        if "sdlc_phase_tasks_mapping" in q:  # Updated condition to match actual task_query str(query)
-            return [SimpleNamespace(task_id=101), SimpleNamespace(task_id=102)]
+        assert "sdlc_phase" not in q  # template is served from the graph
         return []
 
     executed_queries = []
@@ -1093,9 +1104,15 @@ async def test_update_add_users(monkeypatch):
             return None  # No existing
         return None
 
+    mapping_reads = 0
+
     async def fake_fetch_all(query):
+        nonlocal mapping_reads
         q = str(query).lower()
         if "projects_user_mapping" in q:
+            mapping_reads += 1
+            if mapping_reads == 1:
+                return []  # Membership diff: no existing rows
             return [SimpleNamespace(user_id=3), SimpleNamespace(user_id=4)]  # After add
         if "project_files" in q:
             return []
@@ -1302,9 +1319,16 @@ async def test_update_full_success(monkeypatch, tmp_path):
             return None
         return fake_fetch_one
 
+    mapping_reads = 0
+
     async def fake_fetch_all(query):
+        nonlocal mapping_reads
         q = str(query).lower()
         if "projects_user_mapping" in q:
+            mapping_reads += 1
+            if mapping_reads == 1:
+                # Membership diff: 5 is new, 6 is inactive (reactivate), 1 is active (remove)
+                return [SimpleNamespace(user_id=6, is_active=False), SimpleNamespace(user_id=1, is_active=True)]
             return [SimpleNamespace(user_id=5), SimpleNamespace(user_id=6)]  # After add/remove
         if "project_files" in q:
             return [SimpleNamespace(file_id=99, file_name="mock_full_file.txt", is_active=True)]  # After add
@@ -707,6 +707,8 @@ async def test_update_project_comment_success():
     """
     mock_comment = {
         "comment_id": 1,
+        "project_id": 1,
+        "project_phase_id": 1,
         "description": "Original comment",
         "commented_by": 1,
         "comment_date": "2023-10-01T12:00:00"
@@ -873,6 +875,9 @@ async def test_update_comment_reply_success():
     """
     mock_reply = {
         "reply_id": 1,
+        "comment_id": 1,
+        "project_id": 1,
+        "project_phase_id": 1,
         "reply_description": "Original reply",
         "replied_by": 1,
         "reply_date": "2023-10-01T12:00:00"
@@ -1012,6 +1017,8 @@ async def test_resolve_comment_service_success():
     """
     mock_comment = MockComment(
         comment_id=1,
+        project_id=1,
+        project_phase_id=1,
         description="Test comment",
         is_resolved=False,
         resolved_by=None,
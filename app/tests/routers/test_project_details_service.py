@@ -41,16 +41,22 @@ async def test_get_projects_by_user_not_found(mocker, async_client: AsyncClient)
 
 
 @pytest.mark.anyio
-async def test_get_projects_by_user_json_parse_error(mocker, async_client: AsyncClient):
-    bad_row = {"projects_json": "not a valid json"}
+async def test_get_projects_by_user_json_passed_through(mocker, async_client: AsyncClient):
+    projects_json_str = '[{"project_id":2,"project_name":"Proj \u00e9","users":[{"user_image":""}]}]'
     mocker.patch(
         "app.services.transaction.project_details_service.database.fetch_one",
-        return_value=bad_row,
+        return_value={"projects_json": projects_json_str},
     )
     response = await call_get_projects_by_user(async_client, 456)
-    assert response.status_code == 500
-    data = response.json()
-    assert "error parsing json" in data["message"].lower()
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    # function output is embedded byte-for-byte, not re-encoded
+    assert response.content == (
+        b'{"status_code":200,"message":"Projects fetched successfully","data":'
+        + projects_json_str.encode() + b"}"
+    )
+    # empty strings survive
+    assert response.json()["data"][0]["users"][0]["user_image"] == ""
 
 
 @pytest.mark.anyio
@@ -21,9 +21,10 @@ async def test_map_users_to_project_phase_insert_and_update():
     db_mock = AsyncMock()
     payload = MapUsersToPhaseRequest(project_phase_id=1, user_ids=[1, 2])
 
-    # Mock existing rows: user 1 exists but inactive, user 2 doesn't exist
-    db_mock.fetch_all.return_value = [
-        {"user_id": 1, "user_is_active": False, "project_phase_user_map_id": 100}
+    # Both users exist; user 1 is mapped but inactive, user 2 isn't mapped
+    db_mock.fetch_all.side_effect = [
+        [{"user_id": 1}, {"user_id": 2}],
+        [{"user_id": 1, "user_is_active": False}],
     ]
 
     resp: JSONResponse = await service.map_users_to_project_phase_service(db_mock, payload)
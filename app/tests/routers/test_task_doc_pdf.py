@@ -2,6 +2,7 @@ from fastapi.testclient import TestClient
 from unittest.mock import patch
 
 from app.main import app  # Your FastAPI main instance
+from app.utils.pdf_renderer import PdfRenderer
 
 client = TestClient(app)
 
@@ -76,3 +77,34 @@ def test_compare_docs_not_found(mock_fetch):
 
     assert response.status_code == 404
     assert data["message"] == "Task document not found"
+
+
+# ---------- Test Render PDF API ----------
+def fake_render(html):
+    return b"%PDF-1.4 " + html.encode("utf-8")
+
+
+@patch("app.services.docs.task_doc_pdf_service.database.fetch_one")
+def test_render_pdf_streams_cached_file(mock_fetch, tmp_path):
+    mock_fetch.return_value = MOCK_DOC_1
+    renderer = PdfRenderer(folder=str(tmp_path), workers=1, render_fn=fake_render)
+    with patch("app.services.docs.task_doc_pdf_service.pdf_renderer", renderer):
+        response = client.get("/docs/render_pdf/1")
+        again = client.get("/docs/render_pdf/1")
+    renderer.shutdown()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.content.startswith(b"%PDF") and b"<p>Hello World</p>" in response.content
+    assert again.content == response.content
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+@patch("app.services.docs.task_doc_pdf_service.database.fetch_one")
+def test_render_pdf_not_found(mock_fetch):
+    mock_fetch.return_value = None
+
+    response = client.get("/docs/render_pdf/999")
+
+    assert response.status_code == 404
+    assert response.json()["message"] == "Task document not found"
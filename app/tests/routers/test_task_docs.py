@@ -1,5 +1,9 @@
+from unittest.mock import AsyncMock
+
 import pytest
 from httpx import AsyncClient
+from app.services.docs import task_docs_service
+from app.utils import events
 from app.db.database import database
 from app.db.docs.task_docs import task_docs_table
 from app.schemas.docs.task_docs_schema import SaveProjectTaskDocumentRequest, SubmitProjectTaskDocumentRequest
@@ -104,3 +108,102 @@ async def test_submit_project_task_document_new_version(async_client: AsyncClien
     assert response.status_code == 200
     data = response.json()
     assert data["data"]["doc_version"] == 2
+
+
+@pytest.fixture
+async def versioned_phase():
+    from app.db import project_phases_list_table, sdlc_phases_table, sdlc_tasks_table
+    from app.db.transaction.project_tasks_list import project_tasks_list_table
+
+    phase_id = await database.execute(sdlc_phases_table.insert().values(phase_name="Design", phase_code="DS"))
+    project_phase_id = await database.execute(project_phases_list_table.insert().values(project_id=1, phase_id=phase_id))
+    task_ids = []
+    for order, name in enumerate(["URS", "FRS"]):
+        sdlc_task_id = await database.execute(sdlc_tasks_table.insert().values(task_name=name))
+        task_ids.append(await database.execute(project_tasks_list_table.insert().values(
+            project_phase_id=project_phase_id, task_id=sdlc_task_id, task_order_id=order,
+        )))
+    for version in (1, 2, 3):
+        await database.execute(task_docs_table.insert().values(
+            project_task_id=task_ids[0], project_phase_id=project_phase_id, document_json="{}",
+            is_latest=version == 3, doc_version=version, created_date=datetime.utcnow(),
+        ))
+    return project_phase_id, task_ids
+
+
+@pytest.mark.anyio
+async def test_phase_document_index_returns_latest_version_per_task(async_client: AsyncClient, versioned_phase):
+    from app.utils import events
+    from app.utils.phase_document_cache import phase_document_cache
+
+    phase_document_cache.clear()
+    project_phase_id, (urs_task, frs_task) = versioned_phase
+
+    response = await async_client.get(f"/docs/GetPhaseDocumentIndex/{frs_task}")
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert [(d["project_task_id"], float(d["doc_version"]), d["version_count"], d["task_name"], d["phase_code"])
+            for d in data] == [(urs_task, 3.0, 3, "URS", "DS")]
+
+    etag = response.headers["ETag"]
+    cached = await async_client.get(f"/docs/GetPhaseDocumentIndex/{urs_task}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    await database.execute(task_docs_table.insert().values(
+        project_task_id=frs_task, project_phase_id=project_phase_id, document_json="{}", doc_version=1,
+    ))
+    events.publish(events.TASK_DOCUMENT_SAVED, project_task_id=frs_task)
+    refreshed = await async_client.get(f"/docs/GetPhaseDocumentIndex/{urs_task}", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert [d["project_task_id"] for d in refreshed.json()["data"]] == [urs_task, frs_task]
+    phase_document_cache.clear()
+
+
+def test_phase_document_cache_forgets_tasks_of_dropped_phases():
+    from app.utils.phase_document_cache import PhaseDocumentCache
+
+    cache = PhaseDocumentCache(max_entries=1)
+    etag = cache.set(1, [10, 11], b"[]")
+    assert cache.get(11) == (b"[]", etag)
+
+    cache.invalidate(project_task_id=10)
+    assert cache.get(11) is None
+    assert len(cache._task_phase) == 0
+
+    cache.set(1, [10], b"[1]")
+    cache.set(2, [20], b"[2]")
+    # the phase over max_entries is evicted on its own, not with the rest
+    assert cache.get(10) is None
+    assert cache.get(20) is not None
+
+
+@pytest.mark.anyio
+async def test_task_document_versions_newest_first(async_client: AsyncClient, versioned_phase):
+    _, (urs_task, _) = versioned_phase
+
+    response = await async_client.get(f"/docs/GetTaskDocumentVersions/{urs_task}")
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert [float(d["doc_version"]) for d in data] == [3.0, 2.0, 1.0]
+    assert [d["is_latest"] for d in data] == [True, False, False]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("envelope, published", [
+    ('{"status_code": 200, "message": "Task submitted", "data": {"doc_version": 2}}', True),
+    ('{"status_code": 400, "message": "Task is not active", "data": null}', False),
+])
+async def test_submit_announces_only_committed_versions(mocker, envelope, published):
+    db = mocker.Mock(fetch_one=AsyncMock(return_value={"result": envelope}))
+    handler = mocker.Mock()
+    events.subscribe(events.TASK_DOCUMENT_SUBMITTED, handler)
+    try:
+        payload = SubmitProjectTaskDocumentRequest(
+            project_task_id=6, document_json='{"x": 1}', task_status_id=3, updated_by=1
+        )
+        await task_docs_service.submit_project_task_document_service(db, payload)
+    finally:
+        events.unsubscribe(events.TASK_DOCUMENT_SUBMITTED, handler)
+
+    assert handler.called is published
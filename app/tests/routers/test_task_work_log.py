@@ -1,7 +1,21 @@
+import json
 import pytest
 from httpx import AsyncClient
 from fastapi import status
 
+from app.db.database import database
+from app.db.transaction.project_phases_list import project_phases_list_table
+from app.db.transaction.project_tasks_list import project_tasks_list_table
+
+
+@pytest.fixture
+async def project_task_id():
+    """A real project task for the work logs to reference."""
+    project_phase_id = await database.execute(project_phases_list_table.insert().values(project_id=1, phase_id=1))
+    return await database.execute(
+        project_tasks_list_table.insert().values(project_phase_id=project_phase_id, task_id=1, task_status_id=1)
+    )
+
 
 # --- GET: get_task_work_log_details_by_project_task_id (Success) ---
 @pytest.mark.anyio
@@ -31,38 +45,50 @@ async def test_get_task_work_log_details_internal_error(mocker, async_client: As
     assert resp.status_code == 500
 
 
+class ForeignKeyViolation(Exception):
+    sqlstate = "23503"
+
+    def __init__(self, column):
+        super().__init__("insert or update on table \"task_work_log\" violates foreign key constraint")
+        self.detail = f"Key ({column})=(999) is not present in table."
+
+
 # --- POST: create_task_work_log (Success) ---
 @pytest.mark.anyio
 async def test_create_task_work_log_success(mocker, async_client: AsyncClient):
-    mocker.patch("app.services.transaction.task_work_log_service.database.fetch_one", side_effect=[
-        {"project_task_id": 1},  # Project task exists
-        {"user_id": 10}          # User exists
-    ])
-    mocker.patch("app.services.transaction.task_work_log_service.database.execute", return_value=99)
+    fetch_one = mocker.patch("app.services.transaction.task_work_log_service.database.fetch_one")
+    mocker.patch("app.services.transaction.task_work_log_service.database.fetch_all",
+                 return_value=[{"task_work_log_id": 99}])
 
     payload = {"project_task_id": 1, "user_id": 10, "remarks": "Initial log"}
     resp = await async_client.post("/transaction/createTaskWorkLog", json=payload)
 
     assert resp.status_code == status.HTTP_201_CREATED
     assert resp.json()["message"] == "Task work log created successfully"
+    assert resp.json()["data"]["task_work_log_id"] == 99
+    fetch_one.assert_not_called()  # the foreign keys do the validation
 
 
 # --- POST: create_task_work_log (Invalid project_task_id) ---
 @pytest.mark.anyio
 async def test_create_task_work_log_invalid_project_id(mocker, async_client: AsyncClient):
-    mocker.patch("app.services.transaction.task_work_log_service.database.fetch_one", return_value=None)
+    mocker.patch("app.services.transaction.task_work_log_service.database.fetch_all", side_effect=[
+        ForeignKeyViolation("project_task_id"),  # INSERT rejected
+        [],                                      # project task lookup on the error path
+    ])
     payload = {"project_task_id": 999, "user_id": 1, "remarks": "Invalid project"}
     resp = await async_client.post("/transaction/createTaskWorkLog", json=payload)
     assert resp.status_code == 404
     assert "Invalid project_task_id" in resp.text
+    assert resp.json()["data"] == [999]
 
 
 # --- POST: create_task_work_log (Invalid user_id) ---
 @pytest.mark.anyio
 async def test_create_task_work_log_invalid_user(mocker, async_client: AsyncClient):
-    mocker.patch("app.services.transaction.task_work_log_service.database.fetch_one", side_effect=[
-        {"project_task_id": 1},  # Project task exists
-        None                     # User not found
+    mocker.patch("app.services.transaction.task_work_log_service.database.fetch_all", side_effect=[
+        ForeignKeyViolation("user_id"),
+        [],
     ])
     payload = {"project_task_id": 1, "user_id": 99, "remarks": "Invalid user"}
     resp = await async_client.post("/transaction/createTaskWorkLog", json=payload)
@@ -73,12 +99,65 @@ async def test_create_task_work_log_invalid_user(mocker, async_client: AsyncClie
 # --- POST: create_task_work_log (Exception) ---
 @pytest.mark.anyio
 async def test_create_task_work_log_internal_error(mocker, async_client: AsyncClient):
-    mocker.patch("app.services.transaction.task_work_log_service.database.fetch_one", side_effect=Exception("Simulated DB Error"))
+    mocker.patch("app.services.transaction.task_work_log_service.database.fetch_all", side_effect=Exception("Simulated DB Error"))
     payload = {"project_task_id": 1, "user_id": 1, "remarks": "Test"}
     resp = await async_client.post("/transaction/createTaskWorkLog", json=payload)
     assert resp.status_code == 500
 
 
+# --- POST: create_task_work_logs (batch) ---
+@pytest.mark.anyio
+async def test_create_task_work_logs_batch_and_page(async_client: AsyncClient, registered_user, project_task_id):
+    user_id = registered_user["user_id"]
+    payload = {"entries": [
+        {"project_task_id": project_task_id, "user_id": user_id, "remarks": f"log {i}"} for i in range(5)
+    ]}
+    resp = await async_client.post("/transaction/createTaskWorkLogs", json=payload)
+
+    assert resp.status_code == status.HTTP_201_CREATED
+    log_ids = resp.json()["data"]["task_work_log_ids"]
+    assert len(log_ids) == 5
+
+    page = await async_client.get(
+        "/transaction/getTaskWorkLogs", params={"project_task_id": project_task_id, "limit": 3}
+    )
+    body = page.json()
+    assert [w["remarks"] for w in body["data"]] == ["log 0", "log 1", "log 2"]
+    assert body["next_after_id"] == log_ids[2]
+
+    page = await async_client.get(
+        "/transaction/getTaskWorkLogs",
+        params={"project_task_id": project_task_id, "limit": 3, "after_id": body["next_after_id"]},
+    )
+    body = page.json()
+    assert [w["remarks"] for w in body["data"]] == ["log 3", "log 4"]
+    assert body["next_after_id"] is None
+
+
+@pytest.mark.anyio
+async def test_create_task_work_logs_batch_rejects_empty(async_client: AsyncClient):
+    resp = await async_client.post("/transaction/createTaskWorkLogs", json={"entries": []})
+    assert resp.status_code == 422
+
+
+# --- GET: streamTaskWorkLogs ---
+@pytest.mark.anyio
+async def test_stream_task_work_logs(async_client: AsyncClient, registered_user, project_task_id):
+    user_id = registered_user["user_id"]
+    payload = {"entries": [
+        {"project_task_id": project_task_id, "user_id": user_id, "remarks": f"entry {i}"} for i in range(3)
+    ]}
+    await async_client.post("/transaction/createTaskWorkLogs", json=payload)
+
+    resp = await async_client.get("/transaction/streamTaskWorkLogs", params={"project_task_id": project_task_id})
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["remarks"] for line in lines] == ["entry 0", "entry 1", "entry 2"]
+    assert lines[0]["user_id"] == user_id
+
+
 # --- POST: update_project_task_status (Success) ---
 @pytest.mark.anyio
 async def test_update_project_task_status_success(mocker, async_client: AsyncClient):
@@ -2,6 +2,9 @@ import pytest
 from httpx import AsyncClient
 from unittest.mock import MagicMock
 from app.db.database import database
+from app.db.master.json_templates import json_templates_table
+from app.db.master.template_types import template_types_table
+from app.utils import events
 from fastapi import Request
 
 # --------------------------------------------------------------------
@@ -118,3 +121,76 @@ async def test_get_json_template_by_id_not_found(mocker, async_client: AsyncClie
     response = await async_client.get("/master/json-template/778")
     assert response.status_code == 404
     assert response.json()["message"] == "No template found for id 778"
+
+
+# --------------------------------------------------------------------
+# 4. Template registry (latest pointer, immutable contents, ETags)
+# --------------------------------------------------------------------
+async def _insert_template(template_type_id: int, version: float, body: dict) -> int:
+    return await database.execute(
+        json_templates_table.insert().values(
+            template_name="Registry", template_type_id=template_type_id, json_template=body,
+            created_by=1, template_version=version,
+        )
+    )
+
+
+@pytest.mark.anyio
+async def test_latest_template_is_cached_until_a_version_is_created(mocker, async_client: AsyncClient):
+    await database.execute(
+        template_types_table.insert().values(template_type_id=4801, template_type_name="Registry", template_format_type_id=1)
+    )
+    first_id = await _insert_template(4801, 1.0, {"v": 1})
+
+    response = await async_client.get("/master/by-template-type?template_type_id=4801")
+    assert response.json()["data"]["template_id"] == first_id
+    etag = response.headers["etag"]
+
+    # served from the registry: no query, and 304 for a matching ETag
+    fetch_one = mocker.spy(database, "fetch_one")
+    cached = await async_client.get("/master/by-template-type?template_type_id=4801")
+    not_modified = await async_client.get(
+        "/master/by-template-type?template_type_id=4801", headers={"If-None-Match": etag}
+    )
+    assert cached.json() == response.json()
+    assert not_modified.status_code == 304
+    assert fetch_one.call_count == 0
+
+    second_id = await _insert_template(4801, 2.0, {"v": 2})
+    events.publish(events.JSON_TEMPLATE_CREATED, template_type_id=4801)
+
+    response = await async_client.get("/master/by-template-type?template_type_id=4801", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["data"]["template_id"] == second_id
+
+
+@pytest.mark.anyio
+async def test_template_versions_load_each_body_once(mocker, async_client: AsyncClient):
+    await database.execute(
+        template_types_table.insert().values(template_type_id=4802, template_type_name="Versions", template_format_type_id=1)
+    )
+    ids = [await _insert_template(4802, version, {"v": version}) for version in (1.0, 2.0)]
+
+    response = await async_client.get("/master/getAllVersions?template_type_id=4802")
+    assert [t["template_id"] for t in response.json()["data"]] == ids[::-1]
+
+    fetch_all = mocker.spy(database, "fetch_all")
+    again = await async_client.get("/master/getAllVersions?template_type_id=4802")
+    assert again.json() == response.json()
+    assert fetch_all.call_count == 1  # ids only; the bodies come from the registry
+
+    by_id = await async_client.get(f"/master/getJsonTemplate/{ids[0]}")
+    assert by_id.json()["data"]["json_template"] == {"v": 1.0}
+    assert (await async_client.get(
+        f"/master/getJsonTemplate/{ids[0]}", headers={"If-None-Match": by_id.headers["etag"]}
+    )).status_code == 304
+
+
+def test_template_registry_evicts_the_oldest_version_only():
+    from app.utils.template_registry import TemplateRegistry
+
+    registry = TemplateRegistry(max_entries=2)
+    for template_id in (1, 2, 3):
+        registry.put(template_id, {"template_id": template_id})
+
+    assert registry.get_many([1, 2, 3]) == {2: {"template_id": 2}, 3: {"template_id": 3}}
@@ -0,0 +1,135 @@
+import asyncio
+import json
+from datetime import date, datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+import sqlalchemy
+from sqlalchemy import select
+
+from app.db.database import InstrumentedDatabase, database
+from app.db.metadata import metadata
+from app.db.transaction.change_request import change_request_table
+from app.db.transaction.change_request_code_counters import change_request_code_counters
+from app.services.transaction import project_service
+from app.utils import change_request_codes as change_request_codes_module
+from app.utils.change_request_codes import ChangeRequestCodeAllocator, change_request_codes
+
+YEAR = datetime.now().year
+
+
+@pytest.fixture(autouse=True)
+async def reset_counters():
+    await database.execute(change_request_code_counters.delete())
+    change_request_codes.clear()
+    yield
+    await database.execute(change_request_code_counters.delete())
+    change_request_codes.clear()
+
+
+def numbers(codes):
+    assert all(code.startswith(f"CR-{YEAR}-") for code in codes)
+    return sorted(int(code.rsplit("-", 1)[1]) for code in codes)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("block_size", [1, 7])
+async def test_parallel_allocation_is_unique_and_gapless(block_size):
+    allocator = ChangeRequestCodeAllocator(block_size=block_size)
+
+    codes = await asyncio.gather(*(allocator.allocate() for _ in range(50)))
+
+    assert numbers(codes) == list(range(1, 51))
+    last_value = await database.fetch_val(
+        select(change_request_code_counters.c.last_value).where(change_request_code_counters.c.year == YEAR)
+    )
+    # a block reserves ahead of what it has handed out
+    assert last_value == (50 if block_size == 1 else 56)
+
+
+@pytest.mark.anyio
+async def test_years_are_numbered_separately():
+    allocator = ChangeRequestCodeAllocator(block_size=1)
+
+    assert await allocator.allocate(2030) == "CR-2030-1"
+    assert await allocator.allocate(2031) == "CR-2031-1"
+    assert await allocator.allocate(2030) == "CR-2030-2"
+
+
+@pytest.mark.anyio
+async def test_rolled_back_allocation_hands_the_code_back():
+    allocator = ChangeRequestCodeAllocator(block_size=1)
+    await allocator.allocate()
+
+    transaction = await database.transaction()
+    assert await allocator.allocate() == f"CR-{YEAR}-2"
+    await transaction.rollback()
+
+    assert await allocator.allocate() == f"CR-{YEAR}-2"
+
+
+@pytest.fixture
+async def own_connections_database(monkeypatch, tmp_path):
+    # the shared force-rollback connection cannot hold concurrent
+    # transactions, so concurrent creates get a file database where every
+    # task opens its own connection
+    url = f"sqlite:///{tmp_path / 'cr_codes.db'}"
+    engine = sqlalchemy.create_engine(url)
+    metadata.create_all(engine)
+    engine.dispose()
+    db = InstrumentedDatabase(url)
+    await db.connect()
+    monkeypatch.setattr(project_service, "database", db)
+    monkeypatch.setattr(change_request_codes_module, "database", db)
+    yield db
+    await db.disconnect()
+
+
+@pytest.mark.anyio
+async def test_concurrently_created_projects_get_consecutive_codes(monkeypatch, own_connections_database):
+    template = SimpleNamespace(ordered_active_phases=lambda phase_ids: [], tasks_for_phase=lambda phase_id: [])
+    monkeypatch.setattr(project_service.sdlc_template_graph, "get", AsyncMock(return_value=template))
+    request = SimpleNamespace(state=SimpleNamespace(user={"user_id": 1}))
+
+    def payload(n):
+        return SimpleNamespace(
+            project_name=f"CR code stress {n}", project_description="", user_ids=[987001], phase_ids=[1],
+            risk_assessment_id=None, equipment_id=None, start_date=date(2026, 1, 1), end_date=date(2026, 12, 31),
+            renewal_year=None, make=None, model=None, json_template_id=None,
+            change_request_code=None, change_request_json={"reason": f"stress {n}"},
+        )
+
+    responses = await asyncio.gather(
+        *(project_service.create_project_service(payload(n), request=request) for n in range(20))
+    )
+
+    assert [r.status_code for r in responses] == [201] * 20
+    rows = await own_connections_database.fetch_all(select(change_request_table.c.change_request_code))
+    assert numbers([row["change_request_code"] for row in rows]) == list(range(1, 21))
+
+
+@pytest.mark.anyio
+async def test_json_change_request_uploaded_with_a_file_is_numbered(monkeypatch, tmp_path):
+    template = SimpleNamespace(ordered_active_phases=lambda phase_ids: [], tasks_for_phase=lambda phase_id: [])
+    monkeypatch.setattr(project_service.sdlc_template_graph, "get", AsyncMock(return_value=template))
+    monkeypatch.setattr(project_service, "CR_UPLOAD_FOLDER", str(tmp_path))
+    request = SimpleNamespace(state=SimpleNamespace(user={"user_id": 1}))
+    payload = SimpleNamespace(
+        project_name="CR code with file", project_description="", user_ids=[987001], phase_ids=[1],
+        risk_assessment_id=None, equipment_id=None, start_date=date(2026, 1, 1), end_date=date(2026, 12, 31),
+        renewal_year=None, make=None, model=None, json_template_id=None,
+        change_request_code="typed-by-user", change_request_json={"reason": "with file"},
+    )
+    upload = SimpleNamespace(filename="cr.pdf", read=AsyncMock(return_value=b"%PDF"))
+
+    response = await project_service.create_project_service(payload, change_request_file=upload, request=request)
+
+    assert response.status_code == 201
+    project_id = json.loads(response.body)["data"]["project_id"]
+    row = await database.fetch_one(
+        select(change_request_table.c.change_request_code, change_request_table.c.change_request_file)
+        .where(change_request_table.c.project_id == project_id)
+    )
+    assert row["change_request_code"] == f"CR-{YEAR}-1"
+    assert row["change_request_file"].endswith("_cr.pdf")
@@ -0,0 +1,90 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.db.database import database
+from app.db.transaction.comment_replies import comment_replies_table
+from app.db.transaction.project_comments import project_comments_table
+from app.db.transaction.project_tasks_list import project_tasks_list_table
+from app.services.transaction.project_comments_service import COMMENT_SINCE_OVERLAP_SECONDS, get_comments_by_task
+
+T0 = datetime(2025, 1, 1, 9, 0)
+
+
+async def add_comment(task_id, user_id, description, at, **fields):
+    return await database.execute(
+        project_comments_table.insert().values(
+            project_id=1, project_phase_id=7, project_task_id=task_id, description=description,
+            commented_by=user_id, comment_date=at, is_resolved=False, **fields,
+        )
+    )
+
+
+async def add_reply(comment_id, user_id, description, at):
+    return await database.execute(
+        comment_replies_table.insert().values(
+            comment_id=comment_id, reply_description=description, replied_by=user_id, replied_date=at,
+        )
+    )
+
+
+@pytest.fixture
+async def thread(registered_user):
+    user_id = registered_user["user_id"]
+    task_id = await database.execute(project_tasks_list_table.insert().values(project_phase_id=7, task_status_id=1))
+    old = await add_comment(task_id, user_id, "old", T0)
+    edited = await add_comment(task_id, user_id, "edited", T0, update_date=T0 + timedelta(hours=2))
+    replied = await add_comment(task_id, user_id, "replied", T0)
+    await add_reply(replied, user_id, "early reply", T0)
+    await add_reply(replied, user_id, "late reply", T0 + timedelta(hours=3))
+    return {"task_id": task_id, "old": old, "edited": edited, "replied": replied}
+
+
+@pytest.mark.anyio
+async def test_full_fetch_returns_high_water_mark(thread):
+    response = await get_comments_by_task(thread["task_id"])
+    body = json.loads(response.body)
+
+    assert response.status_code == 200
+    assert len(body["data"]) == 3
+    assert body["high_water_mark"] == (T0 + timedelta(hours=3)).isoformat()
+
+
+@pytest.mark.anyio
+async def test_since_returns_only_changed_comments_and_replies(thread):
+    since = (T0 + timedelta(hours=1)).replace(tzinfo=timezone.utc)
+    response = await get_comments_by_task(thread["task_id"], since=since)
+    body = json.loads(response.body)
+
+    assert response.status_code == 200
+    comments = {c["comment_id"]: c for c in body["data"]}
+    assert set(comments) == {thread["edited"], thread["replied"]}
+    assert comments[thread["edited"]]["description"] == "edited"
+    assert [r["reply_description"] for r in comments[thread["replied"]]["replies"]] == ["late reply"]
+    assert body["high_water_mark"] == (T0 + timedelta(hours=3)).isoformat()
+
+
+@pytest.mark.anyio
+async def test_since_with_nothing_new_is_not_an_error(thread):
+    since = T0 + timedelta(hours=3, seconds=COMMENT_SINCE_OVERLAP_SECONDS + 1)
+    response = await get_comments_by_task(thread["task_id"], since=since)
+    body = json.loads(response.body)
+
+    assert response.status_code == 200
+    assert body["data"] == []
+    assert body["high_water_mark"] == since.isoformat()
+
+
+@pytest.mark.anyio
+async def test_row_committed_after_the_mark_but_stamped_before_it_arrives(registered_user, thread):
+    mark = json.loads((await get_comments_by_task(thread["task_id"])).body)["high_water_mark"]
+    late = await add_comment(
+        thread["task_id"], registered_user["user_id"], "late commit", T0 + timedelta(hours=3, seconds=-5)
+    )
+
+    response = await get_comments_by_task(thread["task_id"], since=datetime.fromisoformat(mark))
+    body = json.loads(response.body)
+
+    assert late in {c["comment_id"] for c in body["data"]}
+    assert body["high_water_mark"] == mark
@@ -0,0 +1,188 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.db.database import database
+from app.db.transaction.comment_replies import comment_replies_table
+from app.db.transaction.project_comments import project_comments_table
+from app.main import app
+from app.schemas.transaction.project_comments_schema import CommentReplyCreateRequest, CommentUpdateRequest
+from app.services.transaction.project_comments_service import create_comment_reply, update_project_comment
+from app.utils.comment_stream import COMMENT_CREATED, COMMENT_UPDATED, CommentStream, comment_stream
+
+
+@pytest.fixture(autouse=True)
+def reset_comment_stream():
+    comment_stream.clear()
+    yield
+    comment_stream.clear()
+
+
+def decode(messages):
+    return [json.loads(m) for m in messages]
+
+
+@pytest.mark.anyio
+async def test_live_events_reach_only_subscribers_of_the_phase():
+    stream = CommentStream()
+    phase_7, _, _ = stream.subscribe([7])
+    phase_8, _, _ = stream.subscribe([8])
+
+    stream.publish(7, COMMENT_CREATED, comment_id=1, data={"description": "first"})
+
+    event = json.loads(await phase_7.next())
+    assert event["seq"] == 1
+    assert event["event"] == COMMENT_CREATED
+    assert event["project_phase_id"] == 7
+    assert event["data"] == {"description": "first"}
+    assert phase_8.queue.empty()
+
+
+@pytest.mark.anyio
+async def test_resume_replays_missed_events_in_order():
+    stream = CommentStream()
+    stream.publish(7, COMMENT_CREATED, comment_id=1)
+    stream.publish(8, COMMENT_CREATED, comment_id=2)
+    stream.publish(7, COMMENT_UPDATED, comment_id=1)
+
+    _, missed, resync = stream.subscribe([7, 8], after_seq=1, stream_id=stream.stream_id)
+
+    assert not resync
+    assert [(e["seq"], e["comment_id"]) for e in decode(missed)] == [(2, 2), (3, 1)]
+
+
+@pytest.mark.anyio
+async def test_resume_asks_for_resync_when_events_are_gone():
+    stream = CommentStream(buffer_size=2, max_phases=1)
+    for comment_id in range(3):
+        stream.publish(7, COMMENT_CREATED, comment_id=comment_id)
+
+    _, missed, resync = stream.subscribe([7], after_seq=0, stream_id=stream.stream_id)
+    assert resync and len(missed) == 2
+
+    # another process (or a restart) has a different stream id
+    _, missed, resync = stream.subscribe([7], after_seq=3, stream_id="other")
+    assert resync and missed == []
+
+    # phase 7 is forgotten once another phase takes its slot
+    stream.publish(9, COMMENT_CREATED, comment_id=10)
+    _, missed, resync = stream.subscribe([7], after_seq=2, stream_id=stream.stream_id)
+    assert resync and missed == []
+
+
+@pytest.mark.anyio
+async def test_slow_subscriber_is_told_to_resync(monkeypatch):
+    monkeypatch.setattr("app.utils.comment_stream.SUBSCRIBER_QUEUE_SIZE", 2)
+    stream = CommentStream()
+    subscription, _, _ = stream.subscribe([7])
+    for comment_id in range(3):
+        stream.publish(7, COMMENT_CREATED, comment_id=comment_id)
+
+    assert await subscription.next() is None
+
+
+@pytest.mark.anyio
+async def test_comment_update_is_published_to_its_phase():
+    comment_id = await database.execute(
+        project_comments_table.insert().values(project_id=3, project_phase_id=7, description="old", is_resolved=False)
+    )
+    subscription, _, _ = comment_stream.subscribe([7])
+
+    response = await update_project_comment(
+        CommentUpdateRequest(comment_id=comment_id, description="new", updated_by=1)
+    )
+
+    assert response.status_code == 200
+    event = json.loads(await subscription.next())
+    assert event["event"] == COMMENT_UPDATED
+    assert event["comment_id"] == comment_id
+    assert event["project_id"] == 3
+    assert event["data"]["description"] == "new"
+
+
+@pytest.mark.anyio
+async def test_reply_is_published_only_after_commit():
+    comment_id = await database.execute(
+        project_comments_table.insert().values(project_id=3, project_phase_id=7, description="q", is_resolved=False)
+    )
+    subscription, _, _ = comment_stream.subscribe([7])
+    reply = CommentReplyCreateRequest(comment_id=comment_id, reply_description="a", replied_by=1)
+
+    # marking the comment resolved fails: the reply rolls back and nobody hears of it
+    fetch_one, calls = database.fetch_one, []
+
+    async def fail_second_statement(query, *args, **kwargs):
+        calls.append(query)
+        if len(calls) == 2:
+            raise Exception("DB error")
+        return await fetch_one(query, *args, **kwargs)
+
+    with patch.object(database, "fetch_one", side_effect=fail_second_statement):
+        response = await create_comment_reply(database, reply)
+
+    assert response.status_code == 500
+    assert subscription.queue.empty()
+    assert await database.fetch_all(
+        comment_replies_table.select().where(comment_replies_table.c.comment_id == comment_id)
+    ) == []
+
+    response = await create_comment_reply(database, reply)
+    assert response.status_code == 201
+    assert json.loads(await subscription.next())["comment_id"] == comment_id
+
+
+@pytest.fixture
+def user_phases(monkeypatch):
+    # the token's user (userId 1) may see phases 7 and 8
+    lookup = AsyncMock(return_value=[7, 8])
+    monkeypatch.setattr("app.routers.websocket.get_user_comment_phase_ids", lookup)
+    return lookup
+
+
+@pytest.mark.anyio
+async def test_websocket_replays_from_sequence(auth_token, user_phases):
+    comment_stream.publish(7, COMMENT_CREATED, comment_id=1)
+    comment_stream.publish(7, COMMENT_UPDATED, comment_id=1)
+
+    client = TestClient(app)
+    url = f"/ws/comments/events?token={auth_token}&phases=7&after_seq=1&stream_id={comment_stream.stream_id}"
+    with client.websocket_connect(url) as ws:
+        hello = ws.receive_json()
+        assert hello["type"] == "hello"
+        assert hello["seq"] == 2
+        assert hello["project_phase_ids"] == [7]
+
+        replayed = ws.receive_json()
+        assert (replayed["seq"], replayed["event"]) == (2, COMMENT_UPDATED)
+
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong", "seq": 2}
+
+
+@pytest.mark.anyio
+async def test_websocket_rejects_invalid_token():
+    client = TestClient(app)
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with client.websocket_connect("/ws/comments/events?token=bad&phases=7") as ws:
+            ws.receive_json()
+    assert exc.value.code == 1008
+
+
+@pytest.mark.anyio
+async def test_websocket_subscribes_only_to_the_users_phases(auth_token, user_phases):
+    client = TestClient(app)
+    with client.websocket_connect(f"/ws/comments/events?token={auth_token}&phases=7,99") as ws:
+        assert ws.receive_json()["project_phase_ids"] == [7]
+    user_phases.assert_awaited_with(1)
+
+    with client.websocket_connect(f"/ws/comments/events?token={auth_token}") as ws:
+        assert ws.receive_json()["project_phase_ids"] == [7, 8]
+
+    for phases in ("99", "7,abc"):
+        with pytest.raises(WebSocketDisconnect) as exc:
+            with client.websocket_connect(f"/ws/comments/events?token={auth_token}&phases={phases}") as ws:
+                ws.receive_json()
+        assert exc.value.code == 1008
@@ -0,0 +1,73 @@
+import logging
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.db.database import database
+from app.schemas.forgot_password_schema import ForgotPasswordRequest
+from app.services.forgot_password_service import process_forgot_password
+from app.services.otp_service import forgot_password_email_limiter, forgot_password_ip_limiter
+from app.utils.job_runner import job_runner
+
+logger = logging.getLogger(__name__)
+
+BURST = 200
+
+
+def spy_queries(mocker):
+    return [
+        mocker.spy(database, name)
+        for name in ("fetch_one", "fetch_all", "fetch_val", "execute", "execute_many")
+    ]
+
+
+@pytest.mark.anyio
+async def test_enumeration_burst_from_one_client(async_client, mocker):
+    """
+    One client probing many addresses: after the IP bucket is spent every
+    request is answered 429 from memory.
+    """
+    calls = spy_queries(mocker)
+
+    started = time.perf_counter()
+    codes = []
+    for i in range(BURST):
+        response = await async_client.post("/forgot-password", json={"email": f"probe{i}@example.com"})
+        codes.append(response.status_code)
+    elapsed = time.perf_counter() - started
+
+    round_trips = sum(spy.call_count for spy in calls)
+    logger.info(f"{BURST} probes: {BURST / elapsed:.0f} req/s, {round_trips} queries, {codes.count(429)} throttled")
+    assert codes.count(404) == forgot_password_ip_limiter.capacity
+    assert codes.count(429) == BURST - forgot_password_ip_limiter.capacity
+    assert round_trips == forgot_password_ip_limiter.capacity
+
+
+@pytest.mark.anyio
+async def test_distributed_burst_on_one_address(registered_user, mock_httpx_client, mocker):
+    """
+    Many clients hammering one address: OTP writes and emails stop at the
+    per-email bucket.
+    """
+    calls = spy_queries(mocker)
+    payload = ForgotPasswordRequest(email=registered_user["email"])
+
+    started = time.perf_counter()
+    sent = throttled = 0
+    for i in range(BURST):
+        try:
+            await process_forgot_password(payload, client_ip=f"10.0.{i // 250}.{i % 250}")
+            sent += 1
+        except HTTPException as e:
+            assert e.status_code == 429
+            throttled += 1
+    elapsed = time.perf_counter() - started
+    await job_runner.drain()
+
+    round_trips = sum(spy.call_count for spy in calls)
+    logger.info(f"{BURST} resets: {BURST / elapsed:.0f} req/s, {round_trips} queries, {throttled} throttled")
+    assert sent == forgot_password_email_limiter.capacity
+    # one user lookup and one OTP upsert per accepted request
+    assert round_trips == 2 * sent
+    assert mock_httpx_client.post.await_count == sent
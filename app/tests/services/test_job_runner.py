@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from app.db.database import database
+from app.db.transaction.background_jobs import background_jobs
+from app.services import background_jobs_service  # noqa: F401  registers the app's jobs
+from app.utils.job_runner import JOB_FAILED, JOB_QUEUED, JOB_SUCCEEDED, JobError, JobRunner, job_runner
+
+
+@pytest.mark.anyio
+async def test_job_reports_progress_and_result():
+    runner = JobRunner()
+    seen = []
+
+    async def handler(ctx, value):
+        await ctx.report(50, "half way")
+        seen.append((ctx.job.progress, ctx.job.message))
+        return value * 2
+
+    runner.register("double", handler)
+    job = await runner.submit("double", {"value": 21}, created_by=7)
+    assert job.status == JOB_QUEUED
+
+    await runner.drain()
+
+    job = await runner.get(job.job_id)
+    assert job.status == JOB_SUCCEEDED
+    assert job.result == 42
+    assert job.progress == 100
+    assert job.created_by == 7
+    assert seen == [(50, "half way")]
+
+
+@pytest.mark.anyio
+async def test_retries_until_success_and_stops_on_non_retryable_error():
+    runner = JobRunner()
+    calls = {"flaky": 0, "bad": 0}
+
+    async def flaky(ctx):
+        calls["flaky"] += 1
+        if calls["flaky"] < 3:
+            raise RuntimeError("temporary")
+        return "ok"
+
+    async def bad(ctx):
+        calls["bad"] += 1
+        raise JobError("Project not found.", result={"status_code": 404})
+
+    runner.register("flaky", flaky, max_retries=2, retry_delay=0)
+    runner.register("bad", bad, max_retries=2, retry_delay=0)
+    flaky_job = await runner.submit("flaky")
+    bad_job = await runner.submit("bad")
+    await runner.drain()
+
+    assert flaky_job.status == JOB_SUCCEEDED and flaky_job.attempts == 3
+    assert bad_job.status == JOB_FAILED and bad_job.attempts == 1
+    assert bad_job.error == "Project not found."
+    assert bad_job.result == {"status_code": 404}
+
+
+@pytest.mark.anyio
+async def test_concurrency_limit_per_job_type():
+    runner = JobRunner()
+    running = {"now": 0, "peak": 0}
+
+    async def slow(ctx):
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+
+    runner.register("slow", slow, concurrency=2)
+    for _ in range(6):
+        await runner.submit("slow")
+    await runner.drain()
+
+    assert running["peak"] == 2
+
+
+@pytest.mark.anyio
+async def test_persistent_queue_records_status_and_resumes():
+    async def echo(ctx, value):
+        return {"value": value}
+
+    runner = JobRunner(persist=True)
+    runner.register("echo", echo, resumable=True)
+    job = await runner.submit("echo", {"value": 1})
+    await runner.drain()
+
+    row = await database.fetch_one(background_jobs.select().where(background_jobs.c.job_id == job.job_id))
+    assert row["status"] == JOB_SUCCEEDED
+    assert row["result"] == {"value": 1}
+
+    # a job left queued by a previous process is picked up by a new runner
+    await database.execute(
+        background_jobs.insert().values(
+            job_id="a" * 32, job_type="echo", status=JOB_QUEUED, progress=0, attempts=0, payload={"value": 5}
+        )
+    )
+    restarted = JobRunner(persist=True)
+    restarted.register("echo", echo, resumable=True)
+    assert await restarted.resume_pending() == 1
+    await restarted.drain()
+
+    resumed = await restarted.get("a" * 32)
+    assert resumed.status == JOB_SUCCEEDED
+    assert resumed.result == {"value": 5}
+
+
+def test_task_document_submission_is_never_rerun():
+    spec = job_runner._specs["submit_task_document"]
+    assert spec.max_retries == 0 and spec.resumable is False
@@ -0,0 +1,83 @@
+import pytest
+from sqlalchemy import select
+
+from app.config import config
+from app.db.database import database
+from app.db.transaction.incident_reports import incident_report_transactions
+from app.db.transaction.json_template_transactions import json_template_transactions
+from app.services.transaction import json_template_versions_service
+from app.services.transaction.json_template_versions_service import load_template_json, store_template_json
+from app.utils.json_diff import apply_patch, diff, strip_review_values
+
+FORM = {
+    "title": "CR-12",
+    "fields": [{"label": "Reason", "value": "Audit"}, {"label": "Impact", "value": "Low"}],
+    "notes": "x" * 200,
+}
+
+
+@pytest.fixture
+def patch_storage(monkeypatch):
+    monkeypatch.setattr(config, "JSON_TEMPLATE_PATCH_STORAGE", True)
+    monkeypatch.setattr(json_template_versions_service, "JSON_SNAPSHOT_INTERVAL", 3)
+
+
+def test_diff_reports_paths_and_round_trips():
+    new = {
+        "title": "CR-12",
+        "fields": [{"label": "Reason", "value": "Audit"}, {"label": "Risk", "value": "High"},
+                   {"label": "Impact", "value": "Medium"}],
+        "a/b": 1,
+    }
+
+    ops = diff(FORM, new)
+
+    assert {"op": "remove", "path": "/notes", "old": FORM["notes"]} in ops
+    assert {"op": "add", "path": "/a~1b", "value": 1} in ops
+    assert {"op": "add", "path": "/fields/1", "value": {"label": "Risk", "value": "High"}} in ops
+    assert {"op": "replace", "path": "/fields/1/value", "value": "Medium", "old": "Low"} in ops
+    assert apply_patch(FORM, strip_review_values(ops)) == new
+    assert diff(FORM, FORM) == []
+
+
+@pytest.mark.anyio
+async def test_versions_stored_as_patches_with_snapshot_interval(patch_storage):
+    versions, ids, base = [], [], None
+    for n in range(5):
+        form = {**FORM, "fields": FORM["fields"] + [{"label": f"Extra {i}", "value": i} for i in range(n)]}
+        base = await store_template_json(database, form, 1, base)
+        versions.append(form)
+        ids.append(base)
+
+    rows = await database.fetch_all(
+        select(json_template_transactions).where(json_template_transactions.c.transaction_template_id.in_(ids))
+        .order_by(json_template_transactions.c.transaction_template_id)
+    )
+    assert [row["chain_depth"] for row in rows] == [0, 1, 2, 0, 1]
+    assert rows[1]["template_json"] is None and rows[1]["patch_json"]
+    for transaction_id, form in zip(ids, versions):
+        assert await load_template_json(database, transaction_id) == form
+
+
+@pytest.mark.anyio
+async def test_compare_endpoints(async_client, patch_storage):
+    old_id = await store_template_json(database, FORM, 1)
+    new_id = await store_template_json(database, {**FORM, "title": "CR-13"}, 1, old_id)
+    for transaction_id in (old_id, new_id):
+        await database.execute(
+            incident_report_transactions.insert().values(
+                incident_report_id=4701, transaction_template_id=transaction_id, role_id=2, status=3,
+            )
+        )
+
+    response = await async_client.get(f"/docs/compare_json/{old_id}/{new_id}")
+    assert response.status_code == 200
+    assert response.json()["data"]["changes"] == [
+        {"op": "replace", "path": "/title", "value": "CR-13", "old": "CR-12"}
+    ]
+
+    history = (await async_client.get("/docs/compare_json/incident/4701")).json()["data"]["versions"]
+    assert [v["transaction_template_id"] for v in history] == [old_id, new_id]
+    assert history[1]["summary"] == {"add": 0, "remove": 0, "replace": 1}
+
+    assert (await async_client.get(f"/docs/compare_json/{old_id}/999999")).status_code == 404
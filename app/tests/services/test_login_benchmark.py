@@ -0,0 +1,60 @@
+import asyncio
+import logging
+import time
+
+import pytest
+from sqlalchemy import insert
+
+from app.db import user_role_mapping_table, user_roles_table
+from app.db.configuration.configurations import configurations as configurations_table
+from app.db.database import database
+from app.services import login_service
+from app.utils.user_utils import role_cache
+
+logger = logging.getLogger(__name__)
+
+LOGINS = 20
+PASSWORD = "StrongPassword123"
+
+
+async def seed_login_user(create_user):
+    email = await create_user(password=PASSWORD)
+    user_id = await database.fetch_val(
+        "SELECT user_id FROM users WHERE email = :email", {"email": email}
+    )
+    role_id = await database.execute(insert(user_roles_table).values(role_name="BenchRole", is_active=True))
+    await database.execute(insert(user_role_mapping_table).values(user_id=user_id, role_id=role_id, is_active=True))
+    for key, value in (("MAX_FAILED_ATTEMPTS", "5"), ("LOCK_DURATION_MINUTES", "20"), ("PASSWORD_EXPIRY_DAYS", "90")):
+        await database.execute(insert(configurations_table).values(config_key=key, config_value=value, is_active=True))
+    return email
+
+
+@pytest.mark.anyio
+async def test_login_round_trips_per_successful_login(async_client, create_user, mocker):
+    email = await seed_login_user(create_user)
+    login_service.CONFIG_CACHE.clear()
+    role_cache.clear()
+    payload = {"user_email": email, "user_password": PASSWORD}
+
+    # Warm the config cache; steady-state logins are what we measure
+    response = await async_client.post("/auth/login", json=payload)
+    assert response.status_code == 200
+    assert response.json()["user_role"] == "BenchRole"
+    await asyncio.sleep(0.01)
+
+    calls = [
+        mocker.spy(database, name)
+        for name in ("fetch_one", "fetch_all", "fetch_val", "execute", "execute_many")
+    ]
+
+    started = time.perf_counter()
+    for _ in range(LOGINS):
+        response = await async_client.post("/auth/login", json=payload)
+        assert response.status_code == 200
+    elapsed = time.perf_counter() - started
+    # let the fire-and-forget audit inserts run so they are counted
+    await asyncio.sleep(0.01)
+
+    round_trips = sum(spy.call_count for spy in calls)
+    logger.info(f"{LOGINS} logins: {round_trips / LOGINS:.1f} queries/login, {elapsed / LOGINS * 1000:.1f}ms/login")
+    assert round_trips <= 2 * LOGINS
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app.db.database import database
+from app.db.transaction.project_task_users import project_task_users_table
+from app.utils.membership import sync_memberships
+
+TASK_ID = 987654
+
+
+async def active_users():
+    rows = await database.fetch_all(
+        select(project_task_users_table.c.user_id)
+        .where(project_task_users_table.c.project_task_id == TASK_ID)
+        .where(project_task_users_table.c.user_is_active == True)
+    )
+    return sorted(row.user_id for row in rows)
+
+
+@pytest.mark.anyio
+async def test_sync_memberships_diff_uses_constant_statements(mocker):
+    args = (
+        database,
+        project_task_users_table,
+        {"project_task_id": TASK_ID},
+        project_task_users_table.c.user_id,
+        project_task_users_table.c.user_is_active,
+    )
+    await sync_memberships(*args, desired=range(1, 51))
+    assert await active_users() == list(range(1, 51))
+
+    execute = mocker.spy(database, "execute")
+    fetch_all = mocker.spy(database, "fetch_all")
+    changes = await sync_memberships(*args, desired=range(26, 76))
+
+    # One read, one multi-row insert, one bulk deactivate
+    assert fetch_all.call_count == 1
+    assert execute.call_count == 2
+    assert changes.added == list(range(51, 76))
+    assert changes.deactivated == list(range(1, 26))
+    assert await active_users() == list(range(26, 76))
+
+    execute.reset_mock()
+    fetch_all.reset_mock()
+    changes = await sync_memberships(*args, add=[1, 2, 3], remove=[26])
+
+    assert changes.reactivated == [1, 2, 3]
+    assert changes.added == []
+    assert execute.call_count == 2
+    assert await active_users() == [1, 2, 3] + list(range(27, 76))
+
+
+@pytest.mark.anyio
+async def test_assign_users_to_every_task_in_phase(mocker):
+    from app.db.transaction.project_phases_list import project_phases_list_table
+    from app.db.transaction.project_tasks_list import project_tasks_list_table
+    from app.db.transaction.users import users
+    from app.schemas.transaction.project_task_schema import MapUsersToTasksRequest
+    from app.services.transaction.project_task_service import map_users_to_project_tasks_service
+    from sqlalchemy import insert
+
+    phase_id = await database.execute(insert(project_phases_list_table).values(project_id=1, phase_id=1))
+    task_ids = [
+        await database.execute(insert(project_tasks_list_table).values(project_phase_id=phase_id, task_id=t))
+        for t in range(40)
+    ]
+    user_ids = [
+        await database.execute(insert(users).values(user_name=f"reviewer{u}", email=f"reviewer{u}@example.com"))
+        for u in range(6)
+    ]
+
+    await database.execute(
+        insert(project_task_users_table).values(project_task_id=task_ids[0], user_id=user_ids[0], user_is_active=None)
+    )
+
+    execute = mocker.spy(database, "execute")
+    fetch_all = mocker.spy(database, "fetch_all")
+    resp = await map_users_to_project_tasks_service(
+        database, MapUsersToTasksRequest(project_phase_id=phase_id, user_ids=user_ids[:5])
+    )
+    assert resp.status_code == 200
+    # task ids, known users and the mapping are read once each, then the count UPDATE ... RETURNING;
+    # one insert for every task and one reactivation of the NULL-flagged row
+    assert fetch_all.call_count == 4
+    assert execute.call_count == 2
+
+    resp = await map_users_to_project_tasks_service(
+        database, MapUsersToTasksRequest(project_task_ids=task_ids[:2], user_ids=user_ids[3:] + [999999])
+    )
+    tasks = {t["project_task_id"]: t["active_users_count"] for t in json.loads(resp.body)["data"]["tasks"]}
+    assert tasks == {task_ids[0]: 3, task_ids[1]: 3}
+
+    rows = await database.fetch_all(
+        select(project_tasks_list_table.c.project_task_id, project_tasks_list_table.c.task_users_count)
+        .where(project_tasks_list_table.c.project_phase_id == phase_id)
+    )
+    counts = {row.project_task_id: row.task_users_count for row in rows}
+    assert counts[task_ids[0]] == 3
+    assert all(counts[t] == 5 for t in task_ids[2:])
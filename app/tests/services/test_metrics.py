@@ -0,0 +1,83 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+from prometheus_client import REGISTRY
+
+from app.middleware.metrics_middleware import RequestMetricsMiddleware
+from app.services.transaction.task_work_log_service import get_task_work_logs
+from app.utils.metrics import UNMATCHED_ROUTE
+from app.utils.ttl_cache import TTLCache
+from app.utils.user_utils import fetch_user_by_email
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.anyio
+async def test_queries_are_timed_per_calling_function(registered_user):
+    lookup = "utils.user_utils.fetch_user_by_email"
+    listing = "services.transaction.task_work_log_service.get_task_work_logs"
+    before = sample("db_query_duration_seconds_count", operation="fetch_one", caller=lookup)
+    listings_before = sample("db_rows_returned_count", caller=listing)
+
+    await fetch_user_by_email(registered_user["email"])
+    await get_task_work_logs(project_task_id=1)
+
+    # cached_user sits between fetch_user_by_email and the query and is skipped
+    assert sample("db_query_duration_seconds_count", operation="fetch_one", caller=lookup) == before + 1
+    assert sample("db_rows_returned_count", caller=listing) == listings_before + 1
+    assert sample("db_queries_in_flight", route="background") == 0
+
+
+@pytest.mark.anyio
+async def test_round_trips_are_recorded_per_route(async_client):
+    route = "/transaction/getTaskWorkLogs"
+    before = sample("http_request_db_round_trips_count", route=route)
+    trips_before = sample("http_request_db_round_trips_sum", route=route)
+
+    response = await async_client.get("/transaction/getTaskWorkLogs", params={"project_task_id": 1})
+
+    assert response.status_code == 200
+    assert sample("http_request_db_round_trips_count", route=route) == before + 1
+    assert sample("http_request_db_round_trips_sum", route=route) == trips_before + 1
+    assert sample(
+        "db_query_duration_seconds_count",
+        operation="fetch_all",
+        caller="services.transaction.task_work_log_service.get_task_work_logs",
+    ) >= 1
+
+    exposed = await async_client.get("/metrics")
+    assert "http_request_db_round_trips_bucket" in exposed.text
+    assert "db_query_duration_seconds_bucket" in exposed.text
+
+
+@pytest.mark.anyio
+async def test_multipart_upload_bytes_are_counted():
+    async def app(scope, receive, send):
+        while (await receive()).get("more_body"):
+            pass
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    before = sample("upload_bytes_total", route=UNMATCHED_ROUTE)
+    transport = ASGITransport(app=RequestMetricsMiddleware(app))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/upload", files={"file": ("a.txt", b"x" * 4096)})
+        await client.post("/plain", json={"not": "counted"})
+
+    assert response.status_code == 204
+    received = sample("upload_bytes_total", route=UNMATCHED_ROUTE) - before
+    assert 4096 < received < 4096 + 1024
+
+
+@pytest.mark.anyio
+async def test_named_ttl_cache_counts_hits_and_misses():
+    cache = TTLCache(ttl=60, name="test_cache")
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert "a" in cache
+
+    assert sample("cache_lookups_total", cache="test_cache", result="hit") == 1
+    assert sample("cache_lookups_total", cache="test_cache", result="miss") == 1
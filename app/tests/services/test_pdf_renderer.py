@@ -0,0 +1,78 @@
+import asyncio
+import os
+
+import pytest
+
+from app.utils.pdf_renderer import BlockedResourceError, PdfRenderer, inline_only_url_fetcher
+
+RENDER_LOG = "PDF_RENDER_TEST_LOG"
+
+
+def logging_render(html):
+    # runs in the worker process; the log shows how many renders happened
+    with open(os.environ[RENDER_LOG], "a") as f:
+        f.write("render\n")
+    return b"%PDF-1.4 " + html.encode("utf-8")
+
+
+@pytest.fixture
+def renderer(tmp_path, monkeypatch):
+    monkeypatch.setenv(RENDER_LOG, str(tmp_path / "renders.log"))
+    renderer = PdfRenderer(folder=str(tmp_path / "cache"), workers=2, render_fn=logging_render)
+    yield renderer
+    renderer.shutdown()
+
+
+def render_count(tmp_path):
+    log = tmp_path / "renders.log"
+    return len(log.read_text().splitlines()) if log.exists() else 0
+
+
+@pytest.mark.anyio
+async def test_concurrent_requests_share_one_render(renderer, tmp_path):
+    paths = await asyncio.gather(*(renderer.render(7, "<p>Report</p>") for _ in range(5)))
+
+    assert len(set(paths)) == 1
+    assert render_count(tmp_path) == 1
+    with open(paths[0], "rb") as f:
+        assert f.read().startswith(b"%PDF-1.4 <!DOCTYPE html>")
+
+    assert await renderer.render(7, "<p>Report</p>") == paths[0]
+    assert render_count(tmp_path) == 1
+
+
+@pytest.mark.anyio
+async def test_new_content_or_template_version_renders_again(renderer, tmp_path):
+    renderer.min_age = 0
+    first = await renderer.render(7, "<p>Draft</p>")
+    second = await renderer.render(7, "<p>Final</p>")
+
+    assert first != second and not os.path.exists(first)
+    renderer.template_version += 1
+    assert renderer.cached(7, "<p>Final</p>") is None
+    third = await renderer.render(7, "<p>Final</p>")
+    assert os.listdir(renderer.folder) == [os.path.basename(third)]
+    assert render_count(tmp_path) == 3
+
+
+@pytest.mark.anyio
+async def test_recently_served_versions_are_kept(renderer):
+    first = await renderer.render(7, "<p>Draft</p>")
+    second = await renderer.render(7, "<p>Final</p>")
+
+    # the draft may still be streaming to a client
+    assert os.path.exists(first) and os.path.exists(second)
+
+    os.utime(first, (0, 0))
+    await renderer.render(7, "<p>Final v2</p>")
+    assert not os.path.exists(first) and os.path.exists(second)
+
+
+@pytest.mark.parametrize("url", [
+    "file:///etc/passwd",
+    "http://169.254.169.254/latest/meta-data/",
+    "https://intranet.example/logo.png",
+])
+def test_render_fetches_no_external_resources(url):
+    with pytest.raises(BlockedResourceError):
+        inline_only_url_fetcher(url)
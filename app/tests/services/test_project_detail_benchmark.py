@@ -0,0 +1,73 @@
+import logging
+import time
+
+import pytest
+
+from app.services.transaction import project_service
+from app.services.transaction.project_service import (
+    database, insert, projects, risk_assessment_table, sdlc_phases_table, sdlc_tasks_table,
+    project_phases_list_table, project_tasks_list_table, project_task_users_table, users,
+)
+
+logger = logging.getLogger(__name__)
+
+PHASES = 20
+TASKS_PER_PHASE = 15  # 300 tasks in total
+
+
+async def seed_large_project():
+    risk_id = await database.execute(
+        insert(risk_assessment_table).values(risk_assessment_name="BenchRisk", is_active=True)
+    )
+    project_id = await database.execute(
+        insert(projects).values(
+            project_name="BenchProject", project_description="20 phases / 300 tasks",
+            risk_assessment_id=risk_id, created_by=1, status_id=1, is_active=True,
+            created_date=project_service.datetime.utcnow(),
+        )
+    )
+    user_id = await database.execute(
+        insert(users).values(user_name="bench_user", email="bench@example.com", is_active=True)
+    )
+
+    for p in range(PHASES):
+        phase_id = await database.execute(
+            insert(sdlc_phases_table).values(phase_name=f"Phase {p}", order_id=p, is_active=True)
+        )
+        project_phase_id = await database.execute(
+            insert(project_phases_list_table).values(project_id=project_id, phase_id=phase_id, phase_order_id=p)
+        )
+        for t in range(TASKS_PER_PHASE):
+            task_id = await database.execute(
+                insert(sdlc_tasks_table).values(task_name=f"Task {p}.{t}", order_id=t, is_active=True)
+            )
+            project_task_id = await database.execute(
+                insert(project_tasks_list_table).values(
+                    project_phase_id=project_phase_id, task_id=task_id, task_status_id=1 + t % 3
+                )
+            )
+            await database.execute(
+                insert(project_task_users_table).values(
+                    project_task_id=project_task_id, user_id=user_id, user_is_active=True
+                )
+            )
+    return project_id
+
+
+@pytest.mark.anyio
+async def test_project_detail_benchmark_20_phases_300_tasks(mocker):
+    project_id = await seed_large_project()
+    fetch_one = mocker.spy(database, "fetch_one")
+    fetch_all = mocker.spy(database, "fetch_all")
+
+    started = time.perf_counter()
+    result = await project_service.get_project_detail(project_id)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info(f"get_project_detail: {PHASES} phases / {PHASES * TASKS_PER_PHASE} tasks in {elapsed_ms:.1f} ms")
+
+    assert len(result.phases) == PHASES
+    assert sum(len(p.tasks) for p in result.phases) == PHASES * TASKS_PER_PHASE
+    assert all(p.status_id == 3 for p in result.phases)
+    assert all(len(t.task_users) == 1 for p in result.phases for t in p.tasks)
+    # query count does not grow with the number of phases or tasks
+    assert fetch_one.call_count + fetch_all.call_count == 8
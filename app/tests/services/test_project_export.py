@@ -0,0 +1,108 @@
+import io
+import json
+import zipfile
+
+import pytest
+
+from app.db.database import database
+from app.db.transaction.comment_replies import comment_replies_table
+from app.db.transaction.project_comments import project_comments_table
+from app.services.transaction import project_export_service
+from app.services.transaction.project_export_service import iter_project_package, write_project_export
+from app.utils.zip_stream import ZipStream
+
+PROJECT_ID = 4501
+
+
+@pytest.fixture
+def export_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(project_export_service, "EXPORT_FOLDER", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+async def project_comments():
+    comment_id = await database.execute(
+        project_comments_table.insert().values(
+            project_id=PROJECT_ID, project_phase_id=1, project_task_id=1, description="Export me", is_resolved=False,
+        )
+    )
+    await database.execute(
+        comment_replies_table.insert().values(comment_id=comment_id, reply_description="Exported reply")
+    )
+    yield comment_id
+    await database.execute(comment_replies_table.delete().where(comment_replies_table.c.comment_id == comment_id))
+    await database.execute(project_comments_table.delete().where(project_comments_table.c.comment_id == comment_id))
+
+
+@pytest.mark.anyio
+async def test_zip_stream_yields_a_valid_archive_in_small_pieces():
+    zs = ZipStream()
+    pieces = []
+
+    async def chunks():
+        for _ in range(50):
+            yield b"x" * 1000
+
+    async for data in zs.add("big.txt", chunks()):
+        pieces.append(data)
+    pieces.extend(zs.finish())
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(pieces)))
+    assert archive.read("big.txt") == b"x" * 50000
+    assert zs.entries[0]["size"] == 50000
+    assert len(pieces) > 2
+
+
+@pytest.mark.anyio
+async def test_zip_stream_keeps_entries_with_the_same_name_apart():
+    zs = ZipStream()
+    pieces = []
+    for body in (b"first", b"second", b"third"):
+        async for data in zs.add("files/uploads/report.pdf", [body]):
+            pieces.append(data)
+    pieces.extend(zs.finish())
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(pieces)))
+    assert archive.namelist() == [
+        "files/uploads/report.pdf", "files/uploads/report (2).pdf", "files/uploads/report (3).pdf",
+    ]
+    assert archive.read("files/uploads/report (3).pdf") == b"third"
+    assert [e["name"] for e in zs.entries] == archive.namelist()
+
+
+@pytest.mark.anyio
+async def test_package_holds_project_rows_and_manifest(project_comments):
+    progress = []
+
+    async def report(value, message=None):
+        progress.append(value)
+
+    data = b"".join([chunk async for chunk in iter_project_package(PROJECT_ID, b'{"project_id": 4501}', report)])
+
+    archive = zipfile.ZipFile(io.BytesIO(data))
+    assert archive.testzip() is None
+    assert json.loads(archive.read("project.json")) == {"project_id": PROJECT_ID}
+    comments = [json.loads(line) for line in archive.read("comments.ndjson").splitlines()]
+    assert [c["comment_id"] for c in comments] == [project_comments]
+    replies = [json.loads(line) for line in archive.read("comment_replies.ndjson").splitlines()]
+    assert [r["reply_description"] for r in replies] == ["Exported reply"]
+
+    manifest = json.loads(archive.read("manifest.json"))
+    assert {e["name"] for e in manifest["entries"]} == set(archive.namelist()) - {"manifest.json"}
+    assert progress == sorted(progress) and progress[-1] < 100
+
+
+@pytest.mark.anyio
+async def test_written_export_downloads_with_ranges(async_client, export_folder, project_comments):
+    result = await write_project_export(PROJECT_ID, b"{}", "project_4501_job.zip")
+
+    assert sorted(p.name for p in export_folder.iterdir()) == ["project_4501_job.zip"]
+    full = (export_folder / "project_4501_job.zip").read_bytes()
+    assert result["size"] == len(full)
+
+    response = await async_client.get(result["download_url"], headers={"Range": "bytes=10-"})
+    assert response.status_code == 206
+    assert response.content == full[10:]
+
+    assert (await async_client.get("/exports/files/missing.zip")).status_code == 404
@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import select
+
+from app.db.database import database
+from app.db.transaction.users import users as users_table
+from app.tests.query_budget import DEFAULT_QUERY_BUDGET, budget_for
+from app.utils.query_profiler import SUMMARY_HEADER, QueryProfiler, fingerprint
+
+
+@pytest.mark.anyio
+async def test_fingerprint_ignores_values():
+    assert fingerprint("SELECT * FROM t WHERE id = 5 AND name = 'o''brien'") == fingerprint(
+        "select *  from t where id = 17 and name = 'x'"
+    )
+    assert fingerprint("SELECT a FROM t WHERE id IN (1, 2, 3)") == fingerprint("SELECT a FROM t WHERE id IN (9)")
+
+    one = str(select(users_table.c.email).where(users_table.c.user_id == 1))
+    other = str(select(users_table.c.email).where(users_table.c.user_id == 2))
+    assert fingerprint(one) == fingerprint(other)
+    assert fingerprint(one) != fingerprint(str(select(users_table.c.user_name)))
+
+
+@pytest.mark.anyio
+async def test_report_flags_repeated_and_slow_queries(registered_user):
+    profiler = QueryProfiler(enabled=True, slow_ms=0, repeat_threshold=3)
+    reports = []
+    profiler.add_listener(reports.append)
+
+    token = profiler.begin("GET", "/loop")
+    for user_id in range(5):
+        await database.fetch_val(select(users_table.c.email).where(users_table.c.user_id == user_id))
+    await database.fetch_one(select(users_table.c.user_name).where(users_table.c.email == registered_user["email"]))
+    profile = profiler.end(token)
+    report = await profiler.finish(profile)
+
+    assert reports == [report]
+    assert report["queries"] == 6
+    assert [group["count"] for group in report["repeated"]] == [5]
+    assert "users.user_id" in report["repeated"][0]["sql"]
+    assert len(report["slow"]) == 6
+    explained = [q for q in report["slow"] if q["plan"]]
+    assert explained and any("users" in line.lower() for line in explained[0]["plan"])
+
+
+@pytest.mark.anyio
+async def test_responses_carry_the_query_summary(async_client):
+    # the query-budget plugin turns profiling on for every test
+    response = await async_client.get("/transaction/getTaskWorkLogs", params={"project_task_id": 1})
+
+    assert response.status_code == 200
+    assert response.headers[SUMMARY_HEADER].startswith("count=1, ")
+
+
+@pytest.mark.anyio
+async def test_budget_lookup():
+    report = {"method": "POST", "route": "/transaction/mapUsersToTask"}
+    assert budget_for(report) == 6
+    assert budget_for({"method": "GET", "route": "/unknown"}) == DEFAULT_QUERY_BUDGET
+    assert budget_for(report, override=1) == 1
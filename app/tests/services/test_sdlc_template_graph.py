@@ -0,0 +1,76 @@
+import pytest
+from httpx import AsyncClient
+
+from app.db.database import database
+from app.db.master.risk_assessment import risk_assessment_table
+from app.db.master.sdlc_phases import sdlc_phases_table
+from app.db.master.sdlc_tasks import sdlc_tasks_table
+from app.utils.sdlc_template_graph import build_sdlc_template_snapshot, sdlc_template_graph
+
+
+def test_build_snapshot_orders_phases_and_tasks():
+    phases = [
+        {"phase_id": 2, "phase_name": "Design", "order_id": 2, "is_active": True},
+        {"phase_id": 1, "phase_name": "Plan", "order_id": 1, "is_active": True},
+        {"phase_id": 3, "phase_name": "Retired", "order_id": 3, "is_active": False},
+    ]
+    tasks = [
+        {"phase_id": 1, "task_id": 11, "task_name": "Scope"},
+        {"phase_id": 2, "task_id": 21, "task_name": "Draft"},
+        {"phase_id": 1, "task_id": 12, "task_name": "Budget"},
+    ]
+    risks = [
+        {"risk_assessment_id": 7, "risk_assessment_name": "High", "phase_id": 2},
+        {"risk_assessment_id": 7, "risk_assessment_name": "High", "phase_id": 1},
+    ]
+
+    snapshot = build_sdlc_template_snapshot(phases, tasks, risks, version=4)
+
+    assert snapshot.version == 4
+    assert [t["task_id"] for t in snapshot.tasks_for_phase(1)] == [11, 12]
+    assert [p["phase_id"] for p in snapshot.phases_for_risk(7)] == [1, 2]
+    assert snapshot.phases_for_risk(99) == ()
+    assert [p["phase_id"] for p in snapshot.ordered_active_phases([3, 2, 1, 404])] == [1, 2]
+    assert snapshot.risks_with_phases[0]["phases"] == [
+        {"phase_id": 1, "phase_name": "Plan"},
+        {"phase_id": 2, "phase_name": "Design"},
+    ]
+
+
+@pytest.mark.anyio
+async def test_graph_loads_once_and_rebuilds_on_mapping_commit(mocker, async_client: AsyncClient):
+    risk_id = await database.execute(
+        risk_assessment_table.insert().values(risk_assessment_name="Graph Risk", is_active=True)
+    )
+    phase_id = await database.execute(
+        sdlc_phases_table.insert().values(phase_name="Graph Phase", order_id=1, is_active=True)
+    )
+    task_id = await database.execute(
+        sdlc_tasks_table.insert().values(task_name="Graph Task", order_id=1, is_active=True)
+    )
+
+    first = await sdlc_template_graph.get()
+    assert first.phases_for_risk(risk_id) == ()
+
+    fetch_all = mocker.spy(database, "fetch_all")
+    assert await sdlc_template_graph.get() is first
+    assert fetch_all.call_count == 0
+
+    response = await async_client.post(
+        "/master/mapPhaseToTasks", json={"phase_id": phase_id, "task_ids": [task_id]}
+    )
+    assert response.status_code == 200
+    response = await async_client.post(
+        "/master/mapRiskToPhases", json={"risk_assessment_id": risk_id, "phase_ids": [phase_id]}
+    )
+    assert response.status_code == 200
+
+    current = await sdlc_template_graph.get()
+    assert current.version > first.version
+    assert current.phases_for_risk(risk_id) == (
+        {
+            "phase_id": phase_id,
+            "phase_name": "Graph Phase",
+            "tasks": ({"task_id": task_id, "task_name": "Graph Task"},),
+        },
+    )
@@ -0,0 +1,152 @@
+import json
+
+import pytest
+
+from app.db.database import database
+from app.db.docs.task_docs import task_docs_table
+from app.db.transaction.comment_replies import comment_replies_table
+from app.db.transaction.incident_reports import incident_report_table
+from app.db.transaction.project_comments import project_comments_table
+from app.db.transaction.projects_user_mapping import projects_user_mapping_table
+from app.schemas.transaction.project_comments_schema import CommentUpdateRequest
+from app.services.search_service import search_service
+from app.services.transaction.project_comments_service import update_project_comment
+from app.utils import events
+from app.utils.search_index import SEARCH_TEXT_MAX_CHARS, InvertedIndex, SearchDoc, document_text, search_index, \
+    snippet
+
+USER_ID = 1
+
+
+@pytest.fixture(autouse=True)
+def reset_search_index():
+    search_index.clear()
+    yield
+    search_index.clear()
+
+
+@pytest.fixture
+async def searchable():
+    for project_id in (1, 2):
+        await database.execute(
+            projects_user_mapping_table.insert().values(project_id=project_id, user_id=USER_ID, is_active=True)
+        )
+    comment_id = await database.execute(
+        project_comments_table.insert().values(
+            project_id=1, project_phase_id=7, project_task_id=70, description="Audit trail requirement is unclear",
+            is_resolved=False,
+        )
+    )
+    reply_id = await database.execute(
+        comment_replies_table.insert().values(comment_id=comment_id, reply_description="See the audit trail section")
+    )
+    incident_id = await database.execute(
+        incident_report_table.insert().values(
+            project_id=2, phase_id=8, task_id=80, raise_comment="Login fails under load", is_resolved=False,
+        )
+    )
+    doc_id = await database.execute(
+        task_docs_table.insert().values(
+            project_id=1, project_phase_id=7, project_task_id=70, is_latest=True,
+            document_json=json.dumps({"sections": [{"body": "<p>The system shall keep an <b>audit</b> trail.</p>"}]}),
+        )
+    )
+    return {"comment": comment_id, "reply": reply_id, "incident": incident_id, "document": doc_id}
+
+
+async def search(**params):
+    params.setdefault("user_id", USER_ID)
+    response = await search_service(**params)
+    return response.status_code, json.loads(response.body)
+
+
+def test_document_text_strips_markup_from_json_values():
+    doc = json.dumps({"title": "URS", "rows": [{"cell": "<p>Backup &amp; restore</p>"}, 3]})
+    assert document_text(doc) == "URS Backup & restore"
+    assert document_text("<div>plain html</div>") == "plain html"
+    assert len(document_text(json.dumps({"body": "word " * SEARCH_TEXT_MAX_CHARS}))) == SEARCH_TEXT_MAX_CHARS
+
+
+def test_inverted_index_ranks_and_requires_every_term():
+    index = InvertedIndex()
+    index.add(SearchDoc("comment", 1, 1, None, None, "backup restore backup"))
+    index.add(SearchDoc("comment", 2, 1, None, None, "backup policy for restore tests and other long wording"))
+    index.add(SearchDoc("comment", 3, 1, None, None, "backup only"))
+
+    assert [doc.id for _, doc in index.search("backup restore")] == [1, 2]
+
+    index.remove(("comment", 1))
+    assert [doc.id for _, doc in index.search("restore")] == [2]
+    assert snippet("we test the Restore path", ["restore"]) == "we test the <b>Restore</b> path"
+
+
+@pytest.mark.anyio
+async def test_search_finds_every_type_ranked_and_paginated(searchable):
+    status_code, body = await search(q="audit trail")
+
+    assert status_code == 200
+    found = {(item["type"], item["id"]) for item in body["data"]["items"]}
+    assert found == {("comment", searchable["comment"]), ("reply", searchable["reply"]),
+                     ("document", searchable["document"])}
+    assert body["data"]["total"] == 3
+    ranks = [item["rank"] for item in body["data"]["items"]]
+    assert ranks == sorted(ranks, reverse=True)
+
+    _, page_two = await search(q="audit trail", page=2, page_size=2)
+    assert len(page_two["data"]["items"]) == 1 and page_two["data"]["total"] == 3
+
+    _, incidents = await search(q="login", types=["incident"], project_id=2)
+    assert [(i["type"], i["id"]) for i in incidents["data"]["items"]] == [("incident", searchable["incident"])]
+    assert "<b>Login</b>" in incidents["data"]["items"][0]["snippet"]
+
+
+@pytest.mark.anyio
+async def test_search_only_returns_the_callers_projects(searchable):
+    await database.execute(
+        project_comments_table.insert().values(
+            project_id=3, project_phase_id=9, project_task_id=90, description="Audit trail of another project",
+            is_resolved=False,
+        )
+    )
+    await database.execute(
+        projects_user_mapping_table.insert().values(project_id=2, user_id=2, is_active=False)
+    )
+
+    _, body = await search(q="audit trail")
+    assert {item["project_id"] for item in body["data"]["items"]} == {1}
+    assert body["data"]["total"] == 3
+
+    _, body = await search(q="audit", user_id=2)
+    assert body["data"]["items"] == [] and body["data"]["total"] == 0
+    _, body = await search(q="login", user_id=2)
+    assert body["data"]["items"] == []
+
+
+@pytest.mark.anyio
+async def test_write_paths_update_the_index(searchable):
+    await search(q="audit")
+
+    await update_project_comment(
+        CommentUpdateRequest(comment_id=searchable["comment"], description="Retention period missing", updated_by=1)
+    )
+    await database.execute(
+        task_docs_table.update()
+        .where(task_docs_table.c.task_doc_id == searchable["document"])
+        .values(document_json=json.dumps({"body": "<p>retention rules</p>"}))
+    )
+    events.publish(events.TASK_DOCUMENT_SAVED, project_task_id=70)
+
+    _, body = await search(q="retention")
+    assert {(i["type"], i["id"]) for i in body["data"]["items"]} == {
+        ("comment", searchable["comment"]), ("document", searchable["document"])
+    }
+    _, body = await search(q="audit")
+    assert [(i["type"], i["id"]) for i in body["data"]["items"]] == [("reply", searchable["reply"])]
+
+
+@pytest.mark.anyio
+async def test_search_rejects_unknown_types(async_client):
+    response = await async_client.get("/search", params={"q": "audit", "types": ["wiki"]})
+
+    assert response.status_code == 400
+    assert response.json()["message"] == "Unknown search types: wiki"
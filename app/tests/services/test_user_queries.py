@@ -0,0 +1,70 @@
+import pytest
+
+from app.db.database import database
+from app.utils.user_queries import (
+    AUTH_USER_COLUMNS,
+    PROFILE_USER_COLUMNS,
+    active_user_with_role_query,
+    begin_request_user_cache,
+    end_request_user_cache,
+    forget_request_users,
+    user_by_id_query,
+)
+from app.utils.user_utils import fetch_user_by_email
+
+
+def selected_columns(query) -> set:
+    return {column.name for column in query.selected_columns}
+
+
+@pytest.mark.anyio
+async def test_projections_do_not_select_star():
+    auth = selected_columns(active_user_with_role_query("a@b.c"))
+    assert "password" in auth and "login_failed_count" in auth
+    assert {"user_address", "image_url", "created_by", "updated_date"}.isdisjoint(auth)
+    assert {"role_id", "role_name"} <= auth
+
+    profile = selected_columns(user_by_id_query(1))
+    assert "password" not in profile and "user_locked_time" not in profile
+    assert {"user_phone", "image_url"} <= profile
+
+
+@pytest.mark.anyio
+async def test_profile_projection_leaves_out_the_password(registered_user):
+    user = await fetch_user_by_email(registered_user["email"], columns=PROFILE_USER_COLUMNS)
+
+    row = dict(user._mapping)
+    assert row["user_id"] == registered_user["user_id"]
+    assert row["user_first_name"] == "Test"
+    assert "password" not in row
+
+
+@pytest.mark.anyio
+async def test_user_is_loaded_once_per_request(registered_user, mocker):
+    fetch_one = mocker.spy(database, "fetch_one")
+    email = registered_user["email"]
+
+    # outside a request nothing is cached
+    await fetch_user_by_email(email)
+    await fetch_user_by_email(email)
+    assert fetch_one.call_count == 2
+
+    token = begin_request_user_cache()
+    try:
+        first = await fetch_user_by_email(email)
+        second = await fetch_user_by_email(email)
+        assert second is first
+        assert fetch_one.call_count == 3
+
+        # another projection is a separate entry; a write empties the cache
+        await fetch_user_by_email(email, columns=PROFILE_USER_COLUMNS)
+        forget_request_users()
+        await fetch_user_by_email(email, columns=AUTH_USER_COLUMNS)
+        assert fetch_one.call_count == 5
+
+        # misses are not cached
+        assert await fetch_user_by_email("nobody@example.com") is None
+        assert await fetch_user_by_email("nobody@example.com") is None
+        assert fetch_one.call_count == 7
+    finally:
+        end_request_user_cache(token)
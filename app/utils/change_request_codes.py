@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.config import config
+from app.db.database import IS_SQLITE, database
+from app.db.transaction.change_request_code_counters import change_request_code_counters
+
+
+def format_change_request_code(year: int, number: int) -> str:
+    return f"CR-{year}-{number}"
+
+
+class ChangeRequestCodeAllocator:
+    """
+    CR-{year}-{n} codes from a per-year counter row, advanced with one
+    INSERT ... ON CONFLICT DO UPDATE ... RETURNING so concurrent callers
+    never read the same value.
+
+    With block_size 1 the counter moves inside the caller's transaction: the
+    row stays locked until it commits and a rollback hands the number back,
+    so codes have no gaps. A larger block_size reserves that many numbers
+    per round trip in its own transaction; numbers left in a block when the
+    process stops are skipped.
+    """
+
+    def __init__(self, block_size: int = config.CR_CODE_BLOCK_SIZE):
+        self.block_size = max(1, block_size)
+        self._blocks: dict[int, list[int]] = {}
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+
+    async def allocate(self, year: Optional[int] = None) -> str:
+        year = year or datetime.now().year
+        if self.block_size == 1:
+            number = await self._advance(year, 1)
+        else:
+            number = await self._next_in_block(year)
+        return format_change_request_code(year, number)
+
+    async def _advance(self, year: int, count: int) -> int:
+        """
+        Move the year's counter on by `count` and return its new value.
+        """
+        dialect_insert = sqlite_insert if IS_SQLITE else pg_insert
+        stmt = dialect_insert(change_request_code_counters).values(year=year, last_value=count)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[change_request_code_counters.c.year],
+            set_={"last_value": change_request_code_counters.c.last_value + count},
+        ).returning(change_request_code_counters.c.last_value)
+        return await database.fetch_val(stmt)
+
+    async def _next_in_block(self, year: int) -> int:
+        async with self._get_lock():
+            block = self._blocks.get(year)
+            if block is None or block[0] > block[1]:
+                # a task of its own runs on its own connection, outside any
+                # transaction of the caller, so the reservation always commits
+                last = await asyncio.create_task(self._advance(year, self.block_size))
+                block = self._blocks[year] = [last - self.block_size + 1, last]
+            number = block[0]
+            block[0] += 1
+            return number
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock, self._lock_loop = asyncio.Lock(), loop
+        return self._lock
+
+    def clear(self) -> None:
+        self._blocks.clear()
+
+
+change_request_codes = ChangeRequestCodeAllocator()
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import logging
+import uuid
+from collections import OrderedDict, deque
+from typing import Iterable, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from app.utils import events
+
+logger = logging.getLogger(__name__)
+
+# Recent events kept per phase for resume, and phases kept before the least
+# recently written are forgotten
+PHASE_BUFFER_SIZE = 200
+MAX_BUFFERED_PHASES = 5000
+# Events queued for one client before it is dropped and told to resync
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+COMMENT_CREATED = "comment_created"
+COMMENT_UPDATED = "comment_updated"
+COMMENT_RESOLVED = "comment_resolved"
+REPLY_CREATED = "reply_created"
+REPLY_UPDATED = "reply_updated"
+
+
+class Subscription:
+    def __init__(self, phase_ids: Iterable[int]):
+        self.phase_ids = set(phase_ids)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def push(self, message: str) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # a client this far behind reloads over REST instead
+            self.overflowed = True
+            logger.warning("Comment stream subscriber fell behind; asking it to resync")
+
+    async def next(self) -> Optional[str]:
+        """
+        The next serialized event, or None once the client fell too far behind.
+        """
+        if self.overflowed:
+            return None
+        return await self.queue.get()
+
+
+class CommentStream:
+    """
+    In-process fan-out of comment and reply changes to WebSocket clients,
+    keyed by project phase. Every event gets a sequence number from one
+    counter, so a client can reconnect with the last seq it saw and get the
+    missed events replayed, or a resync notice when they are no longer
+    buffered (or the process restarted: stream_id changed).
+    """
+
+    def __init__(self, buffer_size: int = PHASE_BUFFER_SIZE, max_phases: int = MAX_BUFFERED_PHASES):
+        self.buffer_size = buffer_size
+        self.max_phases = max_phases
+        self.stream_id = uuid.uuid4().hex
+        self.seq = 0
+        self._buffers: "OrderedDict[int, deque]" = OrderedDict()
+        # highest seq no longer buffered, per phase and for forgotten phases
+        self._evicted_upto: dict[int, int] = {}
+        self._forgotten_upto = 0
+        self._subscribers: dict[int, set[Subscription]] = {}
+
+    def publish(self, project_phase_id: int, event: str, **fields) -> int:
+        self.seq += 1
+        message = json.dumps(
+            jsonable_encoder({"type": "comment_event", "seq": self.seq, "event": event,
+                              "project_phase_id": project_phase_id, **fields}),
+            separators=(",", ":"),
+        )
+
+        buffer = self._buffers.pop(project_phase_id, None)
+        if buffer is None:
+            buffer = deque(maxlen=self.buffer_size)
+        if len(buffer) == buffer.maxlen:
+            self._evicted_upto[project_phase_id] = buffer[0][0]
+        buffer.append((self.seq, message))
+        self._buffers[project_phase_id] = buffer
+        while len(self._buffers) > self.max_phases:
+            phase_id, dropped = self._buffers.popitem(last=False)
+            self._forgotten_upto = max(self._forgotten_upto, dropped[-1][0])
+            self._evicted_upto.pop(phase_id, None)
+
+        for subscription in list(self._subscribers.get(project_phase_id, ())):
+            subscription.push(message)
+        return self.seq
+
+    def subscribe(self, phase_ids: Iterable[int], after_seq: Optional[int] = None,
+                  stream_id: Optional[str] = None) -> tuple[Subscription, list[str], bool]:
+        """
+        Register a client. Returns the subscription, the buffered events after
+        `after_seq` in order, and whether the client must reload over REST
+        because some of the events it missed are gone.
+        """
+        subscription = Subscription(phase_ids)
+        for phase_id in subscription.phase_ids:
+            self._subscribers.setdefault(phase_id, set()).add(subscription)
+
+        if after_seq is None:
+            return subscription, [], False
+        if stream_id is not None and stream_id != self.stream_id:
+            return subscription, [], True
+
+        missed, resync = [], False
+        for phase_id in subscription.phase_ids:
+            buffer = self._buffers.get(phase_id)
+            lost_upto = self._evicted_upto.get(phase_id, 0) if buffer is not None else self._forgotten_upto
+            if after_seq < lost_upto:
+                resync = True
+            if buffer is not None:
+                missed.extend(item for item in buffer if item[0] > after_seq)
+        missed.sort(key=lambda item: item[0])
+        return subscription, [message for _, message in missed], resync
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for phase_id in subscription.phase_ids:
+            subscribers = self._subscribers.get(phase_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[phase_id]
+
+    def on_comment_changed(self, project_phase_id: Optional[int] = None, action: Optional[str] = None, **fields) -> None:
+        # changes published without a phase and action only invalidate caches
+        if project_phase_id is None or action is None:
+            return
+        self.publish(project_phase_id, action, **fields)
+
+    def clear(self) -> None:
+        self.stream_id = uuid.uuid4().hex
+        self.seq = 0
+        self._buffers.clear()
+        self._evicted_upto.clear()
+        self._forgotten_upto = 0
+        self._subscribers.clear()
+
+
+comment_stream = CommentStream()
+
+events.subscribe(events.COMMENT_CHANGED, comment_stream.on_comment_changed)
@@ -0,0 +1,52 @@
+from typing import Optional
+
+from app.utils import events
+from app.utils.etag import body_etag
+from app.utils.ttl_cache import TTLCache
+
+# bounds staleness from writes that publish no event (project setup, user mapping, ...)
+DASHBOARD_CACHE_TTL_SECONDS = 60
+DASHBOARD_CACHE_MAX_ENTRIES = 5000
+
+
+class DashboardCache:
+    """
+    Serialized dashboard responses and their ETags keyed by
+    (user_id, project_id). project_id None is the "all projects" dashboard
+    of a user.
+    """
+
+    def __init__(self, ttl: float = DASHBOARD_CACHE_TTL_SECONDS, max_entries: int = DASHBOARD_CACHE_MAX_ENTRIES):
+        self._entries = TTLCache(ttl=ttl, max_entries=max_entries, name="dashboard")
+
+    def get(self, user_id: int, project_id: Optional[int]) -> Optional[tuple[bytes, str]]:
+        return self._entries.get((user_id, project_id))
+
+    def set(self, user_id: int, project_id: Optional[int], body: bytes) -> str:
+        etag = body_etag(body)
+        self._entries.set((user_id, project_id), (body, etag))
+        return etag
+
+    def invalidate(self, project_id: Optional[int] = None, **_) -> None:
+        """
+        Drop the dashboards affected by a change in `project_id` (and every
+        user's all-projects dashboard). Unknown project clears everything.
+        """
+        if project_id is None:
+            self._entries.clear()
+            return
+        self._entries.pop_matching(lambda key: key[1] in (project_id, None))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+dashboard_cache = DashboardCache()
+
+for _event in (
+    events.TASK_STATUS_CHANGED,
+    events.TASK_DOCUMENT_SUBMITTED,
+    events.INCIDENT_CHANGED,
+    events.COMMENT_CHANGED,
+):
+    events.subscribe(_event, dashboard_cache.invalidate)
@@ -0,0 +1,29 @@
+import re
+from typing import Optional
+
+FOREIGN_KEY_VIOLATION = "23503"
+
+_KEY_DETAIL = re.compile(r"Key \((\w+)\)=")
+
+
+def _driver_error(exc: Exception):
+    # SQLAlchemy wraps the DBAPI error in .orig; asyncpg raises it directly
+    return getattr(exc, "orig", None) or exc
+
+
+def is_foreign_key_violation(exc: Exception) -> bool:
+    err = _driver_error(exc)
+    code = getattr(err, "sqlstate", None) or getattr(err, "pgcode", None)
+    if code is not None:
+        return code == FOREIGN_KEY_VIOLATION
+    return "foreign key constraint" in str(err).lower()
+
+
+def violated_column(exc: Exception) -> Optional[str]:
+    """
+    Column named by a Postgres FK violation ('Key (user_id)=(5) is not
+    present...'), or None when the driver does not report it (SQLite).
+    """
+    err = _driver_error(exc)
+    match = _KEY_DETAIL.search(getattr(err, "detail", None) or str(err))
+    return match.group(1) if match else None
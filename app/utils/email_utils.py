@@ -3,6 +3,7 @@ import httpx
 import json
 
 from app.config import config
+from app.utils.job_runner import job_runner
 
 logger = logging.getLogger(__name__)
 
@@ -35,4 +36,19 @@ async def send_simple_email(to: str, subject: str, body: str):
             return response
         except httpx.HTTPStatusError as err:
             logger.error(f"SendGrid API error: {err.response.text}")
-            raise APIResponseError(f"SendGrid error {err.response.status_code}") from err
\ No newline at end of file
+            raise APIResponseError(f"SendGrid error {err.response.status_code}") from err
+
+
+async def _send_email_job(ctx, to: str, subject: str, body: str):
+    await send_simple_email(to=to, subject=subject, body=body)
+
+
+job_runner.register("email", _send_email_job, concurrency=4, max_retries=2)
+
+
+async def queue_email(to: str, subject: str, body: str):
+    """
+    Send an email off the request path; SendGrid failures are retried by
+    the job runner.
+    """
+    return await job_runner.submit("email", {"to": to, "subject": subject, "body": body})
@@ -0,0 +1,24 @@
+import hashlib
+from typing import Optional
+
+from fastapi import status
+from fastapi.responses import Response
+
+
+def body_etag(body: bytes, prefix: str = "") -> str:
+    """Strong validator for a serialized response body."""
+    return f'"{prefix}{hashlib.md5(body).hexdigest()}"'
+
+
+def not_modified(etag: str, if_none_match: Optional[str]) -> Optional[Response]:
+    """The 304 answer to a conditional GET whose validator still matches, else None."""
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
+
+
+def cached_json_response(body: bytes, etag: str, if_none_match: Optional[str] = None) -> Response:
+    """Serve a cached JSON body, or 304 when the client already has it."""
+    return not_modified(etag, if_none_match) or Response(
+        content=body, media_type="application/json", headers={"ETag": etag}
+    )
@@ -0,0 +1,72 @@
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# event names published by the services
+TASK_STATUS_CHANGED = "task_status_changed"
+TASK_DOCUMENT_SUBMITTED = "task_document_submitted"
+# a task document was saved or versioned outside the submit workflow
+TASK_DOCUMENT_SAVED = "task_document_saved"
+INCIDENT_CHANGED = "incident_changed"
+COMMENT_CHANGED = "comment_changed"
+# a new version of a master JSON template was saved
+JSON_TEMPLATE_CREATED = "json_template_created"
+
+_subscribers: dict[str, list[Callable]] = defaultdict(list)
+# events held back by deferred() in the current task
+_deferred: ContextVar[Optional[list]] = ContextVar("deferred_events", default=None)
+
+
+def subscribe(event: str, handler: Callable) -> None:
+    """
+    Register a handler for an event. Handlers are called synchronously
+    with the keyword arguments passed to publish().
+    """
+    if handler not in _subscribers[event]:
+        _subscribers[event].append(handler)
+
+
+def unsubscribe(event: str, handler: Callable) -> None:
+    if handler in _subscribers.get(event, []):
+        _subscribers[event].remove(handler)
+
+
+@contextmanager
+def deferred():
+    """
+    Hold the events published inside the block and deliver them when it
+    exits normally; drop them if it raises. Wrap a transaction in it so
+    subscribers only hear about committed changes:
+
+        with events.deferred():
+            async with database.transaction():
+                ...
+    """
+    pending = []
+    token = _deferred.set(pending)
+    try:
+        yield
+    finally:
+        _deferred.reset(token)
+    for event, data in pending:
+        publish(event, **data)
+
+
+def publish(event: str, **data) -> None:
+    """
+    Notify every handler of `event`. A failing handler is logged and never
+    breaks the request that published the event.
+    """
+    pending = _deferred.get()
+    if pending is not None:
+        pending.append((event, data))
+        return
+    for handler in list(_subscribers.get(event, [])):
+        try:
+            handler(**data)
+        except Exception as e:
+            logger.exception(f"Event handler for '{event}' failed: {str(e)}")
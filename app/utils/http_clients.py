@@ -0,0 +1,49 @@
+import logging
+
+from httpx import AsyncClient, Limits, Timeout
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = Timeout(10.0, connect=5.0)
+DEFAULT_LIMITS = Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60.0)
+
+
+class HttpClientRegistry:
+    """
+    Named, long-lived httpx.AsyncClient instances shared across requests so
+    outbound calls reuse keep-alive connections instead of paying a TCP/TLS
+    handshake per call. Clients are created on first use and closed by the
+    application lifespan.
+    """
+
+    def __init__(self):
+        self._options: dict[str, dict] = {}
+        self._clients: dict[str, AsyncClient] = {}
+        self._retired: list[AsyncClient] = []
+
+    def configure(self, name: str, **client_kwargs) -> None:
+        """
+        Set the httpx.AsyncClient options for `name`. A client already
+        created with the previous options is retired and closed on aclose().
+        """
+        self._options[name] = client_kwargs
+        client = self._clients.pop(name, None)
+        if client is not None:
+            self._retired.append(client)
+
+    def get(self, name: str = "default") -> AsyncClient:
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            options = {"timeout": DEFAULT_TIMEOUT, "limits": DEFAULT_LIMITS, **self._options.get(name, {})}
+            client = self._clients[name] = AsyncClient(**options)
+            logger.info(f"Created shared HTTP client '{name}'")
+        return client
+
+    async def aclose(self) -> None:
+        clients = list(self._clients.values()) + self._retired
+        self._clients, self._retired = {}, []
+        for client in clients:
+            await client.aclose()
+
+
+http_clients = HttpClientRegistry()
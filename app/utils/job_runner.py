@@ -0,0 +1,306 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy import select
+
+from app.config import config
+from app.db.database import database
+from app.db.transaction.background_jobs import background_jobs
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+# Finished jobs kept in memory for polling before the oldest are dropped
+MAX_JOB_HISTORY = 1000
+
+
+class JobError(Exception):
+    """
+    Raised by a handler to fail its job with a result payload. Only
+    retryable errors (and unexpected exceptions) use the retry budget.
+    """
+
+    def __init__(self, message: str, result: Any = None, retryable: bool = False):
+        super().__init__(message)
+        self.result = result
+        self.retryable = retryable
+
+
+@dataclass
+class Job:
+    job_id: str
+    job_type: str
+    payload: dict
+    created_by: Optional[int] = None
+    status: str = JOB_QUEUED
+    progress: int = 0
+    message: Optional[str] = None
+    attempts: int = 0
+    result: Any = None
+    error: Optional[str] = None
+    created_date: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started_date: Optional[datetime] = None
+    finished_date: Optional[datetime] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JOB_SUCCEEDED, JOB_FAILED)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "job_type": self.job_type,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "attempts": self.attempts,
+            "result": self.result,
+            "error": self.error,
+            "created_by": self.created_by,
+            "created_date": self.created_date.isoformat() if self.created_date else None,
+            "started_date": self.started_date.isoformat() if self.started_date else None,
+            "finished_date": self.finished_date.isoformat() if self.finished_date else None,
+        }
+
+
+@dataclass
+class JobSpec:
+    handler: Callable[..., Awaitable[Any]]
+    concurrency: int = 1
+    max_retries: int = 0
+    retry_delay: float = 1.0
+    # payload is JSON and the job may be re-queued after a restart
+    resumable: bool = False
+    semaphore: asyncio.Semaphore = None
+
+    def __post_init__(self):
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+
+
+class JobContext:
+    """
+    Handed to job handlers so they can report progress while they run.
+    """
+
+    def __init__(self, runner: "JobRunner", job: Job):
+        self.runner = runner
+        self.job = job
+
+    async def report(self, progress: int, message: Optional[str] = None) -> None:
+        self.job.progress = max(0, min(100, int(progress)))
+        if message is not None:
+            self.job.message = message
+        await self.runner._persist(self.job)
+
+
+class JobRunner:
+    """
+    In-process async job runner. Handlers are registered per job type with
+    their own concurrency limit and retry budget; submit() returns at once
+    and the work runs on the event loop. With `persist` enabled every state
+    change is also written to background_jobs.
+    """
+
+    def __init__(self, persist: bool = False, max_history: int = MAX_JOB_HISTORY):
+        self.persist = persist
+        self.max_history = max_history
+        self._specs: dict[str, JobSpec] = {}
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._tasks: set[asyncio.Task] = set()
+
+    def register(
+        self,
+        job_type: str,
+        handler: Callable[..., Awaitable[Any]],
+        concurrency: int = 1,
+        max_retries: int = 0,
+        retry_delay: float = 1.0,
+        resumable: bool = False,
+    ) -> None:
+        self._specs[job_type] = JobSpec(
+            handler=handler,
+            concurrency=concurrency,
+            max_retries=max_retries,
+            retry_delay=retry_delay,
+            resumable=resumable,
+        )
+
+    def is_registered(self, job_type: str) -> bool:
+        return job_type in self._specs
+
+    async def submit(self, job_type: str, payload: Optional[dict] = None, created_by: Optional[int] = None) -> Job:
+        if job_type not in self._specs:
+            raise KeyError(f"Unknown job type: {job_type}")
+
+        job = Job(job_id=uuid.uuid4().hex, job_type=job_type, payload=payload or {}, created_by=created_by)
+        self._remember(job)
+        if self.persist:
+            await database.execute(background_jobs.insert().values(**self._row(job, with_payload=True)))
+        self._start(job)
+        logger.info(f"Queued job {job.job_id} ({job_type})")
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None and self.persist:
+            row = await database.fetch_one(select(background_jobs).where(background_jobs.c.job_id == job_id))
+            if row:
+                job = self._from_row(row)
+        return job
+
+    async def resume_pending(self) -> int:
+        """
+        Pick up jobs a previous process left queued or running. Resumable
+        job types are re-queued; the rest are marked failed.
+        """
+        if not self.persist:
+            return 0
+
+        rows = await database.fetch_all(
+            select(background_jobs)
+            .where(background_jobs.c.status.in_([JOB_QUEUED, JOB_RUNNING]))
+            .order_by(background_jobs.c.created_date)
+        )
+        resumed = 0
+        for row in rows:
+            job = self._from_row(row)
+            spec = self._specs.get(job.job_type)
+            if spec and spec.resumable:
+                job.status = JOB_QUEUED
+                self._remember(job)
+                self._start(job)
+                resumed += 1
+            else:
+                job.status = JOB_FAILED
+                job.error = "Interrupted by a restart"
+                job.finished_date = datetime.now(timezone.utc)
+                await self._persist(job)
+        return resumed
+
+    async def drain(self) -> None:
+        """
+        Wait for every job submitted so far to finish.
+        """
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def shutdown(self, timeout: float = 10.0) -> None:
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(list(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    def _start(self, job: Job) -> None:
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job: Job) -> None:
+        spec = self._specs[job.job_type]
+        async with spec.semaphore:
+            job.status = JOB_RUNNING
+            job.started_date = datetime.now(timezone.utc)
+            ctx = JobContext(self, job)
+
+            while True:
+                job.attempts += 1
+                await self._persist(job)
+                try:
+                    job.result = await spec.handler(ctx, **job.payload)
+                    job.status = JOB_SUCCEEDED
+                    job.progress = 100
+                    job.error = None
+                    break
+                except asyncio.CancelledError:
+                    job.status = JOB_FAILED
+                    job.error = "Cancelled"
+                    raise
+                except Exception as e:
+                    retryable = e.retryable if isinstance(e, JobError) else True
+                    job.error = str(e)
+                    job.result = e.result if isinstance(e, JobError) else None
+                    if retryable and job.attempts <= spec.max_retries:
+                        delay = spec.retry_delay * 2 ** (job.attempts - 1)
+                        logger.warning(f"Job {job.job_id} attempt {job.attempts} failed, retrying in {delay}s: {e}")
+                        await asyncio.sleep(delay)
+                        continue
+                    logger.error(f"Job {job.job_id} ({job.job_type}) failed: {e}", exc_info=not isinstance(e, JobError))
+                    job.status = JOB_FAILED
+                    break
+                finally:
+                    if job.done:
+                        job.finished_date = datetime.now(timezone.utc)
+
+            await self._persist(job)
+
+    async def _persist(self, job: Job) -> None:
+        if not self.persist:
+            return
+        try:
+            values = self._row(job)
+            values.pop("job_id")
+            await database.execute(
+                background_jobs.update().where(background_jobs.c.job_id == job.job_id).values(**values)
+            )
+        except Exception as e:
+            logger.error(f"Failed to persist job {job.job_id}: {e}")
+
+    def _remember(self, job: Job) -> None:
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.max_history:
+            oldest_id = next((jid for jid, j in self._jobs.items() if j.done), None)
+            if oldest_id is None:
+                break
+            del self._jobs[oldest_id]
+
+    def _row(self, job: Job, with_payload: bool = False) -> dict:
+        row = {
+            "job_id": job.job_id,
+            "job_type": job.job_type,
+            "status": job.status,
+            "progress": job.progress,
+            "message": job.message,
+            "attempts": job.attempts,
+            "result": job.result,
+            "error": job.error,
+            "created_by": job.created_by,
+            "created_date": job.created_date,
+            "started_date": job.started_date,
+            "finished_date": job.finished_date,
+        }
+        if with_payload:
+            spec = self._specs.get(job.job_type)
+            row["payload"] = job.payload if spec and spec.resumable else None
+        return row
+
+    @staticmethod
+    def _from_row(row) -> Job:
+        return Job(
+            job_id=row["job_id"],
+            job_type=row["job_type"],
+            payload=row["payload"] or {},
+            created_by=row["created_by"],
+            status=row["status"],
+            progress=row["progress"] or 0,
+            message=row["message"],
+            attempts=row["attempts"] or 0,
+            result=row["result"],
+            error=row["error"],
+            created_date=row["created_date"],
+            started_date=row["started_date"],
+            finished_date=row["finished_date"],
+        )
+
+
+job_runner = JobRunner(persist=config.JOB_QUEUE_PERSIST)
@@ -0,0 +1,204 @@
+import copy
+import json
+from difflib import SequenceMatcher
+from typing import Any
+
+ADD = "add"
+REMOVE = "remove"
+REPLACE = "replace"
+
+
+class JsonPatchError(ValueError):
+    pass
+
+
+def _escape(token) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _child(path: str, token) -> str:
+    return f"{path}/{_escape(token)}"
+
+
+def parse_pointer(path: str) -> list[str]:
+    if path == "":
+        return []
+    if not path.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer: {path!r}")
+    return [_unescape(token) for token in path[1:].split("/")]
+
+
+def _canonical(value) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+
+def diff(old: Any, new: Any, path: str = "") -> list[dict]:
+    """
+    Path-level changes turning `old` into `new`, as JSON Patch (RFC 6902)
+    add/remove/replace operations applied in order. remove and replace also
+    carry the previous value under "old" for reviewers; apply_patch ignores it.
+    """
+    if type(old) is not type(new):
+        # 1 and 1.0 are the same JSON number; True and 1 are not
+        same_number = isinstance(old, (int, float)) and isinstance(new, (int, float)) \
+            and not isinstance(old, bool) and not isinstance(new, bool) and old == new
+        return [] if same_number else [{"op": REPLACE, "path": path, "value": new, "old": old}]
+
+    if isinstance(old, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": REMOVE, "path": _child(path, key), "old": old[key]})
+        for key, value in new.items():
+            if key not in old:
+                ops.append({"op": ADD, "path": _child(path, key), "value": value})
+            else:
+                ops.extend(diff(old[key], value, _child(path, key)))
+        return ops
+
+    if isinstance(old, list):
+        return _diff_list(old, new, path)
+
+    return [] if old == new else [{"op": REPLACE, "path": path, "value": new, "old": old}]
+
+
+# replace blocks up to this many old x new elements are aligned by similarity
+MAX_ALIGN_CELLS = 400
+
+
+def _align(old: list[str], new: list[str]) -> list[tuple]:
+    """
+    Pair the elements of a changed block: (i, j) pairs are diffed in place,
+    (i, None) removed and (None, j) added. Edit distance with similarity as
+    the pairing cost, so a row inserted before an edited one stays an add.
+    """
+    m, n = len(old), len(new)
+    if m * n > MAX_ALIGN_CELLS:
+        paired = min(m, n)
+        return [(k, k) for k in range(paired)] + [(i, None) for i in range(paired, m)] + \
+            [(None, j) for j in range(paired, n)]
+
+    change = [[1 - SequenceMatcher(None, a, b, autojunk=False).ratio() for b in new] for a in old]
+    cost = [[0.0] * (n + 1) for _ in range(m + 1)]
+    for i in range(m + 1):
+        cost[i][0] = i
+    for j in range(n + 1):
+        cost[0][j] = j
+    for i in range(1, m + 1):
+        for j in range(1, n + 1):
+            cost[i][j] = min(cost[i - 1][j - 1] + change[i - 1][j - 1], cost[i - 1][j] + 1, cost[i][j - 1] + 1)
+
+    steps, i, j = [], m, n
+    while i or j:
+        if i and j and cost[i][j] == cost[i - 1][j - 1] + change[i - 1][j - 1]:
+            i, j = i - 1, j - 1
+            steps.append((i, j))
+        elif i and cost[i][j] == cost[i - 1][j] + 1:
+            i -= 1
+            steps.append((i, None))
+        else:
+            j -= 1
+            steps.append((None, j))
+    return steps[::-1]
+
+
+def _diff_list(old: list, new: list, path: str) -> list[dict]:
+    # align elements by content so one inserted row is one "add", not a
+    # replace of every row after it
+    old_keys, new_keys = [_canonical(v) for v in old], [_canonical(v) for v in new]
+    matcher = SequenceMatcher(None, old_keys, new_keys, autojunk=False)
+    ops = []
+    # walk from the tail so the indices of earlier elements still hold
+    for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+        if tag == "equal":
+            continue
+        steps, position = [], i1
+        for i, j in _align(old_keys[i1:i2], new_keys[j1:j2]):
+            # an added element goes after the old elements aligned before it
+            steps.append((i, j, position))
+            if i is not None:
+                position += 1
+        for i, j, position in reversed(steps):
+            if i is not None and j is not None:
+                ops.extend(diff(old[i1 + i], new[j1 + j], _child(path, i1 + i)))
+            elif i is not None:
+                ops.append({"op": REMOVE, "path": _child(path, i1 + i), "old": old[i1 + i]})
+            else:
+                ops.append({"op": ADD, "path": _child(path, position), "value": new[j1 + j]})
+    return ops
+
+
+def _resolve_parent(doc, tokens: list[str]):
+    target = doc
+    for token in tokens[:-1]:
+        try:
+            target = target[int(token)] if isinstance(target, list) else target[token]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return target
+
+
+def _index(container: list, token: str, allow_end: bool) -> int:
+    if token == "-" and allow_end:
+        return len(container)
+    try:
+        index = int(token)
+    except ValueError:
+        raise JsonPatchError(f"Invalid array index: {token!r}")
+    if not 0 <= index <= len(container) - (0 if allow_end else 1):
+        raise JsonPatchError(f"Array index out of range: {index}")
+    return index
+
+
+def apply_patch(doc: Any, ops: list[dict]) -> Any:
+    """
+    Apply add/remove/replace operations to a copy of `doc`.
+    """
+    doc = copy.deepcopy(doc)
+    for op in ops:
+        tokens = parse_pointer(op["path"])
+        kind = op["op"]
+        if not tokens:
+            if kind == REMOVE:
+                raise JsonPatchError("Cannot remove the document root")
+            doc = copy.deepcopy(op["value"])
+            continue
+
+        parent = _resolve_parent(doc, tokens)
+        token = tokens[-1]
+        if isinstance(parent, list):
+            index = _index(parent, token, allow_end=kind == ADD)
+            if kind == ADD:
+                parent.insert(index, copy.deepcopy(op["value"]))
+            elif kind == REMOVE:
+                del parent[index]
+            else:
+                parent[index] = copy.deepcopy(op["value"])
+        elif isinstance(parent, dict):
+            if kind != ADD and token not in parent:
+                raise JsonPatchError(f"Path not found: {op['path']}")
+            if kind == REMOVE:
+                del parent[token]
+            else:
+                parent[token] = copy.deepcopy(op["value"])
+        else:
+            raise JsonPatchError(f"Path not found: {op['path']}")
+    return doc
+
+
+def strip_review_values(ops: list[dict]) -> list[dict]:
+    """
+    The operations without their "old" values, for storage as a patch.
+    """
+    return [{k: v for k, v in op.items() if k != "old"} for op in ops]
+
+
+def summarize(ops: list[dict]) -> dict:
+    summary = {ADD: 0, REMOVE: 0, REPLACE: 0}
+    for op in ops:
+        summary[op["op"]] += 1
+    return summary
@@ -0,0 +1,127 @@
+from typing import Iterable, NamedTuple, Optional
+
+from sqlalchemy import Column, Select, Table, and_, insert, or_, select, update
+
+
+class MembershipChanges(NamedTuple):
+    added: list
+    reactivated: list
+    deactivated: list
+
+
+def _row_value(row, name: str):
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+def _is_many(value) -> bool:
+    return isinstance(value, Select) or (isinstance(value, Iterable) and not isinstance(value, (str, bytes)))
+
+
+async def sync_memberships(
+    db,
+    table: Table,
+    scope: dict,
+    key_column: Column,
+    active_column: Column,
+    add: Optional[Iterable] = None,
+    remove: Optional[Iterable] = None,
+    desired: Optional[Iterable] = None,
+    insert_values: Optional[dict] = None,
+    reactivate_values: Optional[dict] = None,
+    deactivate_values: Optional[dict] = None,
+    reset_active: bool = False,
+    key_source: Optional[Column] = None,
+) -> MembershipChanges:
+    """
+    Apply a membership change to a soft-delete mapping table (rows scoped by
+    `scope`, identified by `key_column`, switched by `active_column`) in a
+    constant number of statements: at most one read of the mapping, one
+    multi-row INSERT and one UPDATE each for reactivations and deactivations.
+
+    Either pass `add`/`remove` for an incremental change, or `desired` to make
+    the active set equal to it. `reset_active` also applies
+    `reactivate_values` to rows that are already active. A row whose active
+    flag is NULL counts as inactive.
+
+    One `scope` value may be a list or a SELECT of ids, applying the same
+    change to every one of those scopes; the changes are then reported as
+    (scope id, key) pairs. With `key_source` (e.g. users.user_id), keys that
+    do not exist there are skipped instead of violating a foreign key.
+    """
+    many = [name for name, value in scope.items() if _is_many(value)]
+    if len(many) > 1:
+        raise ValueError(f"Only one scope column can list several ids, got {many}")
+    scope_name = many[0] if many else None
+    scope = dict(scope)
+    if scope_name is not None:
+        ids = scope[scope_name]
+        if isinstance(ids, Select):
+            ids = [row[0] for row in await db.fetch_all(ids)]
+        scope[scope_name] = sorted(set(ids))
+        if not scope[scope_name]:
+            return MembershipChanges(added=[], reactivated=[], deactivated=[])
+    scope_ids = scope[scope_name] if scope_name is not None else [None]
+
+    add = set(desired if desired is not None else add or ())
+    remove = set(remove or ())
+    if key_source is not None and add:
+        rows = await db.fetch_all(select(key_source).where(key_source.in_(sorted(add))))
+        add = {_row_value(row, key_source.name) for row in rows}
+    remove -= add
+
+    scope_clause = and_(*[
+        table.c[name].in_(value) if name == scope_name else table.c[name] == value
+        for name, value in scope.items()
+    ])
+
+    def pair(scope_id, key):
+        return key if scope_name is None else (scope_id, key)
+
+    # pair -> True when at least one active row exists
+    existing = {}
+    if desired is not None or add:
+        columns = [key_column, active_column] + ([table.c[scope_name]] if scope_name is not None else [])
+        for row in await db.fetch_all(select(*columns).where(scope_clause)):
+            scope_id = _row_value(row, scope_name) if scope_name is not None else None
+            key = pair(scope_id, _row_value(row, key_column.name))
+            existing[key] = existing.get(key, False) or bool(_row_value(row, active_column.name))
+
+    wanted = {pair(scope_id, key) for scope_id in scope_ids for key in add}
+    new_pairs = sorted(wanted - existing.keys())
+    reactivated = sorted(key for key in wanted & existing.keys() if reset_active or not existing[key])
+    if desired is not None:
+        deactivated = sorted(key for key, active in existing.items() if active and key not in wanted)
+    else:
+        deactivated = sorted(pair(scope_id, key) for scope_id in scope_ids for key in remove)
+
+    if new_pairs:
+        await db.execute(
+            insert(table).values([
+                {
+                    **{name: value for name, value in scope.items() if name != scope_name},
+                    **({scope_name: key[0]} if scope_name is not None else {}),
+                    key_column.name: key if scope_name is None else key[1],
+                    active_column.name: True,
+                    **(insert_values or {}),
+                }
+                for key in new_pairs
+            ])
+        )
+
+    # add/remove/desired are the same for every scope, so one statement each covers them all
+    if reactivated:
+        keys = reactivated if scope_name is None else {key for _, key in reactivated}
+        stmt = update(table).where(scope_clause, key_column.in_(sorted(keys)))
+        if not reset_active:
+            stmt = stmt.where(or_(active_column == False, active_column.is_(None)))
+        await db.execute(stmt.values({active_column.name: True, **(reactivate_values or {})}))
+
+    if deactivated:
+        outside = key_column.not_in(sorted(add)) if desired is not None else key_column.in_(sorted(remove))
+        await db.execute(
+            update(table)
+            .where(scope_clause, outside, active_column == True)
+            .values({active_column.name: False, **(deactivate_values or {})})
+        )
+
+    return MembershipChanges(added=new_pairs, reactivated=reactivated, deactivated=deactivated)
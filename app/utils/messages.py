@@ -12,5 +12,6 @@ messages = {
     "password_reuse": "Cannot reuse last 5 passwords",
     "reset_success": "Password reset successful",
     "internal_error": "Internal Server Error",
-    "otp_required" : "OTP is required"
+    "otp_required" : "OTP is required",
+    "too_many_requests": "Too many requests. Please try again later."
 }
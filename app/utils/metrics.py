@@ -0,0 +1,210 @@
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.responses import JSONResponse
+
+from app.utils.query_profiler import current_query_profile
+
+# Exposed on /metrics next to the Instrumentator's HTTP metrics (default registry)
+
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds",
+    "Time spent in one database call, pool wait included.",
+    ["operation", "caller"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total", "Database calls that raised.", ["operation", "caller"]
+)
+DB_ROWS_RETURNED = Histogram(
+    "db_rows_returned",
+    "Rows returned by one fetch_all / iterate call.",
+    ["caller"],
+    buckets=(0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 10000),
+)
+DB_QUERIES_IN_FLIGHT = Gauge(
+    "db_queries_in_flight", "Database calls currently holding or waiting for a connection.", ["route"]
+)
+REQUEST_DB_ROUND_TRIPS = Histogram(
+    "http_request_db_round_trips",
+    "Database calls made while serving one request.",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Total database time of one request.",
+    ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+SERIALIZATION_SECONDS = Histogram(
+    "response_serialization_seconds",
+    "Time spent rendering a response body.",
+    ["response"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+UPLOAD_BYTES = Counter("upload_bytes_total", "Multipart request bytes received.", ["route"])
+UPLOAD_SECONDS = Histogram(
+    "upload_duration_seconds",
+    "Time from the first to the last chunk of a multipart request body.",
+    ["route"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+WS_CONNECTIONS = Gauge("websocket_connections", "Open WebSocket connections.")
+WS_ROOMS = Gauge("websocket_rooms", "WebSocket rooms with at least one client.")
+WS_BROADCAST_FANOUT = Histogram(
+    "websocket_broadcast_fanout",
+    "Clients a WebSocket message was relayed to (room size minus sender).",
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+WS_MESSAGES = Counter("websocket_messages_total", "WebSocket messages.", ["direction", "type"])
+CACHE_LOOKUPS = Counter("cache_lookups_total", "In-process cache lookups.", ["cache", "result"])
+
+# Label for work done outside an HTTP request (background jobs, startup)
+NO_ROUTE = "background"
+UNMATCHED_ROUTE = "unmatched"
+
+
+# ------------------------
+# Per-request database stats
+# ------------------------
+
+class RequestStats:
+    __slots__ = ("scope", "round_trips", "db_seconds")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.round_trips = 0
+        self.db_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        return route_label(self.scope)
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def route_label(scope: dict) -> str:
+    # FastAPI stores the matched APIRoute in the scope; its path is the template
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def begin_request_stats(scope: dict):
+    return _request_stats.set(RequestStats(scope))
+
+
+def end_request_stats(token) -> RequestStats:
+    stats = _request_stats.get()
+    _request_stats.reset(token)
+    route = stats.route
+    REQUEST_DB_ROUND_TRIPS.labels(route).observe(stats.round_trips)
+    REQUEST_DB_SECONDS.labels(route).observe(stats.db_seconds)
+    return stats
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+# Frames in these modules are plumbing, not the service that ran the query
+_PLUMBING_MODULES = {
+    __name__,
+    "app.db.database",
+    "app.utils.raw_json",
+    "app.utils.user_queries",
+}
+
+
+def query_caller() -> str:
+    """
+    The first app function up the (await) stack that is not DB plumbing,
+    e.g. 'services.task_work_log_service.get_task_work_logs'.
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("app.") and module not in _PLUMBING_MODULES:
+            return f"{module[4:]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+class QueryTimer:
+    """
+    Times one database call and charges it to the calling service function
+    and to the current request (and its query profile, when profiling).
+    """
+
+    __slots__ = ("operation", "query", "caller", "route", "stats", "rows", "started")
+
+    def __init__(self, operation: str, query=None):
+        self.operation = operation
+        self.query = query
+        self.caller = query_caller()
+        self.stats = _request_stats.get()
+        self.route = self.stats.route if self.stats is not None else NO_ROUTE
+        self.rows: Optional[int] = None
+
+    def __enter__(self):
+        DB_QUERIES_IN_FLIGHT.labels(self.route).inc()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        DB_QUERIES_IN_FLIGHT.labels(self.route).dec()
+        DB_QUERY_SECONDS.labels(self.operation, self.caller).observe(elapsed)
+        if exc_type is not None and not issubclass(exc_type, GeneratorExit):
+            DB_QUERY_ERRORS.labels(self.operation, self.caller).inc()
+        elif self.rows is not None:
+            DB_ROWS_RETURNED.labels(self.caller).observe(self.rows)
+        if self.stats is not None:
+            self.stats.round_trips += 1
+            self.stats.db_seconds += elapsed
+        profile = current_query_profile()
+        if profile is not None:
+            profile.record(self.query, self.operation, self.caller, elapsed, self.rows)
+        return False
+
+
+# ------------------------
+# Caches, serialization, WebSockets
+# ------------------------
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+@contextmanager
+def observe_serialization(response: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        SERIALIZATION_SECONDS.labels(response).observe(time.perf_counter() - started)
+
+
+class InstrumentedJSONResponse(JSONResponse):
+    """
+    Default response class of the app: the stock JSONResponse with its
+    render time recorded.
+    """
+
+    def render(self, content) -> bytes:
+        with observe_serialization("json"):
+            return super().render(content)
+
+
+def record_ws_rooms(rooms: dict) -> None:
+    WS_ROOMS.set(len(rooms))
+    WS_CONNECTIONS.set(sum(len(clients) for clients in rooms.values()))
+
+
+def record_ws_message(direction: str, message_type: Optional[str]) -> None:
+    WS_MESSAGES.labels(direction, message_type or "unknown").inc()
@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+# Bump when the page layout below changes; cached PDFs of older versions are
+# no longer looked up and are replaced on their next render
+PDF_TEMPLATE_VERSION = 1
+PDF_CACHE_MAX_FILES = 500
+# cached PDFs younger than this may still be streaming to a client and are not evicted
+PDF_CACHE_MIN_AGE_SECONDS = 600
+
+PAGE_CSS = """
+@page { size: A4; margin: 18mm 15mm 20mm 15mm;
+        @bottom-right { content: "Page " counter(page) " of " counter(pages); font-size: 8pt; } }
+body { font-family: "DejaVu Sans", Arial, sans-serif; font-size: 10pt; line-height: 1.35; }
+table { border-collapse: collapse; width: 100%; page-break-inside: auto; }
+tr { page-break-inside: avoid; }
+td, th { border: 1px solid #999; padding: 3px 5px; vertical-align: top; }
+thead { display: table-header-group; }
+img { max-width: 100%; }
+"""
+
+
+class BlockedResourceError(ValueError):
+    pass
+
+
+def inline_only_url_fetcher(url: str, *args, **kwargs) -> dict:
+    """
+    Document HTML is user-authored: only inline data: URIs are loaded, so
+    file://, internal and metadata URLs are never fetched by the server.
+    """
+    if not url.startswith("data:"):
+        raise BlockedResourceError(f"Blocked external resource in PDF render: {url[:100]}")
+    from weasyprint import default_url_fetcher
+
+    return default_url_fetcher(url, *args, **kwargs)
+
+
+def render_html_to_pdf(html: str) -> bytes:
+    """
+    Runs in a worker process. WeasyPrint is imported there, so the API
+    process does not load it.
+    """
+    from weasyprint import CSS, HTML
+
+    return HTML(string=html, url_fetcher=inline_only_url_fetcher).write_pdf(
+        stylesheets=[CSS(string=PAGE_CSS)]
+    )
+
+
+def _wrap(html: str) -> str:
+    if "<html" in html[:500].lower():
+        return html
+    return f'<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>{html}</body></html>'
+
+
+class PdfRenderer:
+    """
+    HTML to PDF in a process pool. At most `concurrency` renders run at once,
+    concurrent requests for the same document share one render, and results
+    are kept on disk per (task_doc_id, template version, content hash) so
+    they can be streamed as files.
+    """
+
+    def __init__(
+        self,
+        folder: str = config.PDF_CACHE_FOLDER,
+        workers: int = config.PDF_RENDER_WORKERS,
+        concurrency: Optional[int] = None,
+        render_fn: Callable[[str], bytes] = render_html_to_pdf,
+        template_version: int = PDF_TEMPLATE_VERSION,
+        max_files: int = PDF_CACHE_MAX_FILES,
+        min_age: float = PDF_CACHE_MIN_AGE_SECONDS,
+    ):
+        self.folder = folder
+        self.workers = workers
+        self.concurrency = concurrency or workers
+        self.render_fn = render_fn
+        self.template_version = template_version
+        self.max_files = max_files
+        self.min_age = min_age
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    @property
+    def available(self) -> bool:
+        return self.render_fn is not render_html_to_pdf or importlib.util.find_spec("weasyprint") is not None
+
+    def cache_path(self, task_doc_id: int, html: str) -> str:
+        digest = hashlib.sha256(html.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.folder, f"{task_doc_id}_t{self.template_version}_{digest}.pdf")
+
+    def cached(self, task_doc_id: int, html: str) -> Optional[str]:
+        path = self.cache_path(task_doc_id, html)
+        return path if self._touch(path) else None
+
+    async def render(self, task_doc_id: int, html: str) -> str:
+        """
+        Path of the PDF for this document content, rendered if not cached.
+        """
+        path = self.cache_path(task_doc_id, html)
+        if self._touch(path):
+            return path
+        future = self._inflight.get(path)
+        if future is None:
+            future = asyncio.ensure_future(self._render(task_doc_id, html, path))
+            self._inflight[path] = future
+            future.add_done_callback(lambda _: self._inflight.pop(path, None))
+        # shield: a client going away must not cancel a render others wait on
+        return await asyncio.shield(future)
+
+    async def _render(self, task_doc_id: int, html: str, path: str) -> str:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            pdf = await asyncio.get_running_loop().run_in_executor(self._executor, self.render_fn, _wrap(html))
+
+        os.makedirs(self.folder, exist_ok=True)
+        partial = f"{path}.{os.getpid()}.part"
+        with open(partial, "wb") as f:
+            f.write(pdf)
+        os.replace(partial, path)
+        # older versions go once no download can still be reading them
+        self._remove_versions(task_doc_id, keep=path)
+        self._prune()
+        logger.info(f"Rendered PDF for task_doc_id={task_doc_id} ({len(pdf)} bytes)")
+        return path
+
+    @staticmethod
+    def _touch(path: str) -> bool:
+        # a served file counts as fresh, so eviction leaves it alone while it streams
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _evictable(self, entry: os.DirEntry) -> bool:
+        try:
+            return time.time() - entry.stat().st_mtime >= self.min_age
+        except FileNotFoundError:
+            return False
+
+    def _remove(self, entry: os.DirEntry) -> None:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+    def _remove_versions(self, task_doc_id: int, keep: str) -> None:
+        prefix = f"{task_doc_id}_t"
+        for entry in os.scandir(self.folder):
+            if entry.name.startswith(prefix) and entry.name.endswith(".pdf") \
+                    and entry.path != keep and self._evictable(entry):
+                self._remove(entry)
+
+    def _prune(self) -> None:
+        files = [e for e in os.scandir(self.folder) if e.name.endswith(".pdf")]
+        if len(files) <= self.max_files:
+            return
+        files.sort(key=lambda e: e.stat().st_mtime)
+        for entry in files[:len(files) - self.max_files]:
+            if self._evictable(entry):
+                self._remove(entry)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._semaphore = None
+
+
+pdf_renderer = PdfRenderer()
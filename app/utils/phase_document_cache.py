@@ -0,0 +1,66 @@
+from typing import Iterable, Optional
+
+from app.utils import events
+from app.utils.etag import body_etag
+from app.utils.ttl_cache import TTLCache
+
+# events only reach this worker, so other workers' saves show up after the TTL
+PHASE_DOCUMENT_CACHE_TTL_SECONDS = 60
+PHASE_DOCUMENT_CACHE_MAX_ENTRIES = 2000
+PHASE_DOCUMENT_CACHE_MAX_TASKS = 50000
+
+
+class PhaseDocumentCache:
+    """
+    Serialized phase document index responses and their ETags keyed by
+    project_phase_id, with every task of a cached phase mapped to it so
+    lookups and invalidations by project_task_id need no query. Task
+    mappings expire with their phase and go when it is invalidated.
+    """
+
+    def __init__(self, ttl: float = PHASE_DOCUMENT_CACHE_TTL_SECONDS,
+                 max_entries: int = PHASE_DOCUMENT_CACHE_MAX_ENTRIES,
+                 max_tasks: int = PHASE_DOCUMENT_CACHE_MAX_TASKS):
+        self._entries = TTLCache(ttl=ttl, max_entries=max_entries, name="phase_documents")
+        self._task_phase = TTLCache(ttl=ttl, max_entries=max_tasks)
+
+    def get(self, project_task_id: int) -> Optional[tuple[bytes, str]]:
+        phase_id = self._task_phase.get(project_task_id)
+        entry = self._entries.get(phase_id)
+        if entry is None:
+            return None
+        body, etag, _ = entry
+        return body, etag
+
+    def set(self, project_phase_id: int, project_task_ids: Iterable[int], body: bytes) -> str:
+        etag = body_etag(body)
+        task_ids = tuple(project_task_ids)
+        self._entries.set(project_phase_id, (body, etag, task_ids))
+        for task_id in task_ids:
+            self._task_phase.set(task_id, project_phase_id)
+        return etag
+
+    def invalidate(self, project_task_id: Optional[int] = None, project_phase_id: Optional[int] = None, **_) -> None:
+        """
+        Drop the phase of a changed task document. Without a phase, a task
+        that no cached phase knows (e.g. added after the phase was cached)
+        clears everything.
+        """
+        if project_phase_id is None and project_task_id is not None:
+            project_phase_id = self._task_phase.get(project_task_id)
+        if project_phase_id is None:
+            self.clear()
+            return
+        entry = self._entries.pop(project_phase_id)
+        for task_id in entry[2] if entry is not None else ():
+            self._task_phase.pop(task_id)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._task_phase.clear()
+
+
+phase_document_cache = PhaseDocumentCache()
+
+for _event in (events.TASK_DOCUMENT_SAVED, events.TASK_DOCUMENT_SUBMITTED):
+    events.subscribe(_event, phase_document_cache.invalidate)
@@ -0,0 +1,196 @@
+import json
+import logging
+import re
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from sqlalchemy import text
+
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_HEADER = "X-DB-Queries"
+# EXPLAINs run per request, slowest distinct statements first
+MAX_EXPLAINS = 3
+MAX_REPORTED_SQL = 2000
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_EXPANDING = re.compile(r"\(?\s*__\[POSTCOMPILE_\w+\]\s*\)?")
+_PARAM = re.compile(r":\w+|\$\d+|%\(\w+\)s|\?")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def query_sql(query) -> str:
+    # ClauseElements render with their bind placeholders, not the values
+    return query if isinstance(query, str) else str(query)
+
+
+def fingerprint(sql: str) -> str:
+    """
+    SQL with literals, parameters and IN lists collapsed, so the same
+    statement issued with different values maps to one fingerprint.
+    """
+    sql = _STRING.sub("?", sql)
+    sql = _EXPANDING.sub("(?)", sql)
+    sql = _PARAM.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(?)", sql)
+    return _SPACE.sub(" ", sql).strip().lower()
+
+
+class QueryRecord:
+    __slots__ = ("query", "sql", "fingerprint", "operation", "caller", "ms", "rows")
+
+    def __init__(self, query, operation: str, caller: str, seconds: float, rows: Optional[int]):
+        self.query = query
+        self.sql = query_sql(query)
+        self.fingerprint = fingerprint(self.sql)
+        self.operation = operation
+        self.caller = caller
+        self.ms = round(seconds * 1000, 3)
+        self.rows = rows
+
+
+class QueryProfile:
+    """
+    Every database call made while serving one request.
+    """
+
+    def __init__(self, method: str = "", path: str = ""):
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.status: Optional[int] = None
+        self.queries: list[QueryRecord] = []
+
+    def record(self, query, operation: str, caller: str, seconds: float, rows: Optional[int] = None) -> None:
+        self.queries.append(QueryRecord(query, operation, caller, seconds, rows))
+
+    @property
+    def db_ms(self) -> float:
+        return round(sum(q.ms for q in self.queries), 3)
+
+    def repeated(self, threshold: int) -> list[dict]:
+        """
+        Fingerprints issued at least `threshold` times: N+1 candidates.
+        """
+        groups: dict[str, list[QueryRecord]] = {}
+        for q in self.queries:
+            groups.setdefault(q.fingerprint, []).append(q)
+        found = [
+            {
+                "count": len(group),
+                "ms": round(sum(q.ms for q in group), 3),
+                "callers": sorted({q.caller for q in group}),
+                "sql": group[0].sql[:MAX_REPORTED_SQL],
+            }
+            for group in groups.values()
+            if len(group) >= threshold
+        ]
+        return sorted(found, key=lambda g: g["count"], reverse=True)
+
+    def slow(self, slow_ms: float) -> list[QueryRecord]:
+        return sorted((q for q in self.queries if q.ms >= slow_ms), key=lambda q: q.ms, reverse=True)
+
+    def summary(self, threshold: int, slow_ms: float) -> str:
+        return (
+            f"count={len(self.queries)}, time_ms={self.db_ms}, "
+            f"repeated={len(self.repeated(threshold))}, slow={len(self.slow(slow_ms))}"
+        )
+
+
+_current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("query_profile", default=None)
+
+
+def current_query_profile() -> Optional[QueryProfile]:
+    return _current_profile.get()
+
+
+async def explain(query) -> Optional[list[str]]:
+    """
+    Plan of `query` with its values inlined, or None when the statement
+    cannot be rendered with literal values.
+    """
+    from app.db.database import IS_SQLITE, database, engine
+
+    try:
+        if isinstance(query, str):
+            sql = query
+        else:
+            sql = str(query.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+        prefix = "EXPLAIN QUERY PLAN " if IS_SQLITE else "EXPLAIN "
+        # escape colons so literals such as timestamps are not read as binds
+        rows = await database.fetch_all(text(prefix + sql.replace(":", r"\:")))
+    except Exception as e:
+        logger.debug(f"EXPLAIN failed: {e}")
+        return None
+    return [" ".join(str(value) for value in row._mapping.values()) for row in rows]
+
+
+class QueryProfiler:
+    """
+    Opt-in (QUERY_PROFILER_ENABLED) per-request query log. The middleware
+    opens a profile per request, the database wrapper records into it, and
+    finish() builds the JSON report: repeated fingerprints (N+1) and slow
+    statements with their EXPLAIN output.
+    """
+
+    def __init__(self, enabled: bool, slow_ms: float, repeat_threshold: int):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.repeat_threshold = repeat_threshold
+        self._listeners: list[Callable[[dict], None]] = []
+
+    def begin(self, method: str = "", path: str = ""):
+        return _current_profile.set(QueryProfile(method, path))
+
+    def end(self, token) -> QueryProfile:
+        profile = _current_profile.get()
+        _current_profile.reset(token)
+        return profile
+
+    def summary(self, profile: QueryProfile) -> str:
+        return profile.summary(self.repeat_threshold, self.slow_ms)
+
+    def add_listener(self, listener: Callable[[dict], None]) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[dict], None]) -> None:
+        self._listeners.remove(listener)
+
+    async def finish(self, profile: QueryProfile) -> dict:
+        repeated = profile.repeated(self.repeat_threshold)
+        slow = []
+        explained = set()
+        for q in profile.slow(self.slow_ms):
+            plan = None
+            if q.fingerprint not in explained and len(explained) < MAX_EXPLAINS:
+                explained.add(q.fingerprint)
+                plan = await explain(q.query)
+            slow.append({"ms": q.ms, "caller": q.caller, "sql": q.sql[:MAX_REPORTED_SQL], "plan": plan})
+
+        report = {
+            "method": profile.method,
+            "path": profile.path,
+            "route": profile.route,
+            "status": profile.status,
+            "queries": len(profile.queries),
+            "db_ms": profile.db_ms,
+            "repeated": repeated,
+            "slow": slow,
+        }
+        level = logging.WARNING if repeated or slow else logging.DEBUG
+        logger.log(level, f"Query report: {json.dumps(report, default=str)}")
+        for listener in list(self._listeners):
+            listener(report)
+        return report
+
+
+query_profiler = QueryProfiler(
+    enabled=config.QUERY_PROFILER_ENABLED,
+    slow_ms=config.QUERY_PROFILER_SLOW_MS,
+    repeat_threshold=config.QUERY_PROFILER_REPEAT_THRESHOLD,
+)
@@ -0,0 +1,155 @@
+import ipaddress
+import logging
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+
+from starlette.requests import Request
+
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+# Buckets tracked per process before the least recently used are dropped
+MAX_BUCKETS = 10000
+
+
+class MemoryBucketStore:
+    """
+    Token buckets held in this process. Idle buckets refill to full, so
+    evicting the least recently used ones only forgets keys at rest.
+    """
+
+    def __init__(self, max_keys: int = MAX_BUCKETS):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, capacity: int, refill_per_second: float, now: float) -> float:
+        tokens, updated = self._buckets.pop(key, (float(capacity), now))
+        tokens = min(float(capacity), tokens + (now - updated) * refill_per_second)
+
+        if tokens >= 1:
+            tokens -= 1
+            retry_after = 0.0
+        else:
+            retry_after = (1 - tokens) / refill_per_second
+
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+class RedisBucketStore:
+    """
+    Token buckets shared by every worker through Redis. The refill and take
+    run in one Lua script, so concurrent workers cannot overspend a bucket.
+    """
+
+    _SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + (now - updated) * rate)
+    local retry_after = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        retry_after = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return tostring(retry_after)
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL is set but the 'redis' package is not installed") from e
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+        self._take = self._client.register_script(self._SCRIPT)
+
+    async def take(self, key: str, capacity: int, refill_per_second: float, now: float) -> float:
+        result = await self._take(keys=[self.prefix + key], args=[capacity, refill_per_second, now])
+        return float(result)
+
+    def clear(self) -> None:
+        pass
+
+
+def default_bucket_store():
+    if config.RATE_LIMIT_REDIS_URL:
+        return RedisBucketStore(config.RATE_LIMIT_REDIS_URL)
+    return MemoryBucketStore()
+
+
+class TokenBucketLimiter:
+    """
+    Allows bursts of `capacity` requests per key, refilled at `capacity`
+    tokens every `per_seconds`.
+    """
+
+    def __init__(self, name: str, capacity: int, per_seconds: float, store=None):
+        self.name = name
+        self.capacity = capacity
+        self.refill_per_second = capacity / per_seconds
+        self.store = store if store is not None else default_bucket_store()
+
+    async def hit(self, key) -> float:
+        """
+        Spend one token for `key`. Returns 0 when allowed, otherwise the
+        seconds until a token is available.
+        """
+        try:
+            return await self.store.take(
+                f"{self.name}:{key}", self.capacity, self.refill_per_second, time.time()
+            )
+        except Exception as e:
+            # a broken shared backend must not lock everyone out
+            logger.error(f"Rate limiter '{self.name}' unavailable: {e}")
+            return 0.0
+
+    def clear(self) -> None:
+        self.store.clear()
+
+
+@lru_cache(maxsize=8)
+def _proxy_networks(trusted: str) -> tuple:
+    return tuple(ipaddress.ip_network(entry.strip(), strict=False) for entry in trusted.split(",") if entry.strip())
+
+
+def _is_trusted(address: str, networks: tuple) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def client_ip(request: Request, trusted_proxies: Optional[str] = None) -> Optional[str]:
+    """
+    Address of the client behind the configured TRUSTED_PROXIES. When the
+    direct peer is a trusted proxy, X-Forwarded-For is read right to left
+    and the first hop that is not a trusted proxy is the client; entries to
+    its left are client-supplied and ignored. Otherwise the peer itself is
+    the client, so the header cannot be spoofed to dodge a per-IP limit.
+    """
+    peer = request.client.host if request.client else None
+    networks = _proxy_networks(config.TRUSTED_PROXIES if trusted_proxies is None else trusted_proxies)
+    if peer is None or not _is_trusted(peer, networks):
+        return peer
+    hops = [hop.strip() for value in request.headers.getlist("x-forwarded-for") for hop in value.split(",")]
+    hops = [hop for hop in hops if hop]
+    for hop in reversed(hops):
+        if not _is_trusted(hop, networks):
+            return hop
+    return hops[0] if hops else peer
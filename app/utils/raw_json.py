@@ -0,0 +1,54 @@
+import json
+from typing import Any, Optional, Union
+
+from fastapi import status
+from fastapi.responses import Response
+
+from app.utils.metrics import observe_serialization
+
+
+class RawJSONResponse(Response):
+    """
+    Response for JSON that is already serialized (e.g. text returned by a
+    Postgres json function). The body is sent as-is, without a parse/encode pass.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        with observe_serialization("raw_json"):
+            return to_json_bytes(content)
+
+
+def to_json_bytes(value: Union[str, bytes, dict, list, None]) -> bytes:
+    if value is None:
+        return b"null"
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    # drivers/codecs that already decoded the json column
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_envelope(data: Union[str, bytes, dict, list, None], message: str, status_code: int = status.HTTP_200_OK) -> bytes:
+    """
+    Build the standard {"status_code", "message", "data"} body around an
+    already-serialized `data` value by byte concatenation.
+    """
+    return (
+        b'{"status_code":' + str(status_code).encode()
+        + b',"message":' + json.dumps(message, ensure_ascii=False).encode("utf-8")
+        + b',"data":' + to_json_bytes(data)
+        + b"}"
+    )
+
+
+async def fetch_json_value(db, query, values: Optional[dict] = None, column: Union[str, int] = 0):
+    """
+    Run a query that returns a single json value (typically a stored function
+    call) and return that value untouched, or None when nothing came back.
+    """
+    row = await db.fetch_one(query, values=values) if values is not None else await db.fetch_one(query)
+    if not row:
+        return None
+    return row[column]
@@ -0,0 +1,219 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+
+from app.db import risk_assessment_table, sdlc_phases_table, sdlc_tasks_table
+from app.db.database import database
+from app.utils.metrics import record_cache_lookup
+from app.db.master.risk_sdlcphase_mapping import risk_sdlcphase_mapping_table
+from app.db.master.sdlc_phase_tasks_mapping import sdlc_phase_tasks_mapping_table
+
+logger = logging.getLogger(__name__)
+
+# Safety net for workers that did not handle the mapping write themselves
+SDLC_TEMPLATE_GRAPH_TTL_SECONDS = 300
+
+
+def _phase_sort_key(phase: dict):
+    return (phase["order_id"] is None, phase["order_id"] or 0, phase["phase_id"])
+
+
+@dataclass(frozen=True)
+class SdlcTemplateSnapshot:
+    """
+    Immutable risk -> phase -> task template built from the master mapping
+    tables. Every lookup is a dict access on precomputed, ordered tuples.
+    """
+
+    version: int
+    loaded_at: float
+    # phase_id -> {"phase_id", "phase_name", "order_id", "is_active"}
+    phases: dict = field(default_factory=dict)
+    # phase_id -> ({"task_id", "task_name"}, ...) from active mappings, in task order
+    phase_tasks: dict = field(default_factory=dict)
+    # risk_assessment_id -> ({"phase_id", "phase_name", "tasks"}, ...) in phase order
+    risk_phases: dict = field(default_factory=dict)
+    # precomputed payloads of the admin screens
+    phases_with_tasks: tuple = ()
+    risks_with_phases: tuple = ()
+
+    def tasks_for_phase(self, phase_id: int) -> tuple:
+        return self.phase_tasks.get(phase_id, ())
+
+    def phases_for_risk(self, risk_assessment_id: int) -> tuple:
+        return self.risk_phases.get(risk_assessment_id, ())
+
+    def ordered_active_phases(self, phase_ids: Iterable[int]) -> list:
+        """
+        The active phases among `phase_ids`, in template (order_id) order.
+        """
+        selected = [self.phases[pid] for pid in set(phase_ids) if pid in self.phases]
+        return sorted((p for p in selected if p["is_active"]), key=_phase_sort_key)
+
+
+def build_sdlc_template_snapshot(phase_rows, task_rows, risk_rows, version: int = 0) -> SdlcTemplateSnapshot:
+    """
+    Build a snapshot from the rows of the three loader queries:
+    phases (phase_id, phase_name, order_id, is_active), active phase-task
+    mappings joined to tasks (phase_id, task_id, task_name) in task order, and
+    active risk-phase mappings (risk_assessment_id, risk_assessment_name,
+    phase_id).
+    """
+    phases = {
+        row["phase_id"]: {
+            "phase_id": row["phase_id"],
+            "phase_name": row["phase_name"],
+            "order_id": row["order_id"],
+            "is_active": bool(row["is_active"]),
+        }
+        for row in phase_rows
+    }
+
+    phase_tasks: dict[int, list] = {}
+    for row in task_rows:
+        if row["phase_id"] in phases:
+            phase_tasks.setdefault(row["phase_id"], []).append(
+                {"task_id": row["task_id"], "task_name": row["task_name"]}
+            )
+    phase_tasks = {pid: tuple(tasks) for pid, tasks in phase_tasks.items()}
+
+    risk_names: dict[int, str] = {}
+    risk_phase_ids: dict[int, list] = {}
+    for row in risk_rows:
+        if row["phase_id"] not in phases:
+            continue
+        rid = row["risk_assessment_id"]
+        risk_names.setdefault(rid, row["risk_assessment_name"])
+        risk_phase_ids.setdefault(rid, []).append(row["phase_id"])
+
+    risk_phases = {
+        rid: tuple(
+            {
+                "phase_id": phase["phase_id"],
+                "phase_name": phase["phase_name"],
+                "tasks": phase_tasks.get(phase["phase_id"], ()),
+            }
+            for phase in sorted((phases[pid] for pid in dict.fromkeys(pids)), key=_phase_sort_key)
+        )
+        for rid, pids in risk_phase_ids.items()
+    }
+
+    phases_with_tasks = tuple(
+        {"phase_id": phase["phase_id"], "phase_name": phase["phase_name"], "tasks": list(phase_tasks[phase["phase_id"]])}
+        for phase in sorted((phases[pid] for pid in phase_tasks), key=_phase_sort_key)
+    )
+    risks_with_phases = tuple(
+        {
+            "risk_assessment_id": rid,
+            "risk_assessment_name": risk_names[rid],
+            "phases": [{"phase_id": p["phase_id"], "phase_name": p["phase_name"]} for p in risk_phases[rid]],
+        }
+        for rid in risk_phases
+    )
+
+    return SdlcTemplateSnapshot(
+        version=version,
+        loaded_at=time.monotonic(),
+        phases=phases,
+        phase_tasks=phase_tasks,
+        risk_phases=risk_phases,
+        phases_with_tasks=phases_with_tasks,
+        risks_with_phases=risks_with_phases,
+    )
+
+
+class SdlcTemplateGraph:
+    """
+    Process-wide holder of the current SdlcTemplateSnapshot. Loaded on first
+    use and replaced as a whole by rebuild(), so readers always see one
+    consistent version.
+    """
+
+    def __init__(self, ttl: float = SDLC_TEMPLATE_GRAPH_TTL_SECONDS):
+        self.ttl = ttl
+        self._snapshot: Optional[SdlcTemplateSnapshot] = None
+        self._version = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version if self._snapshot else 0
+
+    async def get(self) -> SdlcTemplateSnapshot:
+        snapshot = self._snapshot
+        fresh = snapshot is not None and snapshot.loaded_at + self.ttl >= time.monotonic()
+        record_cache_lookup("sdlc_template", fresh)
+        if not fresh:
+            snapshot = await self.rebuild(stale=snapshot)
+        return snapshot
+
+    async def rebuild(self, stale: Optional[SdlcTemplateSnapshot] = None) -> SdlcTemplateSnapshot:
+        """
+        Reload the template from the database and swap it in. Concurrent
+        callers waiting on the lock reuse the snapshot loaded by the first.
+        """
+        async with self._lock:
+            if stale is not None and self._snapshot is not stale:
+                return self._snapshot
+
+            phase_rows, task_rows, risk_rows = await asyncio.gather(
+                database.fetch_all(
+                    select(
+                        sdlc_phases_table.c.phase_id,
+                        sdlc_phases_table.c.phase_name,
+                        sdlc_phases_table.c.order_id,
+                        sdlc_phases_table.c.is_active,
+                    )
+                ),
+                database.fetch_all(
+                    select(
+                        sdlc_phase_tasks_mapping_table.c.phase_id,
+                        sdlc_tasks_table.c.task_id,
+                        sdlc_tasks_table.c.task_name,
+                    )
+                    .select_from(
+                        sdlc_phase_tasks_mapping_table.join(
+                            sdlc_tasks_table,
+                            sdlc_phase_tasks_mapping_table.c.task_id == sdlc_tasks_table.c.task_id,
+                        )
+                    )
+                    .where(sdlc_phase_tasks_mapping_table.c.is_active == True)
+                    .order_by(sdlc_tasks_table.c.order_id, sdlc_phase_tasks_mapping_table.c.phase_task_map_id)
+                ),
+                database.fetch_all(
+                    select(
+                        risk_sdlcphase_mapping_table.c.risk_assessment_id,
+                        risk_assessment_table.c.risk_assessment_name,
+                        risk_sdlcphase_mapping_table.c.phase_id,
+                    )
+                    .select_from(
+                        risk_sdlcphase_mapping_table.join(
+                            risk_assessment_table,
+                            risk_sdlcphase_mapping_table.c.risk_assessment_id == risk_assessment_table.c.risk_assessment_id,
+                        )
+                    )
+                    .where(risk_sdlcphase_mapping_table.c.is_active == True)
+                    .order_by(risk_sdlcphase_mapping_table.c.risk_phase_map_id)
+                ),
+            )
+
+            self._version += 1
+            self._snapshot = build_sdlc_template_snapshot(phase_rows, task_rows, risk_rows, version=self._version)
+            logger.info(f"SDLC template graph loaded (version {self._version})")
+            return self._snapshot
+
+    def install(self, snapshot: SdlcTemplateSnapshot) -> None:
+        self._snapshot = snapshot
+
+    def clear(self) -> None:
+        """
+        Drop the snapshot so the next get() reloads it (master data edits).
+        """
+        self._snapshot = None
+
+
+sdlc_template_graph = SdlcTemplateGraph()
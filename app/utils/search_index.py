@@ -0,0 +1,354 @@
+import asyncio
+import html
+import json
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+
+from app.db.database import database
+from app.db.docs.task_docs import task_docs_table
+from app.db.transaction.comment_replies import comment_replies_table
+from app.db.transaction.incident_reports import incident_report_table
+from app.db.transaction.project_comments import project_comments_table
+from app.utils import events
+from app.utils.comment_stream import REPLY_CREATED, REPLY_UPDATED
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT = "document"
+COMMENT = "comment"
+REPLY = "reply"
+INCIDENT = "incident"
+SEARCH_TYPES = (DOCUMENT, COMMENT, REPLY, INCIDENT)
+
+SNIPPET_CHARS = 160
+# indexed text is cut here, as full_text_search.sql does on Postgres, so one entry
+# never exceeds the 1MB tsvector limit
+SEARCH_TEXT_MAX_CHARS = 100000
+# BM25 parameters
+_K1 = 1.2
+_B = 0.75
+
+_TAG_RE = re.compile(r"<[^>]*>")
+_SPACE_RE = re.compile(r"\s+")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+
+def strip_html(text: str) -> str:
+    return _SPACE_RE.sub(" ", html.unescape(_TAG_RE.sub(" ", text))).strip()
+
+
+def _json_strings(value) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _json_strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _json_strings(item)
+
+
+def document_text(document_json: Optional[str]) -> str:
+    """
+    Searchable text of a task document: the string values of its JSON (no
+    keys or punctuation) with the HTML markup stripped. Non-JSON content is
+    treated as plain HTML. Mirrors ai_verify_docs.document_search_text in
+    database_scripts/Rakesh/full_text_search.sql, which feeds the tsvector.
+    """
+    if not document_json:
+        return ""
+    try:
+        parsed = json.loads(document_json)
+    except ValueError:
+        return search_text(strip_html(document_json))
+    return search_text(strip_html(" ".join(_json_strings(parsed))))
+
+
+def search_text(text: Optional[str]) -> str:
+    return (text or "")[:SEARCH_TEXT_MAX_CHARS]
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def snippet(text: str, terms: Iterable[str], width: int = SNIPPET_CHARS) -> str:
+    """
+    About `width` characters of `text` around the first matched term, with
+    the matches wrapped in <b></b> like Postgres ts_headline.
+    """
+    pattern = re.compile(r"\b(" + "|".join(re.escape(t) for t in terms) + r")\b", re.IGNORECASE)
+    match = pattern.search(text)
+    start = max(0, (match.start() if match else 0) - width // 3)
+    end = min(len(text), start + width)
+    if start > 0:
+        start = text.find(" ", start) + 1 or start
+    window = html.escape(text[start:end])
+    window = pattern.sub(lambda m: f"<b>{m.group(0)}</b>", window)
+    return ("…" if start > 0 else "") + window + ("…" if end < len(text) else "")
+
+
+@dataclass(frozen=True)
+class SearchDoc:
+    type: str
+    id: int
+    project_id: Optional[int]
+    project_phase_id: Optional[int]
+    project_task_id: Optional[int]
+    text: str
+
+    @property
+    def key(self) -> tuple:
+        return self.type, self.id
+
+
+class InvertedIndex:
+    """
+    term -> {doc key: term frequency}, ranked with BM25. Queries match
+    documents containing every term, like websearch_to_tsquery without
+    operators (and without stemming).
+    """
+
+    def __init__(self):
+        self._docs: dict[tuple, tuple[SearchDoc, int]] = {}
+        self._postings: dict[str, dict[tuple, int]] = defaultdict(dict)
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, doc: SearchDoc) -> None:
+        self.remove(doc.key)
+        tokens = tokenize(doc.text)
+        if not tokens:
+            return
+        for term, count in Counter(tokens).items():
+            self._postings[term][doc.key] = count
+        self._docs[doc.key] = (doc, len(tokens))
+        self._total_length += len(tokens)
+
+    def remove(self, key: tuple) -> None:
+        entry = self._docs.pop(key, None)
+        if entry is None:
+            return
+        doc, length = entry
+        self._total_length -= length
+        for term in set(tokenize(doc.text)):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[term]
+
+    def remove_where(self, type_: str, **fields) -> None:
+        for key, (doc, _) in list(self._docs.items()):
+            if doc.type == type_ and all(getattr(doc, name) in values for name, values in fields.items()):
+                self.remove(key)
+
+    def clear(self) -> None:
+        self._docs.clear()
+        self._postings.clear()
+        self._total_length = 0
+
+    def search(self, query: str, types: Optional[Iterable[str]] = None, project_id: Optional[int] = None,
+               project_ids: Optional[Iterable[int]] = None) -> list[tuple[float, SearchDoc]]:
+        """
+        Matches ranked best first; `project_ids` limits them to those
+        projects (the caller's memberships).
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self._docs:
+            return []
+        postings = [self._postings.get(term, {}) for term in terms]
+        keys = set.intersection(*(set(p) for p in postings))
+        types = set(types) if types else None
+        project_ids = set(project_ids) if project_ids is not None else None
+
+        total = len(self._docs)
+        avg_length = self._total_length / total
+        idf = [math.log(1 + (total - len(p) + 0.5) / (len(p) + 0.5)) for p in postings]
+        results = []
+        for key in keys:
+            doc, length = self._docs[key]
+            if types is not None and doc.type not in types:
+                continue
+            if project_id is not None and doc.project_id != project_id:
+                continue
+            if project_ids is not None and doc.project_id not in project_ids:
+                continue
+            score = 0.0
+            for weight, p in zip(idf, postings):
+                tf = p[key]
+                score += weight * tf * (_K1 + 1) / (tf + _K1 * (1 - _B + _B * length / avg_length))
+            results.append((score, doc))
+        results.sort(key=lambda item: (-item[0], item[1].type, -item[1].id))
+        return results
+
+
+def _comment_query():
+    c = project_comments_table.c
+    return select(c.comment_id.label("id"), c.project_id, c.project_phase_id, c.project_task_id, c.description.label("text"))
+
+
+def _reply_query():
+    c = project_comments_table.c
+    return (
+        select(
+            comment_replies_table.c.reply_id.label("id"), c.project_id, c.project_phase_id, c.project_task_id,
+            comment_replies_table.c.reply_description.label("text"),
+        )
+        .join(project_comments_table, c.comment_id == comment_replies_table.c.comment_id)
+    )
+
+
+def _incident_query():
+    c = incident_report_table.c
+    return select(
+        c.incident_report_id.label("id"), c.project_id, c.phase_id.label("project_phase_id"),
+        c.task_id.label("project_task_id"), c.raise_comment, c.resolve_comment,
+    )
+
+
+def _document_query():
+    c = task_docs_table.c
+    return select(
+        c.task_doc_id.label("id"), c.project_id, c.project_phase_id, c.project_task_id,
+        c.document_json.label("text"),
+    ).where(c.is_latest == True)
+
+
+def _to_doc(type_: str, row) -> SearchDoc:
+    row = dict(row._mapping)
+    if type_ == INCIDENT:
+        text = search_text(" ".join(filter(None, (row.pop("raise_comment"), row.pop("resolve_comment")))))
+    elif type_ == DOCUMENT:
+        text = document_text(row.pop("text"))
+    else:
+        text = search_text(row.pop("text"))
+    return SearchDoc(type=type_, text=text, **row)
+
+
+_ID_COLUMNS = {
+    COMMENT: (_comment_query, project_comments_table.c.comment_id),
+    REPLY: (_reply_query, comment_replies_table.c.reply_id),
+    INCIDENT: (_incident_query, incident_report_table.c.incident_report_id),
+}
+
+
+class SearchIndex:
+    """
+    In-process full-text index over latest task documents, comments,
+    replies and incident comments; the search backend on SQLite (tests and
+    local runs), where the Postgres tsvector columns do not exist.
+
+    Built from the database on first search. Afterwards write paths only
+    mark what they touched (through the events bus) and the next search
+    reloads just those rows before querying.
+    """
+
+    def __init__(self):
+        self.index = InvertedIndex()
+        self._built = False
+        self._dirty: dict[str, set[int]] = defaultdict(set)
+        self._dirty_doc_tasks: set[int] = set()
+        self._dirty_doc_phases: set[int] = set()
+        self._lock = asyncio.Lock()
+
+    def mark(self, type_: str, id_: Optional[int]) -> None:
+        # nothing to keep in step until the first search builds the index
+        if not self._built:
+            return
+        if id_ is None:
+            self._built = False
+        else:
+            self._dirty[type_].add(id_)
+
+    def on_comment_changed(self, comment_id: Optional[int] = None, action: Optional[str] = None,
+                           data: Optional[dict] = None, **_) -> None:
+        if action in (REPLY_CREATED, REPLY_UPDATED):
+            self.mark(REPLY, (data or {}).get("reply_id"))
+        self.mark(COMMENT, comment_id)
+
+    def on_incident_changed(self, incident_report_id: Optional[int] = None, **_) -> None:
+        self.mark(INCIDENT, incident_report_id)
+
+    def on_document_changed(self, project_task_id: Optional[int] = None,
+                            project_phase_id: Optional[int] = None, **_) -> None:
+        if not self._built:
+            return
+        if project_task_id is None and project_phase_id is None:
+            self._built = False
+        if project_task_id is not None:
+            self._dirty_doc_tasks.add(project_task_id)
+        if project_phase_id is not None:
+            self._dirty_doc_phases.add(project_phase_id)
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            if not self._built:
+                await self._build()
+                return
+            dirty, self._dirty = self._dirty, defaultdict(set)
+            tasks, self._dirty_doc_tasks = self._dirty_doc_tasks, set()
+            phases, self._dirty_doc_phases = self._dirty_doc_phases, set()
+
+            for type_, ids in dirty.items():
+                query, id_column = _ID_COLUMNS[type_]
+                rows = await database.fetch_all(query().where(id_column.in_(list(ids))))
+                for id_ in ids:
+                    self.index.remove((type_, id_))
+                for row in rows:
+                    self.index.add(_to_doc(type_, row))
+
+            if tasks or phases:
+                c = task_docs_table.c
+                self.index.remove_where(DOCUMENT, project_task_id=tasks)
+                self.index.remove_where(DOCUMENT, project_phase_id=phases)
+                rows = await database.fetch_all(
+                    _document_query().where(c.project_task_id.in_(list(tasks)) | c.project_phase_id.in_(list(phases)))
+                )
+                for row in rows:
+                    self.index.add(_to_doc(DOCUMENT, row))
+
+    async def _build(self) -> None:
+        # marks made while loading stay queued and are reloaded on the next search
+        self._built = True
+        self._dirty.clear()
+        self._dirty_doc_tasks.clear()
+        self._dirty_doc_phases.clear()
+        self.index.clear()
+        loaders = ((COMMENT, _comment_query), (REPLY, _reply_query), (INCIDENT, _incident_query),
+                   (DOCUMENT, _document_query))
+        for type_, query in loaders:
+            for row in await database.fetch_all(query()):
+                self.index.add(_to_doc(type_, row))
+        logger.info(f"Search index built with {len(self.index)} entries")
+
+    async def search(self, query: str, types: Optional[Iterable[str]] = None, project_id: Optional[int] = None,
+                     project_ids: Optional[Iterable[int]] = None) -> list[tuple[float, SearchDoc]]:
+        await self.refresh()
+        return self.index.search(query, types=types, project_id=project_id, project_ids=project_ids)
+
+    def clear(self) -> None:
+        self.index.clear()
+        self._built = False
+        self._dirty.clear()
+        self._dirty_doc_tasks.clear()
+        self._dirty_doc_phases.clear()
+
+
+search_index = SearchIndex()
+
+events.subscribe(events.COMMENT_CHANGED, search_index.on_comment_changed)
+events.subscribe(events.INCIDENT_CHANGED, search_index.on_incident_changed)
+events.subscribe(events.TASK_DOCUMENT_SUBMITTED, search_index.on_document_changed)
+events.subscribe(events.TASK_DOCUMENT_SAVED, search_index.on_document_changed)
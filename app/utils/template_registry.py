@@ -0,0 +1,61 @@
+from typing import Iterable, Optional
+
+from app.utils import events
+from app.utils.ttl_cache import TTLCache
+
+# createJsonTemplate on another worker is only seen here once the pointer expires
+TEMPLATE_LATEST_TTL_SECONDS = 60
+TEMPLATE_REGISTRY_MAX_ENTRIES = 1000
+
+
+def template_etag(template_id: int) -> str:
+    # a versioned template never changes, so its id is a strong validator
+    return f'"json-template-{template_id}"'
+
+
+class TemplateRegistry:
+    """
+    Serialized json_templates rows keyed by template_id, kept without a TTL
+    because a saved version is immutable, plus a "latest by type" pointer
+    that createJsonTemplate invalidates.
+    """
+
+    def __init__(self, latest_ttl: float = TEMPLATE_LATEST_TTL_SECONDS,
+                 max_entries: int = TEMPLATE_REGISTRY_MAX_ENTRIES):
+        self._templates = TTLCache(ttl=None, max_entries=max_entries, name="json_templates")
+        self._latest = TTLCache(ttl=latest_ttl, max_entries=max_entries, name="json_template_latest")
+
+    def get(self, template_id: int) -> Optional[dict]:
+        return self._templates.get(template_id)
+
+    def get_many(self, template_ids: Iterable[int]) -> dict[int, dict]:
+        found = {}
+        for template_id in template_ids:
+            data = self._templates.get(template_id)
+            if data is not None:
+                found[template_id] = data
+        return found
+
+    def put(self, template_id: int, data: dict) -> None:
+        self._templates.set(template_id, data)
+
+    def get_latest(self, template_type_id: int) -> Optional[dict]:
+        return self._latest.get(template_type_id)
+
+    def set_latest(self, template_type_id: int, data: dict) -> None:
+        self._latest.set(template_type_id, data)
+
+    def invalidate_type(self, template_type_id: Optional[int] = None, **_) -> None:
+        if template_type_id is None:
+            self._latest.clear()
+            return
+        self._latest.pop(template_type_id)
+
+    def clear(self) -> None:
+        self._templates.clear()
+        self._latest.clear()
+
+
+template_registry = TemplateRegistry()
+
+events.subscribe(events.JSON_TEMPLATE_CREATED, template_registry.invalidate_type)
@@ -0,0 +1,72 @@
+import time
+from typing import Any, Callable, Hashable, Optional
+
+from app.utils.metrics import record_cache_lookup
+
+
+class TTLCache:
+    """
+    Small in-process cache whose entries expire `ttl` seconds after being set
+    (never, when `ttl` is None). When `max_entries` is reached, expired
+    entries are dropped first, then the least recently set one. Lookups of a
+    named cache are counted in the cache_lookups_total metric.
+    """
+
+    def __init__(self, ttl: Optional[float], max_entries: int = 1024, name: Optional[str] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.name = name
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        value = self._lookup(key)
+        if self.name is not None:
+            record_cache_lookup(self.name, value is not _MISSING)
+        return default if value is _MISSING else value
+
+    def _lookup(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return _MISSING
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        # re-inserting keeps the dict in set order, oldest first
+        self._entries.pop(key, None)
+        if len(self._entries) >= self.max_entries:
+            self._evict()
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        self._entries[key] = (expires_at, value)
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._entries.items() if expires_at < now]:
+            del self._entries[key]
+        while len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+    def pop(self, key: Hashable) -> Any:
+        """Remove `key` and return its value, or None when absent or expired."""
+        value = self._lookup(key)
+        self._entries.pop(key, None)
+        return None if value is _MISSING else value
+
+    def pop_matching(self, predicate: Callable[[Hashable], bool]) -> None:
+        for key in [k for k in self._entries if predicate(k)]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._lookup(key) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_MISSING = object()
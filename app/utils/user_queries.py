@@ -0,0 +1,140 @@
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Awaitable, Callable, Optional, TypedDict
+
+from sqlalchemy import Select, and_, select
+
+from app.db import user_role_mapping_table, user_roles_table
+from app.db.transaction.users import users as users_table
+from app.utils.metrics import record_cache_lookup
+
+
+class AuthUser(TypedDict):
+    user_id: int
+    user_name: Optional[str]
+    user_first_name: Optional[str]
+    email: str
+    password: Optional[str]
+    is_active: Optional[bool]
+    is_temporary_password: Optional[bool]
+    password_validity_date: Optional[datetime]
+    login_failed_count: Optional[int]
+    is_user_locked: Optional[bool]
+    user_locked_time: Optional[datetime]
+
+
+class ProfileUser(TypedDict):
+    user_id: int
+    user_code: Optional[str]
+    user_first_name: Optional[str]
+    user_middle_name: Optional[str]
+    user_last_name: Optional[str]
+    user_name: Optional[str]
+    email: str
+    user_phone: Optional[str]
+    user_address: Optional[str]
+    image_url: Optional[str]
+    is_active: Optional[bool]
+    is_temporary_password: Optional[bool]
+
+
+class UserListItem(TypedDict):
+    user_id: int
+    user_name: Optional[str]
+    email: str
+    image_url: Optional[str]
+    is_active: Optional[bool]
+
+
+def _columns(projection) -> tuple:
+    return tuple(users_table.c[name] for name in projection.__annotations__)
+
+
+# Login: credentials and lock state, no profile fields
+AUTH_USER_COLUMNS = _columns(AuthUser)
+# Current user / profile pages: everything except secrets and audit columns
+PROFILE_USER_COLUMNS = _columns(ProfileUser)
+# Pickers and lists
+LISTING_USER_COLUMNS = _columns(UserListItem)
+
+
+def select_users(columns=LISTING_USER_COLUMNS) -> Select:
+    return select(*columns)
+
+
+def user_by_id_query(user_id: int, columns=PROFILE_USER_COLUMNS) -> Select:
+    return select_users(columns).where(users_table.c.user_id == user_id)
+
+
+def active_user_with_role_query(email: str, columns=AUTH_USER_COLUMNS) -> Select:
+    """
+    An active user by email together with their first active role
+    (role_id/role_name are None when the user has none). With the auth
+    columns this is answered from ix_users_active_email.
+    """
+    return (
+        select(*columns, user_roles_table.c.role_id, user_roles_table.c.role_name)
+        .select_from(
+            users_table.outerjoin(
+                user_role_mapping_table,
+                and_(
+                    user_role_mapping_table.c.user_id == users_table.c.user_id,
+                    user_role_mapping_table.c.is_active == True,
+                ),
+            ).outerjoin(
+                user_roles_table,
+                user_roles_table.c.role_id == user_role_mapping_table.c.role_id,
+            )
+        )
+        .where((users_table.c.email == email) & (users_table.c.is_active == True))
+        .order_by(user_role_mapping_table.c.user_role_map_id)
+        .limit(1)
+    )
+
+
+# ------------------------
+# Per-request user cache
+# ------------------------
+
+# Set by RequestUserCacheMiddleware; None outside a request, which disables caching
+_request_users: ContextVar[Optional[dict]] = ContextVar("request_users", default=None)
+
+
+def begin_request_user_cache():
+    return _request_users.set({})
+
+
+def end_request_user_cache(token) -> None:
+    # tasks spawned during the request hold a copy of the context, so empty
+    # the dict instead of leaving them with rows that only grow staler
+    cache = _request_users.get()
+    if cache is not None:
+        cache.clear()
+    _request_users.reset(token)
+
+
+def forget_request_users() -> None:
+    """
+    Drop the users loaded so far in this request; called after user writes.
+    """
+    cache = _request_users.get()
+    if cache is not None:
+        cache.clear()
+
+
+async def cached_user(key: tuple, loader: Callable[[], Awaitable]):
+    """
+    Return the row stored under `key` for the current request, loading it
+    once. Misses (None) are not cached.
+    """
+    cache = _request_users.get()
+    if cache is None:
+        return await loader()
+    hit = key in cache
+    record_cache_lookup("request_user", hit)
+    if hit:
+        return cache[key]
+    row = await loader()
+    if row is not None:
+        cache[key] = row
+    return row
@@ -9,6 +9,8 @@ from app.db.transaction.users import users as users_table
 from sqlalchemy import select, insert
 from datetime import datetime,timezone
 from app.config import config
+from app.utils.ttl_cache import TTLCache
+from app.utils.user_queries import AUTH_USER_COLUMNS, active_user_with_role_query, cached_user, forget_request_users
 
 # from app.models.users import
 naive_utc_time = datetime.now(timezone.utc).replace(tzinfo=None)
@@ -16,32 +18,70 @@ naive_utc_time = datetime.now(timezone.utc).replace(tzinfo=None)
 
 logger = logging.getLogger(__name__)
 
+# user_id -> {"id": role_id, "name": role_name}; the TTL only bounds staleness
+# for role changes made outside user_role_mapping_service
+ROLE_CACHE_TTL_SECONDS = 300
+role_cache = TTLCache(ttl=ROLE_CACHE_TTL_SECONDS, max_entries=10000, name="user_role")
 
-async def fetch_user_by_email(email: str):
+
+async def fetch_user_by_email(email: str, columns=AUTH_USER_COLUMNS):
+    """
+    Fetch an active user together with their first active role in one query.
+    The row carries `columns` (the login projection by default) plus role_id
+    and role_name (None when the user has no role); the role is also stored
+    in the role cache. Repeat lookups within one request are served from the
+    request's user cache.
+    """
     logger.debug(f"Fetching user by email: {email}")
-    query = users_table.select().where(
-        (users_table.c.email == email) & (users_table.c.is_active == True)
+    user = await cached_user(
+        ("email", email, columns),
+        lambda: database.fetch_one(active_user_with_role_query(email, columns)),
     )
-    user = await database.fetch_one(query)
     if user:
         logger.info(f"User found: {email}")
         logger.info(f"User found 2: id={user['user_id']}, name={user['user_name']}")
+        role = role_from_user(dict(user._mapping))
+        if role:
+            role_cache.set(user["user_id"], role)
 
     else:
         logger.warning(f"No active user found with email: {email}")
     return user
 
 
-
 # ------------------------
 # Role Handling Function
 # ------------------------
 
+def role_from_user(user) -> dict | None:
+    """
+    Role carried by a fetch_user_by_email row mapping as {"id", "name"}, or None.
+    """
+    if user.get("role_id") is None:
+        return None
+    return {"id": user["role_id"], "name": user.get("role_name")}
+
+
+def invalidate_user_role(user_id: int | None = None) -> None:
+    """
+    Drop the cached role of `user_id` (every user when None). Called by the
+    user-role mapping writes.
+    """
+    if user_id is None:
+        role_cache.clear()
+    else:
+        role_cache.pop(user_id)
+
+
 async def get_user_role(user_id: int) -> dict | None:
     """
-    Fetch the first role assigned to a user.
-    Returns dict {"role_id": id, "role_name": name} if found, else None.
+    Fetch the first active role assigned to a user.
+    Returns dict {"id": id, "name": name} if found, else None.
     """
+    role = role_cache.get(user_id)
+    if role is not None:
+        return role
+
     role_query = (
         select(user_roles_table.c.role_id, user_roles_table.c.role_name)
         .select_from(
@@ -51,11 +91,15 @@ async def get_user_role(user_id: int) -> dict | None:
             )
         )
         .where(user_role_mapping_table.c.user_id == user_id)
+        .where(user_role_mapping_table.c.is_active == True)
+        .order_by(user_role_mapping_table.c.user_role_map_id)
         .limit(1)
     )
     role = await database.fetch_one(role_query)
     if role:
-        return {"id": role["role_id"], "name": role["role_name"]}
+        role = {"id": role["role_id"], "name": role["role_name"]}
+        role_cache.set(user_id, role)
+        return role
     return None
 
 
@@ -98,6 +142,7 @@ async def reset_user_login_state(user_id: int):
     Reset login failed count and unlock the user.
     """
     logger.info(f"Resetting login state for user: {user_id}")
+    forget_request_users()
     await database.execute(
         users_table.update()
         .where(users_table.c.user_id == user_id)
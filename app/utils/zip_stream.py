@@ -0,0 +1,110 @@
+import hashlib
+import posixpath
+import time
+import zipfile
+from typing import AsyncIterable, AsyncIterator, Iterable, Union
+
+
+class _Sink:
+    """
+    Write-only, unseekable file object for ZipFile; what it receives is
+    taken out with drain() so nothing accumulates. Being unseekable makes
+    ZipFile write sizes and CRCs in data descriptors after each entry.
+    """
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._offset = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def _as_async(chunks):
+    if hasattr(chunks, "__aiter__"):
+        async for chunk in chunks:
+            yield chunk
+    else:
+        for chunk in chunks:
+            yield chunk
+
+
+class ZipStream:
+    """
+    A ZIP archive produced as a byte stream while its entries are added, in
+    memory bounded by one chunk rather than by the archive.
+
+        zs = ZipStream()
+        async for data in zs.add("a.txt", chunks):
+            yield data
+        for data in zs.finish():
+            yield data
+    """
+
+    def __init__(self, compression: int = zipfile.ZIP_DEFLATED):
+        self._sink = _Sink()
+        self._zip = zipfile.ZipFile(self._sink, mode="w", compression=compression, allowZip64=True)
+        self._date_time = time.localtime(time.time())[:6]
+        self._names: set[str] = set()
+        self.entries: list[dict] = []
+
+    @property
+    def size(self) -> int:
+        return self._sink.tell()
+
+    def _unique_name(self, name: str) -> str:
+        """
+        `name`, or "name (2).ext", "name (3).ext", ... when an entry already
+        has it: unzip tools overwrite or skip entries with a repeated name.
+        """
+        stem, ext = posixpath.splitext(name)
+        candidate, n = name, 1
+        while candidate in self._names:
+            n += 1
+            candidate = f"{stem} ({n}){ext}"
+        self._names.add(candidate)
+        return candidate
+
+    async def add(self, name: str, chunks: Union[AsyncIterable[bytes], Iterable[bytes]]) -> AsyncIterator[bytes]:
+        """
+        Add one entry from `chunks` (sync or async), yielding archive bytes
+        as they are produced. A repeated `name` gets a " (2)" style suffix.
+        The stored name, size and sha256 are recorded in `entries`.
+        """
+        name = self._unique_name(name)
+        info = zipfile.ZipInfo(name, date_time=self._date_time)
+        info.compress_type = self._zip.compression
+        digest, size = hashlib.sha256(), 0
+        with self._zip.open(info, mode="w", force_zip64=True) as entry:
+            async for chunk in _as_async(chunks):
+                entry.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+                data = self._sink.drain()
+                if data:
+                    yield data
+        self.entries.append({"name": name, "size": size, "sha256": digest.hexdigest()})
+        data = self._sink.drain()
+        if data:
+            yield data
+
+    def finish(self) -> Iterable[bytes]:
+        """
+        Write the central directory; the archive is complete afterwards.
+        """
+        self._zip.close()
+        yield self._sink.drain()
@@ -0,0 +1,26 @@
+-- Background job queue
+-- Optional durable record of jobs run by app.utils.job_runner (JOB_QUEUE_PERSIST=true):
+-- status polling works across workers and resumable jobs are re-queued after a restart.
+
+CREATE TABLE IF NOT EXISTS ai_verify_transaction.background_jobs
+(
+    job_id character varying(32) NOT NULL,
+    job_type character varying(64) NOT NULL,
+    status character varying(16) NOT NULL,
+    progress integer NOT NULL DEFAULT 0,
+    message character varying,
+    attempts integer NOT NULL DEFAULT 0,
+    payload json,
+    result json,
+    error text,
+    created_by integer,
+    created_date timestamp with time zone,
+    started_date timestamp with time zone,
+    finished_date timestamp with time zone,
+    CONSTRAINT background_jobs_pkey PRIMARY KEY (job_id)
+);
+
+-- restart recovery scans unfinished jobs only
+CREATE INDEX IF NOT EXISTS ix_background_jobs_pending
+    ON ai_verify_transaction.background_jobs (created_date)
+    WHERE status IN ('queued', 'running');
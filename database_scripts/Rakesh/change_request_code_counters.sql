@@ -0,0 +1,19 @@
+-- Change request code counters
+-- CR-{year}-{n} codes are numbered from one counter row per year, advanced with
+-- INSERT ... ON CONFLICT (year) DO UPDATE ... RETURNING, instead of reading the
+-- latest code with LIKE 'CR-{year}-%' (two concurrent creates got the same code).
+-- Seed each year from the highest code already issued.
+
+CREATE TABLE IF NOT EXISTS ai_verify_transaction.change_request_code_counters (
+    year integer PRIMARY KEY,
+    last_value integer NOT NULL
+);
+
+INSERT INTO ai_verify_transaction.change_request_code_counters (year, last_value)
+SELECT split_part(change_request_code, '-', 2)::integer,
+       MAX(split_part(change_request_code, '-', 3)::integer)
+FROM ai_verify_transaction.change_request
+WHERE change_request_code ~ '^CR-[0-9]{4}-[0-9]+$'
+GROUP BY 1
+ON CONFLICT (year) DO UPDATE
+    SET last_value = GREATEST(change_request_code_counters.last_value, EXCLUDED.last_value);
@@ -0,0 +1,10 @@
+-- Change request inbox
+-- getUnverifiedChangeRequests starts from the approver's own mappings and
+-- checks project membership and approver role with EXISTS semi-joins
+-- (the old cross join on user_role_mapping repeated every row per role row).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_change_request_user_mapping_verifier
+    ON ai_verify_transaction.change_request_user_mapping (verified_by, user_is_active, change_request_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_projects_user_mapping_user_active
+    ON ai_verify_transaction.projects_user_mapping (user_id, is_active, project_id);
@@ -0,0 +1,10 @@
+-- Comment thread and inbox reads
+-- GetCommentsByTask and comments/{user_id} read comments by phase in
+-- comment_date order and, with ?since=, probe each candidate comment for
+-- replies added after the client's high-water mark.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_project_comments_phase_date
+    ON ai_verify_transaction.project_comments (project_phase_id, comment_date);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_comment_replies_comment_date
+    ON ai_verify_transaction.comment_replies (comment_id, replied_date);
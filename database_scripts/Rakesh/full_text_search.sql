@@ -0,0 +1,80 @@
+-- Full-text search (GET /search)
+-- Generated tsvector columns keep the search index current on every write
+-- path, including the submit_project_task_document_v2 function, without
+-- application code. Each column has a GIN index; app/services/search_service.py
+-- queries them with websearch_to_tsquery('english', ...), ranks with ts_rank
+-- and only returns rows of projects the caller is a member of (served by
+-- ix_projects_user_mapping_user_active, change_request_inbox_indexes.sql).
+--
+-- Task documents are indexed through document_search_text(): the string
+-- values of the JSON (no keys or braces) with HTML markup stripped, the same
+-- rules as document_text() in app/utils/search_index.py, so Postgres and the
+-- SQLite fallback match the same words. Every indexed text is cut to 100000
+-- characters (SEARCH_TEXT_MAX_CHARS) so no tsvector reaches the 1MB limit and
+-- fails the insert.
+--
+-- Re-runnable: the generated columns are dropped and re-added, which also
+-- drops their indexes.
+
+CREATE OR REPLACE FUNCTION ai_verify_docs.document_search_text(doc text)
+RETURNS text
+LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE
+AS $$
+DECLARE
+    body text;
+BEGIN
+    IF doc IS NULL OR doc = '' THEN
+        RETURN '';
+    END IF;
+    BEGIN
+        SELECT coalesce(string_agg(value #>> '{}', ' '), '')
+          INTO body
+          FROM jsonb_path_query(doc::jsonb, 'strict $.**') AS value
+         WHERE jsonb_typeof(value) = 'string';
+    EXCEPTION WHEN others THEN
+        -- not JSON: index it as plain HTML
+        body := doc;
+    END;
+    body := regexp_replace(body, '<[^>]*>', ' ', 'g');
+    body := replace(replace(replace(replace(replace(replace(body,
+                '&nbsp;', ' '), '&lt;', '<'), '&gt;', '>'), '&quot;', '"'), '&#39;', ''''), '&amp;', '&');
+    RETURN left(btrim(regexp_replace(body, '\s+', ' ', 'g')), 100000);
+END;
+$$;
+
+ALTER TABLE ai_verify_docs.task_docs DROP COLUMN IF EXISTS search_tsv;
+ALTER TABLE ai_verify_docs.task_docs
+    ADD COLUMN search_tsv tsvector
+    GENERATED ALWAYS AS (
+        to_tsvector('english', ai_verify_docs.document_search_text(document_json))
+    ) STORED;
+
+ALTER TABLE ai_verify_transaction.project_comments DROP COLUMN IF EXISTS search_tsv;
+ALTER TABLE ai_verify_transaction.project_comments
+    ADD COLUMN search_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', left(coalesce(description, ''), 100000))) STORED;
+
+ALTER TABLE ai_verify_transaction.comment_replies DROP COLUMN IF EXISTS search_tsv;
+ALTER TABLE ai_verify_transaction.comment_replies
+    ADD COLUMN search_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', left(coalesce(reply_description, ''), 100000))) STORED;
+
+ALTER TABLE ai_verify_transaction.incident_reports DROP COLUMN IF EXISTS search_tsv;
+ALTER TABLE ai_verify_transaction.incident_reports
+    ADD COLUMN search_tsv tsvector
+    GENERATED ALWAYS AS (
+        to_tsvector('english', left(concat_ws(' ', raise_comment, resolve_comment), 100000))
+    ) STORED;
+
+-- only the latest version of a task document is searched
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_task_docs_search_tsv
+    ON ai_verify_docs.task_docs USING gin (search_tsv) WHERE is_latest;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_project_comments_search_tsv
+    ON ai_verify_transaction.project_comments USING gin (search_tsv);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_comment_replies_search_tsv
+    ON ai_verify_transaction.comment_replies USING gin (search_tsv);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_incident_reports_search_tsv
+    ON ai_verify_transaction.incident_reports USING gin (search_tsv);
@@ -0,0 +1,26 @@
+-- Incident inbox read model
+-- Lookup names are stored on incident_reports so GetIncidentReports needs no joins,
+-- plus indexes for the assignee inbox (keyset on incident_report_id) and task lookups.
+
+ALTER TABLE IF EXISTS ai_verify_transaction.incident_reports
+    ADD COLUMN IF NOT EXISTS project_name character varying,
+    ADD COLUMN IF NOT EXISTS phase_name character varying,
+    ADD COLUMN IF NOT EXISTS task_name character varying;
+
+-- backfill existing rows
+UPDATE ai_verify_transaction.incident_reports ir
+SET project_name = p.project_name,
+    phase_name   = sp.phase_name,
+    task_name    = st.task_name
+FROM ai_verify_transaction.project_tasks_list ptl
+LEFT JOIN ai_verify_transaction.project_phases_list ppl ON ppl.project_phase_id = ptl.project_phase_id
+LEFT JOIN ai_verify_transaction.projects p ON p.project_id = ppl.project_id
+LEFT JOIN ai_verify_master.sdlc_phases sp ON sp.phase_id = ppl.phase_id
+LEFT JOIN ai_verify_master.sdlc_tasks st ON st.task_id = ptl.task_id
+WHERE ptl.project_task_id = ir.task_id;
+
+CREATE INDEX IF NOT EXISTS ix_incident_reports_assigned_failure_id
+    ON ai_verify_transaction.incident_reports (assigned_to, failure_type, incident_report_id DESC);
+
+CREATE INDEX IF NOT EXISTS ix_incident_reports_task_id
+    ON ai_verify_transaction.incident_reports (task_id);
@@ -0,0 +1,18 @@
+-- Patch storage for successive JSON template versions
+-- With JSON_TEMPLATE_PATCH_STORAGE on, a resubmitted incident form is stored
+-- as a JSON Patch (patch_json) against the previous submission
+-- (base_transaction_id) and template_json stays NULL; every
+-- JSON_SNAPSHOT_INTERVAL versions a full snapshot is written again.
+-- Readers of template_json must go through load_template_json (or skip
+-- rows whose template_json is NULL) before the flag is turned on.
+
+ALTER TABLE ai_verify_transaction.json_template_transactions
+    ALTER COLUMN template_json DROP NOT NULL,
+    ADD COLUMN IF NOT EXISTS base_transaction_id integer
+        REFERENCES ai_verify_transaction.json_template_transactions (transaction_template_id),
+    ADD COLUMN IF NOT EXISTS patch_json json,
+    ADD COLUMN IF NOT EXISTS chain_depth integer;
+
+-- incident version history: submissions of one incident in order
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_incident_report_transactions_incident_status
+    ON ai_verify_transaction.incident_report_transactions (incident_report_id, status, created_date DESC);
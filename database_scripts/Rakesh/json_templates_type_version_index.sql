@@ -0,0 +1,8 @@
+-- Latest template by type
+-- GET /master/by-template-type reads the newest version with
+-- ORDER BY template_version DESC LIMIT 1 instead of a MAX() subquery join;
+-- this index answers it with one index probe. The result is then kept in
+-- the template registry until createJsonTemplate adds a version.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_json_templates_type_version
+    ON ai_verify_master.json_templates (template_type_id, template_version DESC);
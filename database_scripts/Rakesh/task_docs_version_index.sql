@@ -0,0 +1,8 @@
+-- Phase document index / version history
+-- GetPhaseDocumentIndex ranks each task's versions with
+-- row_number() OVER (PARTITION BY project_task_id ORDER BY doc_version DESC)
+-- and GetTaskDocumentVersions lists one task's versions newest first; this
+-- index serves both without sorting.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_task_docs_task_version
+    ON ai_verify_docs.task_docs (project_task_id, doc_version DESC);
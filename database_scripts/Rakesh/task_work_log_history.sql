@@ -0,0 +1,6 @@
+-- Task work-log history reads
+-- getTaskWorkLogs / streamTaskWorkLogs page through one task's logs by
+-- task_work_log_id; this index serves both without sorting.
+
+CREATE INDEX IF NOT EXISTS ix_task_work_log_project_task_id
+    ON ai_verify_transaction.task_work_log (project_task_id, task_work_log_id);
@@ -42,6 +42,8 @@ ALTER SEQUENCE ai_verify_transaction.incident_report_transactions_incident_repor
 TRUNCATE TABLE ai_verify_transaction.change_request CASCADE;
 ALTER SEQUENCE ai_verify_transaction.change_request_change_request_id_seq RESTART;
 
+TRUNCATE TABLE ai_verify_transaction.change_request_code_counters;
+
 TRUNCATE TABLE ai_verify_transaction.change_request_user_mapping CASCADE;
 ALTER SEQUENCE ai_verify_transaction.change_request_user_mapping_change_request_user_mapping_id_seq RESTART;
 
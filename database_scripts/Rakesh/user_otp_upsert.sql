@@ -0,0 +1,11 @@
+-- One OTP row per user
+-- forgot-password writes the OTP with INSERT ... ON CONFLICT (user_id) DO UPDATE,
+-- which needs a unique index on user_id. Keep the newest row of any duplicates first.
+
+DELETE FROM ai_verify_transaction.user_otp o
+USING ai_verify_transaction.user_otp newer
+WHERE o.user_id = newer.user_id
+  AND o.user_otp_id < newer.user_otp_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_user_otp_user_id
+    ON ai_verify_transaction.user_otp (user_id);
@@ -0,0 +1,21 @@
+-- Login / current-user lookups by email
+-- fetch_user_by_email filters on email and is_active and reads only the
+-- login projection (app/utils/user_queries.py AUTH_USER_COLUMNS); this
+-- partial covering index lets the users side run as an index-only scan.
+-- Keep the INCLUDE list in step with AUTH_USER_COLUMNS.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_active_email
+    ON ai_verify_transaction.users (email)
+    INCLUDE (
+        user_id,
+        user_name,
+        user_first_name,
+        password,
+        is_active,
+        is_temporary_password,
+        password_validity_date,
+        login_failed_count,
+        is_user_locked,
+        user_locked_time
+    )
+    WHERE is_active;